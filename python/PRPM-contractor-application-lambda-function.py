@@ -1,45 +1,73 @@
 import json
-import smtplib
-import ssl
-from email.message import EmailMessage
 import os
 import re
-from datetime import datetime
-from typing import Dict, Any, Tuple
-from urllib.parse import urlparse
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple, Union
+
+from prpm_ack import (ACK_CHANNEL, HeldAcknowledgement, acknowledgement_status, acknowledgements_enabled,
+                      build_acknowledgement)
+from prpm_attachments import MAX_REQUEST_BYTES, attach, read_attachments
+from prpm_batch import batch_refusal, process_batch
+from prpm_circuit import CircuitOpenError
+from prpm_delivery import get_delivery
+from prpm_digest import digest_enabled, get_digest_buffer
+from prpm_domains import check_email_domain, email_domain_kind
+from prpm_intake import IntakeError, read_body
+from prpm_idempotency import get_idempotency_cache, idempotency_key, replayed
+from prpm_metrics import instrumented, phase, record_smtp, set_property
+from prpm_ratelimit import charge_batch, rate_limited
+from prpm_responses import (CONFIG_ERROR_RESPONSE, MISSING_BODY_RESPONSE, SMTP_ERROR_RESPONSE,
+                            UNEXPECTED_ERROR_RESPONSE, json_response, service_unavailable,
+                            static_response)
+from prpm_schema import Field, compile_schema
+from prpm_smtp import smtp_exception_type
+from prpm_spool import MessageTooLargeError, get_spool, spool_fallback_enabled, spool_mode_enabled
+from prpm_templates import Block, Line, Section, compile_template
+from prpm_uploads import document_links, issue_uploads, resolve_uploads, upload_tokens
+
+if TYPE_CHECKING:
+    from email.message import EmailMessage
+    from prpm_attachments import Attachment, StreamingMessage
 
 # SMTP setup (use Lambda environment variables for security)
-SMTP_SERVER = "smtp.zeptomail.com"
-PORT = 587
+SMTP_SERVER = os.environ.get('ZEPTO_SMTP_HOST', "smtp.zeptomail.com")
+PORT = int(os.environ.get('ZEPTO_SMTP_PORT', '587'))
 USERNAME = os.environ.get('ZEPTO_USER', '')
 PASSWORD = os.environ.get('ZEPTO_PASS', '')
 FROM_EMAIL = "noreply@paxriverpm.com"
 TO_EMAIL = "info@paxriverpm.com"
+FORM_TYPE = "contractor-application"
+SUCCESS_MESSAGE = "Contractor application submitted successfully! We will contact you shortly."
+ACK_SUBJECT = "We received your contractor application"
+ACK_SUMMARY = "Your contractor application has been received and our team will review it shortly."
+SUCCESS_RESPONSE = static_response(200, {"message": SUCCESS_MESSAGE})
+ACCEPTED_RESPONSE = static_response(202, {"message": SUCCESS_MESSAGE})
 
 # Validation constants
 MAX_STRING_LENGTH = 500
 MAX_TEXTAREA_LENGTH = 2000
 
+# Precompiled field patterns
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+ZIP_CODE_PATTERN = re.compile(r'^\d{5}(-\d{4})?$')
+PHONE_PATTERN = re.compile(r'^\d{3}-\d{3}-\d{4}$')
+WEBSITE_NETLOC_PATTERN = re.compile(r'[^/?#]*')
+EMAIL_ERROR = 'Please enter a valid email address'
+ZIP_CODE_ERROR = 'Please enter a valid zip code (format: 12345 or 12345-6789)'
+
 
 def validate_email(email: str) -> bool:
-    """Validate email format using regex."""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    """Validate email format using regex, and that its domain is not disposable or undeliverable."""
+    return bool(EMAIL_PATTERN.match(email)) and email_domain_kind(email) is None
 
 
 def validate_zip_code(zip_code: str) -> bool:
     """Validate US zip code format (5 digits or 5+4 format)."""
-    pattern = r'^\d{5}(-\d{4})?$'
-    return bool(re.match(pattern, zip_code))
+    return bool(ZIP_CODE_PATTERN.match(zip_code))
 
 
 def validate_phone(phone: str) -> bool:
     """Validate phone number format (XXX-XXX-XXXX)."""
-    # Remove any whitespace
-    phone = phone.strip()
-    # Pattern for XXX-XXX-XXXX format
-    pattern = r'^\d{3}-\d{3}-\d{4}$'
-    return bool(re.match(pattern, phone))
+    return bool(PHONE_PATTERN.match(phone.strip()))
 
 
 def validate_website(website: str) -> bool:
@@ -52,211 +80,166 @@ def validate_website(website: str) -> bool:
     if not website.startswith(('http://', 'https://')):
         website = 'https://' + website
     
-    try:
-        result = urlparse(website)
-        # Check if it has a valid netloc (domain)
-        return all([result.scheme in ['http', 'https'], result.netloc])
-    except Exception:
-        return False
+    # Check if it has a valid netloc (domain): the same split urlparse makes,
+    # without importing urllib.parse on the validation path
+    netloc = WEBSITE_NETLOC_PATTERN.match(website, website.index('//') + 2).group()
+    return bool(netloc) and ('[' in netloc) == (']' in netloc)
 
 
-def validate_string(value: str, field_name: str, required: bool = True, max_length: int = MAX_STRING_LENGTH) -> Tuple[bool, str]:
-    """Validate string fields."""
-    if required and (not value or not value.strip()):
-        return False, f"{field_name} is required"
-    
-    if value and len(value) > max_length:
-        return False, f"{field_name} must not exceed {max_length} characters"
-    
-    return True, ""
+def phone_error(field_name: str) -> str:
+    """Build the phone format error message for a field."""
+    return f"{field_name} must be in format XXX-XXX-XXXX"
+
+
+CONTRACTOR_SCHEMA = compile_schema([
+    # Company Information
+    Field('companyName', 'Company name'),
+    Field('typeOfService', 'Type of service'),
+    Field('streetAddress', 'Street address'),
+    Field('city', 'City'),
+    Field('state', 'State'),
+    Field('zipCode', 'Zip code', pattern=ZIP_CODE_PATTERN, error=ZIP_CODE_ERROR),
+    Field('website', 'Website', required=False, check=validate_website, error='Please enter a valid website URL'),
+    # Primary Contact
+    Field('firstName', 'First name'),
+    Field('lastName', 'Last name'),
+    Field('title', 'Title'),
+    Field('email', 'Email', pattern=EMAIL_PATTERN, error=EMAIL_ERROR, check=check_email_domain),
+    Field('officeNumber', 'Office number', pattern=PHONE_PATTERN, error=phone_error('Office number')),
+    Field('mobilePhone', 'Mobile phone', required=False, pattern=PHONE_PATTERN, error=phone_error('Mobile phone')),
+    # Primary State License (optional)
+    Field('licenseName', 'License name', required=False),
+    Field('licenseNumber', 'License number', required=False),
+    Field('licenseType', 'License type', required=False),
+    # References
+    Field('reference1Name', 'Reference 1 name'),
+    Field('reference1Title', 'Reference 1 title'),
+    Field('reference1Phone', 'Reference 1 phone', pattern=PHONE_PATTERN, error=phone_error('Reference 1 phone')),
+    Field('reference1BusinessType', 'Reference 1 type of business'),
+    Field('reference2Name', 'Reference 2 name'),
+    Field('reference2Title', 'Reference 2 title'),
+    Field('reference2Phone', 'Reference 2 phone', pattern=PHONE_PATTERN, error=phone_error('Reference 2 phone')),
+    Field('reference2BusinessType', 'Reference 2 type of business'),
+], max_length=MAX_STRING_LENGTH)
 
 
 def validate_contractor_data(body: Dict[str, Any]) -> Tuple[bool, Dict[str, str]]:
     """Comprehensive validation of contractor application form data."""
-    errors = {}
-    
-    # Required string fields - Company Information
-    required_company_fields = {
-        'companyName': 'Company name',
-        'typeOfService': 'Type of service',
-        'streetAddress': 'Street address',
-        'city': 'City',
-        'state': 'State',
-        'zipCode': 'Zip code'
-    }
-    
-    for field, field_name in required_company_fields.items():
-        value = body.get(field, '').strip()
-        is_valid, error_msg = validate_string(value, field_name, required=True)
-        if not is_valid:
-            errors[field] = error_msg
-    
-    # Zip code validation (specific)
-    zip_code = body.get('zipCode', '').strip()
-    if zip_code:
-        if not validate_zip_code(zip_code):
-            errors['zipCode'] = 'Please enter a valid zip code (format: 12345 or 12345-6789)'
-    
-    # Website validation (optional)
-    website = body.get('website', '').strip()
-    if website:
-        if not validate_website(website):
-            errors['website'] = 'Please enter a valid website URL'
-    
-    # Required string fields - Primary Contact
-    required_contact_fields = {
-        'firstName': 'First name',
-        'lastName': 'Last name',
-        'title': 'Title',
-        'email': 'Email',
-        'officeNumber': 'Office number'
-    }
-    
-    for field, field_name in required_contact_fields.items():
-        value = body.get(field, '').strip()
-        is_valid, error_msg = validate_string(value, field_name, required=True)
-        if not is_valid:
-            errors[field] = error_msg
-    
-    # Email validation (specific)
-    email = body.get('email', '').strip()
-    if email:
-        if not validate_email(email):
-            errors['email'] = 'Please enter a valid email address'
-    
-    # Phone number validations
-    phone_fields = {
-        'officeNumber': 'Office number',
-        'mobilePhone': 'Mobile phone'
-    }
-    
-    for field, field_name in phone_fields.items():
-        value = body.get(field, '').strip()
-        if field == 'officeNumber' or value:  # Office number is required, mobile is optional
-            if not value:
-                if field == 'officeNumber':
-                    errors[field] = f"{field_name} is required"
-            elif not validate_phone(value):
-                errors[field] = f"{field_name} must be in format XXX-XXX-XXXX"
-    
-    # Optional license fields
-    optional_license_fields = {
-        'licenseName': ('License name', MAX_STRING_LENGTH),
-        'licenseNumber': ('License number', MAX_STRING_LENGTH),
-        'licenseType': ('License type', MAX_STRING_LENGTH)
-    }
-    
-    for field, (field_name, max_length) in optional_license_fields.items():
-        value = body.get(field, '').strip()
-        if value:
-            is_valid, error_msg = validate_string(value, field_name, required=False, max_length=max_length)
-            if not is_valid:
-                errors[field] = error_msg
-    
-    # Required Reference 1 fields
-    required_ref1_fields = {
-        'reference1Name': 'Reference 1 name',
-        'reference1Title': 'Reference 1 title',
-        'reference1Phone': 'Reference 1 phone',
-        'reference1BusinessType': 'Reference 1 type of business'
-    }
-    
-    for field, field_name in required_ref1_fields.items():
-        value = body.get(field, '').strip()
-        if field == 'reference1Phone':
-            if not value:
-                errors[field] = f"{field_name} is required"
-            elif not validate_phone(value):
-                errors[field] = f"{field_name} must be in format XXX-XXX-XXXX"
-        else:
-            is_valid, error_msg = validate_string(value, field_name, required=True)
-            if not is_valid:
-                errors[field] = error_msg
-    
-    # Required Reference 2 fields
-    required_ref2_fields = {
-        'reference2Name': 'Reference 2 name',
-        'reference2Title': 'Reference 2 title',
-        'reference2Phone': 'Reference 2 phone',
-        'reference2BusinessType': 'Reference 2 type of business'
-    }
-    
-    for field, field_name in required_ref2_fields.items():
-        value = body.get(field, '').strip()
-        if field == 'reference2Phone':
-            if not value:
-                errors[field] = f"{field_name} is required"
-            elif not validate_phone(value):
-                errors[field] = f"{field_name} must be in format XXX-XXX-XXXX"
-        else:
-            is_valid, error_msg = validate_string(value, field_name, required=True)
-            if not is_valid:
-                errors[field] = error_msg
-    
-    return len(errors) == 0, errors
+    return CONTRACTOR_SCHEMA.validate(body)
+
+
+CONTRACTOR_TEMPLATE = compile_template("New Contractor Application Submission", [
+    Section("COMPANY INFORMATION", [
+        Line("Company Name", 'companyName'),
+        Line("Type of Service", 'typeOfService'),
+        Line("Street Address", 'streetAddress'),
+        Line("City", 'city'),
+        Line("State", 'state'),
+        Line("Zip Code", 'zipCode'),
+        Line("Website", 'website', default='Not provided'),
+    ]),
+    Section("PRIMARY CONTACT", [
+        Line("First Name", 'firstName'),
+        Line("Last Name", 'lastName'),
+        Line("Title", 'title'),
+        Line("Email", 'email'),
+        Line("Mobile Phone", 'mobilePhone', default='Not provided'),
+        Line("Office Number", 'officeNumber'),
+    ]),
+    Section("PRIMARY STATE LICENSE", [
+        Line("Name (as it appears on license)", 'licenseName', default='Not provided'),
+        Line("License Number", 'licenseNumber', default='Not provided'),
+        Line("Type of License", 'licenseType', default='Not provided'),
+    ]),
+    Section("REFERENCE #1", [
+        Line("Name", 'reference1Name'),
+        Line("Title", 'reference1Title'),
+        Line("Phone Number", 'reference1Phone'),
+        Line("Type of Business", 'reference1BusinessType'),
+    ]),
+    Section("REFERENCE #2", [
+        Line("Name", 'reference2Name'),
+        Line("Title", 'reference2Title'),
+        Line("Phone Number", 'reference2Phone'),
+        Line("Type of Business", 'reference2BusinessType'),
+    ]),
+    Section("DOCUMENTS", [
+        Block(None, document_links),
+    ]),
+])
 
 
 def format_email_content(body: Dict[str, Any]) -> str:
     """Format the contractor application data into a readable email."""
-    content = f"""
-New Contractor Application Submission:
+    return CONTRACTOR_TEMPLATE.render_text(body)
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-COMPANY INFORMATION:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Company Name: {body.get('companyName', 'N/A')}
-Type of Service: {body.get('typeOfService', 'N/A')}
-Street Address: {body.get('streetAddress', 'N/A')}
-City: {body.get('city', 'N/A')}
-State: {body.get('state', 'N/A')}
-Zip Code: {body.get('zipCode', 'N/A')}
-Website: {body.get('website', 'Not provided')}
+def email_subject(body: Dict[str, Any]) -> str:
+    """Subject line of the notification email (and of its entry in a digest)."""
+    company_name = body.get('companyName', 'Unknown Company')
+    contact_name = f"{body.get('firstName', '')} {body.get('lastName', '')}".strip() or 'Unknown'
+    return f"New Contractor Application: {company_name} - {contact_name}"
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-PRIMARY CONTACT:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-First Name: {body.get('firstName', 'N/A')}
-Last Name: {body.get('lastName', 'N/A')}
-Title: {body.get('title', 'N/A')}
-Email: {body.get('email', 'N/A')}
-Mobile Phone: {body.get('mobilePhone', 'Not provided')}
-Office Number: {body.get('officeNumber', 'N/A')}
+def build_message(body: Dict[str, Any],
+                  attachments: List['Attachment'] = ()) -> Union['EmailMessage', 'StreamingMessage']:
+    """Compose the notification email for a validated contractor application, streaming any attachments."""
+    from email.message import EmailMessage
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    with phase('Format'):
+        text_content, html_content = CONTRACTOR_TEMPLATE.render(body)
+    
+    msg = EmailMessage()
+    msg['Subject'] = email_subject(body)
+    msg['From'] = FROM_EMAIL
+    msg['To'] = TO_EMAIL
+    msg.set_content(text_content)
+    msg.add_alternative(html_content, subtype='html')
+    return attach(msg, attachments)
 
-PRIMARY STATE LICENSE:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Name (as it appears on license): {body.get('licenseName', 'Not provided')}
-License Number: {body.get('licenseNumber', 'Not provided')}
-Type of License: {body.get('licenseType', 'Not provided')}
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def build_ack_message(body: Dict[str, Any]) -> Optional['EmailMessage']:
+    """Compose the submitter's confirmation, or None when there is no address to send it to."""
+    recipient = str(body.get('email', '')).strip()
+    if not recipient:
+        return None
+    name = str(body.get('firstName', '')).strip()
+    return build_acknowledgement(recipient, name, ACK_SUBJECT, ACK_SUMMARY, FROM_EMAIL, TO_EMAIL)
 
-REFERENCE #1:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Name: {body.get('reference1Name', 'N/A')}
-Title: {body.get('reference1Title', 'N/A')}
-Phone Number: {body.get('reference1Phone', 'N/A')}
-Type of Business: {body.get('reference1BusinessType', 'N/A')}
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def add_to_digest(body: Dict[str, Any], attachments: List['Attachment'] = ()) -> bool:
+    """Buffer a validated application for the next digest email; returns False when it is to be sent now."""
+    # Attached files only travel in the application's own email
+    if not digest_enabled(FORM_TYPE) or attachments:
+        return False
+    with phase('Digest'):
+        get_digest_buffer().add(FORM_TYPE, email_subject(body), format_email_content(body))
+    return True
 
-REFERENCE #2:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Name: {body.get('reference2Name', 'N/A')}
-Title: {body.get('reference2Title', 'N/A')}
-Phone Number: {body.get('reference2Phone', 'N/A')}
-Type of Business: {body.get('reference2BusinessType', 'N/A')}
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def screen_submission(body: Dict[str, Any], attachments: List['Attachment'] = ()) -> bool:
+    """Score a validated application for spam; returns True when it is dropped or quarantined instead of sent."""
+    from prpm_spam import quarantine, screen
 
-Submitted on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
-    return content
+    with phase('SpamCheck'):
+        verdict = screen(FORM_TYPE, body)
+    if verdict.action is None:
+        return False
+    if verdict.action == 'quarantine':
+        # Attached and uploaded files only travel in the application's own email, so it is delivered
+        if attachments or upload_tokens(body):
+            set_property('Spam', 'delivered')
+            print(f"Contractor application with files scored as spam, delivered anyway: {verdict.describe()}")
+            return False
+        if not quarantine(FORM_TYPE, email_subject(body), format_email_content(body), verdict):
+            return False
+    set_property('Spam', verdict.action)
+    print(f"Contractor application held as spam ({verdict.action}): {verdict.describe()}")
+    return True
 
 
+@instrumented(FORM_TYPE)
+@rate_limited
 def lambda_handler(event, context):
     """
     AWS Lambda handler for contractor application form submissions.
@@ -267,124 +250,202 @@ def lambda_handler(event, context):
         # Check environment variables
         if not USERNAME or not PASSWORD:
             print("Error: SMTP credentials not configured")
-            return {
-                "statusCode": 500,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*"
-                },
-                "body": json.dumps({
-                    "message": "Server configuration error. Please contact support.",
-                    "error": "SMTP credentials missing"
-                })
-            }
+            return CONFIG_ERROR_RESPONSE
         
         # Parse incoming request
         if not event.get('body'):
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*"
-                },
-                "body": json.dumps({
-                    "message": "Request body is missing",
-                    "errors": {}
-                })
-            }
+            return MISSING_BODY_RESPONSE
+        
+        # Proof of license and insurance may come as multipart uploads or base64 in the JSON
+        with phase('Parse'):
+            body = read_body(event, max_bytes=MAX_REQUEST_BYTES, attachments=True)
         
-        body = json.loads(event['body']) if isinstance(event['body'], str) else event['body']
+        # Large files go straight to the object store; the form first asks for upload URLs
+        if isinstance(body, dict) and 'requestUploads' in body:
+            return json_response(200, issue_uploads(FORM_TYPE, body['requestUploads']))
+        
+        # The form asks for a signed render token when it is displayed
+        if isinstance(body, dict) and body.get('requestFormToken'):
+            from prpm_spam import issue_form_token
+            return json_response(200, {"formToken": issue_form_token(FORM_TYPE)})
+        
+        # While every ZeptoMail endpoint's circuit is open, submissions fail fast or go to the spool
+        delivery = get_delivery(SMTP_SERVER, PORT, USERNAME, PASSWORD)
+        smtp_down = delivery.is_open()
+        if smtp_down:
+            set_property('SmtpCircuit', 'open')
+        
+        # A JSON array is a batch of submissions sent over one SMTP session (trusted callers only)
+        if isinstance(body, list):
+            refusal = batch_refusal(event)
+            if refusal is not None:
+                return json_response(*refusal)
+            over_limit = charge_batch(event, len(body))
+            if over_limit is not None:
+                return over_limit
+            set_property('BatchSize', len(body))
+            if any(isinstance(item, dict) and (item.get('attachments') or item.get('uploads')) for item in body):
+                raise IntakeError(400, "Attachments must be sent with one application at a time")
+            spool = get_spool() if spool_mode_enabled() or (smtp_down and spool_fallback_enabled()) else None
+            session = None if spool else delivery
+            from prpm_store import record_submission
+            status_code, response_body = process_batch(
+                body, FORM_TYPE, validate_contractor_data, build_message,
+                session=session, spool=spool,
+                idempotency=get_idempotency_cache(), normalize=CONTRACTOR_SCHEMA.normalize,
+                success_response=SUCCESS_RESPONSE, record=record_submission, digest=add_to_digest,
+                screen=screen_submission,
+            )
+            return json_response(status_code, response_body)
+        
+        with phase('Attachments'):
+            attachments = read_attachments(body)
+        if attachments:
+            set_property('Attachments', len(attachments))
+            set_property('AttachmentBytes', sum(a.size for a in attachments))
         
         # Validate all fields
-        is_valid, validation_errors = validate_contractor_data(body)
+        with phase('Validate'):
+            is_valid, validation_errors = validate_contractor_data(body)
         
         if not is_valid:
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*"
-                },
-                "body": json.dumps({
-                    "message": "Validation failed. Please check the errors below.",
-                    "errors": validation_errors
-                })
-            }
+            return json_response(400, {
+                "message": "Validation failed. Please check the errors below.",
+                "errors": validation_errors
+            })
+        
+        # Bot and spam submissions get the usual response but never reach SMTP
+        if screen_submission(body, attachments):
+            return SUCCESS_RESPONSE
+        
+        # Duplicate submissions (double clicks, browser retries) get the original response
+        idempotency = get_idempotency_cache()
+        fields = CONTRACTOR_SCHEMA.normalize(body)
+        normalized = dict(fields)
+        if attachments:
+            normalized['attachments'] = ' '.join(a.digest for a in attachments)
+        tokens = upload_tokens(body)
+        if tokens:
+            normalized['uploads'] = ' '.join(tokens)
+        submission_key = idempotency_key(event, FORM_TYPE, normalized)
+        previous_response = idempotency.get(submission_key)
+        if previous_response is not None:
+            print(f"Duplicate submission suppressed: {submission_key}")
+            return replayed(previous_response)
         
-        # Format email content
-        email_content = format_email_content(body)
+        # Only accepted submissions are stored; a background thread writes the copy
+        from prpm_store import record_submission
+        
+        # Uploaded files are checked in the object store and linked from the email; attached ones are listed by name
+        if tokens:
+            with phase('Uploads'):
+                uploads = resolve_uploads(body, FORM_TYPE)
+            set_property('Uploads', len(uploads))
+        if attachments:
+            body['attachments'] = attachments
+        
+        # Low-priority submissions wait for the next digest email instead of being sent one by one
+        if add_to_digest(body, attachments):
+            print("Contractor application added to the digest")
+            record_submission(submission_key, FORM_TYPE, fields)
+            idempotency.put(submission_key, SUCCESS_RESPONSE)
+            return SUCCESS_RESPONSE
+        
+        if smtp_down and not spool_fallback_enabled():
+            print(f"SMTP circuit open; failing fast for {delivery.retry_after():.1f} s")
+            return service_unavailable(delivery.retry_after())
+        
+        # Format and compose the email
+        with phase('BuildMessage'):
+            msg = build_message(body, attachments)
+            ack_msg = build_ack_message(body) if acknowledgements_enabled() else None
         company_name = body.get('companyName', 'Unknown Company')
-        contact_name = f"{body.get('firstName', '')} {body.get('lastName', '')}".strip() or 'Unknown'
         
-        # Compose the email
-        msg = EmailMessage()
-        msg['Subject'] = f"New Contractor Application: {company_name} - {contact_name}"
-        msg['From'] = FROM_EMAIL
-        msg['To'] = TO_EMAIL
-        msg.set_content(email_content)
+        # In spool mode, or while the circuit is open, persist the message and let the drain worker send it
+        if spool_mode_enabled() or smtp_down:
+            try:
+                with phase('Spool'):
+                    spool = get_spool()
+                    spool_id = spool.enqueue(FORM_TYPE, msg.as_bytes())
+                    if ack_msg is not None:
+                        spool.enqueue(FORM_TYPE, ack_msg.as_bytes())
+            except MessageTooLargeError as e:
+                # Attachments can outgrow an SQS message: sent inline instead, or retried later while SMTP is down
+                print(f"Contractor application too large to spool: {str(e)}")
+                if smtp_down:
+                    return service_unavailable(delivery.retry_after())
+            else:
+                print(f"Contractor application spooled as message {spool_id}")
+                response = ACCEPTED_RESPONSE
+                record_submission(submission_key, FORM_TYPE, fields)
+                idempotency.put(submission_key, response)
+                return response
         
-        # Send email via ZeptoMail SMTP
-        ssl_context = ssl.create_default_context()
-        with smtplib.SMTP(SMTP_SERVER, PORT) as server:
-            server.starttls(context=ssl_context)
-            server.login(USERNAME, PASSWORD)
-            server.send_message(msg)
+        # The submitter's acknowledgement connects on its own session while the notification is sent,
+        # but only goes out once the notification has
+        ack = None
+        if ack_msg is not None:
+            ack = HeldAcknowledgement(get_delivery(SMTP_SERVER, PORT, USERNAME, PASSWORD, channel=ACK_CHANNEL),
+                                      ack_msg)
+        
+        # Send email via ZeptoMail SMTP over a warm session, retrying and failing over across endpoints
+        try:
+            delivery.send_message(msg)
+        except BaseException:
+            if ack is not None:
+                ack.cancel()
+            raise
+        finally:
+            record_smtp(delivery.last_timings)
+        
+        # A failed acknowledgement is reported but does not fail the submission
+        ack_sent = None
+        if ack is not None:
+            with phase('AckWait'):
+                ack_sent, ack_error = ack.send()
+            set_property('AckSent', ack_sent)
+            if not ack_sent:
+                print(f"Contractor application acknowledgement email failed: {ack_error}")
         
         print(f"Contractor application email sent successfully for: {company_name}")
         
         # Success response
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*"
-            },
-            "body": json.dumps({
-                "message": "Contractor application submitted successfully! We will contact you shortly."
+        if ack_sent is None:
+            response = SUCCESS_RESPONSE
+        else:
+            response = json_response(200, {
+                "message": SUCCESS_MESSAGE,
+                **acknowledgement_status(ack_sent)
             })
-        }
+        record_submission(submission_key, FORM_TYPE, fields)
+        idempotency.put(submission_key, response)
+        return response
+    
+    except IntakeError as e:
+        print(f"Request body rejected: {e.message}")
+        return json_response(e.status_code, {
+            "message": e.message,
+            "errors": {}
+        })
     
     except json.JSONDecodeError as e:
         print(f"JSON decode error: {str(e)}")
-        return {
-            "statusCode": 400,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*"
-            },
-            "body": json.dumps({
-                "message": "Invalid JSON format in request body.",
-                "error": str(e)
-            })
-        }
+        return json_response(400, {
+            "message": "Invalid JSON format in request body.",
+            "error": str(e)
+        })
     
-    except smtplib.SMTPException as e:
+    except CircuitOpenError as e:
         print(f"SMTP error: {str(e)}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*"
-            },
-            "body": json.dumps({
-                "message": "Failed to send email. Please try again later.",
-                "error": "SMTP error"
-            })
-        }
+        return service_unavailable(e.retry_after)
+    
+    except smtp_exception_type() as e:
+        print(f"SMTP error: {str(e)}")
+        return SMTP_ERROR_RESPONSE
     
     except Exception as e:
         print(f"Unexpected error: {str(e)}")
         import traceback
         traceback.print_exc()
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*"
-            },
-            "body": json.dumps({
-                "message": "An unexpected error occurred. Please try again later.",
-                "error": "Internal server error"
-            })
-        }
+        return UNEXPECTED_ERROR_RESPONSE
 
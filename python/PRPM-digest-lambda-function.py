@@ -0,0 +1,57 @@
+import json
+import os
+
+from prpm_delivery import get_delivery
+from prpm_digest import digest_configured, get_digest_buffer, send_digests, send_due_digests
+
+# SMTP setup (use Lambda environment variables for security)
+SMTP_SERVER = os.environ.get('ZEPTO_SMTP_HOST', "smtp.zeptomail.com")
+PORT = int(os.environ.get('ZEPTO_SMTP_PORT', '587'))
+USERNAME = os.environ.get('ZEPTO_USER', '')
+PASSWORD = os.environ.get('ZEPTO_PASS', '')
+
+
+def lambda_handler(event, context):
+    """
+    AWS Lambda handler that sends the buffered digest emails.
+
+    Runs on a schedule (EventBridge, hourly) and sends one summary email per
+    digested form type over a single ZeptoMail SMTP session. An event with a
+    formTypes list limits the run to those forms; one with "dueOnly": true
+    (a second schedule, every few minutes) sends only the forms that have
+    reached PRPM_DIGEST_MAX_ITEMS, so large bursts go out before the hour.
+    """
+    if not USERNAME or not PASSWORD:
+        print("Error: SMTP credentials not configured")
+        return {
+            "statusCode": 500,
+            "body": json.dumps({
+                "message": "Server configuration error. Please contact support.",
+                "error": "SMTP credentials missing"
+            })
+        }
+
+    if not digest_configured():
+        return {
+            "statusCode": 500,
+            "body": json.dumps({
+                "message": "Server configuration error. Please contact support.",
+                "error": "Digest queue missing"
+            })
+        }
+
+    form_types = (event or {}).get('formTypes')
+    send = send_due_digests if (event or {}).get('dueOnly') else send_digests
+
+    session = get_delivery(SMTP_SERVER, PORT, USERNAME, PASSWORD)
+    summary = send(get_digest_buffer(), session, form_types)
+    print(f"Digest run finished: {summary} SMTP stats: {session.summary()}")
+
+    return {
+        "statusCode": 200,
+        "body": json.dumps(summary)
+    }
+
+
+if __name__ == "__main__":
+    print(lambda_handler({}, None))
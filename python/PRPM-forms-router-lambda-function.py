@@ -0,0 +1,84 @@
+import importlib.util
+import json
+import os
+import sys
+from typing import Dict, Any, Optional
+
+from prpm_intake import IntakeError, read_body
+from prpm_ratelimit import rate_limited
+from prpm_responses import json_response
+
+# Form pipelines served by this function, loaded on first use
+HANDLER_FILES = {
+    'contractor-application': 'PRPM-contractor-application-lambda-function.py',
+    'proposal': 'PRPM-proposal-lambda-function.py',
+    'general-inquiry': 'PRPM-general-inquiry-lambda-function.py',
+}
+HANDLER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_handlers: Dict[str, Any] = {}
+
+
+def load_pipeline(form_type: str):
+    """Import a form's handler script once per container and return its lambda_handler."""
+    handler = _handlers.get(form_type)
+    if handler is None:
+        name = 'prpm_' + form_type.replace('-', '_') + '_handler'
+        module = sys.modules.get(name)
+        if module is None:
+            spec = importlib.util.spec_from_file_location(name, os.path.join(HANDLER_DIR, HANDLER_FILES[form_type]))
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[name] = module
+            spec.loader.exec_module(module)
+        handler = _handlers[form_type] = module.lambda_handler
+    return handler
+
+
+def form_type_from_path(event: Dict[str, Any]) -> Optional[str]:
+    """Match the formType path parameter or the last path segment against the known forms."""
+    candidate = (event.get('pathParameters') or {}).get('formType')
+    if candidate is None:
+        path = event.get('rawPath') or event.get('path') or ''
+        candidate = path.rstrip('/').rsplit('/', 1)[-1]
+    return candidate if candidate in HANDLER_FILES else None
+
+
+@rate_limited
+def lambda_handler(event, context):
+    """
+    AWS Lambda handler that routes every form submission to its pipeline.
+
+    The form is chosen by path (/forms/<form-type>) or, failing that, by a
+    formType field in the JSON body. All pipelines share one container, so
+    they share its warm SMTP session and compiled validators. The rate limit
+    is charged once, here, before the body is looked at.
+    """
+    form_type = form_type_from_path(event)
+
+    if form_type is None:
+        # Fall back to the body; hand the parsed dict on so it is not decoded twice
+        try:
+            body = read_body(event)
+        except IntakeError as e:
+            print(f"Request body rejected: {e.message}")
+            return json_response(e.status_code, {
+                "message": e.message,
+                "errors": {}
+            })
+        except json.JSONDecodeError as e:
+            print(f"JSON decode error: {str(e)}")
+            return json_response(400, {
+                "message": "Invalid JSON format in request body.",
+                "error": str(e)
+            })
+        if isinstance(body, dict) and body.get('formType') in HANDLER_FILES:
+            form_type = body['formType']
+            event = {**event, 'body': body, 'isBase64Encoded': False}
+
+    if form_type is None:
+        return json_response(404, {
+            "message": "Unknown form type",
+            "formTypes": list(HANDLER_FILES)
+        })
+
+    return load_pipeline(form_type)(event, context)
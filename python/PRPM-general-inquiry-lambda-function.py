@@ -1,120 +1,167 @@
 import json
-import smtplib
-import ssl
-from email.message import EmailMessage
 import os
 import re
-from datetime import datetime
-from typing import Dict, Any, Tuple
+from typing import TYPE_CHECKING, Dict, Any, Optional, Tuple
+
+from prpm_ack import (ACK_CHANNEL, HeldAcknowledgement, acknowledgement_status, acknowledgements_enabled,
+                      build_acknowledgement)
+from prpm_batch import batch_refusal, process_batch
+from prpm_circuit import CircuitOpenError
+from prpm_delivery import get_delivery
+from prpm_digest import digest_enabled, get_digest_buffer
+from prpm_domains import check_email_domain, email_domain_kind
+from prpm_intake import IntakeError, read_body
+from prpm_idempotency import get_idempotency_cache, idempotency_key, replayed
+from prpm_metrics import instrumented, phase, record_smtp, set_property
+from prpm_ratelimit import charge_batch, rate_limited
+from prpm_responses import (CONFIG_ERROR_RESPONSE, MISSING_BODY_RESPONSE, SMTP_ERROR_RESPONSE,
+                            UNEXPECTED_ERROR_RESPONSE, json_response, service_unavailable,
+                            static_response)
+from prpm_schema import Field, compile_schema
+from prpm_smtp import smtp_exception_type
+from prpm_spool import get_spool, spool_fallback_enabled, spool_mode_enabled
+from prpm_templates import Block, Line, Section, compile_template
+
+if TYPE_CHECKING:
+    from email.message import EmailMessage
 
 # SMTP setup (use Lambda environment variables for security)
-SMTP_SERVER = "smtp.zeptomail.com"
-PORT = 587
+SMTP_SERVER = os.environ.get('ZEPTO_SMTP_HOST', "smtp.zeptomail.com")
+PORT = int(os.environ.get('ZEPTO_SMTP_PORT', '587'))
 USERNAME = os.environ.get('ZEPTO_USER', '')
 PASSWORD = os.environ.get('ZEPTO_PASS', '')
 FROM_EMAIL = "noreply@paxriverpm.com"
 TO_EMAIL = "info@paxriverpm.com"
+FORM_TYPE = "general-inquiry"
+SUCCESS_MESSAGE = "General inquiry submitted successfully! We will contact you shortly."
+ACK_SUBJECT = "We received your message"
+ACK_SUMMARY = "Your inquiry has been received and we will contact you shortly."
+SUCCESS_RESPONSE = static_response(200, {"message": SUCCESS_MESSAGE})
+ACCEPTED_RESPONSE = static_response(202, {"message": SUCCESS_MESSAGE})
 
 # Validation constants
 MAX_STRING_LENGTH = 200
 MAX_MESSAGE_LENGTH = 5000
 
+# Precompiled field patterns
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+PHONE_PATTERN = re.compile(r'^\d{3}-\d{3}-\d{4}$')
+EMAIL_ERROR = 'Please enter a valid email address'
+
 
 def validate_email(email: str) -> bool:
-    """Validate email format using regex."""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    """Validate email format using regex, and that its domain is not disposable or undeliverable."""
+    return bool(EMAIL_PATTERN.match(email)) and email_domain_kind(email) is None
 
 
 def validate_phone(phone: str) -> bool:
     """Validate phone number format (XXX-XXX-XXXX)."""
-    # Remove any whitespace
-    phone = phone.strip()
-    # Pattern for XXX-XXX-XXXX format
-    pattern = r'^\d{3}-\d{3}-\d{4}$'
-    return bool(re.match(pattern, phone))
+    return bool(PHONE_PATTERN.match(phone.strip()))
 
 
-def validate_string(value: str, field_name: str, required: bool = True, max_length: int = MAX_STRING_LENGTH) -> Tuple[bool, str]:
-    """Validate string fields."""
-    if required and (not value or not value.strip()):
-        return False, f"{field_name} is required"
-    
-    if value and len(value) > max_length:
-        return False, f"{field_name} must not exceed {max_length} characters"
-    
-    return True, ""
+def phone_error(field_name: str) -> str:
+    """Build the phone format error message for a field."""
+    return f"{field_name} must be in format XXX-XXX-XXXX"
+
+
+GENERAL_INQUIRY_SCHEMA = compile_schema([
+    Field('firstName', 'First name'),
+    Field('lastName', 'Last name'),
+    Field('email', 'Email', pattern=EMAIL_PATTERN, error=EMAIL_ERROR, check=check_email_domain),
+    Field('mobilePhone', 'Mobile phone', required=False, pattern=PHONE_PATTERN, error=phone_error('Mobile phone')),
+    Field('message', 'Message', max_length=MAX_MESSAGE_LENGTH),
+], max_length=MAX_STRING_LENGTH)
 
 
 def validate_general_inquiry_data(body: Dict[str, Any]) -> Tuple[bool, Dict[str, str]]:
     """Comprehensive validation of general inquiry form data."""
-    errors = {}
-    
-    # Required string fields
-    required_fields = {
-        'firstName': 'First name',
-        'lastName': 'Last name',
-        'email': 'Email',
-        'message': 'Message'
-    }
-    
-    for field, field_name in required_fields.items():
-        value = body.get(field, '').strip()
-        if field == 'message':
-            is_valid, error_msg = validate_string(value, field_name, required=True, max_length=MAX_MESSAGE_LENGTH)
-        else:
-            is_valid, error_msg = validate_string(value, field_name, required=True)
-        
-        if not is_valid:
-            errors[field] = error_msg
-    
-    # Email validation (specific)
-    email = body.get('email', '').strip()
-    if email:
-        if not validate_email(email):
-            errors['email'] = 'Please enter a valid email address'
-    
-    # Mobile phone validation (optional but should be valid if provided)
-    mobile_phone = body.get('mobilePhone', '').strip()
-    if mobile_phone:
-        if not validate_phone(mobile_phone):
-            errors['mobilePhone'] = 'Mobile phone must be in format XXX-XXX-XXXX'
-    
-    return len(errors) == 0, errors
+    return GENERAL_INQUIRY_SCHEMA.validate(body)
+
+
+def full_name(body: Dict[str, Any]) -> str:
+    """Join the submitter's first and last name."""
+    return f"{body.get('firstName', 'N/A')} {body.get('lastName', 'N/A')}".strip()
+
+
+GENERAL_INQUIRY_TEMPLATE = compile_template("New General Inquiry Submission", [
+    Section("CONTACT INFORMATION", [
+        Line("Name", full_name),
+        Line("First Name", 'firstName'),
+        Line("Last Name", 'lastName'),
+        Line("Email", 'email'),
+        Line("Mobile Phone", 'mobilePhone', default='Not provided'),
+    ]),
+    Section("MESSAGE", [
+        Block(None, 'message'),
+    ]),
+])
 
 
 def format_email_content(body: Dict[str, Any]) -> str:
     """Format the general inquiry data into a readable email."""
-    first_name = body.get('firstName', 'N/A')
-    last_name = body.get('lastName', 'N/A')
-    full_name = f"{first_name} {last_name}".strip()
+    return GENERAL_INQUIRY_TEMPLATE.render_text(body)
+
+
+def email_subject(body: Dict[str, Any]) -> str:
+    """Subject line of the notification email (and of its entry in a digest)."""
+    first_name = body.get('firstName', 'Unknown')
+    last_name = body.get('lastName', 'Unknown')
+    full_name = f"{first_name} {last_name}".strip() or 'Unknown'
+    return f"New General Inquiry from {full_name}"
+
+
+def build_message(body: Dict[str, Any]) -> 'EmailMessage':
+    """Compose the notification email for a validated general inquiry."""
+    from email.message import EmailMessage
+
+    with phase('Format'):
+        text_content, html_content = GENERAL_INQUIRY_TEMPLATE.render(body)
     
-    content = f"""
-New General Inquiry Submission:
+    msg = EmailMessage()
+    msg['Subject'] = email_subject(body)
+    msg['From'] = FROM_EMAIL
+    msg['To'] = TO_EMAIL
+    msg.set_content(text_content)
+    msg.add_alternative(html_content, subtype='html')
+    return msg
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-CONTACT INFORMATION:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Name: {full_name}
-First Name: {first_name}
-Last Name: {last_name}
-Email: {body.get('email', 'N/A')}
-Mobile Phone: {body.get('mobilePhone', 'Not provided')}
+def build_ack_message(body: Dict[str, Any]) -> Optional['EmailMessage']:
+    """Compose the submitter's confirmation, or None when there is no address to send it to."""
+    recipient = str(body.get('email', '')).strip()
+    if not recipient:
+        return None
+    name = str(body.get('firstName', '')).strip()
+    return build_acknowledgement(recipient, name, ACK_SUBJECT, ACK_SUMMARY, FROM_EMAIL, TO_EMAIL)
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-MESSAGE:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-{body.get('message', 'N/A')}
+def add_to_digest(body: Dict[str, Any]) -> bool:
+    """Buffer a validated inquiry for the next digest email; returns False when it is to be sent now."""
+    if not digest_enabled(FORM_TYPE):
+        return False
+    with phase('Digest'):
+        get_digest_buffer().add(FORM_TYPE, email_subject(body), format_email_content(body))
+    return True
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-Submitted on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
-    return content
+def screen_submission(body: Dict[str, Any]) -> bool:
+    """Score a validated inquiry for spam; returns True when it is dropped or quarantined instead of sent."""
+    from prpm_spam import quarantine, screen
 
+    with phase('SpamCheck'):
+        verdict = screen(FORM_TYPE, body)
+    if verdict.action is None:
+        return False
+    if verdict.action == 'quarantine' and not quarantine(FORM_TYPE, email_subject(body),
+                                                         format_email_content(body), verdict):
+        return False
+    set_property('Spam', verdict.action)
+    print(f"General inquiry held as spam ({verdict.action}): {verdict.describe()}")
+    return True
 
+
+@instrumented(FORM_TYPE)
+@rate_limited
 def lambda_handler(event, context):
     """
     AWS Lambda handler for general inquiry form submissions.
@@ -125,125 +172,168 @@ def lambda_handler(event, context):
         # Check environment variables
         if not USERNAME or not PASSWORD:
             print("Error: SMTP credentials not configured")
-            return {
-                "statusCode": 500,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*"
-                },
-                "body": json.dumps({
-                    "message": "Server configuration error. Please contact support.",
-                    "error": "SMTP credentials missing"
-                })
-            }
+            return CONFIG_ERROR_RESPONSE
         
         # Parse incoming request
         if not event.get('body'):
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*"
-                },
-                "body": json.dumps({
-                    "message": "Request body is missing",
-                    "errors": {}
-                })
-            }
-        
-        body = json.loads(event['body']) if isinstance(event['body'], str) else event['body']
+            return MISSING_BODY_RESPONSE
+        
+        with phase('Parse'):
+            body = read_body(event)
+        
+        # The form asks for a signed render token when it is displayed
+        if isinstance(body, dict) and body.get('requestFormToken'):
+            from prpm_spam import issue_form_token
+            return json_response(200, {"formToken": issue_form_token(FORM_TYPE)})
+        
+        # While every ZeptoMail endpoint's circuit is open, submissions fail fast or go to the spool
+        delivery = get_delivery(SMTP_SERVER, PORT, USERNAME, PASSWORD)
+        smtp_down = delivery.is_open()
+        if smtp_down:
+            set_property('SmtpCircuit', 'open')
+        
+        # A JSON array is a batch of submissions sent over one SMTP session (trusted callers only)
+        if isinstance(body, list):
+            refusal = batch_refusal(event)
+            if refusal is not None:
+                return json_response(*refusal)
+            over_limit = charge_batch(event, len(body))
+            if over_limit is not None:
+                return over_limit
+            set_property('BatchSize', len(body))
+            spool = get_spool() if spool_mode_enabled() or (smtp_down and spool_fallback_enabled()) else None
+            session = None if spool else delivery
+            from prpm_store import record_submission
+            status_code, response_body = process_batch(
+                body, FORM_TYPE, validate_general_inquiry_data, build_message,
+                session=session, spool=spool,
+                idempotency=get_idempotency_cache(), normalize=GENERAL_INQUIRY_SCHEMA.normalize,
+                success_response=SUCCESS_RESPONSE, record=record_submission, digest=add_to_digest,
+                screen=screen_submission,
+            )
+            return json_response(status_code, response_body)
         
         # Validate all fields
-        is_valid, validation_errors = validate_general_inquiry_data(body)
+        with phase('Validate'):
+            is_valid, validation_errors = validate_general_inquiry_data(body)
         
         if not is_valid:
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*"
-                },
-                "body": json.dumps({
-                    "message": "Validation failed. Please check the errors below.",
-                    "errors": validation_errors
-                })
-            }
-        
-        # Format email content
-        email_content = format_email_content(body)
-        first_name = body.get('firstName', 'Unknown')
-        last_name = body.get('lastName', 'Unknown')
-        full_name = f"{first_name} {last_name}".strip() or 'Unknown'
-        
-        # Compose the email
-        msg = EmailMessage()
-        msg['Subject'] = f"New General Inquiry from {full_name}"
-        msg['From'] = FROM_EMAIL
-        msg['To'] = TO_EMAIL
-        msg.set_content(email_content)
-        
-        # Send email via ZeptoMail SMTP
-        ssl_context = ssl.create_default_context()
-        with smtplib.SMTP(SMTP_SERVER, PORT) as server:
-            server.starttls(context=ssl_context)
-            server.login(USERNAME, PASSWORD)
-            server.send_message(msg)
+            return json_response(400, {
+                "message": "Validation failed. Please check the errors below.",
+                "errors": validation_errors
+            })
+        
+        # Bot and spam submissions get the usual response but never reach SMTP
+        if screen_submission(body):
+            return SUCCESS_RESPONSE
+        
+        # Duplicate submissions (double clicks, browser retries) get the original response
+        idempotency = get_idempotency_cache()
+        fields = GENERAL_INQUIRY_SCHEMA.normalize(body)
+        submission_key = idempotency_key(event, FORM_TYPE, fields)
+        previous_response = idempotency.get(submission_key)
+        if previous_response is not None:
+            print(f"Duplicate submission suppressed: {submission_key}")
+            return replayed(previous_response)
+        
+        # Only accepted submissions are stored; a background thread writes the copy
+        from prpm_store import record_submission
+        
+        # Low-priority submissions wait for the next digest email instead of being sent one by one
+        if add_to_digest(body):
+            print("General inquiry added to the digest")
+            record_submission(submission_key, FORM_TYPE, fields)
+            idempotency.put(submission_key, SUCCESS_RESPONSE)
+            return SUCCESS_RESPONSE
+        
+        if smtp_down and not spool_fallback_enabled():
+            print(f"SMTP circuit open; failing fast for {delivery.retry_after():.1f} s")
+            return service_unavailable(delivery.retry_after())
+        
+        # Format and compose the email
+        with phase('BuildMessage'):
+            msg = build_message(body)
+            ack_msg = build_ack_message(body) if acknowledgements_enabled() else None
+        full_name = f"{body.get('firstName', 'Unknown')} {body.get('lastName', 'Unknown')}".strip() or 'Unknown'
+        
+        # In spool mode, or while the circuit is open, persist the message and let the drain worker send it
+        if spool_mode_enabled() or smtp_down:
+            with phase('Spool'):
+                spool = get_spool()
+                spool_id = spool.enqueue(FORM_TYPE, msg.as_bytes())
+                if ack_msg is not None:
+                    spool.enqueue(FORM_TYPE, ack_msg.as_bytes())
+            print(f"General inquiry spooled as message {spool_id}")
+            response = ACCEPTED_RESPONSE
+            record_submission(submission_key, FORM_TYPE, fields)
+            idempotency.put(submission_key, response)
+            return response
+        
+        # The submitter's acknowledgement connects on its own session while the notification is sent,
+        # but only goes out once the notification has
+        ack = None
+        if ack_msg is not None:
+            ack = HeldAcknowledgement(get_delivery(SMTP_SERVER, PORT, USERNAME, PASSWORD, channel=ACK_CHANNEL),
+                                      ack_msg)
+        
+        # Send email via ZeptoMail SMTP over a warm session, retrying and failing over across endpoints
+        try:
+            delivery.send_message(msg)
+        except BaseException:
+            if ack is not None:
+                ack.cancel()
+            raise
+        finally:
+            record_smtp(delivery.last_timings)
+        
+        # A failed acknowledgement is reported but does not fail the submission
+        ack_sent = None
+        if ack is not None:
+            with phase('AckWait'):
+                ack_sent, ack_error = ack.send()
+            set_property('AckSent', ack_sent)
+            if not ack_sent:
+                print(f"General inquiry acknowledgement email failed: {ack_error}")
         
         print(f"General inquiry email sent successfully from: {full_name}")
         
         # Success response
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*"
-            },
-            "body": json.dumps({
-                "message": "General inquiry submitted successfully! We will contact you shortly."
+        if ack_sent is None:
+            response = SUCCESS_RESPONSE
+        else:
+            response = json_response(200, {
+                "message": SUCCESS_MESSAGE,
+                **acknowledgement_status(ack_sent)
             })
-        }
+        record_submission(submission_key, FORM_TYPE, fields)
+        idempotency.put(submission_key, response)
+        return response
+    
+    except IntakeError as e:
+        print(f"Request body rejected: {e.message}")
+        return json_response(e.status_code, {
+            "message": e.message,
+            "errors": {}
+        })
     
     except json.JSONDecodeError as e:
         print(f"JSON decode error: {str(e)}")
-        return {
-            "statusCode": 400,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*"
-            },
-            "body": json.dumps({
-                "message": "Invalid JSON format in request body.",
-                "error": str(e)
-            })
-        }
+        return json_response(400, {
+            "message": "Invalid JSON format in request body.",
+            "error": str(e)
+        })
     
-    except smtplib.SMTPException as e:
+    except CircuitOpenError as e:
         print(f"SMTP error: {str(e)}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*"
-            },
-            "body": json.dumps({
-                "message": "Failed to send email. Please try again later.",
-                "error": "SMTP error"
-            })
-        }
+        return service_unavailable(e.retry_after)
+    
+    except smtp_exception_type() as e:
+        print(f"SMTP error: {str(e)}")
+        return SMTP_ERROR_RESPONSE
     
     except Exception as e:
         print(f"Unexpected error: {str(e)}")
         import traceback
         traceback.print_exc()
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*"
-            },
-            "body": json.dumps({
-                "message": "An unexpected error occurred. Please try again later.",
-                "error": "Internal server error"
-            })
-        }
+        return UNEXPECTED_ERROR_RESPONSE
 
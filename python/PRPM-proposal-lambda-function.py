@@ -1,19 +1,44 @@
 import json
-import smtplib
-import ssl
-from email.message import EmailMessage
 import os
 import re
-from datetime import datetime
-from typing import Dict, Any, Tuple
+from typing import TYPE_CHECKING, Dict, Any, Optional, Tuple
+
+from prpm_ack import (ACK_CHANNEL, HeldAcknowledgement, acknowledgement_status, acknowledgements_enabled,
+                      build_acknowledgement)
+from prpm_batch import batch_refusal, process_batch
+from prpm_circuit import CircuitOpenError
+from prpm_delivery import get_delivery
+from prpm_digest import deadline_is_near, digest_enabled, get_digest_buffer
+from prpm_domains import check_email_domain, email_domain_kind
+from prpm_intake import IntakeError, read_body
+from prpm_idempotency import get_idempotency_cache, idempotency_key, replayed
+from prpm_metrics import instrumented, phase, record_smtp, set_property
+from prpm_ratelimit import charge_batch, rate_limited
+from prpm_responses import (CONFIG_ERROR_RESPONSE, MISSING_BODY_RESPONSE, SMTP_ERROR_RESPONSE,
+                            UNEXPECTED_ERROR_RESPONSE, json_response, service_unavailable,
+                            static_response)
+from prpm_schema import Field, compile_schema
+from prpm_smtp import smtp_exception_type
+from prpm_spool import get_spool, spool_fallback_enabled, spool_mode_enabled
+from prpm_templates import Block, Line, Section, compile_template
+
+if TYPE_CHECKING:
+    from datetime import date
+    from email.message import EmailMessage
 
 # SMTP setup (use Lambda environment variables for security)
-SMTP_SERVER = "smtp.zeptomail.com"
-PORT = 587
+SMTP_SERVER = os.environ.get('ZEPTO_SMTP_HOST', "smtp.zeptomail.com")
+PORT = int(os.environ.get('ZEPTO_SMTP_PORT', '587'))
 USERNAME = os.environ.get('ZEPTO_USER', '')
 PASSWORD = os.environ.get('ZEPTO_PASS', '')
 FROM_EMAIL = "noreply@paxriverpm.com"
 TO_EMAIL = "info@paxriverpm.com"
+FORM_TYPE = "proposal"
+SUCCESS_MESSAGE = "Proposal request submitted successfully! We will be in touch with you shortly."
+ACK_SUBJECT = "We received your proposal request"
+ACK_SUMMARY = "Your proposal request has been received and we will be in touch with you shortly."
+SUCCESS_RESPONSE = static_response(200, {"message": SUCCESS_MESSAGE})
+ACCEPTED_RESPONSE = static_response(202, {"message": SUCCESS_MESSAGE})
 
 # Validation constants
 VALID_STATES = ['Maryland', 'Virginia', 'DC', 'District of Columbia']
@@ -22,38 +47,57 @@ VALID_ON_SITE_STAFF = ['yes', 'no']
 MAX_STRING_LENGTH = 1000
 MAX_TEXTAREA_LENGTH = 5000
 
+# Precompiled field patterns
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+ZIP_CODE_PATTERN = re.compile(r'^\d{5}(-\d{4})?$')
+# Accepted deadline formats as (pattern, year group, month group, day group);
+# matching these directly avoids importing _strptime on the validation path
+DATE_PATTERNS = (
+    (re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})$'), 0, 1, 2),
+    (re.compile(r'^(\d{1,2})/(\d{1,2})/(\d{4})$'), 2, 0, 1),
+    (re.compile(r'^(\d{4})/(\d{1,2})/(\d{1,2})$'), 0, 1, 2),
+)
+EMAIL_ERROR = 'Please enter a valid email address'
+ZIP_CODE_ERROR = 'Please enter a valid zip code (format: 12345 or 12345-6789)'
+
 
 def validate_email(email: str) -> bool:
-    """Validate email format using regex."""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    """Validate email format using regex, and that its domain is not disposable or undeliverable."""
+    return bool(EMAIL_PATTERN.match(email)) and email_domain_kind(email) is None
 
 
 def validate_zip_code(zip_code: str) -> bool:
     """Validate US zip code format (5 digits or 5+4 format)."""
-    pattern = r'^\d{5}(-\d{4})?$'
-    return bool(re.match(pattern, zip_code))
+    return bool(ZIP_CODE_PATTERN.match(zip_code))
+
+
+def parse_date(date_str: str) -> Optional['date']:
+    """Parse a YYYY-MM-DD, MM/DD/YYYY or YYYY/MM/DD date; None if it is not one."""
+    from datetime import date
+
+    for pattern, year_index, month_index, day_index in DATE_PATTERNS:
+        match = pattern.match(date_str)
+        if match:
+            parts = match.groups()
+            try:
+                return date(int(parts[year_index]), int(parts[month_index]), int(parts[day_index]))
+            except ValueError:
+                return None
+    return None
 
 
 def validate_date(date_str: str) -> Tuple[bool, str]:
     """Validate date format and ensure it's in the future."""
+    from datetime import date
+
     try:
-        # Try parsing different date formats
-        date_formats = ['%Y-%m-%d', '%m/%d/%Y', '%Y/%m/%d']
-        parsed_date = None
-        
-        for fmt in date_formats:
-            try:
-                parsed_date = datetime.strptime(date_str, fmt)
-                break
-            except ValueError:
-                continue
+        parsed_date = parse_date(date_str)
         
         if parsed_date is None:
             return False, "Invalid date format"
         
         # Check if date is in the future
-        if parsed_date.date() < datetime.now().date():
+        if parsed_date < date.today():
             return False, "Deadline date must be in the future"
         
         return True, ""
@@ -61,194 +105,138 @@ def validate_date(date_str: str) -> Tuple[bool, str]:
         return False, f"Date validation error: {str(e)}"
 
 
-def validate_number(value: str, field_name: str, min_value: int = 0, max_value: int = None) -> Tuple[bool, str]:
-    """Validate numeric fields."""
-    if not value or not value.strip():
-        return False, f"{field_name} is required"
-    
-    try:
-        num_value = int(value)
-        if num_value < min_value:
-            return False, f"{field_name} must be at least {min_value}"
-        if max_value is not None and num_value > max_value:
-            return False, f"{field_name} must not exceed {max_value}"
-        return True, ""
-    except ValueError:
-        return False, f"{field_name} must be a valid number"
-
-
-def validate_string(value: str, field_name: str, required: bool = True, max_length: int = MAX_STRING_LENGTH) -> Tuple[bool, str]:
-    """Validate string fields."""
-    if required and (not value or not value.strip()):
-        return False, f"{field_name} is required"
-    
-    if value and len(value) > max_length:
-        return False, f"{field_name} must not exceed {max_length} characters"
-    
-    return True, ""
+PROPOSAL_SCHEMA = compile_schema([
+    # Community Information
+    Field('communityName', 'Community name'),
+    Field('address', 'Address'),
+    Field('city', 'City'),
+    Field('state', 'State', choices=VALID_STATES),
+    Field('zipCode', 'Zip code', pattern=ZIP_CODE_PATTERN, error=ZIP_CODE_ERROR),
+    Field('numberOfUnits', 'Number of units', min_value=1, max_value=100000),
+    Field('communityType', 'Community type', choices=VALID_COMMUNITY_TYPES),
+    # Management History
+    Field('selfManagementYears', 'Self-management years', min_value=0, max_value=100),
+    Field('professionalManagementYears', 'Professional management years', min_value=0, max_value=100),
+    Field('onSiteStaff', 'On-site staff', required=False, choices=VALID_ON_SITE_STAFF, lower=True),
+    # Board Information (optional)
+    Field('boardMemberInfo', 'Board member info', required=False),
+    Field('boardPresidentInfo', 'Board president info', required=False, max_length=MAX_TEXTAREA_LENGTH),
+    # Requirements, Amenities and Budget
+    Field('specialRequirements', 'Special requirements', max_length=MAX_TEXTAREA_LENGTH),
+    Field('communityAmenities', 'Community amenities', max_length=MAX_TEXTAREA_LENGTH),
+    Field('annualBudget', 'Annual budget'),
+    Field('reserveBudget', 'Reserve budget'),
+    Field('deadlineDate', 'Deadline date', check=validate_date),
+    # Contact Information
+    Field('contactName', 'Contact name'),
+    Field('contactEmail', 'Contact email', pattern=EMAIL_PATTERN, error=EMAIL_ERROR, check=check_email_domain),
+], max_length=MAX_STRING_LENGTH)
 
 
 def validate_proposal_data(body: Dict[str, Any]) -> Tuple[bool, Dict[str, str]]:
     """Comprehensive validation of proposal form data."""
-    errors = {}
-    
-    # Required string fields
-    required_string_fields = {
-        'communityName': 'Community name',
-        'address': 'Address',
-        'city': 'City',
-        'zipCode': 'Zip code',
-        'specialRequirements': 'Special requirements',
-        'communityAmenities': 'Community amenities',
-        'annualBudget': 'Annual budget',
-        'reserveBudget': 'Reserve budget',
-        'contactName': 'Contact name',
-        'contactEmail': 'Contact email'
-    }
-    
-    for field, field_name in required_string_fields.items():
-        value = body.get(field, '')
-        if field == 'specialRequirements' or field == 'communityAmenities':
-            is_valid, error_msg = validate_string(value, field_name, required=True, max_length=MAX_TEXTAREA_LENGTH)
-        else:
-            is_valid, error_msg = validate_string(value, field_name, required=True)
-        
-        if not is_valid:
-            errors[field] = error_msg
-    
-    # Email validation (specific)
-    contact_email = body.get('contactEmail', '').strip()
-    if contact_email:
-        if not validate_email(contact_email):
-            errors['contactEmail'] = 'Please enter a valid email address'
-    
-    # Zip code validation (specific)
-    zip_code = body.get('zipCode', '').strip()
-    if zip_code:
-        if not validate_zip_code(zip_code):
-            errors['zipCode'] = 'Please enter a valid zip code (format: 12345 or 12345-6789)'
-    
-    # State validation
-    state = body.get('state', '').strip()
-    if not state:
-        errors['state'] = 'State is required'
-    elif state not in VALID_STATES:
-        errors['state'] = f'State must be one of: {", ".join(VALID_STATES)}'
-    
-    # Community type validation
-    community_type = body.get('communityType', '').strip()
-    if not community_type:
-        errors['communityType'] = 'Community type is required'
-    elif community_type not in VALID_COMMUNITY_TYPES:
-        errors['communityType'] = f'Community type must be one of: {", ".join(VALID_COMMUNITY_TYPES)}'
-    
-    # Number validations
-    number_fields = {
-        'numberOfUnits': ('Number of units', 1, 100000),
-        'selfManagementYears': ('Self-management years', 0, 100),
-        'professionalManagementYears': ('Professional management years', 0, 100)
-    }
-    
-    for field, (field_name, min_val, max_val) in number_fields.items():
-        value = body.get(field, '').strip()
-        is_valid, error_msg = validate_number(value, field_name, min_value=min_val, max_value=max_val)
-        if not is_valid:
-            errors[field] = error_msg
-    
-    # On-site staff validation (optional but should be valid if provided)
-    on_site_staff = body.get('onSiteStaff', '').strip().lower()
-    if on_site_staff and on_site_staff not in VALID_ON_SITE_STAFF:
-        errors['onSiteStaff'] = f'On-site staff must be one of: {", ".join(VALID_ON_SITE_STAFF)}'
-    
-    # Deadline date validation
-    deadline_date = body.get('deadlineDate', '').strip()
-    if not deadline_date:
-        errors['deadlineDate'] = 'Deadline date is required'
-    else:
-        is_valid, error_msg = validate_date(deadline_date)
-        if not is_valid:
-            errors['deadlineDate'] = error_msg
-    
-    # Optional fields validation (length checks)
-    optional_fields = {
-        'boardMemberInfo': ('Board member info', MAX_STRING_LENGTH),
-        'boardPresidentInfo': ('Board president info', MAX_TEXTAREA_LENGTH)
-    }
-    
-    for field, (field_name, max_length) in optional_fields.items():
-        value = body.get(field, '')
-        if value:
-            is_valid, error_msg = validate_string(value, field_name, required=False, max_length=max_length)
-            if not is_valid:
-                errors[field] = error_msg
-    
-    return len(errors) == 0, errors
+    return PROPOSAL_SCHEMA.validate(body)
+
+
+PROPOSAL_TEMPLATE = compile_template("New Proposal Request Submission", [
+    Section("COMMUNITY INFORMATION", [
+        Line("Community Name", 'communityName'),
+        Line("Address", 'address'),
+        Line("City", 'city'),
+        Line("State", 'state'),
+        Line("Zip Code", 'zipCode'),
+        Line("Number of Units", 'numberOfUnits'),
+        Line("Community Type", 'communityType', transform=str.upper),
+    ]),
+    Section("MANAGEMENT HISTORY", [
+        Line("Self-Management Years", 'selfManagementYears'),
+        Line("Professional Management Years", 'professionalManagementYears'),
+        Line("On-Site Staff", 'onSiteStaff', transform=str.upper),
+    ]),
+    Section("BOARD INFORMATION", [
+        Line("Board Member Info", 'boardMemberInfo', default='Not provided'),
+        Line("Board President Info", 'boardPresidentInfo', default='Not provided'),
+    ]),
+    Section("REQUIREMENTS & AMENITIES", [
+        Block("Special Requirements", 'specialRequirements'),
+        Block("Community Amenities", 'communityAmenities'),
+    ]),
+    Section("BUDGET INFORMATION", [
+        Line("Annual Budget", 'annualBudget'),
+        Line("Reserve Budget", 'reserveBudget'),
+        Line("Deadline Date", 'deadlineDate'),
+    ]),
+    Section("CONTACT INFORMATION", [
+        Line("Contact Name", 'contactName'),
+        Line("Contact Email", 'contactEmail'),
+    ]),
+])
 
 
 def format_email_content(body: Dict[str, Any]) -> str:
-    """Format the proposal data into a readable email."""
-    content = f"""
-New Proposal Request Submission:
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-COMMUNITY INFORMATION:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Community Name: {body.get('communityName', 'N/A')}
-Address: {body.get('address', 'N/A')}
-City: {body.get('city', 'N/A')}
-State: {body.get('state', 'N/A')}
-Zip Code: {body.get('zipCode', 'N/A')}
-Number of Units: {body.get('numberOfUnits', 'N/A')}
-Community Type: {body.get('communityType', 'N/A').upper()}
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-MANAGEMENT HISTORY:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Self-Management Years: {body.get('selfManagementYears', 'N/A')}
-Professional Management Years: {body.get('professionalManagementYears', 'N/A')}
-On-Site Staff: {body.get('onSiteStaff', 'N/A').upper()}
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-BOARD INFORMATION:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Board Member Info: {body.get('boardMemberInfo', 'Not provided')}
-Board President Info: {body.get('boardPresidentInfo', 'Not provided')}
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    """Format the proposal request data into a readable email."""
+    return PROPOSAL_TEMPLATE.render_text(body)
 
-REQUIREMENTS & AMENITIES:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Special Requirements:
-{body.get('specialRequirements', 'N/A')}
 
-Community Amenities:
-{body.get('communityAmenities', 'N/A')}
+def email_subject(body: Dict[str, Any]) -> str:
+    """Subject line of the notification email (and of its entry in a digest)."""
+    contact_name = body.get('contactName', 'Unknown')
+    community_name = body.get('communityName', 'Unknown Community')
+    return f"New Proposal Request: {community_name} - {contact_name}"
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-BUDGET INFORMATION:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Annual Budget: {body.get('annualBudget', 'N/A')}
-Reserve Budget: {body.get('reserveBudget', 'N/A')}
-Deadline Date: {body.get('deadlineDate', 'N/A')}
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-CONTACT INFORMATION:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Contact Name: {body.get('contactName', 'N/A')}
-Contact Email: {body.get('contactEmail', 'N/A')}
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-Submitted on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
-    return content
 
+def build_message(body: Dict[str, Any]) -> 'EmailMessage':
+    """Compose the notification email for a validated proposal request."""
+    from email.message import EmailMessage
 
+    with phase('Format'):
+        text_content, html_content = PROPOSAL_TEMPLATE.render(body)
+    
+    msg = EmailMessage()
+    msg['Subject'] = email_subject(body)
+    msg['From'] = FROM_EMAIL
+    msg['To'] = TO_EMAIL
+    msg.set_content(text_content)
+    msg.add_alternative(html_content, subtype='html')
+    return msg
+
+
+def build_ack_message(body: Dict[str, Any]) -> Optional['EmailMessage']:
+    """Compose the submitter's confirmation, or None when there is no address to send it to."""
+    recipient = str(body.get('contactEmail', '')).strip()
+    if not recipient:
+        return None
+    name = str(body.get('contactName', '')).strip()
+    return build_acknowledgement(recipient, name, ACK_SUBJECT, ACK_SUMMARY, FROM_EMAIL, TO_EMAIL)
+
+
+def add_to_digest(body: Dict[str, Any]) -> bool:
+    """Buffer a validated proposal for the next digest email; returns False when it is to be sent now."""
+    if not digest_enabled(FORM_TYPE) or deadline_is_near(parse_date(str(body.get('deadlineDate', '')).strip())):
+        return False
+    with phase('Digest'):
+        get_digest_buffer().add(FORM_TYPE, email_subject(body), format_email_content(body))
+    return True
+
+
+def screen_submission(body: Dict[str, Any]) -> bool:
+    """Score a validated proposal for spam; returns True when it is dropped or quarantined instead of sent."""
+    from prpm_spam import quarantine, screen
+
+    with phase('SpamCheck'):
+        verdict = screen(FORM_TYPE, body)
+    if verdict.action is None:
+        return False
+    if verdict.action == 'quarantine' and not quarantine(FORM_TYPE, email_subject(body),
+                                                         format_email_content(body), verdict):
+        return False
+    set_property('Spam', verdict.action)
+    print(f"Proposal held as spam ({verdict.action}): {verdict.describe()}")
+    return True
+
+
+@instrumented(FORM_TYPE)
+@rate_limited
 def lambda_handler(event, context):
     """
     AWS Lambda handler for proposal form submissions.
@@ -259,124 +247,168 @@ def lambda_handler(event, context):
         # Check environment variables
         if not USERNAME or not PASSWORD:
             print("Error: SMTP credentials not configured")
-            return {
-                "statusCode": 500,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*"
-                },
-                "body": json.dumps({
-                    "message": "Server configuration error. Please contact support.",
-                    "error": "SMTP credentials missing"
-                })
-            }
+            return CONFIG_ERROR_RESPONSE
         
         # Parse incoming request
         if not event.get('body'):
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*"
-                },
-                "body": json.dumps({
-                    "message": "Request body is missing",
-                    "errors": {}
-                })
-            }
+            return MISSING_BODY_RESPONSE
+        
+        with phase('Parse'):
+            body = read_body(event)
+        
+        # The form asks for a signed render token when it is displayed
+        if isinstance(body, dict) and body.get('requestFormToken'):
+            from prpm_spam import issue_form_token
+            return json_response(200, {"formToken": issue_form_token(FORM_TYPE)})
         
-        body = json.loads(event['body']) if isinstance(event['body'], str) else event['body']
+        # While every ZeptoMail endpoint's circuit is open, submissions fail fast or go to the spool
+        delivery = get_delivery(SMTP_SERVER, PORT, USERNAME, PASSWORD)
+        smtp_down = delivery.is_open()
+        if smtp_down:
+            set_property('SmtpCircuit', 'open')
+        
+        # A JSON array is a batch of submissions sent over one SMTP session (trusted callers only)
+        if isinstance(body, list):
+            refusal = batch_refusal(event)
+            if refusal is not None:
+                return json_response(*refusal)
+            over_limit = charge_batch(event, len(body))
+            if over_limit is not None:
+                return over_limit
+            set_property('BatchSize', len(body))
+            spool = get_spool() if spool_mode_enabled() or (smtp_down and spool_fallback_enabled()) else None
+            session = None if spool else delivery
+            from prpm_store import record_submission
+            status_code, response_body = process_batch(
+                body, FORM_TYPE, validate_proposal_data, build_message,
+                session=session, spool=spool,
+                idempotency=get_idempotency_cache(), normalize=PROPOSAL_SCHEMA.normalize,
+                success_response=SUCCESS_RESPONSE, record=record_submission, digest=add_to_digest,
+                screen=screen_submission,
+            )
+            return json_response(status_code, response_body)
         
         # Validate all fields
-        is_valid, validation_errors = validate_proposal_data(body)
+        with phase('Validate'):
+            is_valid, validation_errors = validate_proposal_data(body)
         
         if not is_valid:
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*"
-                },
-                "body": json.dumps({
-                    "message": "Validation failed. Please check the errors below.",
-                    "errors": validation_errors
-                })
-            }
+            return json_response(400, {
+                "message": "Validation failed. Please check the errors below.",
+                "errors": validation_errors
+            })
+        
+        # Bot and spam submissions get the usual response but never reach SMTP
+        if screen_submission(body):
+            return SUCCESS_RESPONSE
+        
+        # Duplicate submissions (double clicks, browser retries) get the original response
+        idempotency = get_idempotency_cache()
+        fields = PROPOSAL_SCHEMA.normalize(body)
+        submission_key = idempotency_key(event, FORM_TYPE, fields)
+        previous_response = idempotency.get(submission_key)
+        if previous_response is not None:
+            print(f"Duplicate submission suppressed: {submission_key}")
+            return replayed(previous_response)
         
-        # Format email content
-        email_content = format_email_content(body)
-        contact_name = body.get('contactName', 'Unknown')
+        # Only accepted submissions are stored; a background thread writes the copy
+        from prpm_store import record_submission
+        
+        # Low-priority submissions wait for the next digest email instead of being sent one by one
+        if add_to_digest(body):
+            print("Proposal added to the digest")
+            record_submission(submission_key, FORM_TYPE, fields)
+            idempotency.put(submission_key, SUCCESS_RESPONSE)
+            return SUCCESS_RESPONSE
+        
+        if smtp_down and not spool_fallback_enabled():
+            print(f"SMTP circuit open; failing fast for {delivery.retry_after():.1f} s")
+            return service_unavailable(delivery.retry_after())
+        
+        # Format and compose the email
+        with phase('BuildMessage'):
+            msg = build_message(body)
+            ack_msg = build_ack_message(body) if acknowledgements_enabled() else None
         community_name = body.get('communityName', 'Unknown Community')
         
-        # Compose the email
-        msg = EmailMessage()
-        msg['Subject'] = f"New Proposal Request: {community_name} - {contact_name}"
-        msg['From'] = FROM_EMAIL
-        msg['To'] = TO_EMAIL
-        msg.set_content(email_content)
+        # In spool mode, or while the circuit is open, persist the message and let the drain worker send it
+        if spool_mode_enabled() or smtp_down:
+            with phase('Spool'):
+                spool = get_spool()
+                spool_id = spool.enqueue(FORM_TYPE, msg.as_bytes())
+                if ack_msg is not None:
+                    spool.enqueue(FORM_TYPE, ack_msg.as_bytes())
+            print(f"Proposal spooled as message {spool_id}")
+            response = ACCEPTED_RESPONSE
+            record_submission(submission_key, FORM_TYPE, fields)
+            idempotency.put(submission_key, response)
+            return response
+        
+        # The submitter's acknowledgement connects on its own session while the notification is sent,
+        # but only goes out once the notification has
+        ack = None
+        if ack_msg is not None:
+            ack = HeldAcknowledgement(get_delivery(SMTP_SERVER, PORT, USERNAME, PASSWORD, channel=ACK_CHANNEL),
+                                      ack_msg)
         
-        # Send email via ZeptoMail SMTP
-        ssl_context = ssl.create_default_context()
-        with smtplib.SMTP(SMTP_SERVER, PORT) as server:
-            server.starttls(context=ssl_context)
-            server.login(USERNAME, PASSWORD)
-            server.send_message(msg)
+        # Send email via ZeptoMail SMTP over a warm session, retrying and failing over across endpoints
+        try:
+            delivery.send_message(msg)
+        except BaseException:
+            if ack is not None:
+                ack.cancel()
+            raise
+        finally:
+            record_smtp(delivery.last_timings)
+        
+        # A failed acknowledgement is reported but does not fail the submission
+        ack_sent = None
+        if ack is not None:
+            with phase('AckWait'):
+                ack_sent, ack_error = ack.send()
+            set_property('AckSent', ack_sent)
+            if not ack_sent:
+                print(f"Proposal acknowledgement email failed: {ack_error}")
         
         print(f"Proposal email sent successfully for: {community_name}")
         
         # Success response
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*"
-            },
-            "body": json.dumps({
-                "message": "Proposal request submitted successfully! We will be in touch with you shortly."
+        if ack_sent is None:
+            response = SUCCESS_RESPONSE
+        else:
+            response = json_response(200, {
+                "message": SUCCESS_MESSAGE,
+                **acknowledgement_status(ack_sent)
             })
-        }
+        record_submission(submission_key, FORM_TYPE, fields)
+        idempotency.put(submission_key, response)
+        return response
+    
+    except IntakeError as e:
+        print(f"Request body rejected: {e.message}")
+        return json_response(e.status_code, {
+            "message": e.message,
+            "errors": {}
+        })
     
     except json.JSONDecodeError as e:
         print(f"JSON decode error: {str(e)}")
-        return {
-            "statusCode": 400,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*"
-            },
-            "body": json.dumps({
-                "message": "Invalid JSON format in request body.",
-                "error": str(e)
-            })
-        }
+        return json_response(400, {
+            "message": "Invalid JSON format in request body.",
+            "error": str(e)
+        })
     
-    except smtplib.SMTPException as e:
+    except CircuitOpenError as e:
         print(f"SMTP error: {str(e)}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*"
-            },
-            "body": json.dumps({
-                "message": "Failed to send email. Please try again later.",
-                "error": "SMTP error"
-            })
-        }
+        return service_unavailable(e.retry_after)
+    
+    except smtp_exception_type() as e:
+        print(f"SMTP error: {str(e)}")
+        return SMTP_ERROR_RESPONSE
     
     except Exception as e:
         print(f"Unexpected error: {str(e)}")
         import traceback
         traceback.print_exc()
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*"
-            },
-            "body": json.dumps({
-                "message": "An unexpected error occurred. Please try again later.",
-                "error": "Internal server error"
-            })
-        }
+        return UNEXPECTED_ERROR_RESPONSE
 
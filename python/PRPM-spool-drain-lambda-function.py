@@ -0,0 +1,58 @@
+import json
+import os
+
+from prpm_delivery import get_delivery
+from prpm_spool import get_spool, drain, spool_configured
+
+# SMTP setup (use Lambda environment variables for security)
+SMTP_SERVER = os.environ.get('ZEPTO_SMTP_HOST', "smtp.zeptomail.com")
+PORT = int(os.environ.get('ZEPTO_SMTP_PORT', '587'))
+USERNAME = os.environ.get('ZEPTO_USER', '')
+PASSWORD = os.environ.get('ZEPTO_PASS', '')
+
+# Drain settings
+BATCH_SIZE = int(os.environ.get('PRPM_DRAIN_BATCH_SIZE', '10'))
+MAX_BATCHES = int(os.environ.get('PRPM_DRAIN_MAX_BATCHES', '10'))
+
+
+def lambda_handler(event, context):
+    """
+    AWS Lambda handler that drains spooled form submissions.
+
+    Runs on a schedule (EventBridge) and sends queued messages in
+    batches over a single ZeptoMail SMTP session.
+    """
+    if not USERNAME or not PASSWORD:
+        print("Error: SMTP credentials not configured")
+        return {
+            "statusCode": 500,
+            "body": json.dumps({
+                "message": "Server configuration error. Please contact support.",
+                "error": "SMTP credentials missing"
+            })
+        }
+
+    if not spool_configured():
+        return {
+            "statusCode": 500,
+            "body": json.dumps({
+                "message": "Server configuration error. Please contact support.",
+                "error": "Spool queue missing"
+            })
+        }
+
+    batch_size = int((event or {}).get('batchSize', BATCH_SIZE))
+    max_batches = int((event or {}).get('maxBatches', MAX_BATCHES))
+
+    session = get_delivery(SMTP_SERVER, PORT, USERNAME, PASSWORD)
+    summary = drain(get_spool(), session, batch_size=batch_size, max_batches=max_batches)
+    print(f"Spool drain finished: {summary} SMTP stats: {session.summary()}")
+
+    return {
+        "statusCode": 200,
+        "body": json.dumps(summary)
+    }
+
+
+if __name__ == "__main__":
+    print(lambda_handler({}, None))
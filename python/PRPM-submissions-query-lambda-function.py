@@ -0,0 +1,95 @@
+import hmac
+import os
+from typing import Dict, Any
+
+from prpm_responses import CONFIG_ERROR_RESPONSE, json_response
+from prpm_store import DEFAULT_LIMIT, get_submission_store, store_configured
+
+# Staff access token (use Lambda environment variables for security)
+QUERY_TOKEN = os.environ.get('PRPM_QUERY_TOKEN', '')
+
+# Query string parameters and the store filters they map to
+QUERY_PARAMETERS = {
+    'formType': 'form_type',
+    'state': 'state',
+    'zipCode': 'zip_code',
+    'contactEmail': 'contact_email',
+    'community': 'community',
+    'since': 'since',
+    'until': 'until',
+    'deadlineFrom': 'deadline_from',
+    'deadlineTo': 'deadline_to',
+}
+PAGING_PARAMETERS = ('id', 'limit', 'cursor', 'count')
+
+
+def authorized(event: Dict[str, Any]) -> bool:
+    """Return True when the request carries the staff bearer token."""
+    for name, value in (event.get('headers') or {}).items():
+        if name.lower() == 'authorization' and value:
+            return hmac.compare_digest(str(value), f"Bearer {QUERY_TOKEN}")
+    return False
+
+
+def timestamp(value: str) -> float:
+    """Parse an ISO date or date-time (UTC unless it says otherwise) into epoch seconds."""
+    from datetime import datetime, timezone
+
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def lambda_handler(event, context):
+    """
+    AWS Lambda handler that searches stored submissions for staff.
+
+    GET /submissions?formType=proposal&state=Maryland&community=Oak returns
+    the newest matches first, a page at a time (limit, cursor); count=true
+    adds the total and id=<submission id> fetches one submission. Requests
+    must carry "Authorization: Bearer <PRPM_QUERY_TOKEN>". In AWS it needs
+    PRPM_STORE_TABLE: a SQLite store only holds its own container's rows.
+    """
+    if not QUERY_TOKEN:
+        print("Error: PRPM_QUERY_TOKEN not configured")
+        return CONFIG_ERROR_RESPONSE
+
+    if not store_configured():
+        return json_response(500, {
+            "message": "Server configuration error. Please contact support.",
+            "error": "Submission table missing"
+        })
+
+    if not authorized(event):
+        return json_response(401, {"message": "Unauthorized", "errors": {}})
+
+    params = event.get('queryStringParameters') or {}
+    unknown = sorted(set(params) - set(QUERY_PARAMETERS) - set(PAGING_PARAMETERS))
+    if unknown:
+        return json_response(400, {
+            "message": "Unknown query parameters.",
+            "errors": {name: "Not a supported filter" for name in unknown}
+        })
+
+    store = get_submission_store()
+    if params.get('id'):
+        submission = store.get(params['id'])
+        if submission is None:
+            return json_response(404, {"message": "Submission not found", "errors": {}})
+        return json_response(200, submission)
+
+    try:
+        filters = {QUERY_PARAMETERS[name]: value for name, value in params.items() if name in QUERY_PARAMETERS}
+        for name in ('since', 'until'):
+            if filters.get(name):
+                filters[name] = timestamp(filters[name])
+        submissions, next_cursor = store.query(limit=int(params.get('limit', DEFAULT_LIMIT)),
+                                               cursor=params.get('cursor'), **filters)
+        response = {"submissions": submissions, "next": next_cursor}
+        if str(params.get('count', '')).lower() in ('1', 'true', 'yes'):
+            response["count"] = store.count(**filters)
+    except ValueError as e:
+        return json_response(400, {"message": f"Invalid query: {str(e)}", "errors": {}})
+
+    return json_response(200, response)
@@ -0,0 +1,35 @@
+"""Helpers for loading the Lambda handler scripts, whose file names are not importable."""
+import importlib.util
+import os
+import sys
+
+PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROUTER_FILE = 'PRPM-forms-router-lambda-function.py'
+
+if PYTHON_DIR not in sys.path:
+    sys.path.insert(0, PYTHON_DIR)
+
+
+def load_handler(form_type: str, module_name: str = None):
+    """Import a handler script as a fresh module and return it."""
+    name = module_name or 'prpm_' + form_type.replace('-', '_') + '_handler'
+    return load_script(HANDLER_FILES[form_type], name)
+
+
+def load_router(module_name: str = 'prpm_forms_router'):
+    """Import the routed entry point as a fresh module and return it."""
+    return load_script(ROUTER_FILE, module_name)
+
+
+def load_script(file_name: str, name: str):
+    """Import a script from the python/ directory under the given module name."""
+    path = os.path.join(PYTHON_DIR, file_name)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+# The forms and their scripts, as the router serves them
+HANDLER_FILES = load_script(ROUTER_FILE, 'prpm_forms_router').HANDLER_FILES
@@ -0,0 +1,26 @@
+"""Latency summary helpers shared by the benchmarks."""
+import math
+from typing import Dict, Iterable
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies_ms: Iterable[float], elapsed_s: float) -> Dict[str, float]:
+    """Return count, mean, p50/p95/p99, max and throughput for a set of latencies."""
+    values = sorted(latencies_ms)
+    count = len(values)
+    return {
+        'count': count,
+        'mean_ms': round(sum(values) / count, 3) if count else 0.0,
+        'p50_ms': round(percentile(values, 0.50), 3),
+        'p95_ms': round(percentile(values, 0.95), 3),
+        'p99_ms': round(percentile(values, 0.99), 3),
+        'max_ms': round(values[-1], 3) if count else 0.0,
+        'throughput_rps': round(count / elapsed_s, 2) if elapsed_s > 0 else 0.0,
+    }
@@ -0,0 +1,153 @@
+"""
+Peak memory of contractor applications carrying one large attachment.
+
+Each run happens in a fresh interpreter that builds the API Gateway event,
+warms the handler up with an attachment-free submission, resets the kernel's
+peak-RSS mark (/proc/self/clear_refs, so Linux only) and then submits the
+application to the local SMTP stand-in. The figure reported is peak RSS
+above the resident size just before the call, so the event the runtime
+already holds is not counted. Two implementations are compared:
+
+  naive      decode the whole body, EmailMessage.add_attachment the bytes and
+             let smtplib flatten and send the message (several full copies)
+  streaming  the handler as shipped: files are decoded chunk by chunk into
+             temporary files and base64-encoded into the DATA stream
+
+Multipart uploads stream end to end, so their overhead stays flat as the
+file grows. JSON uploads still pay for the parser's copy of the base64 text
+(orjson briefly holds two), which is freed before the message is built;
+large files belong in multipart requests.
+
+Usage: python benchmarks/bench_attachments.py [--sizes 1,4,16,64] [--formats multipart,json]
+"""
+import argparse
+import base64
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+from _handlers import PYTHON_DIR, load_handler
+from smtp_stub import SMTPStub
+
+BOUNDARY = '----prpmBenchBoundary7MA4YWxkTrZu0gW'
+
+
+def rss_kib(field: str) -> int:
+    with open('/proc/self/status') as f:
+        return int(re.search(rf'{field}:\s+(\d+)', f.read()).group(1))
+
+
+def build_event(fmt: str, payload: dict, data: bytes) -> dict:
+    """Build the event API Gateway would hand the function for one upload."""
+    if fmt == 'json':
+        item = {'filename': 'insurance.pdf', 'contentType': 'application/pdf',
+                'data': base64.b64encode(data).decode('ascii')}
+        return {'body': json.dumps({**payload, 'attachments': [item]}),
+                'headers': {'Content-Type': 'application/json'}}
+    head = ''.join(f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+                   for name, value in payload.items())
+    head += (f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="insurance"; filename="insurance.pdf"\r\n'
+             f'Content-Type: application/pdf\r\n\r\n')
+    raw = head.encode('utf-8') + data + f'\r\n--{BOUNDARY}--\r\n'.encode('ascii')
+    return {'body': base64.b64encode(raw).decode('ascii'), 'isBase64Encoded': True,
+            'headers': {'Content-Type': f'multipart/form-data; boundary={BOUNDARY}'}}
+
+
+def naive_submit(handler, event: dict) -> int:
+    """The straightforward implementation: everything decoded, attached and sent as whole bytes."""
+    from email import policy
+    from email.parser import BytesParser
+    from prpm_delivery import get_delivery
+
+    if event.get('isBase64Encoded'):
+        raw = base64.b64decode(event['body'])
+        content_type = event['headers']['Content-Type']
+        form = BytesParser(policy=policy.HTTP).parsebytes(f'Content-Type: {content_type}\r\n\r\n'.encode() + raw)
+        body, files = {}, []
+        for part in form.iter_parts():
+            if part.get_filename():
+                files.append((part.get_filename(), part.get_content_type(), part.get_payload(decode=True)))
+            else:
+                body[part.get_param('name', header='content-disposition')] = part.get_content()
+    else:
+        body = json.loads(event['body'])
+        files = [(item['filename'], item['contentType'], base64.b64decode(item['data']))
+                 for item in body.pop('attachments')]
+    if not handler.validate_contractor_data(body)[0]:
+        return 400
+    msg = handler.build_message(body)
+    for filename, content_type, data in files:
+        maintype, _, subtype = content_type.partition('/')
+        msg.add_attachment(data, maintype=maintype, subtype=subtype, filename=filename)
+    delivery = get_delivery(handler.SMTP_SERVER, handler.PORT, handler.USERNAME, handler.PASSWORD)
+    delivery.send_message(msg)
+    return 200
+
+
+def child(fmt: str, implementation: str, size: int) -> dict:
+    """Run one submission in this (fresh) process and measure it."""
+    from payloads import valid_payload
+
+    handler = load_handler('contractor-application')
+    payload = valid_payload('contractor-application')
+    warm = {'body': json.dumps({**payload, 'companyName': 'Warm-up'})}
+    data = b'%PDF-1.7\n' + os.urandom(size)
+    event = build_event(fmt, payload, data)
+    del data
+    with open(os.devnull, 'w') as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            handler.lambda_handler(warm, None)
+            with open('/proc/self/clear_refs', 'w') as f:
+                f.write('5')
+            before = rss_kib('VmRSS')
+            start = time.perf_counter()
+            if implementation == 'naive':
+                status = naive_submit(handler, event)
+            else:
+                status = handler.lambda_handler(event, None)['statusCode']
+            elapsed = time.perf_counter() - start
+        finally:
+            sys.stdout = stdout
+    return {'status': status, 'ms': elapsed * 1000, 'baseline_mib': before / 1024,
+            'overhead_mib': (rss_kib('VmHWM') - before) / 1024}
+
+
+def run(stub: SMTPStub, fmt: str, implementation: str, size: int) -> dict:
+    limit = str(size + 1024 * 1024)
+    env = dict(os.environ, **stub.environment(), ZEPTO_USER='bench', ZEPTO_PASS='bench',
+               PRPM_ACK_EMAILS='0', PRPM_METRICS='0', PRPM_RATE_LIMIT='0',
+               PRPM_MAX_ATTACHMENT_BYTES=limit, PRPM_MAX_ATTACHMENTS_BYTES=limit)
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', fmt, implementation, str(size)],
+                            capture_output=True, text=True, env=env, cwd=PYTHON_DIR, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1,4,16,64', help='attachment sizes in MiB')
+    parser.add_argument('--formats', default='multipart,json')
+    parser.add_argument('--child', nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        fmt, implementation, size = args.child
+        print(json.dumps(child(fmt, implementation, int(size))))
+        return
+
+    print(f"{'format':<10} {'size MiB':>8}  {'implementation':<10} {'status':>6} {'ms':>8} "
+          f"{'peak over baseline MiB':>23}")
+    with SMTPStub(keep=1) as stub:
+        for fmt in args.formats.split(','):
+            for size_mib in (float(s) for s in args.sizes.split(',')):
+                for implementation in ('naive', 'streaming'):
+                    result = run(stub, fmt, implementation, int(size_mib * 1024 * 1024))
+                    print(f"{fmt:<10} {size_mib:>8g}  {implementation:<10} {result['status']:>6} "
+                          f"{result['ms']:>8.1f} {result['overhead_mib']:>23.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Latency of form submissions while ZeptoMail hangs, with and without the circuit breaker.
+
+Points the general-inquiry handler at the local SMTP stand-in, then makes
+the stand-in stall before its greeting and before accepting DATA, so every
+connect or send runs into the socket timeouts. Retries are turned off
+(PRPM_SMTP_MAX_ATTEMPTS=1) to isolate the breaker. Four phases run back to
+back, one invocation at a time as in a single Lambda container:
+
+  no breaker   every invocation waits out a timeout and fails (500)
+  breaker      the first few wait, then the circuit opens and the rest fail fast (503)
+  fallback     with PRPM_SMTP_FALLBACK=spool, submissions are spooled instead (202)
+  recovery     the stand-in recovers; after the reset timeout one half-open
+               probe goes through and closes the circuit (200)
+
+Usage: python benchmarks/bench_circuit.py [--invocations 10] [--timeout 0.5]
+                                          [--threshold 3] [--reset 2]
+"""
+import argparse
+import contextlib
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+
+from _handlers import load_handler
+from _stats import summarize
+from payloads import valid_payload
+from smtp_stub import SMTPStub
+
+
+def run_phase(handler, name: str, invocations: int, breaker) -> None:
+    body = json.dumps(valid_payload('general-inquiry'))
+    latencies = []
+    statuses = Counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        for i in range(invocations):
+            event = {'body': body, 'headers': {'Idempotency-Key': f'bench-circuit-{name}-{i}'}}
+            start = time.perf_counter()
+            response = handler(event, None)
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[response['statusCode']] += 1
+        elapsed = time.perf_counter() - started
+    stats = summarize(latencies, elapsed)
+    codes = ' '.join(f"{code}x{count}" for code, count in sorted(statuses.items()))
+    print(f"{name:<11} {stats['p50_ms']:>9.1f} {stats['max_ms']:>9.1f} {elapsed * 1000:>10.1f}"
+          f"  {breaker.state:<9} {codes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--invocations', type=int, default=10, help='invocations per phase')
+    parser.add_argument('--timeout', type=float, default=0.5, help='connect/read/send timeout in seconds')
+    parser.add_argument('--threshold', type=int, default=3, help='failures before the circuit opens')
+    parser.add_argument('--reset', type=float, default=2.0, help='seconds the circuit stays open')
+    args = parser.parse_args()
+
+    with SMTPStub() as stub:
+        os.environ.update(stub.environment())
+        os.environ.update({
+            'ZEPTO_USER': 'bench', 'ZEPTO_PASS': 'bench',
+            'PRPM_SMTP_CONNECT_TIMEOUT': str(args.timeout),
+            'PRPM_SMTP_READ_TIMEOUT': str(args.timeout),
+            'PRPM_SMTP_SEND_TIMEOUT': str(args.timeout),
+            'PRPM_SMTP_MAX_ATTEMPTS': '1',
+            'PRPM_SPOOL_PATH': os.path.join(tempfile.mkdtemp(prefix='prpm-bench-circuit-'), 'spool.sqlite3'),
+            'PRPM_RATE_LIMIT': '0', 'PRPM_METRICS': '0', 'PRPM_ACK_EMAILS': '0',
+        })
+        handler = load_handler('general-inquiry')
+        from prpm_smtp import smtp_breaker
+
+        breaker = smtp_breaker(handler.SMTP_SERVER, handler.PORT)
+        breaker.reset_timeout = args.reset
+        print(f"timeouts {args.timeout} s, threshold {args.threshold} failures, reset {args.reset} s\n")
+        print(f"{'phase':<11} {'p50 ms':>9} {'max ms':>9} {'total ms':>10}  {'circuit':<9} status codes")
+        run_phase(handler.lambda_handler, 'healthy', 3, breaker)
+
+        stub.set_delays(greeting_ms=60000, data_ms=60000)
+        breaker.failure_threshold = 10 ** 9
+        run_phase(handler.lambda_handler, 'no breaker', args.invocations, breaker)
+
+        breaker.failure_threshold = args.threshold
+        breaker.record_success()
+        run_phase(handler.lambda_handler, 'breaker', args.invocations, breaker)
+
+        os.environ['PRPM_SMTP_FALLBACK'] = 'spool'
+        run_phase(handler.lambda_handler, 'fallback', args.invocations, breaker)
+        del os.environ['PRPM_SMTP_FALLBACK']
+
+        stub.set_delays()
+        time.sleep(breaker.retry_after())
+        run_phase(handler.lambda_handler, 'recovery', args.invocations, breaker)
+        print(f"\nbreaker: {breaker.summary()}")
+
+
+if __name__ == '__main__':
+    main()
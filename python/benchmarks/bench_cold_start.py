@@ -0,0 +1,132 @@
+"""
+Cold-start benchmark and import-time budget check.
+
+Each handler is imported in a fresh interpreter under `python -X importtime`;
+the script then times the first invocation on the 400 (validation failure)
+path and checks which heavy modules it pulled in. Exits with status 1 when
+the import time or first-call latency exceeds the budget, or when the 400
+path loaded a module that only the SMTP path needs. The modules are
+byte-compiled first, as a deployment package should ship them: compiling
+the sources on import would add tens of milliseconds that depend only on
+whether an earlier run left .pyc files behind.
+
+Usage: python benchmarks/bench_cold_start.py [--budget-ms 25] [--runs 5] [--json out.json]
+"""
+import argparse
+import compileall
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from _handlers import HANDLER_FILES, PYTHON_DIR
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+IMPORT_BUDGET_MS = float(os.environ.get('PRPM_IMPORT_BUDGET_MS', '25'))
+FIRST_CALL_BUDGET_MS = float(os.environ.get('PRPM_FIRST_CALL_BUDGET_MS', '25'))
+
+# Modules the validation-failure path must not need
+SMTP_ONLY_MODULES = ('smtplib', 'ssl', 'email.message', 'email.mime', 'sqlite3')
+
+PROBE = r'''
+import json, os, sys, time
+sys.path.insert(0, {bench_dir!r})
+before = set(sys.modules)
+start = time.perf_counter()
+from _handlers import load_handler
+module = load_handler({form_type!r})
+import_ms = (time.perf_counter() - start) * 1000
+from payloads import invalid_payload
+event = {{'body': json.dumps(invalid_payload({form_type!r}))}}
+start = time.perf_counter()
+response = module.lambda_handler(event, None)
+first_call_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{
+    'import_ms': import_ms,
+    'first_call_ms': first_call_ms,
+    'status': response['statusCode'],
+    'loaded': sorted(set(sys.modules) - before),
+}}))
+'''
+
+
+def parse_importtime(stderr: str):
+    """Return (module, cumulative_us) for each top-level import in -X importtime output."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        # Nested imports are indented below their parent
+        if name.startswith('  '):
+            continue
+        entries.append((name.strip(), int(cumulative_us)))
+    return entries
+
+
+def probe(form_type: str) -> dict:
+    """Import one handler in a fresh interpreter and measure its cold start."""
+    env = dict(os.environ, ZEPTO_USER='bench', ZEPTO_PASS='bench')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE.format(bench_dir=BENCH_DIR, form_type=form_type)],
+        capture_output=True, text=True, env=env, cwd=PYTHON_DIR, check=True,
+    )
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    loaded = set(data['loaded']) - {'_handlers', 'payloads'}
+    imports = [(name, us) for name, us in parse_importtime(result.stderr) if name in loaded]
+    heaviest = sorted(imports, key=lambda item: item[1], reverse=True)[:5]
+    data['heaviest_imports'] = [{'module': name, 'cumulative_ms': us / 1000} for name, us in heaviest]
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per handler')
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_BUDGET_MS, help='median import time budget')
+    parser.add_argument('--first-call-budget-ms', type=float, default=FIRST_CALL_BUDGET_MS,
+                        help='median first-call latency budget for the 400 path')
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    for directory in (PYTHON_DIR, BENCH_DIR):
+        compileall.compile_dir(directory, maxlevels=0, quiet=1)
+
+    report = {}
+    failures = []
+    for form_type in HANDLER_FILES:
+        runs = [probe(form_type) for _ in range(args.runs)]
+        import_ms = statistics.median(run['import_ms'] for run in runs)
+        first_call_ms = statistics.median(run['first_call_ms'] for run in runs)
+        unexpected = sorted({name for run in runs for name in run['loaded'] if name in SMTP_ONLY_MODULES})
+        report[form_type] = {
+            'import_ms': import_ms,
+            'first_call_ms': first_call_ms,
+            'status': runs[0]['status'],
+            'smtp_only_modules_loaded': unexpected,
+            'heaviest_imports': runs[0]['heaviest_imports'],
+        }
+        print(f"{form_type:<24} import {import_ms:7.2f} ms  first 400 call {first_call_ms:6.2f} ms  "
+              f"status {runs[0]['status']}  smtp-only modules loaded: {', '.join(unexpected) or 'none'}")
+        for entry in runs[0]['heaviest_imports']:
+            print(f"    {entry['module']:<32} {entry['cumulative_ms']:7.2f} ms")
+
+        if import_ms > args.budget_ms:
+            failures.append(f"{form_type}: import {import_ms:.2f} ms exceeds budget {args.budget_ms} ms")
+        if first_call_ms > args.first_call_budget_ms:
+            failures.append(f"{form_type}: first call {first_call_ms:.2f} ms exceeds budget "
+                            f"{args.first_call_budget_ms} ms")
+        if unexpected:
+            failures.append(f"{form_type}: 400 path loaded {', '.join(unexpected)}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
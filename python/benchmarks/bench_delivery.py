@@ -0,0 +1,98 @@
+"""
+Delivery success and latency with retries and endpoint failover.
+
+Sends real handler-built messages through prpm_delivery.DeliveryPool against
+local SMTP stand-ins: a STARTTLS primary (like port 587) and an implicit-TLS
+secondary (like port 465). Each scenario runs twice, once as before (one
+endpoint, one attempt) and once with retries and failover:
+
+  flaky primary     the primary answers 451 to every third message
+  primary 421       the primary refuses every message with 421
+  primary hangs     the primary stalls before its greeting and DATA reply
+
+Reports delivered/total, latency percentiles, which endpoint served the
+sends and the per-attempt log of the last send.
+
+Usage: python benchmarks/bench_delivery.py [--messages 30] [--timeout 0.5]
+"""
+import argparse
+import contextlib
+import os
+import time
+from collections import Counter
+
+from _handlers import load_handler
+from _stats import summarize
+from payloads import valid_payload
+from smtp_stub import SMTPStub
+
+
+def run(pool, msg, count: int) -> dict:
+    """Send `count` messages one after another; returns the latency summary and outcomes."""
+    latencies = []
+    served = Counter()
+    delivered = 0
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        for _ in range(count):
+            start = time.perf_counter()
+            try:
+                pool.send_message(msg)
+            except Exception as e:
+                served[f"failed: {type(e).__name__}"] += 1
+            else:
+                delivered += 1
+                served[pool.last_timings['endpoint']] += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+        elapsed = time.perf_counter() - started
+    return {**summarize(latencies, elapsed), 'delivered': delivered, 'served': served,
+            'attempts': pool.last_timings.get('attempts', [])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=30, help='messages per run')
+    parser.add_argument('--timeout', type=float, default=0.5, help='connect/read/send timeout in seconds')
+    args = parser.parse_args()
+
+    os.environ.update({
+        'ZEPTO_USER': 'bench', 'ZEPTO_PASS': 'bench',
+        'PRPM_SMTP_CONNECT_TIMEOUT': str(args.timeout),
+        'PRPM_SMTP_READ_TIMEOUT': str(args.timeout),
+        'PRPM_SMTP_SEND_TIMEOUT': str(args.timeout),
+    })
+    handler = load_handler('general-inquiry')
+    msg = handler.build_message(valid_payload('general-inquiry'))
+    from prpm_delivery import DeliveryPool
+    from prpm_smtp import smtp_breaker
+
+    scenarios = {
+        'flaky primary': lambda primary: primary.set_failure(451, every=3),
+        'primary 421': lambda primary: primary.set_failure(421),
+        'primary hangs': lambda primary: primary.set_delays(greeting_ms=60000, data_ms=60000),
+    }
+    print(f"{'scenario':<15} {'config':<20} {'delivered':>9} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}  served by")
+    for name, break_primary in scenarios.items():
+        with SMTPStub() as primary, SMTPStub(implicit_tls=True) as secondary:
+            os.environ.update(primary.environment())
+            endpoints = [('localhost', primary.port, False), ('localhost', secondary.port, True)]
+            break_primary(primary)
+            for config, pool in (
+                ('before: 1 attempt', DeliveryPool(endpoints[:1], 'bench', 'bench', max_attempts=1)),
+                ('retry + failover', DeliveryPool(endpoints, 'bench', 'bench')),
+            ):
+                with contextlib.redirect_stdout(None):
+                    for host, port, _ in endpoints:
+                        smtp_breaker(host, port).record_success()
+                result = run(pool, msg, args.messages)
+                ports = {f"localhost:{primary.port}": 'primary', f"localhost:{secondary.port}": 'secondary'}
+                served = ', '.join(f"{ports.get(k, k)} {v}" for k, v in result['served'].most_common())
+                print(f"{name:<15} {config:<20} {result['delivered']:>4}/{result['count']:<4} "
+                      f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['max_ms']:>8.1f}  {served}")
+            attempts = ' -> '.join(f"{ports.get(a['endpoint'])} {a['outcome']} ({a['ms']:.0f} ms)"
+                                   for a in result['attempts'])
+            print(f"{'':<15} last send: {attempts}")
+
+
+if __name__ == '__main__':
+    main()
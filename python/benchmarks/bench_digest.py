@@ -0,0 +1,81 @@
+"""
+SMTP volume and handler latency with general inquiries sent one by one versus digested.
+
+A burst of general inquiries (each with its own Idempotency-Key) is submitted
+to the local SMTP stand-in, first with every inquiry sent as its own email
+and then with PRPM_DIGEST_FORMS=general-inquiry, where inquiries are buffered.
+Every --tick inquiries the due-only digest run stands in for its frequent
+schedule and sends a digest once --digest-items are waiting; the hourly run
+then sends what is left. Handlers never send digests themselves, so their
+latency excludes the digest runs. Reports the messages the stub accepted
+(each one a ZeptoMail send counted against the quota) and handler latency.
+
+Usage: python benchmarks/bench_digest.py [--inquiries 500] [--digest-items 25] [--tick 50] [--latency-ms 5]
+"""
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from _handlers import load_handler, load_script
+from _stats import summarize
+from payloads import valid_payload
+from smtp_stub import SMTPStub
+
+
+def burst(mode: str, stub: SMTPStub, inquiries: int, tick: int) -> dict:
+    os.environ['PRPM_DIGEST_FORMS'] = 'general-inquiry' if mode == 'digest' else ''
+    handler = load_handler('general-inquiry', f'prpm_digest_bench_{mode}')
+    body = json.dumps(valid_payload('general-inquiry'))
+    latencies = []
+    digest_run = load_script('PRPM-digest-lambda-function.py', f'prpm_digest_bench_run_{mode}')
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        handler.lambda_handler({'body': body, 'headers': {'Idempotency-Key': f'{mode}-warm'}}, None)
+        delivered = stub.delivered
+        started = time.perf_counter()
+        for i in range(inquiries):
+            start = time.perf_counter()
+            status = handler.lambda_handler({'body': body, 'headers': {'Idempotency-Key': f'{mode}-{i}'}}, None)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if status['statusCode'] != 200:
+                raise RuntimeError(f"{mode}: unexpected status {status['statusCode']}")
+            if mode == 'digest' and (i + 1) % tick == 0:
+                run_start = time.perf_counter()
+                digest_run.lambda_handler({'dueOnly': True}, None)
+                started += time.perf_counter() - run_start
+        elapsed = time.perf_counter() - started
+        if mode == 'digest':
+            digest_run.lambda_handler({}, None)
+    return {'messages': stub.delivered - delivered, **summarize(latencies, elapsed)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--inquiries', type=int, default=500)
+    parser.add_argument('--digest-items', type=int, default=25, help='PRPM_DIGEST_MAX_ITEMS')
+    parser.add_argument('--tick', type=int, default=50, help='inquiries between due-only digest runs')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='stub delay before every SMTP reply')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='prpm-digest-bench-')
+    os.environ.update(PRPM_DIGEST_PATH=os.path.join(directory, 'digest.sqlite3'),
+                      PRPM_DIGEST_MAX_ITEMS=str(args.digest_items), ZEPTO_USER='bench', ZEPTO_PASS='bench',
+                      PRPM_ACK_EMAILS='0', PRPM_METRICS='0', PRPM_RATE_LIMIT='0')
+    try:
+        with SMTPStub(latency_ms=args.latency_ms) as stub:
+            os.environ.update(stub.environment())
+            print(f"{'mode':<10} {'inquiries':>9} {'SMTP messages':>14} {'p50 ms':>8} {'p95 ms':>8} "
+                  f"{'p99 ms':>8} {'max ms':>8}")
+            for mode in ('immediate', 'digest'):
+                result = burst(mode, stub, args.inquiries, args.tick)
+                print(f"{mode:<10} {args.inquiries:>9} {result['messages']:>14} {result['p50_ms']:>8.3f} "
+                      f"{result['p95_ms']:>8.3f} {result['p99_ms']:>8.3f} {result['max_ms']:>8.3f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
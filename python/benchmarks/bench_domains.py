@@ -0,0 +1,120 @@
+"""
+Blocked-domain index: size, load cost and lookup latency against a Python set.
+
+A synthetic list of --domains disposable domains (published lists run to
+100,000-200,000) is written as text and compiled with prpm_domains. The
+memory-mapped index is compared with the obvious alternative, reading the
+text list into a set at cold start: time and memory to load, and per-lookup
+latency for a listed domain, a subdomain of one and an unlisted address
+(which checks every parent domain), both on first sight and when repeated
+(the index caches recent answers). Also checks that importing prpm_domains
+does not map the index.
+
+Usage: python benchmarks/bench_domains.py [--domains 150000] [--number N]
+"""
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+from _handlers import PYTHON_DIR
+import prpm_domains
+
+WORDS = ('mail', 'temp', 'trash', 'inbox', 'drop', 'box', 'fake', 'burner', 'spam', 'throw', 'away', 'quick',
+         'minute', 'guerrilla', 'nada', 'zero', 'anon', 'secret', 'void', 'ghost')
+TLDS = ('com', 'net', 'org', 'io', 'email', 'xyz', 'cc', 'me', 'de', 'fr', 'ru', 'top')
+
+
+def synthetic_list(rng: random.Random, count: int):
+    domains = set()
+    while len(domains) < count:
+        domains.add(f"{rng.choice(WORDS)}{rng.choice(WORDS)}{rng.randrange(10000)}.{rng.choice(TLDS)}")
+    return sorted(domains)
+
+
+def set_lookup(domains: dict, domain: str):
+    name = domain.lower()
+    while name:
+        if name in domains:
+            return domains[name]
+        name = name.partition('.')[2]
+    return None
+
+
+def load_set(path: str) -> dict:
+    with open(path, encoding='utf-8') as f:
+        return prpm_domains.read_domain_list(f, path)
+
+
+def measure_load(load):
+    """Return (milliseconds, KiB allocated) to build an object with load()."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    loaded = load()
+    elapsed = (time.perf_counter() - start) * 1000
+    size = tracemalloc.get_traced_memory()[0] / 1024
+    tracemalloc.stop()
+    return loaded, elapsed, size
+
+
+def bench(func, number: int) -> float:
+    """Return the best per-call time in microseconds over five repeats."""
+    return min(timeit.Timer(func).repeat(repeat=5, number=number)) / number * 1e6
+
+
+def import_cost() -> str:
+    """Time importing prpm_domains in a fresh interpreter (after typing, as the handlers do); is mmap loaded?"""
+    code = ("import sys, time, typing; start = time.perf_counter(); import prpm_domains; "
+            "print(f'{(time.perf_counter() - start) * 1000:.2f} ms, mmap loaded: {\"mmap\" in sys.modules}')")
+    return subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=PYTHON_DIR,
+                          check=True).stdout.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--domains', type=int, default=150000, help='synthetic disposable domains')
+    parser.add_argument('--number', type=int, default=20000, help='lookups per timing repeat')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='prpm-domains-bench-')
+    try:
+        domains = synthetic_list(random.Random(3), args.domains)
+        text_path = os.path.join(directory, 'domains.txt')
+        index_path = os.path.join(directory, 'domains.idx')
+        with open(text_path, 'w', encoding='utf-8') as f:
+            f.write(''.join(f"{domain}\n" for domain in domains))
+        start = time.perf_counter()
+        with open(text_path, encoding='utf-8') as f:
+            prpm_domains.build_index(prpm_domains.read_domain_list(f, text_path), index_path)
+        print(f"{args.domains:,} domains: text {os.path.getsize(text_path) / 1024:.0f} KiB, "
+              f"index {os.path.getsize(index_path) / 1024:.0f} KiB, built in {time.perf_counter() - start:.2f} s")
+        print(f"import prpm_domains: {import_cost()}\n")
+
+        index, index_ms, index_kib = measure_load(lambda: prpm_domains.DomainIndex(index_path))
+        table, set_ms, set_kib = measure_load(lambda: load_set(text_path))
+        print(f"{'':<26} {'mmap index':>12} {'repeated':>9} {'set from text':>14}")
+        print(f"{'load ms':<26} {index_ms:>12.3f} {'':>9} {set_ms:>14.3f}")
+        print(f"{'load memory KiB':<26} {index_kib:>12.1f} {'':>9} {set_kib:>14.1f}")
+
+        listed = domains[len(domains) // 3]
+        cases = {'listed domain': listed, 'subdomain of listed': f"mx.eu.{listed}",
+                 'unlisted (3 parents)': 'mail.lexingtonparkcommons.org'}
+        for name, domain in cases.items():
+            assert index.lookup(domain) == set_lookup(table, domain)
+            index_us = bench(lambda: (index._cache.clear(), index.lookup(domain)), args.number)
+            cached_us = bench(lambda: index.lookup(domain), args.number)
+            set_us = bench(lambda: set_lookup(table, domain), args.number)
+            print(f"{name + ' us':<26} {index_us:>12.2f} {cached_us:>9.2f} {set_us:>14.2f}")
+        index.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+End-to-end handler benchmark against the local SMTP stand-in.
+
+Drives every lambda_handler with realistic payloads through five paths:
+validation failure (400), success (200), success with the submitter
+acknowledgement enabled (200, two messages), SMTP error (500, the stub
+rejects every message) and duplicate (200 replayed from the idempotency
+cache). Sending invocations carry a fresh Idempotency-Key so none of them is
+suppressed as a duplicate. Reports p50/p95/p99 latency and throughput per form
+and path, and writes the results as JSON so runs can be compared over time.
+
+Usage:
+    python benchmarks/bench_handlers.py [--iterations 200] [--latency-ms 5]
+                                        [--output results.json] [--compare previous.json]
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from _handlers import HANDLER_FILES, PYTHON_DIR, load_handler
+from _stats import summarize
+from payloads import valid_payload, invalid_payload
+from smtp_stub import SMTPStub
+
+SCENARIOS = ('validation_failure', 'success', 'success_with_ack', 'smtp_error', 'duplicate')
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def run_scenario(handler, form_type: str, scenario: str, stub: SMTPStub, iterations: int) -> dict:
+    """Invoke the handler repeatedly for one path and summarize the latencies."""
+    payload = invalid_payload(form_type) if scenario == 'validation_failure' else valid_payload(form_type)
+    body = json.dumps(payload)
+    if scenario in ('success', 'success_with_ack', 'smtp_error'):
+        events = [{'body': body, 'headers': {'Idempotency-Key': f'bench-{scenario}-{i}'}}
+                  for i in range(iterations)]
+    else:
+        events = [{'body': body}] * iterations
+    stub.set_failure(554 if scenario == 'smtp_error' else 0)
+    os.environ['PRPM_ACK_EMAILS'] = '1' if scenario == 'success_with_ack' else '0'
+
+    latencies = []
+    statuses = Counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        for event in events:
+            start = time.perf_counter()
+            response = handler(event, None)
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[response['statusCode']] += 1
+        elapsed = time.perf_counter() - started
+    stub.set_failure(0)
+    os.environ['PRPM_ACK_EMAILS'] = '0'
+
+    return {
+        'form_type': form_type,
+        'scenario': scenario,
+        **summarize(latencies, elapsed),
+        'status_codes': {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PYTHON_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(current: dict, previous_path: str):
+    """Print p50/p99/throughput changes against an earlier results file."""
+    with open(previous_path) as f:
+        previous = {(r['form_type'], r['scenario']): r for r in json.load(f)['results']}
+    print(f"\nCompared with {previous_path}:")
+    for result in current['results']:
+        old = previous.get((result['form_type'], result['scenario']))
+        if old is None:
+            continue
+        changes = []
+        for key in ('p50_ms', 'p99_ms', 'throughput_rps'):
+            if old[key]:
+                changes.append(f"{key} {(result[key] - old[key]) / old[key] * 100:+.1f}%")
+        print(f"  {result['form_type']:<24} {result['scenario']:<20} {'  '.join(changes)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end handler benchmark')
+    parser.add_argument('--iterations', type=int, default=200, help='invocations per form and path')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='stub delay before every SMTP reply')
+    parser.add_argument('--forms', nargs='*', default=list(HANDLER_FILES), choices=list(HANDLER_FILES))
+    parser.add_argument('--output', help='results file (default: benchmarks/results/handlers-<time>.json)')
+    parser.add_argument('--compare', help='earlier results file to diff against')
+    args = parser.parse_args()
+
+    stub = SMTPStub(latency_ms=args.latency_ms).start()
+    os.environ.update(stub.environment())
+    os.environ.setdefault('ZEPTO_USER', 'bench')
+    os.environ.setdefault('ZEPTO_PASS', 'bench')
+
+    results = []
+    try:
+        for form_type in args.forms:
+            handler = load_handler(form_type).lambda_handler
+            for scenario in SCENARIOS:
+                result = run_scenario(handler, form_type, scenario, stub, args.iterations)
+                results.append(result)
+                print(f"{form_type:<24} {scenario:<20} p50 {result['p50_ms']:8.3f} ms  "
+                      f"p95 {result['p95_ms']:8.3f} ms  p99 {result['p99_ms']:8.3f} ms  "
+                      f"{result['throughput_rps']:9.1f} req/s  {result['status_codes']}")
+    finally:
+        stub.stop()
+
+    report = {
+        'benchmark': 'handlers',
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {'iterations': args.iterations, 'smtp_latency_ms': args.latency_ms},
+        'results': results,
+    }
+    output = args.output
+    if output is None:
+        os.makedirs(DEFAULT_OUTPUT_DIR, exist_ok=True)
+        output = os.path.join(DEFAULT_OUTPUT_DIR, f"handlers-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Intake cost of honest and hostile request bodies.
+
+Feeds prpm_intake.read_body a normal submission in every supported encoding
+and a set of hostile bodies: oversized raw JSON, oversized base64, a gzip
+bomb that inflates to 1 GiB, deeply nested JSON and a form body with too
+many fields. Reports the outcome, the time per call and the peak memory
+allocated while handling one body (tracemalloc, input excluded).
+
+Usage: python benchmarks/bench_intake.py [--number N]
+"""
+import argparse
+import base64
+import gzip
+import json
+import time
+import tracemalloc
+import zlib
+from urllib.parse import urlencode
+
+import _handlers  # noqa: F401  (puts python/ on sys.path)
+from payloads import valid_payload
+from prpm_intake import MAX_BODY_BYTES, IntakeError, read_body
+
+
+def gzip_bomb(size: int) -> bytes:
+    """Gzip stream of `size` zero bytes, compressed in chunks so building it stays cheap."""
+    compressor = zlib.compressobj(9, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    chunk = bytes(1024 * 1024)
+    parts = [compressor.compress(chunk) for _ in range(size // len(chunk))]
+    parts.append(compressor.flush())
+    return b''.join(parts)
+
+
+def cases():
+    payload = valid_payload('general-inquiry')
+    text = json.dumps(payload)
+    gzipped = gzip.compress(text.encode())
+    oversized = json.dumps({'message': 'x' * (MAX_BODY_BYTES + 1)})
+    return [
+        ('json', {'body': text}),
+        ('json base64', {'body': base64.b64encode(text.encode()).decode(), 'isBase64Encoded': True}),
+        ('json gzip', {'body': base64.b64encode(gzipped).decode(), 'isBase64Encoded': True,
+                       'headers': {'Content-Encoding': 'gzip'}}),
+        ('form-urlencoded', {'body': urlencode(payload),
+                             'headers': {'Content-Type': 'application/x-www-form-urlencoded'}}),
+        ('oversized json', {'body': oversized}),
+        ('oversized base64', {'body': base64.b64encode(oversized.encode()).decode(), 'isBase64Encoded': True}),
+        ('gzip bomb 1 GiB', {'body': base64.b64encode(gzip_bomb(1024 ** 3)).decode(), 'isBase64Encoded': True,
+                             'headers': {'Content-Encoding': 'gzip'}}),
+        ('nested json', {'body': '[' * 100000 + ']' * 100000}),
+        ('form field flood', {'body': '&'.join(f'f{i}=1' for i in range(100000)),
+                              'headers': {'Content-Type': 'application/x-www-form-urlencoded'}}),
+    ]
+
+
+def outcome(event) -> str:
+    try:
+        body = read_body(event)
+    except IntakeError as e:
+        return f"{e.status_code} {e.message}"
+    except json.JSONDecodeError as e:
+        return f"400 invalid JSON: {e.msg}"
+    return f"parsed {type(body).__name__} with {len(body)} fields"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=20, help='calls per case for timing')
+    args = parser.parse_args()
+
+    print(f"{'case':<18} {'input KiB':>10} {'ms/call':>9} {'peak KiB':>9}  outcome")
+    for name, event in cases():
+        result = outcome(event)
+        start = time.perf_counter()
+        for _ in range(args.number):
+            outcome(event)
+        ms = (time.perf_counter() - start) / args.number * 1000
+
+        tracemalloc.start()
+        outcome(event)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:<18} {len(event['body']) / 1024:>10.1f} {ms:>9.3f} {peak / 1024:>9.1f}  {result[:60]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Load test: legitimate traffic under a single-source flood, with and without
+the per-IP rate limiter.
+
+One warm handler processes an interleaved stream in which most requests come
+from a handful of flooding IPs and the rest from many distinct legitimate
+IPs, each sending a single valid submission. A share of the flood requests
+are batches (JSON arrays, sent with the batch token) of distinct
+submissions, which the limiter must charge per submission. Every request
+carries a fresh Idempotency-Key, so the flood cannot be absorbed by
+duplicate suppression. Reports, per run, legitimate throughput and latency,
+the status breakdown of both populations and the number of messages that
+reached the SMTP stub.
+
+Usage:
+    python benchmarks/bench_ratelimit.py [--requests 2000] [--legit-share 0.05]
+                                         [--flood-ips 3] [--batch-share 0.2]
+                                         [--batch-size 10] [--latency-ms 5]
+"""
+import argparse
+import contextlib
+import json
+import os
+import time
+from collections import Counter
+
+from _handlers import load_handler
+from _stats import summarize
+from payloads import valid_payload
+from smtp_stub import SMTPStub
+
+BATCH_TOKEN = 'bench-batch-token'
+
+# A free-text field of each form, varied so the items of a batch are not duplicates of each other
+VARIED_FIELD = {'general-inquiry': 'message', 'proposal': 'communityAmenities',
+                'contractor-application': 'typeOfService'}
+
+
+def batch_body(form_type: str, size: int, tag: str) -> str:
+    """A JSON array of size valid submissions that differ from each other and from every other batch."""
+    items = []
+    for n in range(size):
+        item = valid_payload(form_type)
+        item[VARIED_FIELD[form_type]] += f" ({tag}-{n})"
+        items.append(item)
+    return json.dumps(items)
+
+
+def build_stream(form_type: str, requests: int, legit_share: float, flood_ips: int, run_id: str,
+                 batch_share: float = 0.0, batch_size: int = 1):
+    """Interleave flood and legitimate events; returns a list of (is_legit, event)."""
+    body = json.dumps(valid_payload(form_type))
+    every = max(1, round(1 / legit_share))
+    batch_every = max(1, round(1 / batch_share)) if batch_share > 0 else 0
+    stream = []
+    for i in range(requests):
+        legit = i % every == 0
+        ip = f"198.51.100.{i // every % 250}" if legit else f"203.0.113.{i % flood_ips}"
+        headers = {'Idempotency-Key': f'{run_id}-{i}'}
+        event_body = body
+        if not legit and batch_every and i % batch_every == 1:
+            event_body = batch_body(form_type, batch_size, f'{run_id}-{i}')
+            headers['Authorization'] = f'Bearer {BATCH_TOKEN}'
+        stream.append((legit, {
+            'body': event_body,
+            'headers': headers,
+            'requestContext': {'identity': {'sourceIp': ip}},
+        }))
+    return stream
+
+
+def run(handler, stream, stub: SMTPStub) -> dict:
+    delivered_before = stub.delivered
+    legit_latencies = []
+    statuses = {True: Counter(), False: Counter()}
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        for legit, event in stream:
+            start = time.perf_counter()
+            response = handler(event, None)
+            if legit:
+                legit_latencies.append((time.perf_counter() - start) * 1000)
+            statuses[legit][response['statusCode']] += 1
+        elapsed = time.perf_counter() - started
+    return {
+        'legit': summarize(legit_latencies, elapsed),
+        'legit_status': dict(statuses[True]),
+        'flood_status': dict(statuses[False]),
+        'smtp_deliveries': stub.delivered - delivered_before,
+        'elapsed_s': round(elapsed, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--form', default='general-inquiry')
+    parser.add_argument('--requests', type=int, default=2000, help='total requests in the stream')
+    parser.add_argument('--legit-share', type=float, default=0.05, help='fraction from legitimate IPs')
+    parser.add_argument('--flood-ips', type=int, default=3, help='number of flooding source IPs')
+    parser.add_argument('--batch-share', type=float, default=0.2, help='fraction of flood requests that are batches')
+    parser.add_argument('--batch-size', type=int, default=10, help='submissions in each flood batch')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='stub delay before every SMTP reply')
+    args = parser.parse_args()
+
+    stub = SMTPStub(latency_ms=args.latency_ms).start()
+    os.environ.update(stub.environment())
+    os.environ.setdefault('ZEPTO_USER', 'bench')
+    os.environ.setdefault('ZEPTO_PASS', 'bench')
+    os.environ['PRPM_METRICS'] = '0'
+    os.environ['PRPM_BATCH_TOKEN'] = BATCH_TOKEN
+    try:
+        handler = load_handler(args.form).lambda_handler
+        for label, enabled in (('no limiter', '0'), ('rate limited', '1')):
+            os.environ['PRPM_RATE_LIMIT'] = enabled
+            stream = build_stream(args.form, args.requests, args.legit_share, args.flood_ips, f'load-{enabled}',
+                                  args.batch_share, args.batch_size)
+            result = run(handler, stream, stub)
+            legit = result['legit']
+            print(f"{label:<13} legit {legit['count']:>4} req  {legit['throughput_rps']:8.1f} legit req/s  "
+                  f"p50 {legit['p50_ms']:7.3f} ms  p99 {legit['p99_ms']:7.3f} ms  "
+                  f"legit {result['legit_status']}  flood {result['flood_status']}  "
+                  f"SMTP deliveries {result['smtp_deliveries']}  ({result['elapsed_s']} s)")
+    finally:
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Micro-benchmark: per-request CPU of building responses and (de)serializing
+JSON, before and after the response layer.
+
+Compares the original per-call response construction (dict literal plus
+json.dumps) with the pre-serialized static responses, and every JSON
+operation on the request path (body parse, validation-error body, EMF
+metrics record) under the stdlib and orjson backends of prpm_codec.
+
+Usage: python benchmarks/bench_responses.py [--number N]
+"""
+import argparse
+import importlib
+import json
+import os
+import timeit
+
+import _handlers  # noqa: F401  (puts python/ on sys.path)
+import prpm_codec
+from payloads import valid_payload
+from prpm_responses import MISSING_BODY_RESPONSE, static_response
+
+SUCCESS_MESSAGE = "General inquiry submitted successfully! We will contact you shortly."
+SUCCESS_RESPONSE = static_response(200, {"message": SUCCESS_MESSAGE})
+VALIDATION_ERRORS = {
+    'email': 'Please enter a valid email address',
+    'mobilePhone': 'Mobile phone must be in format XXX-XXX-XXXX',
+    'message': 'Message is required',
+}
+EMF_RECORD = {
+    "_aws": {"Timestamp": 1760000000000, "CloudWatchMetrics": [{
+        "Namespace": "PaxRiverPM/Forms", "Dimensions": [["FormType", "StartType"]],
+        "Metrics": [{"Name": name, "Unit": "Milliseconds"} for name in
+                    ('ParseMs', 'ValidateMs', 'BuildMessageMs', 'SendMs', 'TotalMs')],
+    }]},
+    "FormType": "general-inquiry", "StartType": "warm", "StatusCode": 200, "SmtpSessionReused": True,
+    "ParseMs": 0.012, "ValidateMs": 0.008, "BuildMessageMs": 0.21, "SendMs": 25.1, "TotalMs": 25.4,
+}
+
+
+def legacy_response(message: str) -> dict:
+    return {
+        "statusCode": 200,
+        "headers": {
+            "Content-Type": "application/json",
+            "Access-Control-Allow-Origin": "*"
+        },
+        "body": json.dumps({
+            "message": message
+        })
+    }
+
+
+def legacy_missing_body() -> dict:
+    return {
+        "statusCode": 400,
+        "headers": {
+            "Content-Type": "application/json",
+            "Access-Control-Allow-Origin": "*"
+        },
+        "body": json.dumps({
+            "message": "Request body is missing",
+            "errors": {}
+        })
+    }
+
+
+def bench(func, number: int) -> float:
+    """Best per-call time in microseconds over five repeats."""
+    return min(timeit.Timer(func).repeat(repeat=5, number=number)) / number * 1e6
+
+
+def codec(backend: str):
+    """Load prpm_codec with the given backend; returns (loads, dumps) or None if unavailable."""
+    os.environ['PRPM_JSON_CODEC'] = backend
+    try:
+        module = importlib.reload(prpm_codec)
+        module.backend()
+    except ImportError:
+        return None
+    finally:
+        os.environ.pop('PRPM_JSON_CODEC', None)
+    # The resolved functions, not the module-level wrappers: the next reload
+    # rebinds the wrappers' backend in place
+    return module._loads, module._dumps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=50000, help='calls per timing repeat')
+    args = parser.parse_args()
+    n = args.number
+
+    print("Static responses")
+    for name, old, new in (
+        ('success (200)', lambda: legacy_response(SUCCESS_MESSAGE), lambda: SUCCESS_RESPONSE),
+        ('missing body (400)', legacy_missing_body, lambda: MISSING_BODY_RESPONSE),
+    ):
+        old_us, new_us = bench(old, n), bench(new, n)
+        print(f"  {name:<24} per call {old_us:7.3f} us -> {new_us:7.3f} us  (saves {old_us - new_us:6.3f} us)")
+
+    body = json.dumps(valid_payload('general-inquiry'))
+    operations = {
+        'parse body': lambda loads, dumps: lambda: loads(body),
+        'validation error body': lambda loads, dumps: lambda: dumps({
+            "message": "Validation failed. Please check the errors below.", "errors": VALIDATION_ERRORS}),
+        'EMF metrics record': lambda loads, dumps: lambda: dumps(EMF_RECORD),
+    }
+    backends = {'json.dumps/loads (before)': (json.loads, json.dumps)}
+    for backend in ('json', 'orjson'):
+        pair = codec(backend)
+        if pair is None:
+            print("\n(orjson not installed; skipping)")
+            continue
+        backends[f'prpm_codec {backend}'] = pair
+    importlib.reload(prpm_codec)
+
+    print(f"\n{'operation':<24}" + ''.join(f"{name:>28}" for name in backends))
+    totals = dict.fromkeys(backends, 0.0)
+    for operation, make in operations.items():
+        row = f"{operation:<24}"
+        for name, (loads, dumps) in backends.items():
+            us = bench(make(loads, dumps), n)
+            totals[name] += us
+            row += f"{us:>25.3f} us"
+        print(row)
+    print(f"{'total per request':<24}" + ''.join(f"{totals[name]:>25.3f} us" for name in backends))
+
+
+if __name__ == '__main__':
+    main()
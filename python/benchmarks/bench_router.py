@@ -0,0 +1,221 @@
+"""
+Routed entry point vs. three separate functions under mixed traffic.
+
+Measures, against the local SMTP stand-in, the cold-start cost of each
+deployment (fresh interpreter: import + first successful submission), the
+cost of a warm router container loading a pipeline it has not served yet,
+and warm per-form latency. Those samples then drive a discrete-event
+simulation of Lambda container pools: Poisson arrivals mixed across the
+three forms, one request per container at a time, idle containers reused
+most-recently-used first and reaped after the keep-alive window. Reports
+the cold-start rate and p50/p95/p99 latency of each setup.
+
+Usage:
+    python benchmarks/bench_router.py [--rate-per-hour 30] [--hours 168]
+                                      [--mix 0.2 0.3 0.5] [--keepalive-s 420]
+                                      [--init-ms 150] [--runs 5] [--json out.json]
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+from _handlers import HANDLER_FILES, PYTHON_DIR, load_handler, load_router
+from _stats import percentile
+from payloads import valid_payload
+from smtp_stub import SMTPStub
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FORM_TYPES = list(HANDLER_FILES)
+
+HANDLER_PROBE = r'''
+import json, sys, time
+sys.path.insert(0, {bench_dir!r})
+from payloads import valid_payload
+start = time.perf_counter()
+from _handlers import load_handler
+module = load_handler({form_type!r})
+import_ms = (time.perf_counter() - start) * 1000
+event = {{'body': json.dumps(valid_payload({form_type!r})), 'headers': {{'Idempotency-Key': 'probe'}}}}
+start = time.perf_counter()
+response = module.lambda_handler(event, None)
+first_call_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{'import_ms': import_ms, 'first_call_ms': first_call_ms, 'status': response['statusCode']}}))
+'''
+
+ROUTER_PROBE = r'''
+import json, sys, time
+sys.path.insert(0, {bench_dir!r})
+from payloads import valid_payload
+start = time.perf_counter()
+from _handlers import load_router
+module = load_router()
+import_ms = (time.perf_counter() - start) * 1000
+first_calls, statuses = {{}}, {{}}
+for form_type in {order!r}:
+    event = {{'path': '/forms/' + form_type, 'body': json.dumps(valid_payload(form_type)),
+             'headers': {{'Idempotency-Key': 'probe-' + form_type}}}}
+    start = time.perf_counter()
+    response = module.lambda_handler(event, None)
+    first_calls[form_type] = (time.perf_counter() - start) * 1000
+    statuses[form_type] = response['statusCode']
+print(json.dumps({{'import_ms': import_ms, 'first_calls': first_calls, 'statuses': statuses}}))
+'''
+
+
+def run_probe(source: str, env: dict) -> dict:
+    result = subprocess.run([sys.executable, '-c', source], capture_output=True, text=True,
+                            env=env, cwd=PYTHON_DIR, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure_cold(env: dict, runs: int) -> dict:
+    """Cold-start samples (ms) per setup and form, plus the router's first use of each pipeline."""
+    samples = {'separate': {f: [] for f in FORM_TYPES}, 'router': {f: [] for f in FORM_TYPES},
+               'router_first_use': {f: [] for f in FORM_TYPES}}
+    for _ in range(runs):
+        for form_type in FORM_TYPES:
+            data = run_probe(HANDLER_PROBE.format(bench_dir=BENCH_DIR, form_type=form_type), env)
+            samples['separate'][form_type].append(data['import_ms'] + data['first_call_ms'])
+
+            order = [form_type] + [f for f in FORM_TYPES if f != form_type]
+            data = run_probe(ROUTER_PROBE.format(bench_dir=BENCH_DIR, order=order), env)
+            samples['router'][form_type].append(data['import_ms'] + data['first_calls'][form_type])
+            for other in order[1:]:
+                samples['router_first_use'][other].append(data['first_calls'][other])
+    return samples
+
+
+def measure_warm(iterations: int) -> dict:
+    """Warm latency samples (ms) per setup and form, each invocation a distinct submission."""
+    router = load_router().lambda_handler
+    handlers = {form_type: load_handler(form_type).lambda_handler for form_type in FORM_TYPES}
+    samples = {'separate': {}, 'router': {}}
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for setup in samples:
+            for form_type in FORM_TYPES:
+                body = json.dumps(valid_payload(form_type))
+                handler = router if setup == 'router' else handlers[form_type]
+                latencies = []
+                for i in range(iterations + 1):
+                    event = {'path': '/forms/' + form_type, 'body': body,
+                             'headers': {'Idempotency-Key': f'warm-{setup}-{i}'}}
+                    start = time.perf_counter()
+                    handler(event, None)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                samples[setup][form_type] = latencies[1:]
+    return samples
+
+
+def arrivals(rate_per_hour: float, hours: float, mix, rng: random.Random):
+    """Poisson arrival times (s) with a form type drawn from the traffic mix."""
+    t, end = 0.0, hours * 3600
+    rate = rate_per_hour / 3600
+    while True:
+        t += rng.expovariate(rate)
+        if t >= end:
+            return
+        yield t, rng.choices(FORM_TYPES, weights=mix)[0]
+
+
+def simulate(setup: str, requests, cold: dict, warm: dict, init_ms: float, keepalive_s: float,
+             rng: random.Random) -> dict:
+    """Replay the arrivals against container pools and return latency and cold-start stats."""
+    pools = {}
+    latencies, cold_starts, peak = [], 0, 0
+    for t, form_type in requests:
+        pool = pools.setdefault('router' if setup == 'router' else form_type, [])
+        pool[:] = [c for c in pool if c['busy_until'] > t or t - c['last_used'] <= keepalive_s]
+        idle = [c for c in pool if c['busy_until'] <= t]
+        if idle:
+            container = max(idle, key=lambda c: c['last_used'])
+            if form_type in container['loaded']:
+                latency = rng.choice(warm[setup][form_type])
+            else:
+                latency = rng.choice(cold['router_first_use'][form_type])
+        else:
+            container = {'loaded': set()}
+            pool.append(container)
+            cold_starts += 1
+            latency = init_ms + rng.choice(cold[setup][form_type])
+        container['loaded'].add(form_type)
+        container['busy_until'] = t + latency / 1000
+        container['last_used'] = container['busy_until']
+        latencies.append(latency)
+        peak = max(peak, sum(len(p) for p in pools.values()))
+
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        'setup': setup,
+        'requests': count,
+        'cold_starts': cold_starts,
+        'cold_start_rate': round(cold_starts / count, 4) if count else 0.0,
+        'p50_ms': round(percentile(values, 0.50), 3),
+        'p95_ms': round(percentile(values, 0.95), 3),
+        'p99_ms': round(percentile(values, 0.99), 3),
+        'mean_ms': round(sum(values) / count, 3) if count else 0.0,
+        'peak_containers': peak,
+    }
+
+
+def median(values):
+    return sorted(values)[len(values) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rate-per-hour', type=float, default=30.0, help='mean submissions per hour, all forms')
+    parser.add_argument('--hours', type=float, default=168.0, help='simulated traffic window')
+    parser.add_argument('--mix', type=float, nargs=3, default=[0.2, 0.3, 0.5], metavar=('CONTRACTOR', 'PROPOSAL', 'GENERAL'),
+                        help='traffic share per form')
+    parser.add_argument('--keepalive-s', type=float, default=420.0, help='idle time before a container is reaped')
+    parser.add_argument('--init-ms', type=float, default=150.0, help='runtime bootstrap added to every cold start')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='stub delay before every SMTP reply')
+    parser.add_argument('--runs', type=int, default=5, help='fresh-interpreter probes per form and setup')
+    parser.add_argument('--iterations', type=int, default=100, help='warm invocations per form and setup')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    stub = SMTPStub(latency_ms=args.latency_ms).start()
+    os.environ.update(stub.environment())
+    os.environ.setdefault('ZEPTO_USER', 'bench')
+    os.environ.setdefault('ZEPTO_PASS', 'bench')
+    os.environ['PRPM_METRICS'] = '0'
+    try:
+        cold = measure_cold(dict(os.environ), args.runs)
+        warm = measure_warm(args.iterations)
+    finally:
+        stub.stop()
+
+    print(f"{'form':<24} {'separate cold':>14} {'router cold':>12} {'router 1st use':>15} "
+          f"{'separate warm':>14} {'router warm':>12}   (median ms)")
+    for form_type in FORM_TYPES:
+        print(f"{form_type:<24} {median(cold['separate'][form_type]):>14.2f} {median(cold['router'][form_type]):>12.2f} "
+              f"{median(cold['router_first_use'][form_type]):>15.2f} {median(warm['separate'][form_type]):>14.2f} "
+              f"{median(warm['router'][form_type]):>12.2f}")
+
+    rng = random.Random(args.seed)
+    requests = list(arrivals(args.rate_per_hour, args.hours, args.mix, rng))
+    print(f"\nSimulated {len(requests)} submissions over {args.hours:g} h "
+          f"({args.rate_per_hour:g}/h, mix {args.mix}, keep-alive {args.keepalive_s:g} s, init {args.init_ms:g} ms)")
+    results = []
+    for setup in ('separate', 'router'):
+        result = simulate(setup, requests, cold, warm, args.init_ms, args.keepalive_s, random.Random(args.seed))
+        results.append(result)
+        print(f"{setup:<10} cold starts {result['cold_starts']:>6} ({result['cold_start_rate'] * 100:5.2f}%)  "
+              f"p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  "
+              f"peak containers {result['peak_containers']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'parameters': vars(args), 'cold_samples_ms': cold, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Micro-benchmark: cost of the pre-SMTP spam screen, and of its keyword matcher.
+
+screen() is timed on proposals and inquiries that are clean, padded to the
+5,000-character message limit, link-stuffed and keyword-heavy, with a form
+token signed PRPM_FORM_TOKEN_SECRET so the HMAC check is included. The
+keyword matcher shipped in prpm_spam (a first-word index confirmed by
+substring search) is then compared with testing each phrase with `in`,
+with one regex alternation of all phrases and with a pure-Python
+Aho-Corasick automaton, which must report the same phrases.
+
+Usage: python benchmarks/bench_spam.py [--number N]
+"""
+import argparse
+import os
+import re
+import time
+import timeit
+from collections import deque
+
+os.environ.setdefault('PRPM_FORM_TOKEN_SECRET', 'bench-secret')
+
+from _handlers import load_handler  # noqa: E402,F401  (puts the handlers' directory on sys.path)
+from payloads import valid_payload  # noqa: E402
+import prpm_spam  # noqa: E402
+
+FILLER = ("We are a self-managed association of 120 units and our board is looking for a management "
+          "company that can take over the accounting, maintenance coordination and annual meeting. ")
+SPAM = ("Dear Sir/Madam, I am an SEO expert. We offer SEO services, link building and guest post "
+        "placements to rank your website on the first page of Google. Contact us on WhatsApp or "
+        "Telegram, free trial available. [url=http://example.net]click here[/url] "
+        "https://example.net/offer https://example.net/seo www.example.net ")
+
+
+class AhoCorasick:
+    """Textbook Aho-Corasick over lower-cased text, reporting whole-word matches like the shipped matcher."""
+
+    def __init__(self, phrases):
+        self.goto, self.fail, self.out = [{}], [0], [[]]
+        for phrase in phrases:
+            state = 0
+            for char in phrase:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.out[state].append(phrase)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def matches(self, text: str):
+        text = text.lower()
+        found, state = {}, 0
+        for end, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for phrase in self.out[state]:
+                start = end - len(phrase) + 1
+                if _word_boundary(text, start - 1) and _word_boundary(text, end + 1):
+                    found.setdefault(phrase, None)
+        return sorted(found)
+
+
+def _word_boundary(text: str, index: int) -> bool:
+    return index < 0 or index >= len(text) or not (text[index].isalnum() or text[index] == "'")
+
+
+def naive_matches(phrases, text: str):
+    """Test each phrase with `in` (no word boundaries, so it over-matches)."""
+    text = text.lower()
+    return [phrase for phrase in phrases if phrase in text]
+
+
+def submissions():
+    token = prpm_spam.issue_form_token('general-inquiry', now=time.time() - 60)
+    fresh = prpm_spam.issue_form_token('general-inquiry')
+    inquiry = dict(valid_payload('general-inquiry'), formToken=token)
+    long_message = (FILLER * 40)[:5000]
+    return {
+        'proposal, clean': ('proposal', dict(valid_payload('proposal'),
+                                             formToken=prpm_spam.issue_form_token('proposal', now=time.time() - 60))),
+        'inquiry, clean': ('general-inquiry', inquiry),
+        'inquiry, 5 KB clean': ('general-inquiry', dict(inquiry, message=long_message)),
+        'inquiry, 5 KB spam': ('general-inquiry', dict(inquiry, formToken=fresh, message=(SPAM * 20)[:5000])),
+        'inquiry, honeypot': ('general-inquiry', dict(inquiry, url='http://example.net')),
+    }
+
+
+def bench(func, number: int) -> float:
+    """Return the best per-call time in microseconds over five repeats."""
+    return min(timeit.Timer(func).repeat(repeat=5, number=number)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=2000, help='calls per timing repeat')
+    args = parser.parse_args()
+
+    start = timeit.default_timer()
+    matcher = prpm_spam.keyword_matcher()
+    print(f"First-use build of {len(matcher.weights)} phrases: "
+          f"{(timeit.default_timer() - start) * 1e3:.2f} ms\n")
+
+    print(f"{'screen()':<22} {'us/call':>9} {'score':>6}  action")
+    for name, (form_type, body) in submissions().items():
+        verdict = prpm_spam.screen(form_type, body)
+        us = bench(lambda: prpm_spam.screen(form_type, body), args.number)
+        print(f"{name:<22} {us:>9.2f} {verdict.score:>6g}  {verdict.action or 'send'}")
+
+    phrases = list(matcher.weights)
+    automaton = AhoCorasick(phrases)
+    alternation = re.compile(r'\b(?:' + '|'.join(map(re.escape, sorted(phrases, key=len, reverse=True))) + r')\b',
+                             re.IGNORECASE)
+    print(f"\n{'keyword matching':<22} {'in us':>9} {'regex us':>9} {'aho-corasick us':>16} {'shipped us':>11}"
+          f"  same phrases")
+    for name, text in (('200 chars clean', FILLER[:200]), ('5 KB clean', (FILLER * 40)[:5000]),
+                       ('5 KB spam', (SPAM * 20)[:5000])):
+        naive_us = bench(lambda: naive_matches(phrases, text), args.number)
+        regex_us = bench(lambda: alternation.findall(text), args.number)
+        automaton_us = bench(lambda: automaton.matches(text), max(args.number // 20, 1))
+        shipped_us = bench(lambda: matcher.matches(text), args.number)
+        same = automaton.matches(text) == matcher.matches(text)
+        print(f"{name:<22} {naive_us:>9.2f} {regex_us:>9.2f} {automaton_us:>16.2f} {shipped_us:>11.2f}  {same}")
+
+
+if __name__ == '__main__':
+    main()
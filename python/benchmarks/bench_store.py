@@ -0,0 +1,175 @@
+"""
+Submission store: what it adds to the handler, and how fast it answers queries.
+
+Handler latency: proposals are submitted to the local SMTP stand-in with the
+store off, with the store written synchronously inside the handler (one
+SQLite transaction per submission, the naive approach) and write-behind as
+shipped, where the handler only appends to a buffer. Each submission carries
+a fresh Idempotency-Key so every one is stored.
+
+Query latency: the store is bulk-loaded with synthetic submissions spread
+over three years and the three forms, then each query shape the staff
+search uses is run against varying values; reported per shape are the
+p50/p95/max times of query() (first page of 50) and count().
+
+Usage: python benchmarks/bench_store.py [--rows 300000] [--iterations 300] [--queries 200]
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+STORE_DIR = tempfile.mkdtemp(prefix='prpm-store-bench-')
+os.environ['PRPM_STORE_PATH'] = os.path.join(STORE_DIR, 'submissions.sqlite3')
+
+from _handlers import load_handler  # noqa: E402
+from _stats import summarize  # noqa: E402
+from payloads import valid_payload  # noqa: E402
+from smtp_stub import SMTPStub  # noqa: E402
+
+FORM_TYPES = ('proposal', 'contractor-application', 'general-inquiry')
+STATES = ('Maryland', 'Virginia', 'DC', 'District of Columbia')
+WORDS = ('Oak', 'Cedar', 'Harbor', 'Lexington', 'Patuxent', 'River', 'Bay', 'Willow', 'Chesapeake',
+         'Solomons', 'Hollywood', 'Laurel', 'Meadow', 'Summit', 'Pine', 'Creek', 'Landing', 'Park')
+SUFFIXES = ('Commons', 'Village', 'Estates', 'Towers', 'Condominium', 'HOA', 'Place', 'Pointe')
+
+
+def contact_email(user: int) -> str:
+    """About five submissions share each of the 60,000 synthetic submitters' addresses."""
+    return f"user{user}@example{user % 50}.com"
+
+
+def synthetic_record(rng: random.Random, index: int, now: float):
+    """One (id, idempotency key, form_type, submitted_at, fields) record shaped like a normalized submission."""
+    form_type = rng.choices(FORM_TYPES, weights=(3, 2, 5))[0]
+    email = contact_email(rng.randrange(60000))
+    zip_code = f"{rng.randrange(20000, 23000):05d}"
+    fields = {'city': 'Lexington Park', 'zipCode': zip_code}
+    if form_type == 'proposal':
+        fields.update({
+            'communityName': f"{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.choice(SUFFIXES)}",
+            'state': rng.choice(STATES), 'numberOfUnits': str(rng.randrange(10, 900)),
+            'deadlineDate': f"{rng.randrange(2024, 2028)}-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+            'contactName': 'Helen Carter', 'contactEmail': email,
+        })
+    elif form_type == 'contractor-application':
+        fields.update({'companyName': f"{rng.choice(WORDS)} Roofing LLC", 'state': rng.choice(STATES),
+                       'firstName': 'Dana', 'lastName': 'Whitfield', 'email': email})
+    else:
+        fields = {'firstName': 'Sam', 'lastName': 'Rivera', 'email': email,
+                  'message': 'Do you manage communities in our area? ' * 3}
+    return (f"{index:032x}", f"{form_type}:body:{index:064x}", form_type,
+            now - rng.random() * 3 * 365 * 86400, fields)
+
+
+def bench_handler(mode: str, iterations: int) -> dict:
+    """Submit proposals with the store off, synchronous or write-behind and summarize handler latency."""
+    import prpm_store
+
+    module = load_handler('proposal', f'prpm_store_bench_{mode}')
+    os.environ['PRPM_SUBMISSION_STORE'] = '0' if mode == 'off' else '1'
+    record_submission = prpm_store.record_submission
+    if mode == 'synchronous':
+        # The handlers look record_submission up in prpm_store when they use it
+        store = prpm_store.get_submission_store()
+        prpm_store.record_submission = lambda key, form_type, fields: store.write(
+            [(prpm_store.new_submission_id(), key, form_type, time.time(), fields)])
+    body = json.dumps(valid_payload('proposal'))
+    latencies = []
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            module.lambda_handler({'body': body, 'headers': {'Idempotency-Key': f'{mode}-warm'}}, None)
+            started = time.perf_counter()
+            for i in range(iterations):
+                event = {'body': body, 'headers': {'Idempotency-Key': f'{mode}-{i}'}}
+                start = time.perf_counter()
+                status = module.lambda_handler(event, None)['statusCode']
+                latencies.append((time.perf_counter() - start) * 1000)
+                if status != 200:
+                    raise RuntimeError(f"{mode}: unexpected status {status}")
+            elapsed = time.perf_counter() - started
+    finally:
+        prpm_store.record_submission = record_submission
+    if mode == 'write-behind':
+        writer = prpm_store.get_writer()
+        writer.flush()
+        print(f"  write-behind: {writer.summary()}")
+    return summarize(latencies, elapsed)
+
+
+def query_shapes(rng: random.Random, now: float):
+    """The staff searches, each as a function returning fresh filter values."""
+    day = 86400
+    return {
+        'formType, newest': lambda: {'form_type': rng.choice(FORM_TYPES)},
+        'state': lambda: {'state': rng.choice(STATES)},
+        'zipCode': lambda: {'zip_code': f"{rng.randrange(20000, 23000):05d}"},
+        'contactEmail': lambda: {'contact_email': contact_email(rng.randrange(60000))},
+        'community prefix': lambda: {'form_type': 'proposal', 'community': f"{rng.choice(WORDS)} {rng.choice(WORDS)}"},
+        'proposal + state': lambda: {'form_type': 'proposal', 'state': rng.choice(STATES)},
+        'state + last 30 days': lambda: {'state': rng.choice(STATES), 'since': now - 30 * day},
+        'deadline in a month': lambda: (lambda start: {
+            'form_type': 'proposal', 'deadline_from': f"{start}-01", 'deadline_to': f"{start}-31",
+        })(f"{rng.randrange(2024, 2028)}-{rng.randrange(1, 13):02d}"),
+        'zip + state + formType': lambda: {'form_type': 'contractor-application', 'state': rng.choice(STATES),
+                                           'zip_code': f"{rng.randrange(20000, 23000):05d}"},
+    }
+
+
+def bench_queries(store, queries: int, now: float):
+    rng = random.Random(7)
+    print(f"\n{'query':<26} {'query() p50':>12} {'p95':>8} {'max':>8}   {'count() p50':>12} {'p95':>8}   "
+          f"{'matches p50':>11}")
+    for name, make_filters in query_shapes(rng, now).items():
+        query_ms, count_ms, matches = [], [], []
+        for _ in range(queries):
+            filters = make_filters()
+            start = time.perf_counter()
+            store.query(**filters)
+            query_ms.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            matches.append(store.count(**filters))
+            count_ms.append((time.perf_counter() - start) * 1000)
+        q, c = summarize(query_ms, 1), summarize(count_ms, 1)
+        print(f"{name:<26} {q['p50_ms']:>9.3f} ms {q['p95_ms']:>8.3f} {q['max_ms']:>8.3f}   "
+              f"{c['p50_ms']:>9.3f} ms {c['p95_ms']:>8.3f}   {sorted(matches)[len(matches) // 2]:>11,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=300000, help='synthetic submissions to load')
+    parser.add_argument('--iterations', type=int, default=300, help='handler invocations per mode')
+    parser.add_argument('--queries', type=int, default=200, help='runs of each query shape')
+    args = parser.parse_args()
+
+    import prpm_store
+
+    try:
+        with SMTPStub() as stub:
+            os.environ.update(stub.environment(), ZEPTO_USER='bench', ZEPTO_PASS='bench',
+                              PRPM_ACK_EMAILS='0', PRPM_METRICS='0', PRPM_RATE_LIMIT='0')
+            print(f"{'store':<14} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>9}")
+            for mode in ('off', 'synchronous', 'write-behind'):
+                result = bench_handler(mode, args.iterations)
+                print(f"{mode:<14} {result['p50_ms']:>8.3f} {result['p95_ms']:>8.3f} {result['p99_ms']:>8.3f} "
+                      f"{result['throughput_rps']:>9.1f}")
+
+        store = prpm_store.SubmissionStore(os.path.join(STORE_DIR, 'loaded.sqlite3'))
+        rng, now = random.Random(42), time.time()
+        start = time.perf_counter()
+        for first in range(0, args.rows, 5000):
+            store.write([synthetic_record(rng, index, now) for index in range(first, min(first + 5000, args.rows))])
+        print(f"\nLoaded {args.rows:,} submissions in {time.perf_counter() - start:.1f} s "
+              f"({os.path.getsize(store.path) / 1024 / 1024:.0f} MiB)")
+        bench_queries(store, args.queries, now)
+    finally:
+        shutil.rmtree(STORE_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Micro-benchmark: per-message render cost and memory of the compiled email
+templates against the original f-string format_email_content functions.
+
+Times the legacy plain-text formatter, the compiled template's plain-text
+render and its combined plain-text + HTML render, and reports the peak
+memory each one allocates (tracemalloc) for a single message. The plain-text
+output is checked for parity with the legacy formatter, timestamp aside and
+without the sections added since (the contractor form's DOCUMENTS).
+
+Usage: python benchmarks/bench_templates.py [--number N]
+"""
+import argparse
+import re
+import timeit
+import tracemalloc
+
+from _handlers import load_handler
+import legacy
+from payloads import valid_payload
+
+TEMPLATE_NAMES = {
+    'contractor-application': 'CONTRACTOR_TEMPLATE',
+    'proposal': 'PROPOSAL_TEMPLATE',
+    'general-inquiry': 'GENERAL_INQUIRY_TEMPLATE',
+}
+TIMESTAMP = re.compile(r'Submitted on: [^\n]*')
+# Sections the legacy formatters never had, with their closing rule
+ADDED_SECTIONS = re.compile(r'DOCUMENTS:\n━+\n.*?\n\n━+\n\n', re.S)
+
+
+def same_text(legacy_text: str, text: str) -> bool:
+    """Compare a legacy and a template rendering, timestamp and added sections aside."""
+    return TIMESTAMP.sub('', legacy_text) == TIMESTAMP.sub('', ADDED_SECTIONS.sub('', text))
+
+
+def bench(func, payload, number: int) -> float:
+    """Return the best per-call time in microseconds over five repeats."""
+    timer = timeit.Timer(lambda: func(payload))
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e6
+
+
+def peak_bytes(func, payload) -> int:
+    """Peak memory allocated while rendering one message, result included."""
+    func(payload)
+    tracemalloc.start()
+    try:
+        result = func(payload)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=20000, help='calls per timing repeat')
+    args = parser.parse_args()
+
+    print(f"{'form':<24} {'renderer':<20} {'us/msg':>8} {'speedup':>8} {'peak KiB':>9}  same text")
+    for form_type, name in TEMPLATE_NAMES.items():
+        template = getattr(load_handler(form_type), name)
+        payload = valid_payload(form_type)
+        old = legacy.FORMATTERS[form_type]
+        same = same_text(old(payload), template.render_text(payload))
+
+        old_us = bench(old, payload, args.number)
+        for label, func in (('legacy text', old), ('template text', template.render_text),
+                            ('template text+html', template.render)):
+            us = bench(func, payload, args.number) if func is not old else old_us
+            print(f"{form_type:<24} {label:<20} {us:>8.2f} {old_us / us:>7.2f}x "
+                  f"{peak_bytes(func, payload) / 1024:>9.1f}  {same if func is not old else ''}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Handler latency and memory with files sent inline versus offloaded to the object store.
+
+For each size one contractor application carries a single PDF, in a fresh
+interpreter per run (see bench_attachments.py for how peak RSS is taken):
+
+  inline    multipart upload through the Lambda body, streamed into the
+            email as an attachment
+  offload   the handler issues an upload token, the file is PUT straight
+            to the local object store stand-in, and the submission that
+            follows carries only the token; the email links to the file
+
+Reports the size of the event the function receives, the handler's time and
+its peak RSS above the pre-call baseline. Offloaded submissions should stay
+flat in all three whatever the file size; the upload itself is between the
+client and the store.
+
+Usage: python benchmarks/bench_uploads.py [--sizes 1,4,16,64]
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from _handlers import PYTHON_DIR, load_handler
+from bench_attachments import build_event, rss_kib
+from object_store_stub import ObjectStoreStub
+from smtp_stub import SMTPStub
+
+
+def put_file(upload: dict, size: int) -> float:
+    """PUT a generated PDF of `size` bytes to a pre-signed URL a MiB at a time; returns seconds taken."""
+    def chunks():
+        yield b'%PDF-1.7\n'
+        remaining = size
+        while remaining:
+            chunk = os.urandom(min(remaining, 1024 * 1024))
+            remaining -= len(chunk)
+            yield chunk
+
+    url = urlsplit(upload['uploadUrl'])
+    connection = http.client.HTTPConnection(url.netloc, timeout=60)
+    start = time.perf_counter()
+    connection.request('PUT', f"{url.path}?{url.query}", chunks(),
+                       {**upload['headers'], 'Content-Length': str(size + 9)})
+    response = connection.getresponse()
+    response.read()
+    if response.status != 200:
+        raise RuntimeError(f"upload failed with {response.status}")
+    return time.perf_counter() - start
+
+
+def child(mode: str, size: int) -> dict:
+    """Run one submission in this (fresh) process and measure it."""
+    from payloads import valid_payload
+
+    handler = load_handler('contractor-application')
+    payload = valid_payload('contractor-application')
+    with open(os.devnull, 'w') as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            handler.lambda_handler({'body': json.dumps({**payload, 'companyName': 'Warm-up'})}, None)
+            if mode == 'inline':
+                event = build_event('multipart', payload, b'%PDF-1.7\n' + os.urandom(size))
+            else:
+                request = {'filename': 'insurance.pdf', 'contentType': 'application/pdf', 'size': size + 9}
+                issued = handler.lambda_handler({'body': json.dumps({'requestUploads': [request]})}, None)
+                upload = json.loads(issued['body'])['uploads'][0]
+                put_file(upload, size)
+                event = {'body': json.dumps({**payload, 'uploads': [upload['uploadToken']]}),
+                         'headers': {'Content-Type': 'application/json'}}
+            with open('/proc/self/clear_refs', 'w') as f:
+                f.write('5')
+            before = rss_kib('VmRSS')
+            start = time.perf_counter()
+            status = handler.lambda_handler(event, None)['statusCode']
+            elapsed = time.perf_counter() - start
+        finally:
+            sys.stdout = stdout
+    return {'status': status, 'ms': elapsed * 1000, 'event_bytes': len(event['body']),
+            'overhead_mib': (rss_kib('VmHWM') - before) / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1,4,16,64', help='file sizes in MiB')
+    parser.add_argument('--child', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, size = args.child
+        print(json.dumps(child(mode, int(size))))
+        return
+
+    print(f"{'size MiB':>8}  {'mode':<8} {'status':>6} {'event bytes':>12} {'handler ms':>11} {'peak over baseline MiB':>23}")
+    with SMTPStub(keep=1) as smtp, ObjectStoreStub() as store:
+        for size_mib in (float(s) for s in args.sizes.split(',')):
+            size = int(size_mib * 1024 * 1024)
+            limit = str(size + 1024 * 1024)
+            env = dict(os.environ, **smtp.environment(), **store.environment(),
+                       ZEPTO_USER='bench', ZEPTO_PASS='bench',
+                       PRPM_ACK_EMAILS='0', PRPM_METRICS='0', PRPM_RATE_LIMIT='0',
+                       PRPM_MAX_ATTACHMENT_BYTES=limit, PRPM_MAX_ATTACHMENTS_BYTES=limit,
+                       PRPM_MAX_UPLOAD_BYTES=limit)
+            for mode in ('inline', 'offload'):
+                result = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', mode, str(size)],
+                                        capture_output=True, text=True, env=env, cwd=PYTHON_DIR, check=True)
+                data = json.loads(result.stdout.strip().splitlines()[-1])
+                print(f"{size_mib:>8g}  {mode:<8} {data['status']:>6} {data['event_bytes']:>12,} "
+                      f"{data['ms']:>11.1f} {data['overhead_mib']:>23.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Micro-benchmark: per-submission validation cost of the compiled form schemas
+against the original hand-written validate_*_data functions.
+
+Usage: python benchmarks/bench_validation.py [--number N]
+"""
+import argparse
+import timeit
+
+from _handlers import load_handler
+import legacy
+from payloads import valid_payload, invalid_payload
+
+VALIDATOR_NAMES = {
+    'contractor-application': 'validate_contractor_data',
+    'proposal': 'validate_proposal_data',
+    'general-inquiry': 'validate_general_inquiry_data',
+}
+
+
+def bench(func, payload, number: int) -> float:
+    """Return the best per-call time in microseconds over five repeats."""
+    timer = timeit.Timer(lambda: func(payload))
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=20000, help='calls per timing repeat')
+    args = parser.parse_args()
+
+    print(f"{'form':<24} {'payload':<8} {'legacy us':>10} {'schema us':>10} {'speedup':>8}  same result")
+    for form_type, name in VALIDATOR_NAMES.items():
+        current = getattr(load_handler(form_type), name)
+        old = legacy.VALIDATORS[form_type]
+        for kind, payload in (('valid', valid_payload(form_type)), ('invalid', invalid_payload(form_type))):
+            old_us = bench(old, payload, args.number)
+            new_us = bench(current, payload, args.number)
+            same = old(payload) == current(payload)
+            print(f"{form_type:<24} {kind:<8} {old_us:>10.2f} {new_us:>10.2f} {old_us / new_us:>7.2f}x  {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,596 @@
+"""
+Reference copies of the original hand-written validators and email formatters.
+
+Kept verbatim (only renamed per form) so benchmarks can compare the current
+implementations against the code they replaced.
+"""
+import re
+from datetime import datetime
+from typing import Dict, Any, Tuple
+from urllib.parse import urlparse
+
+
+# Contractor form
+CONTRACTOR_MAX_STRING_LENGTH = 500
+CONTRACTOR_MAX_TEXTAREA_LENGTH = 2000
+
+
+def contractor_validate_email(email: str) -> bool:
+    """Validate email format using regex."""
+    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    return bool(re.match(pattern, email))
+
+
+def contractor_validate_zip_code(zip_code: str) -> bool:
+    """Validate US zip code format (5 digits or 5+4 format)."""
+    pattern = r'^\d{5}(-\d{4})?$'
+    return bool(re.match(pattern, zip_code))
+
+
+def contractor_validate_phone(phone: str) -> bool:
+    """Validate phone number format (XXX-XXX-XXXX)."""
+    # Remove any whitespace
+    phone = phone.strip()
+    # Pattern for XXX-XXX-XXXX format
+    pattern = r'^\d{3}-\d{3}-\d{4}$'
+    return bool(re.match(pattern, phone))
+
+
+def contractor_validate_website(website: str) -> bool:
+    """Validate website URL format."""
+    if not website or not website.strip():
+        return True  # Optional field, empty is valid
+    
+    website = website.strip()
+    # Add http:// if no scheme is present
+    if not website.startswith(('http://', 'https://')):
+        website = 'https://' + website
+    
+    try:
+        result = urlparse(website)
+        # Check if it has a valid netloc (domain)
+        return all([result.scheme in ['http', 'https'], result.netloc])
+    except Exception:
+        return False
+
+
+def contractor_validate_string(value: str, field_name: str, required: bool = True, max_length: int = CONTRACTOR_MAX_STRING_LENGTH) -> Tuple[bool, str]:
+    """Validate string fields."""
+    if required and (not value or not value.strip()):
+        return False, f"{field_name} is required"
+    
+    if value and len(value) > max_length:
+        return False, f"{field_name} must not exceed {max_length} characters"
+    
+    return True, ""
+
+
+def contractor_validate_contractor_data(body: Dict[str, Any]) -> Tuple[bool, Dict[str, str]]:
+    """Comprehensive validation of contractor application form data."""
+    errors = {}
+    
+    # Required string fields - Company Information
+    required_company_fields = {
+        'companyName': 'Company name',
+        'typeOfService': 'Type of service',
+        'streetAddress': 'Street address',
+        'city': 'City',
+        'state': 'State',
+        'zipCode': 'Zip code'
+    }
+    
+    for field, field_name in required_company_fields.items():
+        value = body.get(field, '').strip()
+        is_valid, error_msg = contractor_validate_string(value, field_name, required=True)
+        if not is_valid:
+            errors[field] = error_msg
+    
+    # Zip code validation (specific)
+    zip_code = body.get('zipCode', '').strip()
+    if zip_code:
+        if not contractor_validate_zip_code(zip_code):
+            errors['zipCode'] = 'Please enter a valid zip code (format: 12345 or 12345-6789)'
+    
+    # Website validation (optional)
+    website = body.get('website', '').strip()
+    if website:
+        if not contractor_validate_website(website):
+            errors['website'] = 'Please enter a valid website URL'
+    
+    # Required string fields - Primary Contact
+    required_contact_fields = {
+        'firstName': 'First name',
+        'lastName': 'Last name',
+        'title': 'Title',
+        'email': 'Email',
+        'officeNumber': 'Office number'
+    }
+    
+    for field, field_name in required_contact_fields.items():
+        value = body.get(field, '').strip()
+        is_valid, error_msg = contractor_validate_string(value, field_name, required=True)
+        if not is_valid:
+            errors[field] = error_msg
+    
+    # Email validation (specific)
+    email = body.get('email', '').strip()
+    if email:
+        if not contractor_validate_email(email):
+            errors['email'] = 'Please enter a valid email address'
+    
+    # Phone number validations
+    phone_fields = {
+        'officeNumber': 'Office number',
+        'mobilePhone': 'Mobile phone'
+    }
+    
+    for field, field_name in phone_fields.items():
+        value = body.get(field, '').strip()
+        if field == 'officeNumber' or value:  # Office number is required, mobile is optional
+            if not value:
+                if field == 'officeNumber':
+                    errors[field] = f"{field_name} is required"
+            elif not contractor_validate_phone(value):
+                errors[field] = f"{field_name} must be in format XXX-XXX-XXXX"
+    
+    # Optional license fields
+    optional_license_fields = {
+        'licenseName': ('License name', CONTRACTOR_MAX_STRING_LENGTH),
+        'licenseNumber': ('License number', CONTRACTOR_MAX_STRING_LENGTH),
+        'licenseType': ('License type', CONTRACTOR_MAX_STRING_LENGTH)
+    }
+    
+    for field, (field_name, max_length) in optional_license_fields.items():
+        value = body.get(field, '').strip()
+        if value:
+            is_valid, error_msg = contractor_validate_string(value, field_name, required=False, max_length=max_length)
+            if not is_valid:
+                errors[field] = error_msg
+    
+    # Required Reference 1 fields
+    required_ref1_fields = {
+        'reference1Name': 'Reference 1 name',
+        'reference1Title': 'Reference 1 title',
+        'reference1Phone': 'Reference 1 phone',
+        'reference1BusinessType': 'Reference 1 type of business'
+    }
+    
+    for field, field_name in required_ref1_fields.items():
+        value = body.get(field, '').strip()
+        if field == 'reference1Phone':
+            if not value:
+                errors[field] = f"{field_name} is required"
+            elif not contractor_validate_phone(value):
+                errors[field] = f"{field_name} must be in format XXX-XXX-XXXX"
+        else:
+            is_valid, error_msg = contractor_validate_string(value, field_name, required=True)
+            if not is_valid:
+                errors[field] = error_msg
+    
+    # Required Reference 2 fields
+    required_ref2_fields = {
+        'reference2Name': 'Reference 2 name',
+        'reference2Title': 'Reference 2 title',
+        'reference2Phone': 'Reference 2 phone',
+        'reference2BusinessType': 'Reference 2 type of business'
+    }
+    
+    for field, field_name in required_ref2_fields.items():
+        value = body.get(field, '').strip()
+        if field == 'reference2Phone':
+            if not value:
+                errors[field] = f"{field_name} is required"
+            elif not contractor_validate_phone(value):
+                errors[field] = f"{field_name} must be in format XXX-XXX-XXXX"
+        else:
+            is_valid, error_msg = contractor_validate_string(value, field_name, required=True)
+            if not is_valid:
+                errors[field] = error_msg
+    
+    return len(errors) == 0, errors
+
+
+def contractor_format_email_content(body: Dict[str, Any]) -> str:
+    """Format the contractor application data into a readable email."""
+    content = f"""
+New Contractor Application Submission:
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+COMPANY INFORMATION:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Company Name: {body.get('companyName', 'N/A')}
+Type of Service: {body.get('typeOfService', 'N/A')}
+Street Address: {body.get('streetAddress', 'N/A')}
+City: {body.get('city', 'N/A')}
+State: {body.get('state', 'N/A')}
+Zip Code: {body.get('zipCode', 'N/A')}
+Website: {body.get('website', 'Not provided')}
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+PRIMARY CONTACT:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+First Name: {body.get('firstName', 'N/A')}
+Last Name: {body.get('lastName', 'N/A')}
+Title: {body.get('title', 'N/A')}
+Email: {body.get('email', 'N/A')}
+Mobile Phone: {body.get('mobilePhone', 'Not provided')}
+Office Number: {body.get('officeNumber', 'N/A')}
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+PRIMARY STATE LICENSE:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Name (as it appears on license): {body.get('licenseName', 'Not provided')}
+License Number: {body.get('licenseNumber', 'Not provided')}
+Type of License: {body.get('licenseType', 'Not provided')}
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+REFERENCE #1:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Name: {body.get('reference1Name', 'N/A')}
+Title: {body.get('reference1Title', 'N/A')}
+Phone Number: {body.get('reference1Phone', 'N/A')}
+Type of Business: {body.get('reference1BusinessType', 'N/A')}
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+REFERENCE #2:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Name: {body.get('reference2Name', 'N/A')}
+Title: {body.get('reference2Title', 'N/A')}
+Phone Number: {body.get('reference2Phone', 'N/A')}
+Type of Business: {body.get('reference2BusinessType', 'N/A')}
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+Submitted on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+"""
+    return content
+
+# Proposal form
+PROPOSAL_VALID_STATES = ['Maryland', 'Virginia', 'DC', 'District of Columbia']
+PROPOSAL_VALID_COMMUNITY_TYPES = ['condo', 'hoa', 'coop', 'apartment']
+PROPOSAL_VALID_ON_SITE_STAFF = ['yes', 'no']
+PROPOSAL_MAX_STRING_LENGTH = 1000
+PROPOSAL_MAX_TEXTAREA_LENGTH = 5000
+
+
+def proposal_validate_email(email: str) -> bool:
+    """Validate email format using regex."""
+    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    return bool(re.match(pattern, email))
+
+
+def proposal_validate_zip_code(zip_code: str) -> bool:
+    """Validate US zip code format (5 digits or 5+4 format)."""
+    pattern = r'^\d{5}(-\d{4})?$'
+    return bool(re.match(pattern, zip_code))
+
+
+def proposal_validate_date(date_str: str) -> Tuple[bool, str]:
+    """Validate date format and ensure it's in the future."""
+    try:
+        # Try parsing different date formats
+        date_formats = ['%Y-%m-%d', '%m/%d/%Y', '%Y/%m/%d']
+        parsed_date = None
+        
+        for fmt in date_formats:
+            try:
+                parsed_date = datetime.strptime(date_str, fmt)
+                break
+            except ValueError:
+                continue
+        
+        if parsed_date is None:
+            return False, "Invalid date format"
+        
+        # Check if date is in the future
+        if parsed_date.date() < datetime.now().date():
+            return False, "Deadline date must be in the future"
+        
+        return True, ""
+    except Exception as e:
+        return False, f"Date validation error: {str(e)}"
+
+
+def proposal_validate_number(value: str, field_name: str, min_value: int = 0, max_value: int = None) -> Tuple[bool, str]:
+    """Validate numeric fields."""
+    if not value or not value.strip():
+        return False, f"{field_name} is required"
+    
+    try:
+        num_value = int(value)
+        if num_value < min_value:
+            return False, f"{field_name} must be at least {min_value}"
+        if max_value is not None and num_value > max_value:
+            return False, f"{field_name} must not exceed {max_value}"
+        return True, ""
+    except ValueError:
+        return False, f"{field_name} must be a valid number"
+
+
+def proposal_validate_string(value: str, field_name: str, required: bool = True, max_length: int = PROPOSAL_MAX_STRING_LENGTH) -> Tuple[bool, str]:
+    """Validate string fields."""
+    if required and (not value or not value.strip()):
+        return False, f"{field_name} is required"
+    
+    if value and len(value) > max_length:
+        return False, f"{field_name} must not exceed {max_length} characters"
+    
+    return True, ""
+
+
+def proposal_validate_proposal_data(body: Dict[str, Any]) -> Tuple[bool, Dict[str, str]]:
+    """Comprehensive validation of proposal form data."""
+    errors = {}
+    
+    # Required string fields
+    required_string_fields = {
+        'communityName': 'Community name',
+        'address': 'Address',
+        'city': 'City',
+        'zipCode': 'Zip code',
+        'specialRequirements': 'Special requirements',
+        'communityAmenities': 'Community amenities',
+        'annualBudget': 'Annual budget',
+        'reserveBudget': 'Reserve budget',
+        'contactName': 'Contact name',
+        'contactEmail': 'Contact email'
+    }
+    
+    for field, field_name in required_string_fields.items():
+        value = body.get(field, '')
+        if field == 'specialRequirements' or field == 'communityAmenities':
+            is_valid, error_msg = proposal_validate_string(value, field_name, required=True, max_length=PROPOSAL_MAX_TEXTAREA_LENGTH)
+        else:
+            is_valid, error_msg = proposal_validate_string(value, field_name, required=True)
+        
+        if not is_valid:
+            errors[field] = error_msg
+    
+    # Email validation (specific)
+    contact_email = body.get('contactEmail', '').strip()
+    if contact_email:
+        if not proposal_validate_email(contact_email):
+            errors['contactEmail'] = 'Please enter a valid email address'
+    
+    # Zip code validation (specific)
+    zip_code = body.get('zipCode', '').strip()
+    if zip_code:
+        if not proposal_validate_zip_code(zip_code):
+            errors['zipCode'] = 'Please enter a valid zip code (format: 12345 or 12345-6789)'
+    
+    # State validation
+    state = body.get('state', '').strip()
+    if not state:
+        errors['state'] = 'State is required'
+    elif state not in PROPOSAL_VALID_STATES:
+        errors['state'] = f'State must be one of: {", ".join(PROPOSAL_VALID_STATES)}'
+    
+    # Community type validation
+    community_type = body.get('communityType', '').strip()
+    if not community_type:
+        errors['communityType'] = 'Community type is required'
+    elif community_type not in PROPOSAL_VALID_COMMUNITY_TYPES:
+        errors['communityType'] = f'Community type must be one of: {", ".join(PROPOSAL_VALID_COMMUNITY_TYPES)}'
+    
+    # Number validations
+    number_fields = {
+        'numberOfUnits': ('Number of units', 1, 100000),
+        'selfManagementYears': ('Self-management years', 0, 100),
+        'professionalManagementYears': ('Professional management years', 0, 100)
+    }
+    
+    for field, (field_name, min_val, max_val) in number_fields.items():
+        value = body.get(field, '').strip()
+        is_valid, error_msg = proposal_validate_number(value, field_name, min_value=min_val, max_value=max_val)
+        if not is_valid:
+            errors[field] = error_msg
+    
+    # On-site staff validation (optional but should be valid if provided)
+    on_site_staff = body.get('onSiteStaff', '').strip().lower()
+    if on_site_staff and on_site_staff not in PROPOSAL_VALID_ON_SITE_STAFF:
+        errors['onSiteStaff'] = f'On-site staff must be one of: {", ".join(PROPOSAL_VALID_ON_SITE_STAFF)}'
+    
+    # Deadline date validation
+    deadline_date = body.get('deadlineDate', '').strip()
+    if not deadline_date:
+        errors['deadlineDate'] = 'Deadline date is required'
+    else:
+        is_valid, error_msg = proposal_validate_date(deadline_date)
+        if not is_valid:
+            errors['deadlineDate'] = error_msg
+    
+    # Optional fields validation (length checks)
+    optional_fields = {
+        'boardMemberInfo': ('Board member info', PROPOSAL_MAX_STRING_LENGTH),
+        'boardPresidentInfo': ('Board president info', PROPOSAL_MAX_TEXTAREA_LENGTH)
+    }
+    
+    for field, (field_name, max_length) in optional_fields.items():
+        value = body.get(field, '')
+        if value:
+            is_valid, error_msg = proposal_validate_string(value, field_name, required=False, max_length=max_length)
+            if not is_valid:
+                errors[field] = error_msg
+    
+    return len(errors) == 0, errors
+
+
+def proposal_format_email_content(body: Dict[str, Any]) -> str:
+    """Format the proposal data into a readable email."""
+    content = f"""
+New Proposal Request Submission:
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+COMMUNITY INFORMATION:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Community Name: {body.get('communityName', 'N/A')}
+Address: {body.get('address', 'N/A')}
+City: {body.get('city', 'N/A')}
+State: {body.get('state', 'N/A')}
+Zip Code: {body.get('zipCode', 'N/A')}
+Number of Units: {body.get('numberOfUnits', 'N/A')}
+Community Type: {body.get('communityType', 'N/A').upper()}
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+MANAGEMENT HISTORY:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Self-Management Years: {body.get('selfManagementYears', 'N/A')}
+Professional Management Years: {body.get('professionalManagementYears', 'N/A')}
+On-Site Staff: {body.get('onSiteStaff', 'N/A').upper()}
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+BOARD INFORMATION:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Board Member Info: {body.get('boardMemberInfo', 'Not provided')}
+Board President Info: {body.get('boardPresidentInfo', 'Not provided')}
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+REQUIREMENTS & AMENITIES:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Special Requirements:
+{body.get('specialRequirements', 'N/A')}
+
+Community Amenities:
+{body.get('communityAmenities', 'N/A')}
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+BUDGET INFORMATION:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Annual Budget: {body.get('annualBudget', 'N/A')}
+Reserve Budget: {body.get('reserveBudget', 'N/A')}
+Deadline Date: {body.get('deadlineDate', 'N/A')}
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+CONTACT INFORMATION:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Contact Name: {body.get('contactName', 'N/A')}
+Contact Email: {body.get('contactEmail', 'N/A')}
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+Submitted on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+"""
+    return content
+
+# General Inquiry form
+GENERAL_INQUIRY_MAX_STRING_LENGTH = 200
+GENERAL_INQUIRY_MAX_MESSAGE_LENGTH = 5000
+
+
+def general_inquiry_validate_email(email: str) -> bool:
+    """Validate email format using regex."""
+    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    return bool(re.match(pattern, email))
+
+
+def general_inquiry_validate_phone(phone: str) -> bool:
+    """Validate phone number format (XXX-XXX-XXXX)."""
+    # Remove any whitespace
+    phone = phone.strip()
+    # Pattern for XXX-XXX-XXXX format
+    pattern = r'^\d{3}-\d{3}-\d{4}$'
+    return bool(re.match(pattern, phone))
+
+
+def general_inquiry_validate_string(value: str, field_name: str, required: bool = True, max_length: int = GENERAL_INQUIRY_MAX_STRING_LENGTH) -> Tuple[bool, str]:
+    """Validate string fields."""
+    if required and (not value or not value.strip()):
+        return False, f"{field_name} is required"
+    
+    if value and len(value) > max_length:
+        return False, f"{field_name} must not exceed {max_length} characters"
+    
+    return True, ""
+
+
+def general_inquiry_validate_general_inquiry_data(body: Dict[str, Any]) -> Tuple[bool, Dict[str, str]]:
+    """Comprehensive validation of general inquiry form data."""
+    errors = {}
+    
+    # Required string fields
+    required_fields = {
+        'firstName': 'First name',
+        'lastName': 'Last name',
+        'email': 'Email',
+        'message': 'Message'
+    }
+    
+    for field, field_name in required_fields.items():
+        value = body.get(field, '').strip()
+        if field == 'message':
+            is_valid, error_msg = general_inquiry_validate_string(value, field_name, required=True, max_length=GENERAL_INQUIRY_MAX_MESSAGE_LENGTH)
+        else:
+            is_valid, error_msg = general_inquiry_validate_string(value, field_name, required=True)
+        
+        if not is_valid:
+            errors[field] = error_msg
+    
+    # Email validation (specific)
+    email = body.get('email', '').strip()
+    if email:
+        if not general_inquiry_validate_email(email):
+            errors['email'] = 'Please enter a valid email address'
+    
+    # Mobile phone validation (optional but should be valid if provided)
+    mobile_phone = body.get('mobilePhone', '').strip()
+    if mobile_phone:
+        if not general_inquiry_validate_phone(mobile_phone):
+            errors['mobilePhone'] = 'Mobile phone must be in format XXX-XXX-XXXX'
+    
+    return len(errors) == 0, errors
+
+
+def general_inquiry_format_email_content(body: Dict[str, Any]) -> str:
+    """Format the general inquiry data into a readable email."""
+    first_name = body.get('firstName', 'N/A')
+    last_name = body.get('lastName', 'N/A')
+    full_name = f"{first_name} {last_name}".strip()
+    
+    content = f"""
+New General Inquiry Submission:
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+CONTACT INFORMATION:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Name: {full_name}
+First Name: {first_name}
+Last Name: {last_name}
+Email: {body.get('email', 'N/A')}
+Mobile Phone: {body.get('mobilePhone', 'Not provided')}
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+MESSAGE:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{body.get('message', 'N/A')}
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+Submitted on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+"""
+    return content
+
+
+VALIDATORS = {
+    'contractor-application': contractor_validate_contractor_data,
+    'proposal': proposal_validate_proposal_data,
+    'general-inquiry': general_inquiry_validate_general_inquiry_data,
+}
+
+FORMATTERS = {
+    'contractor-application': contractor_format_email_content,
+    'proposal': proposal_format_email_content,
+    'general-inquiry': general_inquiry_format_email_content,
+}
@@ -0,0 +1,383 @@
+"""
+Local HTTP server that runs the Lambda handlers like API Gateway and Lambda would.
+
+Every POST is turned into an API Gateway (REST, v1) proxy event and handed
+to a simulated Lambda container: POST /<form-type> invokes that form's
+function, any other path the routed entry point. Each function gets its
+own pool of containers that serve one request at a time. A request takes
+the most recently used idle container (warm) or, below --workers, starts a
+new one (cold); containers idle longer than --idle-timeout are retired.
+When every container is busy, requests queue, or get API Gateway's 429
+with --throttle.
+
+  --mode process   each container is a spawned interpreter, so cold starts
+                   pay the real imports and no state leaks between containers
+  --mode thread    containers are module copies in this process: cheaper,
+                   but the shared prpm_* caches (SMTP sessions, idempotency,
+                   rate limits) are common to all of them
+
+The event's sourceIp is the first X-Forwarded-For address when there is
+one, so a load generator can spread requests over many rate-limit buckets.
+Responses carry X-Container-Id, X-Cold-Start and X-Handler-Ms headers, and
+GET /_stats returns per-function container statistics. With --smtp-stub the
+handlers are pointed at a local SMTP stand-in, and with --object-store at a
+local stand-in for the upload bucket.
+
+Usage:
+    python benchmarks/local_server.py [--port 8080] [--workers 4] [--mode process]
+                                      [--idle-timeout 300] [--throttle] [--smtp-stub]
+                                      [--smtp-latency-ms 20] [--object-store] [--verbose]
+"""
+import argparse
+import base64
+import contextlib
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from _handlers import HANDLER_FILES, ROUTER_FILE, load_script
+
+ROUTER = 'forms-router'
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "POST, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type, Content-Encoding, Idempotency-Key",
+}
+
+
+def script_for(function: str) -> str:
+    return ROUTER_FILE if function == ROUTER else HANDLER_FILES[function]
+
+
+def build_event(method: str, target: str, headers: dict, body: bytes, source_ip: str) -> dict:
+    """Build an API Gateway REST proxy event; bodies that are compressed or not UTF-8 are base64-encoded."""
+    url = urlsplit(target)
+    path = url.path or '/'
+    segment = path.rstrip('/').rsplit('/', 1)[-1]
+    text = None
+    if 'content-encoding' not in {name.lower() for name in headers}:
+        try:
+            text = body.decode('utf-8')
+        except UnicodeDecodeError:
+            pass
+    return {
+        "resource": "/{proxy+}",
+        "path": path,
+        "httpMethod": method,
+        "headers": headers,
+        "queryStringParameters": dict(parse_qsl(url.query)) or None,
+        "pathParameters": {"formType": segment} if segment in HANDLER_FILES else None,
+        "requestContext": {
+            "requestId": str(uuid.uuid4()),
+            "httpMethod": method,
+            "path": path,
+            "identity": {"sourceIp": source_ip},
+        },
+        "body": text if text is not None else base64.b64encode(body).decode('ascii'),
+        "isBase64Encoded": text is None,
+    }
+
+
+class LambdaContext:
+    """The parts of the Lambda context object a handler may look at."""
+
+    def __init__(self, function_name: str, timeout: float = 30.0):
+        self.function_name = function_name
+        self.aws_request_id = str(uuid.uuid4())
+        self._deadline = time.monotonic() + timeout
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+
+def _invoke(module, function: str, event: dict):
+    """Call lambda_handler; returns (response, handler_ms)."""
+    start = time.perf_counter()
+    response = module.lambda_handler(event, LambdaContext(function))
+    return response, (time.perf_counter() - start) * 1000
+
+
+class ThreadContainer:
+    """A container simulated by a private copy of the handler module in this process."""
+
+    def __init__(self, function: str, container_id: str):
+        self.id = container_id
+        self.function = function
+        start = time.perf_counter()
+        name = 'prpm_local_' + container_id.replace('-', '_')
+        self.module = load_script(script_for(function), name)
+        self.init_ms = (time.perf_counter() - start) * 1000
+
+    def invoke(self, event: dict):
+        return _invoke(self.module, self.function, event)
+
+    def stop(self):
+        pass
+
+
+def _container_main(function: str, conn, verbose: bool):
+    """Entry point of a process container: import the handler, then serve events until told to stop."""
+    if not verbose:
+        sys.stdout = open(os.devnull, 'w')
+    start = time.perf_counter()
+    module = load_script(script_for(function), 'prpm_local_handler')
+    conn.send(('ready', (time.perf_counter() - start) * 1000))
+    while True:
+        event = conn.recv()
+        if event is None:
+            return
+        try:
+            conn.send(('ok', _invoke(module, function, event)))
+        except Exception as e:
+            conn.send(('error', f"{type(e).__name__}: {e}"))
+
+
+class ProcessContainer:
+    """A container simulated by a spawned interpreter that imports the handler from scratch."""
+
+    def __init__(self, function: str, container_id: str, verbose: bool = False):
+        self.id = container_id
+        self.function = function
+        context = multiprocessing.get_context('spawn')
+        self._conn, child = context.Pipe()
+        self._process = context.Process(target=_container_main, args=(function, child, verbose), daemon=True)
+        self._process.start()
+        _, self.init_ms = self._conn.recv()
+
+    def invoke(self, event: dict):
+        self._conn.send(event)
+        status, result = self._conn.recv()
+        if status == 'error':
+            raise RuntimeError(result)
+        return result
+
+    def stop(self):
+        with contextlib.suppress(OSError):
+            self._conn.send(None)
+        self._process.join(timeout=2)
+        if self._process.is_alive():
+            self._process.terminate()
+
+
+class ContainerPool:
+    """Lambda-style concurrency for one function: one request per container, warm reuse, idle expiry."""
+
+    def __init__(self, function: str, factory, max_containers: int, idle_timeout: float):
+        self.function = function
+        self.factory = factory
+        self.max_containers = max_containers
+        self.idle_timeout = idle_timeout
+        self._idle = []
+        self._count = 0
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self.stats = {"invocations": 0, "cold_starts": 0, "retired": 0, "throttled": 0, "init_ms_total": 0.0}
+
+    def _retire_expired(self):
+        now = time.monotonic()
+        expired = [c for c in self._idle if now - c.last_used > self.idle_timeout]
+        for container in expired:
+            self._idle.remove(container)
+            self._count -= 1
+            self.stats["retired"] += 1
+            container.stop()
+
+    def acquire(self, wait: bool = True):
+        """Return (container, cold), or (None, False) when throttled."""
+        with self._cond:
+            while True:
+                self._retire_expired()
+                if self._idle:
+                    return self._idle.pop(), False
+                if self._count < self.max_containers:
+                    self._count += 1
+                    container_id = f"{self.function}-{next(self._ids)}"
+                    break
+                if not wait:
+                    self.stats["throttled"] += 1
+                    return None, False
+                self._cond.wait()
+        try:
+            container = self.factory(self.function, container_id)
+        except Exception:
+            with self._cond:
+                self._count -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.stats["cold_starts"] += 1
+            self.stats["init_ms_total"] += container.init_ms
+        return container, True
+
+    def release(self, container):
+        with self._cond:
+            container.last_used = time.monotonic()
+            self.stats["invocations"] += 1
+            self._idle.append(container)
+            self._cond.notify()
+
+    def discard(self, container):
+        """Drop a container whose handler crashed, as Lambda would."""
+        container.stop()
+        with self._cond:
+            self._count -= 1
+            self._cond.notify()
+
+    def summary(self) -> dict:
+        with self._cond:
+            cold = self.stats["cold_starts"]
+            return {
+                **self.stats,
+                "containers": self._count,
+                "idle": len(self._idle),
+                "avg_init_ms": round(self.stats["init_ms_total"] / cold, 2) if cold else None,
+            }
+
+    def stop(self):
+        with self._cond:
+            for container in self._idle:
+                container.stop()
+            self._idle.clear()
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, headers: dict, body: bytes):
+        self.send_response(status)
+        for name, value in {**CORS_HEADERS, **headers}.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_OPTIONS(self):
+        self._send(204, {}, b'')
+
+    def do_GET(self):
+        if urlsplit(self.path).path == '/_stats':
+            stats = {name: pool.summary() for name, pool in self.server.pools.items()}
+            self._send(200, {"Content-Type": "application/json"}, json.dumps(stats).encode())
+        else:
+            self._send(404, {"Content-Type": "application/json"}, b'{"message":"Not Found"}')
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length)
+        segment = urlsplit(self.path).path.rstrip('/').rsplit('/', 1)[-1]
+        function = segment if segment in HANDLER_FILES else ROUTER
+        # Load generators can pose as many clients through X-Forwarded-For
+        forwarded = self.headers.get('X-Forwarded-For')
+        source_ip = forwarded.split(',')[0].strip() if forwarded else self.client_address[0]
+        event = build_event('POST', self.path, dict(self.headers.items()), body, source_ip)
+
+        pool = self.server.pools[function]
+        container, cold = pool.acquire(wait=not self.server.throttle)
+        if container is None:
+            self._send(429, {"Content-Type": "application/json"}, b'{"message":"Rate Exceeded."}')
+            return
+        try:
+            response, handler_ms = container.invoke(event)
+        except Exception as e:
+            pool.discard(container)
+            print(f"{container.id} crashed: {e}", file=sys.stderr)
+            self._send(502, {"Content-Type": "application/json"}, b'{"message":"Internal server error"}')
+            return
+        pool.release(container)
+
+        payload = response.get('body') or ''
+        payload = base64.b64decode(payload) if response.get('isBase64Encoded') else payload.encode('utf-8')
+        headers = {
+            **(response.get('headers') or {}),
+            'X-Container-Id': container.id,
+            'X-Cold-Start': 'true' if cold else 'false',
+            'X-Handler-Ms': f"{handler_ms:.3f}",
+        }
+        self._send(response.get('statusCode', 200), headers, payload)
+
+
+class LocalServer(ThreadingHTTPServer):
+    """HTTP front end with one container pool per function."""
+
+    daemon_threads = True
+
+    def __init__(self, address, workers: int = 4, mode: str = 'process', idle_timeout: float = 300.0,
+                 throttle: bool = False, verbose: bool = False):
+        super().__init__(address, _RequestHandler)
+        if mode == 'process':
+            factory = lambda function, container_id: ProcessContainer(function, container_id, verbose)
+        else:
+            factory = ThreadContainer
+        self.pools = {function: ContainerPool(function, factory, workers, idle_timeout)
+                      for function in (*HANDLER_FILES, ROUTER)}
+        self.throttle = throttle
+        self.verbose = verbose
+
+    def server_close(self):
+        super().server_close()
+        for pool in self.pools.values():
+            pool.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=4, help='containers per function')
+    parser.add_argument('--mode', choices=('process', 'thread'), default='process')
+    parser.add_argument('--idle-timeout', type=float, default=300.0, help='seconds before an idle container is retired')
+    parser.add_argument('--throttle', action='store_true', help='answer 429 instead of queueing when all containers are busy')
+    parser.add_argument('--smtp-stub', action='store_true', help='start a local SMTP stand-in and point the handlers at it')
+    parser.add_argument('--smtp-latency-ms', type=float, default=20.0, help='stand-in delay before every reply')
+    parser.add_argument('--object-store', action='store_true', help='start a local object store for file uploads')
+    parser.add_argument('--verbose', action='store_true', help='show request logs and handler output')
+    args = parser.parse_args()
+
+    stub = None
+    if args.smtp_stub:
+        from smtp_stub import SMTPStub
+
+        stub = SMTPStub(latency_ms=args.smtp_latency_ms).start()
+        os.environ.update(stub.environment())
+        os.environ.setdefault('ZEPTO_USER', 'local')
+        os.environ.setdefault('ZEPTO_PASS', 'local')
+        print(f"SMTP stub listening on {stub.host}:{stub.port}")
+    store = None
+    if args.object_store:
+        from object_store_stub import ObjectStoreStub
+
+        store = ObjectStoreStub().start()
+        os.environ.update(store.environment())
+        print(f"Object store stub listening on {store.host}:{store.port}")
+    if not args.verbose and args.mode == 'thread':
+        sys.stdout = open(os.devnull, 'w')
+
+    server = LocalServer((args.host, args.port), args.workers, args.mode, args.idle_timeout,
+                         args.throttle, args.verbose)
+    print(f"Serving {', '.join((*HANDLER_FILES, ROUTER))} on http://{args.host}:{server.server_port}"
+          f" ({args.workers} {args.mode} containers per function)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if stub is not None:
+            stub.stop()
+        if store is not None:
+            store.stop()
+
+
+if __name__ == '__main__':
+    main()
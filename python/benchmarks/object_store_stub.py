@@ -0,0 +1,216 @@
+"""
+Local stand-in for the S3 bucket that contractor uploads go to.
+
+Serves PUT and GET on /<key> with URLs signed the way prpm_uploads'
+LocalObjectStore signs them (HMAC-SHA256 under PRPM_UPLOAD_SECRET over the
+method, key, expiry and, for PUT, the content type and size), which plays
+the part of S3's pre-signed URLs. PUT bodies are streamed to files in a
+temporary directory; GET honours single byte ranges, which is how the
+handler checks an upload without downloading it. CORS preflights are
+answered so a browser form can upload straight to it.
+
+Usage: python benchmarks/object_store_stub.py [--port 9000] [--secret local-upload-secret]
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from _handlers import PYTHON_DIR  # noqa: F401 (puts python/ on sys.path)
+
+CHUNK_BYTES = 64 * 1024
+RANGE_PATTERN = re.compile(r'^bytes=(\d+)-(\d*)$')
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, PUT, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type',
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, headers: dict = None, body: bytes = b''):
+        self.send_response(status)
+        for name, value in {**CORS_HEADERS, **(headers or {})}.items():
+            self.send_header(name, value)
+        if 'Content-Length' not in (headers or {}):
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _authorize(self, method: str, content_type: str = '', size: int = 0):
+        """Return the object key if the URL's signature and expiry check out, else None (after replying)."""
+        # Imported here: prpm_uploads reads its settings from the environment
+        # on import, which callers set from environment() after creating the stub
+        from prpm_uploads import url_message
+
+        url = urlsplit(self.path)
+        key = unquote(url.path.lstrip('/'))
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        store = self.server.store
+        if not key or '..' in key.split('/'):
+            self._reply(400)
+            return None
+        try:
+            expires = int(params.get('expires', ''))
+        except ValueError:
+            expires = 0
+        expected = store.sign(url_message(method, key, expires, content_type, size))
+        if expires < time.time() or not hmac.compare_digest(expected, params.get('signature', '')):
+            store.rejected += 1
+            self._reply(403, body=b'Signature does not match or URL has expired')
+            return None
+        return key
+
+    def do_OPTIONS(self):
+        self._reply(204)
+
+    def do_PUT(self):
+        store = self.server.store
+        content_type = self.headers.get('Content-Type', '')
+        size = int(self.headers.get('Content-Length') or 0)
+        key = self._authorize('PUT', content_type, size)
+        if key is None:
+            # The body was not read; the connection cannot be reused
+            self.close_connection = True
+            return
+        path = store.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), delete=False) as f:
+            remaining = size
+            while remaining:
+                chunk = self.rfile.read(min(CHUNK_BYTES, remaining))
+                if not chunk:
+                    break
+                f.write(chunk)
+                remaining -= len(chunk)
+        if remaining:
+            os.unlink(f.name)
+            self.close_connection = True
+            self._reply(400, body=b'Incomplete body')
+            return
+        os.replace(f.name, path)
+        with store.lock:
+            store.content_types[key] = content_type
+            store.puts += 1
+            store.bytes_in += size
+        self._reply(200, {'ETag': f'"{hashlib.md5(key.encode()).hexdigest()}"'})
+
+    def do_GET(self):
+        store = self.server.store
+        key = self._authorize('GET')
+        if key is None:
+            return
+        path = store.path(key)
+        if not os.path.exists(path):
+            self._reply(404, body=b'NoSuchKey')
+            return
+        size = os.path.getsize(path)
+        start, end, status = 0, size - 1, 200
+        match = RANGE_PATTERN.match(self.headers.get('Range', ''))
+        if match:
+            start = int(match.group(1))
+            end = min(int(match.group(2)) if match.group(2) else size - 1, size - 1)
+            if start >= size:
+                self._reply(416, {'Content-Range': f'bytes */{size}'})
+                return
+            status = 206
+        length = end - start + 1
+        headers = {'Content-Type': store.content_types.get(key, 'application/octet-stream'),
+                   'Content-Length': str(length)}
+        if status == 206:
+            headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+        self._reply(status, headers)
+        with open(path, 'rb') as f:
+            f.seek(start)
+            while length:
+                chunk = f.read(min(CHUNK_BYTES, length))
+                self.wfile.write(chunk)
+                length -= len(chunk)
+        with store.lock:
+            store.gets += 1
+            store.bytes_out += end - start + 1
+
+
+class ObjectStoreStub:
+    """Threaded local object store checking prpm_uploads-style signed URLs."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, secret: str = 'local-upload-secret'):
+        self.secret = secret
+        self.directory = tempfile.mkdtemp(prefix='prpm-object-store-')
+        self.content_types = {}
+        self.lock = threading.Lock()
+        self.puts = self.gets = self.rejected = 0
+        self.bytes_in = self.bytes_out = 0
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.store = self
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = None
+
+    def sign(self, message: str) -> str:
+        digest = hmac.new(self.secret.encode('utf-8'), message.encode('utf-8'), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b'=').decode('ascii')
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, *key.split('/'))
+
+    def start(self) -> 'ObjectStoreStub':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def environment(self) -> dict:
+        """Environment variables that point the handlers at this stand-in."""
+        return {
+            'PRPM_UPLOAD_LOCAL_URL': f'http://{self.host}:{self.port}',
+            'PRPM_UPLOAD_SECRET': self.secret,
+        }
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('--secret', default='local-upload-secret')
+    args = parser.parse_args()
+
+    stub = ObjectStoreStub(args.host, args.port, args.secret)
+    print(f"Object store stub listening on {stub.host}:{stub.port}, storing in {stub.directory}")
+    for name, value in stub.environment().items():
+        print(f"  export {name}={value}")
+    stub.start()
+    try:
+        while True:
+            time.sleep(5)
+            print(f"puts={stub.puts} gets={stub.gets} rejected={stub.rejected} bytes_in={stub.bytes_in}")
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""
+Synthetic form payloads generated from the handlers' own field schemas.
+
+Each form's FormSchema (the one behind validate_*_data) is read from its
+handler, and every field is classified by what it accepts: a choice list,
+a number range, an email/phone/zip pattern, a date or website check, or
+free text with the field's length limit. From that the generator builds
+realistic valid submissions and a configurable mix of cases:
+
+  valid             plausible values for every field (optional ones sometimes left out)
+  edge_length       valid, with every free-text field exactly at its length limit
+  over_length       one free-text field one character over its limit
+  missing_required  one required field left out
+  bad_email, bad_phone, bad_zip, bad_date, bad_choice, bad_number
+                    one field of that kind in a format the validator rejects
+
+Every case records the status the handler should answer (200 or 400), so a
+replay can tell expected rejections from real errors.
+
+Usage: python benchmarks/payload_generator.py [--count 1000] [--seed 1]
+                                              [--forms general-inquiry=60,...] [--mix valid=70,...]
+                                              [--output payloads.jsonl]
+"""
+import argparse
+import json
+import random
+import sys
+from datetime import date, timedelta
+
+from _handlers import HANDLER_FILES, load_handler
+
+# Share of peak-season traffic per form
+DEFAULT_FORMS = {'general-inquiry': 60, 'contractor-application': 25, 'proposal': 15}
+DEFAULT_MIX = {
+    'valid': 70, 'edge_length': 5, 'over_length': 3, 'missing_required': 5, 'bad_email': 4,
+    'bad_phone': 4, 'bad_zip': 3, 'bad_date': 3, 'bad_choice': 2, 'bad_number': 1,
+}
+# The field kind each invalid case needs; forms without one skip the case
+CASE_KINDS = {
+    'bad_email': 'email', 'bad_phone': 'phone', 'bad_zip': 'zip', 'bad_date': 'date',
+    'bad_choice': 'choice', 'bad_number': 'number', 'over_length': 'text',
+}
+
+FIRST_NAMES = ['Jordan', 'Dana', 'Patricia', 'Marcus', 'Helen', 'Avery', 'Luis', 'Keisha', 'Tom', 'Mei']
+LAST_NAMES = ['Alvarez', 'Whitfield', 'Gomez', 'Lee', 'Carter', 'Nguyen', 'Brooks', 'Okafor', 'Russo']
+CITIES = ['Lexington Park', 'California', 'Great Mills', 'Leonardtown', 'Hollywood', 'Mechanicsville']
+STREETS = ['Three Notch Road', 'Shangri-La Drive', 'Great Mills Road', 'Chancellors Run Road']
+DOMAINS = ['gmail.com', 'yahoo.com', 'outlook.com', 'comcast.net', 'verizon.net']
+WORDS = ('the board would like help with monthly reporting owner portal roof replacement reserve study '
+         'landscaping contract vendor bids annual meeting budget planning pool maintenance parking '
+         'enforcement we are relocating to the area and need a three bedroom home near the base').split()
+
+BAD_VALUES = {
+    'email': ['jordan@', 'jordan.gmail.com', 'jordan@gmail', 'jordan @gmail.com', '@gmail.com'],
+    'phone': ['3015550142', '(301) 555-0142', '301.555.0142', '301-555-014', '+1 301-555-0142'],
+    'zip': ['2061', '206190', '20619-12', 'ABCDE', '20619 1234'],
+    'date': ['2001-01-01', '2030-13-01', '2030-02-30', '31/12/2030', 'next Tuesday'],
+    'number': ['many', '-5', '1e3', '0x10', '100001'],
+    'choice': ['Delaware', 'townhouse', 'maybe', 'N/A'],
+}
+
+
+def classify(field) -> str:
+    """Return the kind of value a field accepts."""
+    if field.choices is not None:
+        return 'choice'
+    if field.numeric:
+        return 'number'
+    if field.pattern is not None:
+        for kind, sample in (('email', 'a.b@example.com'), ('phone', '301-555-0100'), ('zip', '20619')):
+            if field.pattern.match(sample) is not None:
+                return kind
+        return 'text'
+    if field.check is not None:
+        future = (date.today() + timedelta(days=30)).isoformat()
+        return 'date' if field.check(future) == (True, "") else 'website'
+    return 'text'
+
+
+class PayloadGenerator:
+    """Builds (case, payload, expected_status) for one form from its handler's schema."""
+
+    def __init__(self, form_type: str, rng: random.Random, handler=None):
+        handler = handler or load_handler(form_type)
+        schema = next(value for name, value in vars(handler).items()
+                      if name.endswith('_SCHEMA') and hasattr(value, 'fields'))
+        self.form_type = form_type
+        self.rng = rng
+        self.fields = [(field, classify(field), field.max_length or schema.max_length)
+                       for field in schema.fields]
+        self.kinds = {kind for _, kind, _ in self.fields}
+
+    def supports(self, case: str) -> bool:
+        return case not in CASE_KINDS or CASE_KINDS[case] in self.kinds
+
+    def _text(self, field, limit: int) -> str:
+        rng, name = self.rng, field.name.lower()
+        if 'firstname' in name:
+            return rng.choice(FIRST_NAMES)
+        if name.endswith('name'):
+            return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if name == 'city':
+            return rng.choice(CITIES)
+        if 'address' in name:
+            return f"{rng.randint(100, 49999)} {rng.choice(STREETS)}"
+        if 'budget' in name:
+            return f"${rng.randint(50, 2000) * 1000:,}"
+        words = rng.randint(3, 12) if limit <= 1000 else rng.randint(20, 150)
+        return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()[:limit - 1] + '.'
+
+    def value(self, field, kind: str, limit: int) -> str:
+        """A plausible valid value for a field."""
+        rng = self.rng
+        if kind == 'choice':
+            return rng.choice(field.choices)
+        if kind == 'number':
+            low = field.min_value or 0
+            high = low + 500 if field.max_value is None else min(field.max_value, low + 500)
+            return str(rng.randint(low, high))
+        if kind == 'email':
+            return f"{rng.choice(FIRST_NAMES)}.{rng.choice(LAST_NAMES)}{rng.randint(1, 999)}@{rng.choice(DOMAINS)}".lower()
+        if kind == 'phone':
+            return f"{rng.choice(['240', '301', '410'])}-555-{rng.randint(0, 9999):04d}"
+        if kind == 'zip':
+            code = f"20{rng.randint(600, 699)}"
+            return code if rng.random() < 0.8 else f"{code}-{rng.randint(0, 9999):04d}"
+        if kind == 'date':
+            day = date.today() + timedelta(days=rng.randint(1, 120))
+            return rng.choice([day.strftime('%Y-%m-%d'), day.strftime('%m/%d/%Y'), day.strftime('%Y/%m/%d')])
+        if kind == 'website':
+            return rng.choice(['www.', 'https://www.', '']) + f"{rng.choice(LAST_NAMES).lower()}homes.com"
+        return self._text(field, limit)
+
+    def generate(self, case: str = 'valid'):
+        """Return (payload, expected_status) for a case."""
+        rng = self.rng
+        payload = {}
+        for field, kind, limit in self.fields:
+            if not field.required and rng.random() < 0.3:
+                continue
+            if case == 'edge_length' and kind == 'text':
+                payload[field.name] = ('x' * (limit - 1)) + 'y'
+            else:
+                payload[field.name] = self.value(field, kind, limit)
+        if case in ('valid', 'edge_length'):
+            return payload, 200
+
+        if case == 'missing_required':
+            targets = [f for f, _, _ in self.fields if f.required]
+            del payload[rng.choice(targets).name]
+        elif case == 'over_length':
+            field, _, limit = rng.choice([entry for entry in self.fields if entry[1] == 'text'])
+            payload[field.name] = 'x' * (limit + 1)
+        else:
+            kind = CASE_KINDS[case]
+            field = rng.choice([f for f, k, _ in self.fields if k == kind])
+            bad = BAD_VALUES[kind]
+            if kind == 'number':
+                # Numbers are only bad outside the field's range
+                low, high = field.min_value, field.max_value
+                bad = [v for v in bad if not v.lstrip('-').isdigit()
+                       or (low is not None and int(v) < low) or (high is not None and int(v) > high)]
+            payload[field.name] = rng.choice(bad)
+        return payload, 400
+
+
+def parse_weights(value: str, known) -> dict:
+    """Parse "name=weight,name=weight" into a dict, rejecting unknown names."""
+    weights = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in known:
+            raise SystemExit(f"unknown name {name!r}; choose from {', '.join(known)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+class TrafficGenerator:
+    """An endless stream of (form_type, case, payload, expected_status) drawn from form and case weights."""
+
+    def __init__(self, forms: dict = None, mix: dict = None, seed: int = None):
+        self.rng = random.Random(seed)
+        forms = forms or DEFAULT_FORMS
+        self.generators = {form: PayloadGenerator(form, self.rng) for form in forms}
+        self.forms = list(forms)
+        self.form_weights = [forms[form] for form in self.forms]
+        self.mix = mix or DEFAULT_MIX
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        rng = self.rng
+        form = rng.choices(self.forms, self.form_weights)[0]
+        generator = self.generators[form]
+        cases = [case for case in self.mix if generator.supports(case)]
+        case = rng.choices(cases, [self.mix[c] for c in cases])[0]
+        payload, expected = generator.generate(case)
+        return form, case, payload, expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--forms', help='form weights, e.g. general-inquiry=60,proposal=40')
+    parser.add_argument('--mix', help='case weights, e.g. valid=80,bad_phone=20')
+    parser.add_argument('--output', help='JSONL file (default: stdout)')
+    args = parser.parse_args()
+
+    forms = parse_weights(args.forms, HANDLER_FILES) if args.forms else None
+    mix = parse_weights(args.mix, DEFAULT_MIX) if args.mix else None
+    traffic = TrafficGenerator(forms, mix, args.seed)
+    out = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        for _ in range(args.count):
+            form, case, payload, expected = next(traffic)
+            out.write(json.dumps({'formType': form, 'case': case, 'expectedStatus': expected,
+                                  'payload': payload}) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
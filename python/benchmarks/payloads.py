@@ -0,0 +1,93 @@
+"""Realistic form payloads for the three handlers."""
+import copy
+from datetime import date, timedelta
+
+CONTRACTOR = {
+    'companyName': 'Chesapeake Roofing & Gutters LLC',
+    'typeOfService': 'Roofing, gutter repair and replacement',
+    'streetAddress': '22810 Three Notch Road, Suite 4',
+    'city': 'California',
+    'state': 'Maryland',
+    'zipCode': '20619',
+    'website': 'www.chesapeakeroofing.com',
+    'firstName': 'Dana',
+    'lastName': 'Whitfield',
+    'title': 'Operations Manager',
+    'email': 'dana.whitfield@chesapeakeroofing.com',
+    'mobilePhone': '301-555-0142',
+    'officeNumber': '301-555-0100',
+    'licenseName': 'Chesapeake Roofing & Gutters LLC',
+    'licenseNumber': 'MHIC-145922',
+    'licenseType': 'Maryland Home Improvement Commission Contractor',
+    'reference1Name': 'Patricia Gomez',
+    'reference1Title': 'Board President, Wildewood HOA',
+    'reference1Phone': '240-555-0187',
+    'reference1BusinessType': 'Homeowners association',
+    'reference2Name': 'Marcus Lee',
+    'reference2Title': 'Facilities Director',
+    'reference2Phone': '301-555-0199',
+    'reference2BusinessType': 'Commercial property management',
+}
+
+PROPOSAL = {
+    'communityName': 'Lexington Park Commons',
+    'address': '46200 Shangri-La Drive',
+    'city': 'Lexington Park',
+    'state': 'Maryland',
+    'zipCode': '20653-1234',
+    'numberOfUnits': '148',
+    'communityType': 'condo',
+    'selfManagementYears': '3',
+    'professionalManagementYears': '12',
+    'onSiteStaff': 'no',
+    'boardMemberInfo': 'Five-member board; elections held every March.',
+    'boardPresidentInfo': 'Helen Carter, president since 2021. Prefers email contact.',
+    'specialRequirements': (
+        'We need monthly financial reporting, an online owner portal, and help '
+        'coordinating a roof replacement project planned for next spring. ' * 4
+    ).strip(),
+    'communityAmenities': 'Clubhouse, outdoor pool, two tennis courts, walking trails and a dog park.',
+    'annualBudget': '$412,000',
+    'reserveBudget': '$1,150,000',
+    'deadlineDate': (date.today() + timedelta(days=45)).strftime('%Y-%m-%d'),
+    'contactName': 'Helen Carter',
+    'contactEmail': 'board@lexingtonparkcommons.org',
+}
+
+GENERAL_INQUIRY = {
+    'firstName': 'Jordan',
+    'lastName': 'Alvarez',
+    'email': 'jordan.alvarez@gmail.com',
+    'mobilePhone': '240-555-0123',
+    'message': (
+        'Hello, I am relocating to the Patuxent River area for a new position at the '
+        'naval air station and would like to know which three-bedroom homes will be '
+        'available in Lexington Park or California in the next two months. '
+        'I have a small dog. Thank you!'
+    ),
+}
+
+VALID_PAYLOADS = {
+    'contractor-application': CONTRACTOR,
+    'proposal': PROPOSAL,
+    'general-inquiry': GENERAL_INQUIRY,
+}
+
+# Field overrides that make each payload fail validation
+INVALID_OVERRIDES = {
+    'contractor-application': {'email': 'not-an-email', 'zipCode': '2061', 'officeNumber': '3015550100'},
+    'proposal': {'state': 'Delaware', 'numberOfUnits': 'many', 'deadlineDate': '2001-01-01'},
+    'general-inquiry': {'email': 'jordan@', 'message': ''},
+}
+
+
+def valid_payload(form_type: str) -> dict:
+    """Return a fresh copy of the valid payload for a form."""
+    return copy.deepcopy(VALID_PAYLOADS[form_type])
+
+
+def invalid_payload(form_type: str) -> dict:
+    """Return a payload for a form that fails validation."""
+    payload = valid_payload(form_type)
+    payload.update(INVALID_OVERRIDES[form_type])
+    return payload
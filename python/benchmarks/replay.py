@@ -0,0 +1,240 @@
+"""
+Replay synthetic form traffic at a target request rate and report how it went.
+
+Requests come from payload_generator (or a JSONL file it wrote) and are
+sent open-loop: request i is due at start + i / rate whatever happened to
+earlier ones, so a slow system shows up as growing latency instead of a
+quietly lower send rate. Latency is measured from the due time; service
+time from the moment a worker actually sent the request.
+
+Targets:
+  --url URL   POST to URL/<form-type>, e.g. the local_server.py adapter
+  (default)   invoke the handlers in this process against a local SMTP
+              stand-in, one request at a time like one warm container (the
+              forms share this process's SMTP session); use --url with
+              local_server.py --mode process for concurrency
+
+Each request carries a fresh Idempotency-Key and an X-Forwarded-For /
+sourceIp from a pool of --clients addresses. The report gives throughput,
+status codes, outcomes against each case's expected status (2xx for valid
+payloads, 400 for invalid ones), transport errors, and latency percentiles
+overall and per form.
+
+Usage:
+    python benchmarks/replay.py [--rate 20] [--duration 30] [--concurrency 32]
+                                [--url http://127.0.0.1:8080] [--input payloads.jsonl]
+                                [--forms general-inquiry=60,...] [--mix valid=70,...] [--seed 1]
+                                [--clients 1000] [--smtp-latency-ms 20] [--output report.json]
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from _handlers import HANDLER_FILES, load_handler
+from _stats import percentile, summarize
+from payload_generator import DEFAULT_MIX, TrafficGenerator, parse_weights
+
+
+def load_requests(path: str):
+    """Cycle through (form_type, case, payload, expected_status) records from a JSONL file."""
+    with open(path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return itertools.cycle([(r['formType'], r['case'], r['payload'], r['expectedStatus']) for r in records])
+
+
+class HTTPTarget:
+    """POSTs JSON to a URL over one keep-alive connection per worker thread."""
+
+    def __init__(self, url: str, timeout: float = 30.0):
+        from urllib.parse import urlsplit
+
+        parts = urlsplit(url)
+        self.https = parts.scheme == 'https'
+        self.netloc = parts.netloc
+        self.base_path = parts.path.rstrip('/')
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        import http.client
+
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            connection = self._local.connection = cls(self.netloc, timeout=self.timeout)
+        return connection
+
+    def send(self, form_type: str, payload: dict, client_ip: str) -> int:
+        body = json.dumps(payload).encode('utf-8')
+        headers = {'Content-Type': 'application/json', 'Idempotency-Key': str(uuid.uuid4()),
+                   'X-Forwarded-For': client_ip}
+        connection = self._connection()
+        try:
+            connection.request('POST', f"{self.base_path}/{form_type}", body, headers)
+            response = connection.getresponse()
+            response.read()
+        except Exception:
+            connection.close()
+            self._local.connection = None
+            raise
+        return response.status
+
+    def close(self):
+        pass
+
+
+class InProcessTarget:
+    """Invokes the handlers directly, one request at a time."""
+
+    def __init__(self, forms, smtp_latency_ms: float):
+        from local_server import build_event
+        from smtp_stub import SMTPStub
+
+        self._build_event = build_event
+        self.stub = SMTPStub(latency_ms=smtp_latency_ms).start()
+        os.environ.update(self.stub.environment())
+        os.environ.setdefault('ZEPTO_USER', 'replay')
+        os.environ.setdefault('ZEPTO_PASS', 'replay')
+        self.handlers = {form: load_handler(form).lambda_handler for form in forms}
+        # Every form sends through the same pooled SMTP connection in this process
+        self.lock = threading.Lock()
+
+    def send(self, form_type: str, payload: dict, client_ip: str) -> int:
+        headers = {'Content-Type': 'application/json', 'Idempotency-Key': str(uuid.uuid4())}
+        event = self._build_event('POST', f"/{form_type}", headers, json.dumps(payload).encode('utf-8'), client_ip)
+        with self.lock:
+            return self.handlers[form_type](event, None)['statusCode']
+
+    def close(self):
+        self.stub.stop()
+
+
+def timed(target, item, client_ip: str, due: float) -> dict:
+    form_type, case, payload, expected = item
+    started = time.perf_counter()
+    status, error = None, None
+    try:
+        status = target.send(form_type, payload, client_ip)
+    except Exception as e:
+        error = type(e).__name__
+    finished = time.perf_counter()
+    return {'form_type': form_type, 'case': case, 'expected': expected, 'status': status, 'error': error,
+            'latency_ms': (finished - due) * 1000, 'service_ms': (finished - started) * 1000}
+
+
+def replay(target, requests, rate: float, duration: float, concurrency: int, clients: int) -> tuple:
+    """Send rate * duration requests open-loop; returns (results, elapsed_seconds)."""
+    total = int(rate * duration)
+    addresses = [f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}" for i in range(1, clients + 1)]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        start = time.perf_counter()
+        futures = []
+        for i in range(total):
+            due = start + i / rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(executor.submit(timed, target, next(requests), addresses[i % clients], due))
+        results = [future.result() for future in futures]
+    return results, time.perf_counter() - start
+
+
+def outcome(result: dict) -> str:
+    """'expected', or what went wrong."""
+    if result['error']:
+        return f"error {result['error']}"
+    status, expected = result['status'], result['expected']
+    if status == expected or (expected == 200 and 200 <= status < 300):
+        return 'expected'
+    return f"expected {expected}, got {status}"
+
+
+def report(results, elapsed: float, rate: float) -> dict:
+    latencies = [r['latency_ms'] for r in results]
+    summary = summarize(latencies, elapsed)
+    summary['p90_ms'] = round(percentile(sorted(latencies), 0.90), 3)
+    service = summarize([r['service_ms'] for r in results], elapsed)
+    by_form = defaultdict(list)
+    for r in results:
+        by_form[r['form_type']].append(r)
+    unexpected = Counter(f"{r['form_type']} {r['case']}: {outcome(r)}" for r in results if outcome(r) != 'expected')
+    return {
+        'target_rate_rps': rate,
+        'sent': len(results),
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': summary['throughput_rps'],
+        'status_codes': dict(sorted(Counter(str(r['status'] or 'none') for r in results).items())),
+        'outcomes': dict(Counter('expected' if outcome(r) == 'expected' else 'unexpected' for r in results)),
+        'unexpected': dict(unexpected.most_common()),
+        'cases': dict(Counter(r['case'] for r in results).most_common()),
+        'latency_ms': {key: summary[key] for key in ('mean_ms', 'p50_ms', 'p90_ms', 'p95_ms', 'p99_ms', 'max_ms')},
+        'service_ms': {key: service[key] for key in ('mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms')},
+        'forms': {form: {
+            'count': len(items),
+            **{key: value for key, value in summarize([r['latency_ms'] for r in items], elapsed).items()
+               if key in ('p50_ms', 'p95_ms', 'p99_ms')},
+            'unexpected': sum(1 for r in items if outcome(r) != 'expected'),
+        } for form, items in sorted(by_form.items())},
+    }
+
+
+def print_report(data: dict):
+    print(f"Target {data['target_rate_rps']:.1f} req/s: sent {data['sent']} in {data['elapsed_s']:.1f} s, "
+          f"throughput {data['throughput_rps']:.1f} req/s")
+    print(f"Status codes: {', '.join(f'{code} x{count}' for code, count in data['status_codes'].items())}")
+    print(f"Outcomes: {data['outcomes'].get('expected', 0)} expected, {data['outcomes'].get('unexpected', 0)} unexpected")
+    for line, count in data['unexpected'].items():
+        print(f"  {count:>6}  {line}")
+    print(f"Cases: {', '.join(f'{case} {count}' for case, count in data['cases'].items())}")
+    for label, key in (('Latency (from due time)', 'latency_ms'), ('Service time', 'service_ms')):
+        print(f"{label}: " + '  '.join(f"{name[:-3]} {value:.1f} ms" for name, value in data[key].items()))
+    for form, stats in data['forms'].items():
+        print(f"  {form:<24} {stats['count']:>6} req  p50 {stats['p50_ms']:8.1f} ms  p95 {stats['p95_ms']:8.1f} ms"
+              f"  p99 {stats['p99_ms']:8.1f} ms  unexpected {stats['unexpected']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rate', type=float, default=20.0, help='requests per second')
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds of traffic')
+    parser.add_argument('--concurrency', type=int, default=32, help='requests in flight at most')
+    parser.add_argument('--url', help='base URL to POST to (default: invoke the handlers in process)')
+    parser.add_argument('--input', help='JSONL written by payload_generator.py (default: generate on the fly)')
+    parser.add_argument('--forms', help='form weights, e.g. general-inquiry=60,proposal=40')
+    parser.add_argument('--mix', help='case weights, e.g. valid=80,bad_phone=20')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--clients', type=int, default=1000, help='distinct client IP addresses')
+    parser.add_argument('--smtp-latency-ms', type=float, default=20.0, help='stand-in delay per SMTP reply (in process)')
+    parser.add_argument('--output', help='write the report as JSON')
+    args = parser.parse_args()
+
+    forms = parse_weights(args.forms, HANDLER_FILES) if args.forms else None
+    mix = parse_weights(args.mix, DEFAULT_MIX) if args.mix else None
+    requests = load_requests(args.input) if args.input else iter(TrafficGenerator(forms, mix, args.seed))
+    target = HTTPTarget(args.url) if args.url else InProcessTarget(list(forms or HANDLER_FILES),
+                                                                   args.smtp_latency_ms)
+    try:
+        # The handlers log every request; keep the report readable
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            results, elapsed = replay(target, requests, args.rate, args.duration, args.concurrency, args.clients)
+    finally:
+        target.close()
+
+    data = report(results, elapsed, args.rate)
+    print_report(data)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(data, f, indent=2)
+        print(f"\nReport written to {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+"""
+Local SMTP stand-in for ZeptoMail.
+
+Speaks enough ESMTP for smtplib (EHLO, STARTTLS, AUTH PLAIN/LOGIN, MAIL,
+RCPT, DATA, NOOP, RSET, QUIT), adds a configurable delay before every reply
+to mimic network round trips, and can be told to reject messages or to
+stall (before the greeting, or before accepting DATA) to exercise error
+and timeout paths. STARTTLS uses a throwaway self-signed certificate;
+point SSL_CERT_FILE at it so the handlers' default SSL context trusts it.
+With implicit_tls the stand-in speaks TLS from the first byte, like port 465.
+
+Usage: python benchmarks/smtp_stub.py [--port 2525] [--latency-ms 20]
+"""
+import argparse
+import os
+import socket
+import socketserver
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+
+
+_CERT_DIR = None
+
+
+def make_certificate(directory: str = None):
+    """
+    Create a self-signed certificate for localhost; returns (cert_path, key_path).
+
+    Without a directory, every stub in the process shares one certificate,
+    so a single SSL_CERT_FILE trusts all of them.
+    """
+    global _CERT_DIR
+    if directory is None:
+        _CERT_DIR = _CERT_DIR or tempfile.mkdtemp(prefix='prpm-smtp-stub-')
+        directory = _CERT_DIR
+    cert_path = os.path.join(directory, 'cert.pem')
+    key_path = os.path.join(directory, 'key.pem')
+    if not os.path.exists(cert_path):
+        subprocess.run(
+            ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '2',
+             '-keyout', key_path, '-out', cert_path, '-subj', '/CN=localhost',
+             '-addext', 'subjectAltName=DNS:localhost,IP:127.0.0.1'],
+            check=True, capture_output=True,
+        )
+    return cert_path, key_path
+
+
+class _SMTPHandler(socketserver.BaseRequestHandler):
+    """One SMTP conversation."""
+
+    def setup(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stub = self.server.stub
+        self.tls = False
+        if self.stub.implicit_tls:
+            self.request = self.stub.context.wrap_socket(self.request, server_side=True)
+            self.tls = True
+        self.reader = self.request.makefile('rb')
+
+    def reply(self, line: str):
+        if self.stub.latency:
+            time.sleep(self.stub.latency)
+        self.request.sendall(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        stub = self.stub
+        stub.connections += 1
+        if stub.greeting_delay:
+            time.sleep(stub.greeting_delay)
+        self.reply('220 localhost ESMTP prpm stub')
+        mail_from, recipients = None, []
+        while True:
+            line = self.reader.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+
+            if verb in ('EHLO', 'HELO'):
+                if verb == 'HELO':
+                    self.reply('250 localhost')
+                    continue
+                extensions = ['250-localhost', '250-PIPELINING', '250-8BITMIME', '250-SIZE 52428800']
+                if stub.context is not None and not self.tls:
+                    extensions.append('250-STARTTLS')
+                extensions.append('250 AUTH PLAIN LOGIN')
+                if stub.latency:
+                    time.sleep(stub.latency)
+                self.request.sendall(('\r\n'.join(extensions) + '\r\n').encode('ascii'))
+            elif verb == 'STARTTLS' and stub.context is not None and not self.tls:
+                self.reply('220 Ready to start TLS')
+                self.request = stub.context.wrap_socket(self.request, server_side=True)
+                self.reader = self.request.makefile('rb')
+                self.tls = True
+            elif verb == 'AUTH':
+                parts = command.split()
+                if len(parts) == 2 and parts[1].upper() == 'LOGIN':
+                    self.reply('334 VXNlcm5hbWU6')
+                    self.reader.readline()
+                    self.reply('334 UGFzc3dvcmQ6')
+                    self.reader.readline()
+                elif len(parts) == 2:
+                    self.reply('334 ')
+                    self.reader.readline()
+                self.reply('235 2.7.0 Authentication successful')
+            elif verb == 'MAIL':
+                mail_from, recipients = command[10:].strip(), []
+                self.reply('250 2.1.0 Ok')
+            elif verb == 'RCPT':
+                recipient = command[8:].strip()
+                if recipient.strip('<>').lower() in stub.rejected_recipients:
+                    self.reply('550 5.1.1 Recipient rejected by stub')
+                    continue
+                recipients.append(recipient)
+                self.reply('250 2.1.5 Ok')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                chunks = []
+                while True:
+                    data = self.reader.readline()
+                    if not data or data == b'.\r\n':
+                        break
+                    chunks.append(data)
+                if stub.data_delay:
+                    time.sleep(stub.data_delay)
+                if stub.should_fail():
+                    stub.rejected += 1
+                    self.reply(f'{stub.fail_code} Message rejected by stub')
+                else:
+                    stub.record(mail_from, recipients, b''.join(chunks))
+                    self.reply('250 2.0.0 Ok: queued')
+            elif verb == 'NOOP':
+                self.reply('250 2.0.0 Ok')
+            elif verb == 'RSET':
+                mail_from, recipients = None, []
+                self.reply('250 2.0.0 Ok')
+            elif verb == 'QUIT':
+                self.reply('221 2.0.0 Bye')
+                return
+            else:
+                self.reply('502 5.5.2 Command not recognized')
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that time out hang up mid-conversation; only report real bugs
+        if not isinstance(sys.exc_info()[1], OSError):
+            super().handle_error(request, client_address)
+
+
+class SMTPStub:
+    """Threaded local SMTP server with artificial latency and failure injection."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency_ms: float = 0.0,
+                 tls: bool = True, keep: int = 100, implicit_tls: bool = False):
+        self.latency = latency_ms / 1000
+        self.implicit_tls = implicit_tls
+        self.fail_code = 0
+        self.fail_every = 1
+        self._data_count = 0
+        self.greeting_delay = 0.0
+        self.data_delay = 0.0
+        self.rejected_recipients = set()
+        self.connections = 0
+        self.delivered = 0
+        self.rejected = 0
+        self.messages = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        self.context = None
+        self.cert_path = None
+        if tls or implicit_tls:
+            self.cert_path, key_path = make_certificate()
+            self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            self.context.load_cert_chain(self.cert_path, key_path)
+        self._server = _Server((host, port), _SMTPHandler)
+        self._server.stub = self
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = None
+
+    def record(self, mail_from: str, recipients, data: bytes):
+        with self._lock:
+            self.delivered += 1
+            self.messages.append((mail_from, list(recipients), data))
+
+    def set_failure(self, code: int = 0, every: int = 1):
+        """Reject every `every`-th message with this SMTP code (0 to accept again)."""
+        self.fail_code = code
+        self.fail_every = every
+        self._data_count = 0
+
+    def should_fail(self) -> bool:
+        """Count one DATA and return True if it is to be rejected."""
+        with self._lock:
+            self._data_count += 1
+            return bool(self.fail_code) and self._data_count % self.fail_every == 0
+
+    def set_delays(self, greeting_ms: float = 0.0, data_ms: float = 0.0):
+        """Stall before the greeting and before the reply to DATA (0 to stop stalling)."""
+        self.greeting_delay = greeting_ms / 1000
+        self.data_delay = data_ms / 1000
+
+    def reject_recipient(self, address: str):
+        """Refuse RCPT TO for this address, leaving other recipients unaffected."""
+        self.rejected_recipients.add(address.lower())
+
+    def start(self) -> 'SMTPStub':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def environment(self) -> dict:
+        """Environment variables that point the handlers at this stub."""
+        env = {
+            'ZEPTO_SMTP_HOST': 'localhost',
+            'ZEPTO_SMTP_PORT': str(self.port),
+        }
+        if self.cert_path:
+            env['SSL_CERT_FILE'] = self.cert_path
+        return env
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local SMTP stand-in for ZeptoMail')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2525)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='delay before every reply')
+    parser.add_argument('--fail-code', type=int, default=0, help='reject every message with this code')
+    parser.add_argument('--greeting-delay-ms', type=float, default=0.0, help='stall before the greeting')
+    parser.add_argument('--data-delay-ms', type=float, default=0.0, help='stall before the reply to DATA')
+    parser.add_argument('--no-tls', action='store_true', help='do not offer STARTTLS')
+    parser.add_argument('--implicit-tls', action='store_true', help='speak TLS from the first byte (like port 465)')
+    args = parser.parse_args()
+
+    stub = SMTPStub(args.host, args.port, args.latency_ms, tls=not args.no_tls, implicit_tls=args.implicit_tls)
+    stub.set_failure(args.fail_code)
+    stub.set_delays(args.greeting_delay_ms, args.data_delay_ms)
+    print(f"SMTP stub listening on {stub.host}:{stub.port}")
+    for name, value in stub.environment().items():
+        print(f"  export {name}={value}")
+    stub.start()
+    try:
+        while True:
+            time.sleep(5)
+            print(f"connections={stub.connections} delivered={stub.delivered} rejected={stub.rejected}")
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
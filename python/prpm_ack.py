@@ -0,0 +1,116 @@
+import os
+from typing import TYPE_CHECKING, Dict, Any, Optional, Tuple
+
+from prpm_templates import escape_html
+
+if TYPE_CHECKING:
+    from email.message import EmailMessage
+
+# Acknowledgement settings (Lambda environment variables)
+ACK_TIMEOUT = float(os.environ.get('PRPM_ACK_TIMEOUT', '10'))
+# Longest a held acknowledgement waits for its notification (a send's retry budget plus its socket timeouts)
+HOLD_TIMEOUT = 60
+ACK_CHANNEL = 'acknowledgement'
+COMPANY_NAME = "Pax River Property Management"
+
+_executor = None
+
+
+def acknowledgements_enabled() -> bool:
+    """Return True when PRPM_ACK_EMAILS is set to 1/true."""
+    return os.environ.get('PRPM_ACK_EMAILS', '0').lower() in ('1', 'true', 'yes')
+
+
+def build_acknowledgement(recipient: str, name: str, subject: str, summary: str,
+                          from_email: str, reply_to: str) -> 'EmailMessage':
+    """Compose the confirmation sent back to the person who submitted a form."""
+    from email.message import EmailMessage
+
+    greeting = f"Hi {name}," if name else "Hello,"
+    text = (
+        f"{greeting}\n\n"
+        f"Thank you for contacting {COMPANY_NAME}. {summary}\n\n"
+        f"This is an automated confirmation. If you need to add anything, "
+        f"reply to this email or write to {reply_to}.\n\n"
+        f"{COMPANY_NAME}\n"
+    )
+    html = (
+        '<!DOCTYPE html><html><body style="margin:0;padding:16px;'
+        'font-family:Arial,Helvetica,sans-serif;font-size:14px;color:#222;">'
+        f"<p>{escape_html(greeting)}</p>"
+        f"<p>Thank you for contacting {COMPANY_NAME}. {escape_html(summary)}</p>"
+        f"<p>This is an automated confirmation. If you need to add anything, "
+        f'reply to this email or write to <a href="mailto:{reply_to}">{reply_to}</a>.</p>'
+        f"<p>{COMPANY_NAME}</p></body></html>"
+    )
+
+    msg = EmailMessage()
+    msg['Subject'] = subject
+    msg['From'] = from_email
+    msg['To'] = recipient
+    msg['Reply-To'] = reply_to
+    msg.set_content(text)
+    msg.add_alternative(html, subtype='html')
+    return msg
+
+
+class HeldAcknowledgement:
+    """
+    A confirmation prepared alongside the notification but only sent after it.
+
+    The worker opens the acknowledgement session straight away, so its
+    handshake overlaps the notification send, then waits: send() lets the
+    message go and waits for the outcome, cancel() drops it because the
+    submission was not delivered. One worker per container means the
+    session is never used by two threads at once, even if an earlier send
+    outlived its invocation.
+    """
+
+    def __init__(self, session, msg: 'EmailMessage'):
+        import threading
+
+        self._decided = threading.Event()
+        self._send = False
+        self._future = _worker().submit(self._run, session, msg)
+
+    def _run(self, session, msg: 'EmailMessage') -> None:
+        warm = getattr(session, 'warm', None)
+        if warm is not None:
+            warm()
+        if not self._decided.wait(HOLD_TIMEOUT):
+            raise RuntimeError(f"notification outcome not known after {HOLD_TIMEOUT} s")
+        if self._send:
+            session.send_message(msg)
+
+    def send(self, timeout: float = ACK_TIMEOUT) -> Tuple[bool, Optional[str]]:
+        """Send once the notification is delivered; returns (sent, error) without raising."""
+        from concurrent.futures import TimeoutError
+
+        self._send = True
+        self._decided.set()
+        try:
+            self._future.result(timeout=timeout)
+        except TimeoutError:
+            return False, f"timed out after {timeout:g} s"
+        except Exception as e:
+            return False, f"{type(e).__name__}: {str(e)}"
+        return True, None
+
+    def cancel(self) -> None:
+        """Drop the acknowledgement; the notification it confirms was not delivered."""
+        self._decided.set()
+
+
+def _worker():
+    global _executor
+    if _executor is None:
+        from concurrent.futures import ThreadPoolExecutor
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prpm-ack')
+    return _executor
+
+
+def acknowledgement_status(sent: Optional[bool]) -> Dict[str, Any]:
+    """Response body fields describing the acknowledgement outcome."""
+    if sent is None:
+        return {}
+    return {"acknowledgement": "sent" if sent else "failed"}
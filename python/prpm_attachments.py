@@ -0,0 +1,416 @@
+import os
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from prpm_intake import MAX_BODY_BYTES, MAX_FORM_FIELDS, IntakeError
+
+# Attachment limits (Lambda environment variables). A synchronous Lambda
+# request is capped at 6 MB, which after base64 leaves room for about 4 MiB
+# of files.
+MAX_ATTACHMENT_BYTES = int(os.environ.get('PRPM_MAX_ATTACHMENT_BYTES', str(4 * 1024 * 1024)))
+MAX_ATTACHMENTS_BYTES = int(os.environ.get('PRPM_MAX_ATTACHMENTS_BYTES', str(4 * 1024 * 1024)))
+MAX_ATTACHMENTS = int(os.environ.get('PRPM_MAX_ATTACHMENTS', '5'))
+ALLOWED_TYPES = tuple(t.strip().lower() for t in os.environ.get(
+    'PRPM_ATTACHMENT_TYPES', 'application/pdf,image/jpeg,image/png').split(',') if t.strip())
+# Files stay in memory up to this size, then spill to a temporary file in /tmp
+SPILL_BYTES = int(os.environ.get('PRPM_ATTACHMENT_SPILL_BYTES', str(256 * 1024)))
+# Largest request body a form that takes attachments accepts: the form plus base64-sized files
+MAX_REQUEST_BYTES = MAX_BODY_BYTES + (MAX_ATTACHMENTS_BYTES + 2) // 3 * 4
+
+# Raw bytes encoded per chunk: 1024 base64 lines of 76 characters
+CHUNK_BYTES = 57 * 1024
+# Base64 characters decoded per chunk (a multiple of 4, so chunks decode independently)
+DECODE_CHARS = 64 * 1024
+MAX_PART_HEADER_BYTES = 8 * 1024
+
+# Leading bytes each allowed type must start with; types not listed are taken as declared
+SIGNATURES = {
+    'application/pdf': (b'%PDF-',),
+    'image/jpeg': (b'\xff\xd8\xff',),
+    'image/png': (b'\x89PNG\r\n\x1a\n',),
+}
+
+
+def _too_large(what: str, limit: int) -> IntakeError:
+    return IntakeError(413, f"{what} must not exceed {limit} bytes")
+
+
+def clean_filename(filename: str) -> str:
+    """Drop any client-side path and characters that have no place in a header."""
+    name = filename.replace('\\', '/').rsplit('/', 1)[-1]
+    name = ''.join(c for c in name if c.isprintable() and c != '"').strip()
+    return name[:255] or 'attachment'
+
+
+class Attachment:
+    """
+    One uploaded file, written chunk by chunk into a spooled temporary file.
+
+    Sizes, the SHA-256 digest and the type signature are checked as the data
+    arrives, so the file is never held as a single bytes object: it stays in
+    memory up to SPILL_BYTES and lives in /tmp beyond that.
+    """
+
+    __slots__ = ('filename', 'content_type', 'size', 'digest', '_file', '_hash', '_head')
+
+    def __init__(self, filename: str, content_type: str):
+        import hashlib
+        import tempfile
+
+        self.filename = clean_filename(filename)
+        self.content_type = (content_type or 'application/octet-stream').split(';', 1)[0].strip().lower()
+        if self.content_type not in ALLOWED_TYPES:
+            raise IntakeError(415, f"{self.filename}: file type {self.content_type} is not accepted "
+                                   f"(allowed: {', '.join(ALLOWED_TYPES)})")
+        self.size = 0
+        self.digest = None
+        self._file = tempfile.SpooledTemporaryFile(max_size=SPILL_BYTES)
+        self._hash = hashlib.sha256()
+        self._head = b''
+
+    def write(self, data) -> None:
+        self.size += len(data)
+        if self.size > MAX_ATTACHMENT_BYTES:
+            raise _too_large(f"{self.filename}: each file", MAX_ATTACHMENT_BYTES)
+        if len(self._head) < 16:
+            self._head += bytes(data[:16 - len(self._head)])
+        self._hash.update(data)
+        self._file.write(data)
+
+    def finish(self) -> 'Attachment':
+        """Check the completed file against its declared type and rewind it for reading."""
+        if self.size == 0:
+            raise IntakeError(400, f"{self.filename}: file is empty")
+        signatures = SIGNATURES.get(self.content_type)
+        if signatures is not None and not self._head.startswith(signatures):
+            raise IntakeError(415, f"{self.filename}: file content is not {self.content_type}")
+        self.digest = self._hash.hexdigest()
+        self._hash = None
+        self._file.seek(0)
+        return self
+
+    def encoded_size(self) -> int:
+        """Size of the file as CRLF-terminated base64 lines in the message."""
+        encoded = (self.size + 2) // 3 * 4
+        return encoded + (encoded + 75) // 76 * 2
+
+    def base64_lines(self) -> Iterator[bytes]:
+        """Yield the file as CRLF-terminated 76-character base64 lines, CHUNK_BYTES of input at a time."""
+        import binascii
+
+        self._file.seek(0)
+        while True:
+            chunk = self._file.read(CHUNK_BYTES)
+            if not chunk:
+                return
+            encoded = binascii.b2a_base64(chunk, newline=False)
+            yield b''.join(encoded[i:i + 76] + b'\r\n' for i in range(0, len(encoded), 76))
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _Budget:
+    """Enforces the count and total size limits across all files of one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+
+    def add(self, size: int) -> None:
+        self.total += size
+        if self.total > MAX_ATTACHMENTS_BYTES:
+            raise _too_large("Attachments", MAX_ATTACHMENTS_BYTES)
+
+    def open(self, filename: str, content_type: str) -> Attachment:
+        self.count += 1
+        if self.count > MAX_ATTACHMENTS:
+            raise IntakeError(413, f"No more than {MAX_ATTACHMENTS} files may be attached")
+        return Attachment(filename, content_type)
+
+
+def _decode_into(attachment: Attachment, data: str, start: int, budget: _Budget) -> None:
+    """Base64-decode data[start:] into an attachment DECODE_CHARS characters at a time."""
+    import binascii
+
+    length = len(data) - start
+    # Four characters carry three bytes; reject oversized files before decoding any of them
+    if length // 4 * 3 - 2 > MAX_ATTACHMENT_BYTES:
+        raise _too_large(f"{attachment.filename}: each file", MAX_ATTACHMENT_BYTES)
+    if length % 4:
+        raise IntakeError(400, f"{attachment.filename}: file data is not valid base64")
+    for offset in range(start, len(data), DECODE_CHARS):
+        try:
+            chunk = binascii.a2b_base64(data[offset:offset + DECODE_CHARS], strict_mode=True)
+        except (binascii.Error, ValueError):
+            raise IntakeError(400, f"{attachment.filename}: file data is not valid base64")
+        budget.add(len(chunk))
+        attachment.write(chunk)
+
+
+def _from_json(item: Any, budget: _Budget) -> Attachment:
+    """Build an attachment from {"filename", "contentType", "data"}; data is base64 or a base64 data: URL."""
+    if not isinstance(item, dict) or not isinstance(item.get('data'), str):
+        raise IntakeError(400, "Each attachment must be an object with filename, contentType and base64 data")
+    data = item['data']
+    content_type = item.get('contentType')
+    start = 0
+    if data.startswith('data:'):
+        start = data.find(',') + 1
+        media_type, _, encoding = data[5:start - 1].partition(';')
+        if start == 0 or encoding.lower() != 'base64':
+            raise IntakeError(400, "Attachment data URLs must be base64-encoded")
+        content_type = content_type or media_type
+    attachment = budget.open(str(item.get('filename') or 'attachment'), str(content_type or ''))
+    _decode_into(attachment, data, start, budget)
+    return attachment.finish()
+
+
+def read_attachments(body: Dict[str, Any]) -> List[Attachment]:
+    """
+    Remove and return the submission's attachments, checked against every limit.
+
+    Multipart requests arrive here already parsed into Attachment objects;
+    JSON submissions carry an "attachments" list of base64 objects, which is
+    decoded chunk by chunk and dropped from the body so the encoded strings
+    can be freed before the message is built.
+    """
+    items = body.pop('attachments', None)
+    if not items:
+        return []
+    if not isinstance(items, list):
+        raise IntakeError(400, "attachments must be a list")
+    if all(isinstance(item, Attachment) for item in items):
+        return items
+    budget = _Budget()
+    attachments = []
+    while items:
+        attachments.append(_from_json(items.pop(0), budget))
+    return attachments
+
+
+class _MultipartReader:
+    """
+    Incremental multipart/form-data parser.
+
+    Data is fed in chunks; only a chunk plus a boundary's worth of bytes is
+    buffered at a time. Text fields are collected (within the same limits as
+    form-urlencoded bodies) and file parts are streamed into Attachments.
+    """
+
+    def __init__(self, boundary: str):
+        self.delimiter = b'\r\n--' + boundary.encode('latin-1')
+        # A leading CRLF lets the first boundary match the same delimiter as the rest
+        self.buffer = bytearray(b'\r\n')
+        self.state = 'preamble'
+        self.fields: Dict[str, str] = {}
+        self.attachments: List[Attachment] = []
+        self.budget = _Budget()
+        self.field_bytes = 0
+        # (kind, target, field name) of the part being read; kind is 'file', 'field' or 'skip'
+        self.part: Optional[Tuple[str, Any, Optional[str]]] = None
+
+    def feed(self, data: bytes) -> None:
+        self.buffer += data
+        while self._step():
+            pass
+
+    def _write(self, data: bytes) -> None:
+        kind, target, _ = self.part
+        if kind == 'file':
+            self.budget.add(len(data))
+            target.write(data)
+        elif kind == 'field':
+            self.field_bytes += len(data)
+            if self.field_bytes > MAX_BODY_BYTES:
+                raise _too_large("Form fields", MAX_BODY_BYTES)
+            target += data
+
+    def _step(self) -> bool:
+        buffer, delimiter = self.buffer, self.delimiter
+        if self.state in ('preamble', 'body'):
+            index = buffer.find(delimiter)
+            if index < 0:
+                # The tail may hold the start of a delimiter split across chunks
+                keep = len(delimiter) - 1
+                if len(buffer) > keep:
+                    if self.state == 'body':
+                        self._write(buffer[:len(buffer) - keep])
+                    del buffer[:len(buffer) - keep]
+                return False
+            if self.state == 'body':
+                self._write(buffer[:index])
+                self._finish_part()
+            del buffer[:index + len(delimiter)]
+            self.state = 'boundary'
+            return True
+        if self.state == 'boundary':
+            if buffer.startswith(b'--'):
+                self.state = 'done'
+                return False
+            end = buffer.find(b'\r\n')
+            if end < 0:
+                if len(buffer) > MAX_PART_HEADER_BYTES:
+                    raise IntakeError(400, "Malformed multipart body")
+                return False
+            del buffer[:end + 2]
+            self.state = 'headers'
+            return True
+        if self.state == 'headers':
+            # The header block ends at the first empty line, which may be the very first one
+            end = buffer.find(b'\r\n\r\n') if not buffer.startswith(b'\r\n') else 0
+            if end < 0:
+                if len(buffer) > MAX_PART_HEADER_BYTES:
+                    raise IntakeError(400, "Multipart part headers are too large")
+                return False
+            headers = bytes(buffer[:end])
+            del buffer[:end + (4 if end else 2)]
+            self._start_part(headers)
+            self.state = 'body'
+            return True
+        return False
+
+    def _start_part(self, raw_headers: bytes) -> None:
+        from email.parser import BytesHeaderParser
+        from email.policy import HTTP
+
+        headers = BytesHeaderParser(policy=HTTP).parsebytes(raw_headers)
+        name = headers.get_param('name', header='content-disposition')
+        filename = headers.get_filename()
+        if not name or filename == '':
+            # Browsers send an empty file part, with no filename, for a file input left blank
+            self.part = ('skip', None, None)
+        elif filename is not None:
+            self.part = ('file', self.budget.open(filename, headers.get_content_type()), name)
+        else:
+            if len(self.fields) >= MAX_FORM_FIELDS:
+                raise IntakeError(413, f"Request body must not contain more than {MAX_FORM_FIELDS} fields")
+            self.part = ('field', bytearray(), name)
+
+    def _finish_part(self) -> None:
+        kind, target, name = self.part
+        if kind == 'file':
+            self.attachments.append(target.finish())
+        elif kind == 'field':
+            try:
+                self.fields[name] = target.decode('utf-8')
+            except UnicodeDecodeError:
+                raise IntakeError(400, "Request body must be UTF-8 encoded")
+        self.part = None
+
+    def close(self) -> Dict[str, Any]:
+        if self.state != 'done':
+            raise IntakeError(400, "Multipart body is truncated")
+        body: Dict[str, Any] = dict(self.fields)
+        if self.attachments:
+            body['attachments'] = self.attachments
+        return body
+
+
+def _body_chunks(event: Dict[str, Any]) -> Iterator[bytes]:
+    """Yield the raw request body in chunks, base64-decoding it as it goes when needed."""
+    import binascii
+
+    body = event['body']
+    if isinstance(body, bytes):
+        for offset in range(0, len(body), DECODE_CHARS):
+            yield body[offset:offset + DECODE_CHARS]
+    elif event.get('isBase64Encoded'):
+        if '\n' in body:
+            # Line-wrapped base64 cannot be cut into independent chunks
+            body = ''.join(body.split())
+        for offset in range(0, len(body), DECODE_CHARS):
+            try:
+                yield binascii.a2b_base64(body[offset:offset + DECODE_CHARS])
+            except (binascii.Error, ValueError):
+                raise IntakeError(400, "Request body is not valid base64")
+    else:
+        for offset in range(0, len(body), DECODE_CHARS):
+            yield body[offset:offset + DECODE_CHARS].encode('utf-8')
+
+
+def parse_multipart(event: Dict[str, Any], content_type_header: str) -> Dict[str, Any]:
+    """
+    Parse a multipart/form-data request into a flat dict of fields.
+
+    Uploaded files are returned under "attachments" as Attachment objects,
+    decoded from the event body and written to their temporary files chunk
+    by chunk; the body is never decoded or copied as a whole.
+    """
+    from email.message import Message
+
+    parsed = Message()
+    parsed['Content-Type'] = content_type_header
+    boundary = parsed.get_boundary()
+    if not boundary or len(boundary) > 70:
+        raise IntakeError(400, "Multipart body has no valid boundary")
+    reader = _MultipartReader(boundary)
+    try:
+        for chunk in _body_chunks(event):
+            reader.feed(chunk)
+            if reader.state == 'done':
+                break
+        return reader.close()
+    except IntakeError:
+        for attachment in reader.attachments:
+            attachment.close()
+        raise
+
+
+class StreamingMessage:
+    """
+    An EmailMessage with attachments that are base64-encoded as the message is sent.
+
+    The message is flattened once with a short placeholder in place of each
+    attachment's body; iter_chunks() yields the flattened text with every
+    placeholder replaced by the file's base64 lines, read from its temporary
+    file CHUNK_BYTES at a time. prpm_smtp writes the chunks straight to the
+    DATA stream, so sending holds one chunk of the file in memory, not the
+    several whole copies EmailMessage.add_attachment and smtplib would make.
+    """
+
+    def __init__(self, msg, attachments: List[Attachment]):
+        from email.policy import SMTP
+        from email.utils import getaddresses
+
+        markers = []
+        for attachment in attachments:
+            maintype, _, subtype = attachment.content_type.partition('/')
+            msg.add_attachment(b'', maintype=maintype, subtype=subtype, filename=attachment.filename)
+            marker = f"prpm-attachment-{os.urandom(8).hex()}"
+            msg.get_payload()[-1].set_payload(marker)
+            markers.append(marker.encode('ascii'))
+
+        self.msg = msg
+        self.attachments = attachments
+        self.from_addr = msg['Sender'] or msg['From']
+        self.to_addrs = [address for _, address in getaddresses(
+            msg.get_all('To', []) + msg.get_all('Cc', []) + msg.get_all('Bcc', []))]
+
+        # Split the flattened message around the placeholders; the line break
+        # after each one is dropped because the base64 lines end with their own
+        flattened = msg.as_bytes(policy=SMTP)
+        self.segments = []
+        for marker in markers:
+            head, _, flattened = flattened.partition(marker)
+            self.segments.append(head)
+            flattened = flattened[2:] if flattened.startswith(b'\r\n') else flattened
+        self.segments.append(flattened)
+        self.size = sum(len(s) for s in self.segments) + sum(a.encoded_size() for a in attachments)
+
+    def iter_chunks(self) -> Iterator[bytes]:
+        """Yield the message as CRLF-terminated lines in chunks; may be called again to resend."""
+        for segment, attachment in zip(self.segments, self.attachments):
+            yield segment
+            yield from attachment.base64_lines()
+        yield self.segments[-1]
+
+    def as_bytes(self) -> bytes:
+        """The whole message at once, for the spool."""
+        return b''.join(self.iter_chunks())
+
+
+def attach(msg, attachments: List[Attachment]):
+    """Return msg with the attachments added as a StreamingMessage, or msg itself when there are none."""
+    if not attachments:
+        return msg
+    return StreamingMessage(msg, attachments)
@@ -0,0 +1,116 @@
+import os
+from typing import Dict, Any, List, Callable, Optional, Tuple
+
+# Largest number of submissions accepted in one batch event
+MAX_BATCH_SIZE = int(os.environ.get('PRPM_MAX_BATCH_SIZE', '25'))
+
+# Batches are for trusted integrations: they must carry
+# "Authorization: Bearer <PRPM_BATCH_TOKEN>", and while no token is
+# configured the public form endpoints take one submission per request.
+BATCH_TOKEN = os.environ.get('PRPM_BATCH_TOKEN', '')
+
+
+def batch_refusal(event: Dict[str, Any]) -> Optional[Tuple[int, Dict[str, Any]]]:
+    """Return (status_code, response_body) when a batch request must be refused, None when it may proceed."""
+    import hmac
+
+    if not BATCH_TOKEN:
+        return 400, {"message": "Submit one form at a time", "errors": {"body": "Submission must be a JSON object"}}
+    for name, value in (event.get('headers') or {}).items():
+        if name.lower() == 'authorization' and value:
+            if hmac.compare_digest(str(value), f"Bearer {BATCH_TOKEN}"):
+                return None
+    return 401, {"message": "Unauthorized", "errors": {}}
+
+
+def process_batch(items: List[Any], form_type: str,
+                  validate: Callable[[Dict[str, Any]], Tuple[bool, Dict[str, str]]],
+                  build_message: Callable[[Dict[str, Any]], Any],
+                  session=None, spool=None, idempotency=None,
+                  normalize: Callable[[Dict[str, Any]], Dict[str, str]] = None,
+                  success_response: Dict[str, Any] = None,
+                  record: Callable[[str, str, Dict[str, str]], None] = None,
+                  digest: Callable[[Dict[str, Any]], bool] = None,
+                  screen: Callable[[Dict[str, Any]], bool] = None) -> Tuple[int, Dict[str, Any]]:
+    """
+    Validate and deliver a list of submissions; returns (status_code, response_body).
+
+    Every item is validated independently. Valid items are either spooled
+    (when a spool is given) or sent one after another over the same SMTP
+    session, so a batch pays for at most one connect/STARTTLS/LOGIN. When an
+    idempotency cache is given, items already delivered (in this batch or an
+    earlier request) are reported as duplicates instead of being sent again,
+    and success_response is what a later single submission of them replays.
+    Valid items go to digest first, which returns True when it has
+    buffered the item for a digest email instead, and once sent, spooled
+    or digested to record (as key, form type and normalized fields).
+    Valid items for which screen returns True were held as spam and go no
+    further.
+    """
+    import smtplib
+    from prpm_idempotency import body_key
+
+    if not items:
+        return 400, {"message": "Batch must contain at least one submission", "errors": {}}
+    if len(items) > MAX_BATCH_SIZE:
+        return 400, {"message": f"Batch must not exceed {MAX_BATCH_SIZE} submissions", "errors": {}}
+
+    results = []
+    summary = {"sent": 0, "queued": 0, "invalid": 0, "failed": 0, "duplicate": 0, "spam": 0}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results.append({"index": index, "status": "invalid",
+                            "errors": {"body": "Submission must be a JSON object"}})
+            summary["invalid"] += 1
+            continue
+
+        is_valid, errors = validate(item)
+        if not is_valid:
+            results.append({"index": index, "status": "invalid", "errors": errors})
+            summary["invalid"] += 1
+            continue
+
+        if screen is not None and screen(item):
+            results.append({"index": index, "status": "spam"})
+            summary["spam"] += 1
+            continue
+
+        key = fields = None
+        if idempotency is not None or record is not None:
+            fields = normalize(item)
+            key = body_key(form_type, fields)
+        if idempotency is not None and idempotency.get(key) is not None:
+            results.append({"index": index, "status": "duplicate"})
+            summary["duplicate"] += 1
+            continue
+
+        if digest is not None and digest(item):
+            status = "queued"
+        elif spool is not None:
+            spool.enqueue(form_type, build_message(item).as_bytes())
+            status = "queued"
+        else:
+            try:
+                session.send_message(build_message(item))
+            except (smtplib.SMTPException, OSError) as e:
+                print(f"Batch item {index} SMTP error: {str(e)}")
+                results.append({"index": index, "status": "failed", "error": "SMTP error"})
+                summary["failed"] += 1
+                continue
+            status = "sent"
+        if record is not None:
+            record(key, form_type, fields)
+        if idempotency is not None:
+            idempotency.put(key, success_response)
+        results.append({"index": index, "status": status})
+        summary[status] += 1
+
+    if session is not None:
+        print(f"Batch SMTP stats: {session.summary()}")
+
+    status_code = 200 if summary["invalid"] == 0 and summary["failed"] == 0 else 207
+    return status_code, {
+        "message": f"Processed {len(items)} submissions",
+        "summary": summary,
+        "results": results,
+    }
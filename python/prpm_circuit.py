@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+
+# Circuit breaker settings (Lambda environment variables)
+FAILURE_THRESHOLD = int(os.environ.get('PRPM_SMTP_BREAKER_THRESHOLD', '5'))
+RESET_TIMEOUT = float(os.environ.get('PRPM_SMTP_BREAKER_RESET', '30'))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit for {name} is open; retry in {retry_after:.1f} s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Fails fast while a dependency is down instead of waiting on it every call.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    every call is refused for `reset_timeout` seconds. The first call after
+    that runs as a half-open probe (others are still refused while it is in
+    flight): success closes the circuit, failure opens it for another
+    `reset_timeout`.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD,
+                 reset_timeout: float = RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "opened": 0,
+            "rejected": 0,
+            "probes": 0,
+        }
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a probe through (0 when it would now)."""
+        if self.state == CLOSED:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def is_open(self) -> bool:
+        """Return True while calls would be refused, without claiming the probe."""
+        with self._lock:
+            if self.state == CLOSED:
+                return False
+            return self._probing or self.retry_after() > 0
+
+    def allow(self) -> bool:
+        """Return True if a call may go ahead; after the reset timeout this claims the probe."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self._probing or self.retry_after() > 0:
+                self.stats["rejected"] += 1
+                return False
+            self.state = HALF_OPEN
+            self._probing = True
+            self.stats["probes"] += 1
+            return True
+
+    def check(self) -> None:
+        """Raise CircuitOpenError unless a call may go ahead."""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_after())
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != CLOSED:
+                print(f"Circuit for {self.name} closed")
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.stats["opened"] += 1
+                    print(f"Circuit for {self.name} opened after {self.failures} failures")
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_after": round(self.retry_after(), 2),
+            **self.stats,
+        }
+
+
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Return the process-wide breaker for a dependency, shared across warm invocations."""
+    breaker: Optional[CircuitBreaker] = _BREAKERS.get(name)
+    if breaker is None:
+        with _BREAKERS_LOCK:
+            breaker = _BREAKERS.setdefault(name, CircuitBreaker(name))
+    return breaker
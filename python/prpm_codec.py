@@ -0,0 +1,60 @@
+import json
+import os
+from typing import Any, Optional
+
+# JSON backend: orjson when installed, unless PRPM_JSON_CODEC=json forces the
+# stdlib (PRPM_JSON_CODEC=orjson makes a missing orjson an error). The choice
+# is made on first use, not at import: importing orjson pulls in uuid,
+# zoneinfo and friends, which requests that never reach JSON need not pay.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch
+# the stdlib exception whichever backend is active.
+BACKEND: Optional[str] = None
+
+# Bodies shorter than this are parsed by the stdlib whatever the backend: a
+# form's worth of JSON parses within tens of microseconds either way, while
+# importing orjson costs a cold start around 10 ms
+SMALL_BODY_BYTES = 64 * 1024
+
+# Compact stdlib encoder, also used for responses serialized at import time
+compact_dumps = json.JSONEncoder(separators=(',', ':')).encode
+
+_loads = None
+_dumps = None
+
+
+def backend() -> str:
+    """Pick the JSON backend on first call and return its name."""
+    global BACKEND, _loads, _dumps
+    if BACKEND is None:
+        choice = os.environ.get('PRPM_JSON_CODEC', 'auto').lower()
+        if choice != 'json':
+            try:
+                import orjson
+            except ImportError:
+                if choice == 'orjson':
+                    raise
+            else:
+                _loads = orjson.loads
+                _dumps = lambda value: orjson.dumps(value).decode('utf-8')
+                BACKEND = 'orjson'
+                return BACKEND
+        _loads = json.loads
+        _dumps = compact_dumps
+        BACKEND = 'json'
+    return BACKEND
+
+
+def loads(data) -> Any:
+    """Parse JSON from str or UTF-8 bytes; only bodies of SMALL_BODY_BYTES or more load the backend."""
+    if len(data) < SMALL_BODY_BYTES:
+        return json.loads(data)
+    if _loads is None:
+        backend()
+    return _loads(data)
+
+
+def dumps(value: Any) -> str:
+    """Serialize to a compact JSON string."""
+    if _dumps is None:
+        backend()
+    return _dumps(value)
@@ -0,0 +1,249 @@
+import os
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from prpm_circuit import CircuitOpenError
+from prpm_smtp import IMPLICIT_TLS_PORT, get_session, is_outage, smtp_breaker
+
+# Delivery settings (Lambda environment variables). PRPM_SMTP_ENDPOINTS is a
+# comma-separated list of host:port in order of preference, e.g.
+# "smtp.zeptomail.com:587,smtp.zeptomail.com:465"; port 465 (or an smtps://
+# prefix) means implicit TLS. Unset, the handler's host and port are used.
+ENDPOINTS = os.environ.get('PRPM_SMTP_ENDPOINTS', '')
+RETRY_BUDGET = float(os.environ.get('PRPM_SMTP_RETRY_BUDGET', '10'))
+MAX_ATTEMPTS = int(os.environ.get('PRPM_SMTP_MAX_ATTEMPTS', '4'))
+RETRY_BASE_DELAY = float(os.environ.get('PRPM_SMTP_RETRY_BASE_DELAY', '0.2'))
+RETRY_MAX_DELAY = float(os.environ.get('PRPM_SMTP_RETRY_MAX_DELAY', '2'))
+
+# Endpoint scoring: an endpoint's score is its smoothed send latency plus a
+# penalty per unit of recent failure rate; the rate halves every
+# FAILURE_HALF_LIFE seconds so a recovered primary is preferred again.
+LATENCY_SMOOTHING = 0.3
+FAILURE_PENALTY_MS = 1000.0
+FAILURE_HALF_LIFE = 60.0
+# Assumed latency for an endpoint that has not been used yet
+UNKNOWN_LATENCY_MS = 250.0
+
+
+def parse_endpoints(value: str) -> List[Tuple[str, int, bool]]:
+    """Parse "host:port,smtps://host:port" into (host, port, implicit_tls) tuples."""
+    endpoints = []
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        implicit_tls = None
+        for scheme, implicit in (('smtps://', True), ('smtp://', False)):
+            if item.startswith(scheme):
+                item, implicit_tls = item[len(scheme):], implicit
+        host, _, port = item.rpartition(':')
+        if not host:
+            host, port = port, '587'
+        port = int(port)
+        endpoints.append((host, port, port == IMPLICIT_TLS_PORT if implicit_tls is None else implicit_tls))
+    return endpoints
+
+
+class Endpoint:
+    """One SMTP host and port with its recent health."""
+
+    def __init__(self, host: str, port: int, implicit_tls: bool, index: int):
+        self.host = host
+        self.port = port
+        self.implicit_tls = implicit_tls
+        self.index = index
+        self.name = f"{host}:{port}"
+        self.breaker = smtp_breaker(host, port)
+        self.latency_ms: Optional[float] = None
+        self._failure_rate = 0.0
+        self._failure_at = 0.0
+        self.sent = 0
+        self.failed = 0
+
+    def failure_rate(self) -> float:
+        """Smoothed share of recent sends that failed, decayed since the last failure."""
+        if not self._failure_rate:
+            return 0.0
+        elapsed = time.monotonic() - self._failure_at
+        return self._failure_rate * 0.5 ** (elapsed / FAILURE_HALF_LIFE)
+
+    def score(self) -> float:
+        """Lower is better."""
+        latency = UNKNOWN_LATENCY_MS if self.latency_ms is None else self.latency_ms
+        return latency + FAILURE_PENALTY_MS * self.failure_rate()
+
+    def record_success(self, milliseconds: float) -> None:
+        self.sent += 1
+        if self.latency_ms is None:
+            self.latency_ms = milliseconds
+        else:
+            self.latency_ms += LATENCY_SMOOTHING * (milliseconds - self.latency_ms)
+        self._failure_rate = self.failure_rate() * (1 - LATENCY_SMOOTHING)
+        self._failure_at = time.monotonic()
+
+    def record_failure(self) -> None:
+        self.failed += 1
+        self._failure_rate = self.failure_rate() * (1 - LATENCY_SMOOTHING) + LATENCY_SMOOTHING
+        self._failure_at = time.monotonic()
+
+
+class DeliveryPool:
+    """
+    Sends a message through the healthiest of several SMTP endpoints, retrying
+    transient failures.
+
+    Each attempt goes to the best-scoring endpoint whose circuit is not open,
+    over that endpoint's warm session. Outages (timeouts, dropped
+    connections, 4xx replies) move on to the next attempt; a rejection of the
+    message itself is raised at once. Retrying the endpoint that just failed
+    waits a jittered exponential backoff, failing over to another one does
+    not. No attempt starts after `budget` seconds, so the worst case is the
+    budget plus one attempt's socket timeouts.
+
+    A send that timed out after DATA may have been delivered, so a retry can
+    deliver a message twice; duplicates are preferred over lost submissions.
+    """
+
+    def __init__(self, endpoints: List[Tuple[str, int, bool]], username: str, password: str,
+                 channel: str = 'notification', budget: float = RETRY_BUDGET,
+                 max_attempts: int = MAX_ATTEMPTS, base_delay: float = RETRY_BASE_DELAY,
+                 max_delay: float = RETRY_MAX_DELAY):
+        self.endpoints = [Endpoint(host, port, implicit_tls, index)
+                          for index, (host, port, implicit_tls) in enumerate(endpoints)]
+        self.username = username
+        self.password = password
+        self.channel = channel
+        self.budget = budget
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.last_timings: Dict[str, Any] = {}
+        self.stats: Dict[str, int] = {"sends": 0, "retries": 0, "failovers": 0, "failed": 0}
+
+    def _session(self, endpoint: Endpoint):
+        return get_session(endpoint.host, endpoint.port, self.username, self.password,
+                           channel=self.channel, implicit_tls=endpoint.implicit_tls)
+
+    def ranked(self) -> List[Endpoint]:
+        """Endpoints whose circuit would let a call through, best first."""
+        return sorted((e for e in self.endpoints if not e.breaker.is_open()),
+                      key=lambda e: (e.score(), e.index))
+
+    def is_open(self) -> bool:
+        """Return True while every endpoint's circuit is open."""
+        return not self.ranked()
+
+    def retry_after(self) -> float:
+        """Seconds until the first endpoint's circuit lets a probe through."""
+        return min(e.breaker.retry_after() for e in self.endpoints)
+
+    def _backoff(self, retry: int, remaining: float) -> float:
+        """Full-jitter exponential backoff, capped by max_delay and the time left."""
+        import random
+
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+        return min(delay, max(0.0, remaining))
+
+    def warm(self) -> None:
+        """Open the best endpoint's session ahead of a send; a failure is left for the send to retry."""
+        candidates = self.ranked()
+        if not candidates:
+            return
+        try:
+            self._session(candidates[0]).get_connection()
+        except Exception as e:
+            print(f"SMTP warm-up via {candidates[0].name} failed: {str(e)}")
+
+    def send_message(self, msg) -> None:
+        """Deliver a message, raising the last error once attempts or budget run out."""
+        deadline = time.monotonic() + self.budget
+        attempts: List[Dict[str, Any]] = []
+        failed = set()
+        backoff_ms = 0.0
+        last_error: Optional[Exception] = None
+        self.stats["sends"] += 1
+        self.last_timings = {}
+        try:
+            for attempt in range(self.max_attempts):
+                candidates = self.ranked()
+                if not candidates:
+                    if last_error is None:
+                        raise CircuitOpenError(', '.join(e.name for e in self.endpoints), self.retry_after())
+                    break
+                endpoint = candidates[0]
+                if attempt:
+                    self.stats["retries"] += 1
+                    if endpoint.name in failed:
+                        remaining = deadline - time.monotonic()
+                        delay = self._backoff(attempt - 1, remaining)
+                        time.sleep(delay)
+                        backoff_ms += delay * 1000
+                    else:
+                        self.stats["failovers"] += 1
+                    if time.monotonic() >= deadline:
+                        break
+
+                session = self._session(endpoint)
+                start = time.perf_counter()
+                try:
+                    session.send_message(msg)
+                except Exception as e:
+                    milliseconds = (time.perf_counter() - start) * 1000
+                    outcome = 'circuit_open' if isinstance(e, CircuitOpenError) else type(e).__name__
+                    attempts.append({"endpoint": endpoint.name, "outcome": outcome,
+                                     "ms": round(milliseconds, 3)})
+                    self.last_timings = {**session.last_timings, "endpoint": endpoint.name}
+                    print(f"SMTP attempt {attempt + 1} via {endpoint.name} failed: {str(e)}")
+                    if not isinstance(e, CircuitOpenError):
+                        if not is_outage(e):
+                            raise
+                        endpoint.record_failure()
+                    failed.add(endpoint.name)
+                    last_error = e
+                    continue
+
+                milliseconds = (time.perf_counter() - start) * 1000
+                endpoint.record_success(milliseconds)
+                attempts.append({"endpoint": endpoint.name, "outcome": "sent", "ms": round(milliseconds, 3)})
+                self.last_timings = {**session.last_timings, "endpoint": endpoint.name}
+                return
+
+            self.stats["failed"] += 1
+            raise last_error
+        finally:
+            self.last_timings["attempts"] = attempts
+            if backoff_ms:
+                self.last_timings["backoff_ms"] = backoff_ms
+
+    def summary(self) -> Dict[str, Any]:
+        """Return delivery statistics and the health of every endpoint."""
+        return {
+            **self.stats,
+            "endpoints": [{
+                "endpoint": e.name,
+                "sent": e.sent,
+                "failed": e.failed,
+                "latency_ms": None if e.latency_ms is None else round(e.latency_ms, 2),
+                "failure_rate": round(e.failure_rate(), 3),
+                "circuit": e.breaker.state,
+            } for e in self.endpoints],
+        }
+
+
+_POOLS: Dict[Tuple[str, str, str], DeliveryPool] = {}
+
+
+def get_delivery(server: str, port: int, username: str, password: str,
+                 channel: str = 'notification') -> DeliveryPool:
+    """
+    Return the process-wide delivery pool for an account and channel.
+
+    Endpoints come from PRPM_SMTP_ENDPOINTS, falling back to server:port.
+    """
+    endpoints = ENDPOINTS or f"{server}:{port}"
+    key = (endpoints, username, channel)
+    pool = _POOLS.get(key)
+    if pool is None or pool.password != password:
+        pool = DeliveryPool(parse_endpoints(endpoints), username, password, channel=channel)
+        _POOLS[key] = pool
+    return pool
@@ -0,0 +1,309 @@
+import json
+import os
+import time
+from typing import TYPE_CHECKING, Dict, Any, Iterable, List, Optional
+
+from prpm_spool import running_in_lambda
+from prpm_templates import escape_html
+
+if TYPE_CHECKING:
+    from email.message import EmailMessage
+
+# Digest settings (Lambda environment variables). Each form type has its own
+# SQS queue: {form} in the queue URL stands for the form type (or "quarantine").
+DIGEST_PATH = os.environ.get('PRPM_DIGEST_PATH', '/tmp/prpm-digest.sqlite3')
+DIGEST_QUEUE_URL = os.environ.get('PRPM_DIGEST_QUEUE_URL', '')
+DIGEST_MAX_ITEMS = int(os.environ.get('PRPM_DIGEST_MAX_ITEMS', '25'))
+DIGEST_MAX_AGE = float(os.environ.get('PRPM_DIGEST_MAX_AGE', '3600'))
+URGENT_DAYS = int(os.environ.get('PRPM_DIGEST_URGENT_DAYS', '14'))
+MAX_ENTRIES_PER_EMAIL = 100
+VISIBILITY_TIMEOUT = 120
+FROM_EMAIL = "noreply@paxriverpm.com"
+TO_EMAIL = "info@paxriverpm.com"
+QUARANTINE_FORM = 'quarantine'
+
+
+def digest_forms() -> List[str]:
+    """Return the form types listed in PRPM_DIGEST_FORMS (comma-separated)."""
+    return [name.strip() for name in os.environ.get('PRPM_DIGEST_FORMS', '').split(',') if name.strip()]
+
+
+def digest_configured() -> bool:
+    """Return True when the buffer is one the digest function can read: SQS, or SQLite outside Lambda."""
+    if DIGEST_QUEUE_URL and '{form}' not in DIGEST_QUEUE_URL:
+        print("Configuration error: PRPM_DIGEST_QUEUE_URL must contain {form}, which stands for "
+              "the form type of each digest's own queue")
+        return False
+    if DIGEST_QUEUE_URL or not running_in_lambda():
+        return True
+    print("Configuration error: PRPM_DIGEST_QUEUE_URL must be set for digests in AWS Lambda; "
+          "the SQLite digest buffer is for local runs only")
+    return False
+
+
+def digest_enabled(form_type: str) -> bool:
+    """Return True when submissions of this form are buffered for digests (and the buffer is usable)."""
+    return form_type in digest_forms() and digest_configured()
+
+
+class DigestEntry:
+    """A buffered submission: the notification's subject and its format_email_content text."""
+
+    __slots__ = ('id', 'form_type', 'title', 'content', 'queued_at')
+
+    def __init__(self, id: Any, form_type: str, title: str, content: str, queued_at: float):
+        self.id = id
+        self.form_type = form_type
+        self.title = title
+        self.content = content
+        self.queued_at = queued_at
+
+
+class DigestBuffer:
+    """
+    SQLite-backed buffer of submissions waiting for their form's digest email.
+
+    Entries are claimed for a visibility timeout while a digest is sent and
+    deleted once it has been accepted, so a digest that fails to send is
+    retried with the same entries. Serves as the local stand-in for SQS.
+    """
+
+    def __init__(self, path: str = DIGEST_PATH):
+        import sqlite3
+
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS digest ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " form_type TEXT NOT NULL,"
+            " title TEXT NOT NULL,"
+            " content TEXT NOT NULL,"
+            " queued_at REAL NOT NULL,"
+            " visible_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS digest_ready ON digest (form_type, visible_at)")
+
+    def add(self, form_type: str, title: str, content: str) -> None:
+        """Buffer one submission for the next digest."""
+        now = time.time()
+        self._db.execute(
+            "INSERT INTO digest (form_type, title, content, queued_at, visible_at) VALUES (?, ?, ?, ?, ?)",
+            (form_type, title, content, now, now),
+        )
+
+    def due(self, form_type: str, max_items: int = DIGEST_MAX_ITEMS, max_age: float = DIGEST_MAX_AGE) -> bool:
+        """Return True once max_items entries are waiting or the oldest has waited max_age seconds."""
+        count, oldest = self._db.execute(
+            "SELECT COUNT(*), MIN(queued_at) FROM digest WHERE form_type = ? AND visible_at <= ?",
+            (form_type, time.time()),
+        ).fetchone()
+        return count >= max_items or (oldest is not None and time.time() - oldest >= max_age)
+
+    def form_types(self) -> List[str]:
+        """Return the form types with buffered entries."""
+        return [row[0] for row in self._db.execute("SELECT DISTINCT form_type FROM digest").fetchall()]
+
+    def claim(self, form_type: str, max_entries: int = MAX_ENTRIES_PER_EMAIL,
+              visibility_timeout: int = VISIBILITY_TIMEOUT) -> List[DigestEntry]:
+        """Claim up to max_entries of a form's oldest entries."""
+        now = time.time()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self._db.execute(
+                "SELECT id, form_type, title, content, queued_at FROM digest"
+                " WHERE form_type = ? AND visible_at <= ? ORDER BY id LIMIT ?",
+                (form_type, now, max_entries),
+            ).fetchall()
+            self._db.executemany(
+                "UPDATE digest SET visible_at = ? WHERE id = ?",
+                [(now + visibility_timeout, row[0]) for row in rows],
+            )
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+        return [DigestEntry(*row) for row in rows]
+
+    def delete(self, entries: Iterable[DigestEntry]) -> None:
+        """Remove entries whose digest was sent."""
+        self._db.executemany("DELETE FROM digest WHERE id = ?", [(entry.id,) for entry in entries])
+
+    def release(self, entries: Iterable[DigestEntry]) -> None:
+        """Make entries of a digest that failed to send available again."""
+        self._db.executemany("UPDATE digest SET visible_at = ? WHERE id = ?",
+                             [(time.time(), entry.id) for entry in entries])
+
+
+class SQSDigestBuffer:
+    """
+    Digest buffer backed by one SQS queue per form type.
+
+    queue_url contains {form}, replaced by the form type, so a queue's
+    approximate depth is its form's count: due() compares it with max_items
+    and leaves age to the hourly digest run.
+    """
+
+    def __init__(self, queue_url: str = DIGEST_QUEUE_URL, client=None):
+        if client is None:
+            import boto3
+            client = boto3.client('sqs')
+        self.queue_url = queue_url
+        self._sqs = client
+
+    def _queue(self, form_type: str) -> str:
+        return self.queue_url.replace('{form}', form_type)
+
+    def add(self, form_type: str, title: str, content: str) -> None:
+        """Buffer one submission for the next digest."""
+        self._sqs.send_message(QueueUrl=self._queue(form_type), MessageBody=json.dumps({
+            "title": title, "content": content, "queuedAt": time.time(),
+        }))
+
+    def due(self, form_type: str, max_items: int = DIGEST_MAX_ITEMS, max_age: float = DIGEST_MAX_AGE) -> bool:
+        """Return True once the form's queue holds about max_items entries."""
+        attributes = self._sqs.get_queue_attributes(
+            QueueUrl=self._queue(form_type), AttributeNames=['ApproximateNumberOfMessages'],
+        )['Attributes']
+        return int(attributes['ApproximateNumberOfMessages']) >= max_items
+
+    def form_types(self) -> List[str]:
+        """Return the form types configured for digests, and the spam quarantine."""
+        return digest_forms() + [QUARANTINE_FORM]
+
+    def claim(self, form_type: str, max_entries: int = MAX_ENTRIES_PER_EMAIL,
+              visibility_timeout: int = VISIBILITY_TIMEOUT) -> List[DigestEntry]:
+        """Receive up to max_entries of a form's entries, ten messages at a time."""
+        entries = []
+        while len(entries) < max_entries:
+            messages = self._sqs.receive_message(
+                QueueUrl=self._queue(form_type), MaxNumberOfMessages=min(10, max_entries - len(entries)),
+                VisibilityTimeout=visibility_timeout, WaitTimeSeconds=0,
+            ).get('Messages', [])
+            if not messages:
+                break
+            for message in messages:
+                data = json.loads(message['Body'])
+                entries.append(DigestEntry(message['ReceiptHandle'], form_type, data['title'],
+                                           data['content'], data['queuedAt']))
+        return entries
+
+    def delete(self, entries: Iterable[DigestEntry]) -> None:
+        """Remove entries whose digest was sent."""
+        entries = list(entries)
+        for start in range(0, len(entries), 10):
+            self._sqs.delete_message_batch(QueueUrl=self._queue(entries[start].form_type), Entries=[
+                {'Id': str(index), 'ReceiptHandle': entry.id}
+                for index, entry in enumerate(entries[start:start + 10])
+            ])
+
+    def release(self, entries: Iterable[DigestEntry]) -> None:
+        """Make entries of a digest that failed to send visible again."""
+        entries = list(entries)
+        for start in range(0, len(entries), 10):
+            self._sqs.change_message_visibility_batch(QueueUrl=self._queue(entries[start].form_type), Entries=[
+                {'Id': str(index), 'ReceiptHandle': entry.id, 'VisibilityTimeout': 0}
+                for index, entry in enumerate(entries[start:start + 10])
+            ])
+
+
+_BUFFER: Optional[Any] = None
+
+
+def get_digest_buffer():
+    """Return the process-wide digest buffer: SQS when a queue URL is configured, SQLite otherwise (outside Lambda)."""
+    global _BUFFER
+    if _BUFFER is None:
+        if not digest_configured():
+            raise RuntimeError("PRPM_DIGEST_QUEUE_URL is not configured")
+        _BUFFER = SQSDigestBuffer(DIGEST_QUEUE_URL) if DIGEST_QUEUE_URL else DigestBuffer(DIGEST_PATH)
+    return _BUFFER
+
+
+def deadline_is_near(deadline, urgent_days: int = URGENT_DAYS) -> bool:
+    """Return True when a deadline (a datetime.date, or None) falls within urgent_days of today."""
+    from datetime import date
+
+    return deadline is not None and (deadline - date.today()).days <= urgent_days
+
+
+def _utc(timestamp: float) -> str:
+    return time.strftime('%Y-%m-%d %H:%M UTC', time.gmtime(timestamp))
+
+
+def build_digest(form_type: str, entries: List[DigestEntry],
+                 from_email: str = FROM_EMAIL, to_email: str = TO_EMAIL) -> 'EmailMessage':
+    """Compose one summary email from buffered submissions, oldest first."""
+    from email.message import EmailMessage
+
+    label = form_type.replace('-', ' ').title()
+    count = len(entries)
+    noun = 'submission' if count == 1 else 'submissions'
+    period = f"{_utc(entries[0].queued_at)} to {_utc(entries[-1].queued_at)}"
+    contents = "\n".join(f"{index}. {entry.title}" for index, entry in enumerate(entries, 1))
+    text = f"{label} digest: {count} {noun} received {period}\n\n{contents}\n" + "".join(
+        f"\n{'=' * 60}\n{index}. {entry.title}\n{entry.content}" for index, entry in enumerate(entries, 1)
+    )
+    html = (
+        '<!DOCTYPE html><html><body style="margin:0;padding:16px;'
+        'font-family:Arial,Helvetica,sans-serif;font-size:14px;color:#222;">'
+        f'<h2 style="margin:0 0 8px;font-size:18px;">{escape_html(label)} digest</h2>'
+        f"<p>{count} {noun} received {period}</p><ol>"
+        + "".join(f'<li><a href="#entry-{index}">{escape_html(entry.title)}</a></li>'
+                  for index, entry in enumerate(entries, 1))
+        + "</ol>"
+        + "".join(f'<hr id="entry-{index}"><h3 style="font-size:15px;">{index}. {escape_html(entry.title)}</h3>'
+                  f'<pre style="font-family:inherit;white-space:pre-wrap;">{escape_html(entry.content)}</pre>'
+                  for index, entry in enumerate(entries, 1))
+        + "</body></html>"
+    )
+
+    msg = EmailMessage()
+    msg['Subject'] = f"{label} digest: {count} new {noun}"
+    msg['From'] = from_email
+    msg['To'] = to_email
+    msg.set_content(text)
+    msg.add_alternative(html, subtype='html')
+    return msg
+
+
+def send_digests(buffer, session, form_types: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Send every buffered entry as digest emails, up to MAX_ENTRIES_PER_EMAIL each.
+
+    A digest that fails to send is released for the next run and the rest of
+    that form's entries wait with it. Returns counts of digests and entries
+    sent and of digests that failed.
+    """
+    summary = {"digests": 0, "entries": 0, "failed": 0}
+    for form_type in (buffer.form_types() if form_types is None else form_types):
+        while True:
+            entries = buffer.claim(form_type)
+            if not entries:
+                break
+            try:
+                session.send_message(build_digest(form_type, entries))
+            except Exception as e:
+                print(f"{form_type} digest of {len(entries)} entries failed: {str(e)}")
+                buffer.release(entries)
+                summary["failed"] += 1
+                break
+            buffer.delete(entries)
+            summary["digests"] += 1
+            summary["entries"] += len(entries)
+    return summary
+
+
+def send_due_digests(buffer, session, form_types: Optional[Iterable[str]] = None,
+                     max_items: int = DIGEST_MAX_ITEMS) -> Dict[str, Any]:
+    """
+    Send the digests of forms that have reached DIGEST_MAX_ITEMS or DIGEST_MAX_AGE.
+
+    Used by a frequent scheduled run, so "every N items" does not wait for
+    the hourly digest and no handler sends a digest inside a visitor's request.
+    """
+    due = [form_type for form_type in (buffer.form_types() if form_types is None else form_types)
+           if buffer.due(form_type, max_items)]
+    return send_digests(buffer, session, due)
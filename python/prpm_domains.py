@@ -0,0 +1,242 @@
+import os
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple, Union
+
+# Blocked-domain index settings (Lambda environment variables)
+INDEX_PATH = os.environ.get('PRPM_DOMAIN_INDEX',
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prpm_blocked_domains.idx'))
+INDEX_MAGIC = b'PRPMDOM1'
+BLOCK_SIZE = 16
+CACHE_SIZE = 1024
+
+# What a listed domain is, in the order of the kind byte stored in the index
+KINDS = ('disposable', 'invalid')
+DOMAIN_ERRORS = {
+    'disposable': 'Please use a permanent email address, not a disposable one',
+    'invalid': 'Please check your email address; its domain cannot receive email',
+}
+
+
+def domain_check_enabled() -> bool:
+    """Return True unless PRPM_DOMAIN_CHECK is set to 0/false."""
+    return os.environ.get('PRPM_DOMAIN_CHECK', '1').lower() not in ('0', 'false', 'no')
+
+
+class DomainIndex:
+    """
+    Read-only, memory-mapped set of blocked domains, searched in place.
+
+    The lower-case ASCII domains are sorted bytewise and cut into blocks of
+    BLOCK_SIZE. Each entry is stored as three bytes (how many leading bytes
+    it shares with the previous entry of its block, the length of the rest,
+    its kind as an index into KINDS) followed by the rest; the first entry
+    of a block shares nothing, so it can be read on its own. The file holds
+    the 8-byte magic, uint32 entry and block counts, block count + 1 uint32
+    offsets where each block starts (the last one is the end of the file),
+    then the blocks, all little-endian. Opening it parses nothing; a lookup
+    binary-searches the block heads and scans one block.
+    """
+
+    def __init__(self, path: str = INDEX_PATH):
+        import mmap
+        import struct
+
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.blocks = struct.unpack_from('<8sII', self._map, 0)
+        if magic != INDEX_MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a domain index")
+        self._offset = struct.Struct('<I').unpack_from
+        self._span = struct.Struct('<II').unpack_from
+        self._cache = {}
+
+    def _entries(self, block: int) -> Iterator[Tuple[bytes, int]]:
+        """Decode one block's (domain, kind index) entries in order."""
+        data = self._map
+        position, end = self._span(data, 16 + 4 * block)
+        previous = b''
+        while position < end:
+            shared, length, kind = data[position], data[position + 1], data[position + 2]
+            position += 3
+            previous = previous[:shared] + data[position:position + length]
+            position += length
+            yield previous, kind
+
+    def _find(self, domain: bytes) -> int:
+        """Return the kind index of domain in the index, or -1."""
+        data, offset = self._map, self._offset
+        low, high = 0, self.blocks
+        while low < high:
+            middle = (low + high) // 2
+            start = offset(data, 16 + 4 * middle)[0]
+            if data[start + 3:start + 3 + data[start + 1]] <= domain:
+                low = middle + 1
+            else:
+                high = middle
+        if low == 0:
+            return -1
+        position, end = self._span(data, 12 + 4 * low)
+        entry = b''
+        while position < end:
+            shared, length = data[position], data[position + 1]
+            entry = entry[:shared] + data[position + 3:position + 3 + length]
+            if entry >= domain:
+                return data[position + 2] if entry == domain else -1
+            position += 3 + length
+        return -1
+
+    def kind(self, domain: str) -> Optional[str]:
+        """Return the kind of an exactly listed domain, or None."""
+        try:
+            kind = self._find(domain.lower().encode('ascii'))
+        except UnicodeEncodeError:
+            return None
+        return None if kind < 0 else KINDS[kind]
+
+    def lookup(self, domain: str) -> Optional[str]:
+        """
+        Return the kind of domain or of the closest listed parent (mail.foo.com is blocked by foo.com).
+
+        The last CACHE_SIZE answers are kept, so the common webmail domains
+        most submissions use cost a dict lookup.
+        """
+        try:
+            return self._cache[domain]
+        except KeyError:
+            pass
+        kind = None
+        try:
+            name = domain.strip().rstrip('.').lower().encode('ascii')
+        except UnicodeEncodeError:
+            name = b''
+        while name:
+            found = self._find(name)
+            if found >= 0:
+                kind = KINDS[found]
+                break
+            name = name.partition(b'.')[2]
+        if len(self._cache) >= CACHE_SIZE:
+            self._cache.clear()
+        self._cache[domain] = kind
+        return kind
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        for block in range(self.blocks):
+            for entry, kind in self._entries(block):
+                yield entry.decode('ascii'), KINDS[kind]
+
+    def close(self) -> None:
+        self._map.close()
+
+
+def read_domain_list(lines: Iterable[str], source: str = '<list>') -> Dict[str, str]:
+    """
+    Parse a plain-text domain list into {domain: kind}.
+
+    One domain per line, optionally followed by its kind (disposable when
+    omitted); blank lines and # comments are skipped and a leading "*." or
+    "." is dropped, so published disposable-domain lists load as they are.
+    """
+    domains = {}
+    for number, line in enumerate(lines, 1):
+        parts = line.split('#', 1)[0].split()
+        if not parts:
+            continue
+        domain = parts[0].lower().lstrip('*').strip('.')
+        kind = parts[1].lower() if len(parts) > 1 else 'disposable'
+        if kind not in KINDS or len(parts) > 2:
+            raise ValueError(f"{source}:{number}: expected '<domain> [{'|'.join(KINDS)}]', got {line.strip()!r}")
+        try:
+            domain.encode('ascii')
+        except UnicodeEncodeError:
+            domain = domain.encode('idna').decode('ascii')
+        domains[domain] = kind
+    return domains
+
+
+def build_index(domains: Dict[str, str], path: str) -> int:
+    """Write {domain: kind} as an index file, atomically replacing path; returns its size in bytes."""
+    import struct
+
+    entries = sorted((domain.encode('ascii'), KINDS.index(kind)) for domain, kind in domains.items())
+    blocks = []
+    for first in range(0, len(entries), BLOCK_SIZE):
+        block = bytearray()
+        previous = b''
+        for domain, kind in entries[first:first + BLOCK_SIZE]:
+            if len(domain) > 255:
+                raise ValueError(f"Domain too long: {domain[:40]!r}...")
+            shared = 0
+            while shared < min(len(previous), len(domain)) and previous[shared] == domain[shared]:
+                shared += 1
+            block += bytes((shared, len(domain) - shared, kind)) + domain[shared:]
+            previous = domain
+        blocks.append(bytes(block))
+    offsets = [16 + 4 * (len(blocks) + 1)]
+    for block in blocks:
+        offsets.append(offsets[-1] + len(block))
+    temporary = f"{path}.tmp"
+    with open(temporary, 'wb') as f:
+        f.write(struct.pack('<8sII', INDEX_MAGIC, len(entries), len(blocks)))
+        f.write(struct.pack(f'<{len(offsets)}I', *offsets))
+        f.write(b''.join(blocks))
+    os.replace(temporary, path)
+    return offsets[-1]
+
+
+_INDEX: Optional[DomainIndex] = None
+_INDEX_LOADED = False
+
+
+def get_domain_index() -> Optional[DomainIndex]:
+    """Map the index on first use; None (and domain checks skipped) when it is missing or unreadable."""
+    global _INDEX, _INDEX_LOADED
+    if not _INDEX_LOADED:
+        _INDEX_LOADED = True
+        try:
+            _INDEX = DomainIndex(INDEX_PATH)
+        except (OSError, ValueError) as e:
+            print(f"Domain index unavailable, skipping domain checks: {str(e)}")
+    return _INDEX
+
+
+def email_domain_kind(email: str) -> Optional[str]:
+    """Return 'disposable' or 'invalid' when the address's domain is listed, None otherwise."""
+    if not domain_check_enabled():
+        return None
+    index = get_domain_index()
+    if index is None:
+        return None
+    return index.lookup(email.rpartition('@')[2])
+
+
+def check_email_domain(email: str) -> Union[bool, Tuple[bool, str]]:
+    """Schema check for email fields that already match the address pattern."""
+    kind = email_domain_kind(email)
+    return True if kind is None else (False, DOMAIN_ERRORS[kind])
+
+
+def main(argv: Any = None) -> None:
+    """Rebuild the index from plain-text domain lists (later lists override earlier ones)."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('lists', nargs='+', help="text files of '<domain> [disposable|invalid]' lines")
+    parser.add_argument('-o', '--output', default=INDEX_PATH, help='index file to write')
+    args = parser.parse_args(argv)
+
+    domains = {}
+    for name in args.lists:
+        with open(name, encoding='utf-8') as f:
+            domains.update(read_domain_list(f, name))
+    size = build_index(domains, args.output)
+    kinds = {kind: sum(1 for value in domains.values() if value == kind) for kind in KINDS}
+    print(f"Wrote {len(domains)} domains ({kinds}) to {args.output}: {size} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+# Idempotency settings (Lambda environment variables)
+IDEMPOTENCY_TTL = float(os.environ.get('PRPM_IDEMPOTENCY_TTL', '600'))
+IDEMPOTENCY_MAX_ENTRIES = int(os.environ.get('PRPM_IDEMPOTENCY_MAX_ENTRIES', '1024'))
+IDEMPOTENCY_DB = os.environ.get('PRPM_IDEMPOTENCY_DB', '')
+
+IDEMPOTENCY_HEADER = 'idempotency-key'
+MAX_KEY_LENGTH = 255
+
+
+class SharedIdempotencyStore:
+    """SQLite-backed response store shared by every container that can reach the file."""
+
+    def __init__(self, path: str):
+        import sqlite3
+
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=5, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS idempotency ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._db.execute(
+            "SELECT response FROM idempotency WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, response: Dict[str, Any], ttl: float) -> None:
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO idempotency (key, response, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(response), now + ttl),
+        )
+        self._db.execute("DELETE FROM idempotency WHERE expires_at <= ?", (now,))
+
+
+class IdempotencyCache:
+    """
+    TTL-bounded LRU of responses to successful submissions.
+
+    Lookups hit the in-process cache first and fall back to the optional
+    shared store, so a duplicate that lands on another warm container is
+    still answered without SMTP work. Duplicates that arrive while the
+    original is still being sent are not detected.
+    """
+
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL, max_entries: int = IDEMPOTENCY_MAX_ENTRIES,
+                 store: Optional[SharedIdempotencyStore] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.store = store
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored response for key, or None if it is unknown or expired."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, response = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return response
+            del self._entries[key]
+
+        if self.store is not None:
+            response = self.store.get(key)
+            if response is not None:
+                self._remember(key, response)
+                self.hits += 1
+                return response
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        """Remember the response for a successfully handled submission."""
+        self._remember(key, response)
+        if self.store is not None:
+            self.store.put(key, response, self.ttl)
+
+    def _remember(self, key: str, response: Dict[str, Any]) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+_CACHE: Optional[IdempotencyCache] = None
+
+
+def get_idempotency_cache() -> IdempotencyCache:
+    """Return the process-wide cache, backed by PRPM_IDEMPOTENCY_DB when it is set."""
+    global _CACHE
+    if _CACHE is None:
+        store = SharedIdempotencyStore(IDEMPOTENCY_DB) if IDEMPOTENCY_DB else None
+        _CACHE = IdempotencyCache(store=store)
+    return _CACHE
+
+
+def client_key(event: Dict[str, Any]) -> Optional[str]:
+    """Return the client-supplied Idempotency-Key header, if any."""
+    for name, value in (event.get('headers') or {}).items():
+        if name.lower() == IDEMPOTENCY_HEADER and value:
+            return str(value)[:MAX_KEY_LENGTH]
+    return None
+
+
+def body_key(form_type: str, normalized: Dict[str, str]) -> str:
+    """Hash a normalized, validated submission into a cache key."""
+    import hashlib
+
+    canonical = json.dumps(normalized, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return f"{form_type}:body:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
+
+def idempotency_key(event: Dict[str, Any], form_type: str, normalized: Dict[str, str]) -> str:
+    """Key on the client's Idempotency-Key when present, otherwise on the body hash."""
+    key = client_key(event)
+    if key is not None:
+        return f"{form_type}:client:{key}"
+    return body_key(form_type, normalized)
+
+
+def replayed(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of a stored response marked as a replay."""
+    return {**response, "headers": {**response.get("headers", {}), "Idempotent-Replayed": "true"}}
@@ -0,0 +1,146 @@
+import os
+from typing import Dict, Any, Optional
+
+from prpm_codec import loads
+
+# Intake limits (Lambda environment variables). The largest single
+# submission is a few tens of KiB; the default leaves room for batches.
+MAX_BODY_BYTES = int(os.environ.get('PRPM_MAX_BODY_BYTES', str(1024 * 1024)))
+MAX_FORM_FIELDS = int(os.environ.get('PRPM_MAX_FORM_FIELDS', '100'))
+
+FORM_URLENCODED = 'application/x-www-form-urlencoded'
+MULTIPART_FORM_DATA = 'multipart/form-data'
+
+
+class IntakeError(Exception):
+    """A request body rejected before parsing, carrying the HTTP status to answer with."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+def header(event: Dict[str, Any], name: str) -> Optional[str]:
+    """Case-insensitive header lookup (API Gateway passes headers as sent)."""
+    headers = event.get('headers') or {}
+    value = headers.get(name)
+    if value is None:
+        for key, candidate in headers.items():
+            if key.lower() == name:
+                return candidate
+    return value
+
+
+def _too_large(max_bytes: int) -> IntakeError:
+    return IntakeError(413, f"Request body must not exceed {max_bytes} bytes")
+
+
+def _decode_base64(body, max_bytes: int) -> bytes:
+    import binascii
+
+    # Four characters carry three bytes; anything longer cannot decode small enough
+    if len(body) > (max_bytes + 2) // 3 * 4 + 4:
+        raise _too_large(max_bytes)
+    try:
+        return binascii.a2b_base64(body)
+    except (binascii.Error, ValueError):
+        raise IntakeError(400, "Request body is not valid base64")
+
+
+def _decompress(data: bytes, encoding: str, max_bytes: int) -> bytes:
+    """Inflate gzip/deflate data, stopping as soon as the output would exceed max_bytes."""
+    import zlib
+
+    # wbits 32+ accepts both gzip and zlib headers; raw deflate needs negative wbits
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 32)
+    try:
+        output = decompressor.decompress(data, max_bytes + 1)
+    except zlib.error:
+        if encoding != 'deflate':
+            raise IntakeError(400, "Request body is not valid gzip data")
+        decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        try:
+            output = decompressor.decompress(data, max_bytes + 1)
+        except zlib.error:
+            raise IntakeError(400, "Request body is not valid deflate data")
+    if len(output) > max_bytes or decompressor.unconsumed_tail:
+        raise _too_large(max_bytes)
+    if not decompressor.eof:
+        raise IntakeError(400, "Request body is truncated")
+    return output
+
+
+def _parse_form(data) -> Dict[str, str]:
+    from urllib.parse import parse_qsl
+
+    if isinstance(data, bytes):
+        try:
+            data = data.decode('utf-8')
+        except UnicodeDecodeError:
+            raise IntakeError(400, "Request body must be UTF-8 encoded")
+    try:
+        return dict(parse_qsl(data, keep_blank_values=True, max_num_fields=MAX_FORM_FIELDS))
+    except ValueError:
+        raise IntakeError(413, f"Request body must not contain more than {MAX_FORM_FIELDS} fields")
+
+
+def read_body(event: Dict[str, Any], max_bytes: int = MAX_BODY_BYTES, attachments: bool = False) -> Any:
+    """
+    Decode and parse the request body with every size check made before parsing.
+
+    The raw length is checked first, then the base64-decoded length and the
+    inflated length (which never grows past max_bytes + 1, so a compression
+    bomb costs no more memory than an honest body). JSON is parsed straight
+    from the decoded bytes; form-urlencoded bodies become a flat dict.
+    Raises IntakeError for bodies to reject and json.JSONDecodeError for
+    malformed JSON, whichever prpm_codec backend is active. Bodies that are
+    already parsed are returned unchanged.
+
+    Forms that take attachments also accept multipart/form-data, which is
+    parsed incrementally by prpm_attachments without decoding the body as a
+    whole; uploaded files come back under "attachments".
+    """
+    body = event.get('body')
+    if not isinstance(body, (str, bytes)):
+        return body
+
+    # A str's UTF-8 size is at least its length, so this never rejects a body that fits
+    if len(body) > max_bytes and not event.get('isBase64Encoded'):
+        raise _too_large(max_bytes)
+
+    content_type_header = header(event, 'content-type') or ''
+    content_type = content_type_header.split(';', 1)[0].strip().lower()
+    if content_type == MULTIPART_FORM_DATA:
+        if not attachments:
+            raise IntakeError(415, "File uploads are not accepted by this form")
+        if event.get('isBase64Encoded') and len(body) > (max_bytes + 2) // 3 * 4 + 4:
+            raise _too_large(max_bytes)
+        if (header(event, 'content-encoding') or 'identity').strip().lower() != 'identity':
+            raise IntakeError(415, "Compressed multipart bodies are not supported")
+        from prpm_attachments import parse_multipart
+        return parse_multipart(event, content_type_header)
+
+    data = body
+    if event.get('isBase64Encoded'):
+        data = _decode_base64(body, max_bytes)
+        if len(data) > max_bytes:
+            raise _too_large(max_bytes)
+
+    encoding = (header(event, 'content-encoding') or 'identity').strip().lower()
+    if encoding in ('gzip', 'x-gzip', 'deflate'):
+        if isinstance(data, str):
+            raise IntakeError(400, "Compressed request bodies must be base64-encoded")
+        data = _decompress(data, encoding, max_bytes)
+    elif encoding != 'identity':
+        raise IntakeError(415, f"Unsupported Content-Encoding: {encoding}")
+
+    if content_type == FORM_URLENCODED:
+        return _parse_form(data)
+
+    try:
+        return loads(data)
+    except UnicodeDecodeError:
+        raise IntakeError(400, "Request body must be UTF-8 encoded")
+    except RecursionError:
+        raise IntakeError(400, "Request body is nested too deeply")
@@ -0,0 +1,148 @@
+import contextvars
+import functools
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+from prpm_codec import compact_dumps, dumps
+
+# CloudWatch Embedded Metric Format settings
+NAMESPACE = os.environ.get('PRPM_METRICS_NAMESPACE', 'PaxRiverPM/Forms')
+DIMENSIONS = ['FormType', 'StartType']
+
+# SMTP session timing keys mapped to metric phase names
+SMTP_PHASES = {
+    'ssl_context_ms': 'SslContext',
+    'connect_ms': 'Connect',
+    'starttls_ms': 'StartTls',
+    'login_ms': 'Login',
+    'noop_ms': 'Noop',
+    'send_ms': 'Send',
+    'backoff_ms': 'RetryBackoff',
+}
+
+_cold_start = True
+_current: contextvars.ContextVar = contextvars.ContextVar('prpm_metrics', default=None)
+
+
+def metrics_enabled() -> bool:
+    """Return False when PRPM_METRICS is set to 0/false."""
+    return os.environ.get('PRPM_METRICS', '1').lower() not in ('0', 'false', 'no')
+
+
+class InvocationMetrics:
+    """Phase timings and properties for one handler invocation."""
+
+    def __init__(self, form_type: str):
+        global _cold_start
+        self.form_type = form_type
+        self.start_type = 'cold' if _cold_start else 'warm'
+        _cold_start = False
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.properties: Dict[str, Any] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block and add it to the named phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def add(self, name: str, milliseconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + milliseconds
+
+    def record_smtp(self, timings: Dict[str, Any]) -> None:
+        """Copy the SMTP session's last per-phase timings into this invocation."""
+        for key, name in SMTP_PHASES.items():
+            if key in timings:
+                self.add(name, timings[key])
+        if 'reused' in timings:
+            self.properties['SmtpSessionReused'] = timings['reused']
+        if 'tls_session_reused' in timings:
+            self.properties['TlsSessionReused'] = timings['tls_session_reused']
+        if 'circuit' in timings:
+            self.properties['SmtpCircuit'] = timings['circuit']
+        if 'endpoint' in timings:
+            self.properties['SmtpEndpoint'] = timings['endpoint']
+        if 'attempts' in timings:
+            self.properties['SmtpAttempts'] = timings['attempts']
+
+    def to_emf(self, status_code: Optional[int]) -> Dict[str, Any]:
+        """Build the Embedded Metric Format record for this invocation."""
+        total_ms = (time.perf_counter() - self.started) * 1000
+        values = {f"{name}Ms": round(ms, 3) for name, ms in self.phases.items()}
+        values['TotalMs'] = round(total_ms, 3)
+        return {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [{
+                    "Namespace": NAMESPACE,
+                    "Dimensions": [DIMENSIONS],
+                    "Metrics": [{"Name": name, "Unit": "Milliseconds"} for name in values],
+                }],
+            },
+            "FormType": self.form_type,
+            "StartType": self.start_type,
+            "StatusCode": status_code,
+            **self.properties,
+            **values,
+        }
+
+    def emit(self, status_code: Optional[int]) -> None:
+        """Print the EMF record; CloudWatch Logs extracts the metrics from stdout."""
+        # A cold start's record uses the stdlib encoder, leaving the fast backend to warm invocations
+        print((compact_dumps if self.start_type == 'cold' else dumps)(self.to_emf(status_code)))
+
+
+def current() -> Optional[InvocationMetrics]:
+    """Return the metrics of the invocation in progress, if any."""
+    return _current.get()
+
+
+@contextmanager
+def phase(name: str):
+    """Time a block into the current invocation's metrics (no-op outside one)."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    with metrics.phase(name):
+        yield
+
+
+def record_smtp(timings: Dict[str, Any]) -> None:
+    """Record SMTP session timings into the current invocation's metrics."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.record_smtp(timings)
+
+
+def set_property(name: str, value: Any) -> None:
+    """Attach a non-metric property to the current invocation's record."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.properties[name] = value
+
+
+def instrumented(form_type: str):
+    """Decorate a lambda_handler so each invocation emits one EMF metrics record."""
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            if not metrics_enabled():
+                return handler(event, context)
+            metrics = InvocationMetrics(form_type)
+            token = _current.set(metrics)
+            response = None
+            try:
+                response = handler(event, context)
+                return response
+            finally:
+                _current.reset(token)
+                metrics.emit(response.get('statusCode') if isinstance(response, dict) else None)
+        return wrapper
+    return decorator
@@ -0,0 +1,181 @@
+import contextvars
+import functools
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from prpm_responses import json_response
+
+# Rate limit settings (Lambda environment variables)
+RATE_LIMIT_PER_MINUTE = float(os.environ.get('PRPM_RATE_LIMIT_PER_MINUTE', '10'))
+RATE_LIMIT_BURST = float(os.environ.get('PRPM_RATE_LIMIT_BURST', '5'))
+RATE_LIMIT_MAX_KEYS = int(os.environ.get('PRPM_RATE_LIMIT_MAX_KEYS', '10000'))
+RATE_LIMIT_DB = os.environ.get('PRPM_RATE_LIMIT_DB', '')
+
+# Set while a request that already passed the limiter is being handled, so a
+# routed call is not charged again by the form handler it dispatches to
+_admitted: contextvars.ContextVar = contextvars.ContextVar('prpm_rate_limit_admitted', default=False)
+
+
+def rate_limiting_enabled() -> bool:
+    """Return False when PRPM_RATE_LIMIT is set to 0/false."""
+    return os.environ.get('PRPM_RATE_LIMIT', '1').lower() not in ('0', 'false', 'no')
+
+
+class SharedRateLimitStore:
+    """SQLite-backed token buckets shared by every container that can reach the file."""
+
+    def __init__(self, path: str, cleanup_every: int = 1000):
+        import sqlite3
+
+        self.path = path
+        self.cleanup_every = cleanup_every
+        self._calls = 0
+        self._db = sqlite3.connect(path, timeout=5, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit ("
+            " key TEXT PRIMARY KEY,"
+            " tokens REAL NOT NULL,"
+            " updated REAL NOT NULL)"
+        )
+
+    def acquire(self, key: str, rate: float, burst: float, cost: float) -> Tuple[bool, float]:
+        """Refill and charge one bucket inside a write transaction."""
+        now = time.time()
+        db = self._db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT tokens, updated FROM rate_limit WHERE key = ?", (key,)).fetchone()
+            tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+            allowed = tokens >= min(cost, burst)
+            if allowed:
+                tokens -= cost
+            db.execute("INSERT OR REPLACE INTO rate_limit (key, tokens, updated) VALUES (?, ?, ?)",
+                       (key, tokens, now))
+            self._calls += 1
+            if self._calls % self.cleanup_every == 0:
+                # A bucket idle long enough to be full again carries no state
+                db.execute("DELETE FROM rate_limit WHERE tokens + (? - updated) * ? >= ?", (now, rate, burst))
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return allowed, 0.0 if allowed else (min(cost, burst) - tokens) / rate
+
+
+class TokenBucketLimiter:
+    """
+    Per-key token buckets: `burst` requests at once, refilled at `rate` per second.
+
+    A charge larger than `burst` (a batch of submissions) is admitted from
+    a full bucket and leaves it in debt, so the key waits until the whole
+    cost has been refilled. Buckets live in an LRU bounded to `max_keys`;
+    evicting a bucket only forgets how much of its burst a key has used. With a shared store the
+    store is authoritative and nothing is kept in process.
+    """
+
+    def __init__(self, rate: float = RATE_LIMIT_PER_MINUTE / 60, burst: float = RATE_LIMIT_BURST,
+                 max_keys: int = RATE_LIMIT_MAX_KEYS, store: Optional[SharedRateLimitStore] = None):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.store = store
+        self._buckets: 'OrderedDict[str, list]' = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+
+    def acquire(self, key: str, cost: float = 1.0) -> Tuple[bool, float]:
+        """Take `cost` tokens from key's bucket; returns (allowed, seconds until it would be)."""
+        if self.store is not None:
+            allowed, retry_after = self.store.acquire(key, self.rate, self.burst, cost)
+        else:
+            now = time.monotonic()
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.burst, now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            allowed = bucket[0] >= min(cost, self.burst)
+            if allowed:
+                bucket[0] -= cost
+            retry_after = 0.0 if allowed else (min(cost, self.burst) - bucket[0]) / self.rate
+
+        if allowed:
+            self.allowed += 1
+        else:
+            self.limited += 1
+        return allowed, retry_after
+
+
+_LIMITER: Optional[TokenBucketLimiter] = None
+
+
+def get_rate_limiter() -> TokenBucketLimiter:
+    """Return the process-wide limiter, backed by PRPM_RATE_LIMIT_DB when it is set."""
+    global _LIMITER
+    if _LIMITER is None:
+        store = SharedRateLimitStore(RATE_LIMIT_DB) if RATE_LIMIT_DB else None
+        _LIMITER = TokenBucketLimiter(store=store)
+    return _LIMITER
+
+
+def source_ip(event: Dict[str, Any]) -> Optional[str]:
+    """Return the caller's IP from an API Gateway REST (v1) or HTTP API (v2) event."""
+    request_context = event.get('requestContext') or {}
+    identity = request_context.get('identity') or request_context.get('http') or {}
+    return identity.get('sourceIp')
+
+
+def too_many_requests(retry_after: float) -> Dict[str, Any]:
+    """Build the 429 response, with Retry-After rounded up to whole seconds."""
+    return json_response(429, {
+        "message": "Too many submissions. Please wait a moment and try again."
+    }, headers={"Retry-After": str(max(1, math.ceil(retry_after)))})
+
+
+def rate_limited(handler):
+    """Decorate a lambda_handler so callers over their limit get a 429 before any other work."""
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        if _admitted.get() or not rate_limiting_enabled():
+            return handler(event, context)
+        key = source_ip(event)
+        if key is not None:
+            allowed, retry_after = get_rate_limiter().acquire(key)
+            if not allowed:
+                print(f"Rate limit exceeded for {key}; retry after {retry_after:.1f} s")
+                return too_many_requests(retry_after)
+        token = _admitted.set(True)
+        try:
+            return handler(event, context)
+        finally:
+            _admitted.reset(token)
+    return wrapper
+
+
+def charge_batch(event: Dict[str, Any], count: int) -> Optional[Dict[str, Any]]:
+    """
+    Charge the caller for the rest of a batch of count submissions.
+
+    rate_limited took one token for the request before its body was read;
+    every further submission in it costs one more, so a batch cannot send
+    more email than the same submissions posted one at a time. Returns the
+    429 response when the caller is over its limit, None otherwise.
+    """
+    if count <= 1 or not rate_limiting_enabled():
+        return None
+    key = source_ip(event)
+    if key is None:
+        return None
+    allowed, retry_after = get_rate_limiter().acquire(key, count - 1)
+    if allowed:
+        return None
+    print(f"Rate limit exceeded for {key} by a batch of {count}; retry after {retry_after:.1f} s")
+    return too_many_requests(retry_after)
@@ -0,0 +1,69 @@
+import math
+from typing import Dict, Any, Optional
+
+from prpm_codec import compact_dumps, dumps
+
+# Headers on every form response
+HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*"
+}
+
+
+def json_response(status_code: int, body: Dict[str, Any],
+                  headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Build an API Gateway proxy response with a JSON body.
+
+    Error bodies (4xx and 5xx) are serialized with the stdlib encoder, so a
+    cold container whose first request is rejected never loads the fast
+    backend; it is used for successful responses only.
+    """
+    return {
+        "statusCode": status_code,
+        "headers": HEADERS if headers is None else {**HEADERS, **headers},
+        "body": dumps(body) if status_code < 400 else compact_dumps(body)
+    }
+
+
+def static_response(status_code: int, body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a constant response once, at import time.
+
+    Serialized with the stdlib encoder so importing a handler does not load
+    the fast backend. The returned dict is handed out as-is on every
+    invocation, so it must never be mutated; copy it first (as
+    prpm_idempotency.replayed does).
+    """
+    return {
+        "statusCode": status_code,
+        "headers": HEADERS,
+        "body": compact_dumps(body)
+    }
+
+
+# Responses shared by every form handler
+CONFIG_ERROR_RESPONSE = static_response(500, {
+    "message": "Server configuration error. Please contact support.",
+    "error": "SMTP credentials missing"
+})
+MISSING_BODY_RESPONSE = static_response(400, {
+    "message": "Request body is missing",
+    "errors": {}
+})
+SMTP_ERROR_RESPONSE = static_response(500, {
+    "message": "Failed to send email. Please try again later.",
+    "error": "SMTP error"
+})
+UNEXPECTED_ERROR_RESPONSE = static_response(500, {
+    "message": "An unexpected error occurred. Please try again later.",
+    "error": "Internal server error"
+})
+
+
+def service_unavailable(retry_after: float) -> Dict[str, Any]:
+    """Build the 503 returned while the mail server's circuit is open."""
+    return json_response(503, {
+        "message": "Email service is temporarily unavailable. Please try again later.",
+        "error": "SMTP unavailable"
+    }, headers={"Retry-After": str(max(1, math.ceil(retry_after)))})
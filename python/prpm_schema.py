@@ -0,0 +1,138 @@
+import re
+from typing import Dict, Any, Tuple, Callable, Iterable, Optional, Pattern, Sequence, Union
+
+
+class Field:
+    """Declarative description of one form field."""
+
+    __slots__ = ('name', 'label', 'required', 'max_length', 'pattern', 'error',
+                 'choices', 'lower', 'min_value', 'max_value', 'numeric', 'check')
+
+    def __init__(self, name: str, label: str, required: bool = True, max_length: Optional[int] = None,
+                 pattern: Union[str, Pattern, None] = None, error: Optional[str] = None,
+                 choices: Optional[Sequence[str]] = None, lower: bool = False,
+                 min_value: Optional[int] = None, max_value: Optional[int] = None,
+                 check: Optional[Callable[[str], Any]] = None):
+        self.name = name
+        self.label = label
+        self.required = required
+        self.max_length = max_length
+        self.pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        self.error = error
+        self.choices = tuple(choices) if choices is not None else None
+        self.lower = lower
+        self.min_value = min_value
+        self.max_value = max_value
+        self.numeric = min_value is not None or max_value is not None
+        self.check = check
+
+
+class FormSchema:
+    """
+    A set of fields compiled into a single-pass validator.
+
+    Every value is fetched and stripped exactly once; all error messages are
+    built at compile time so a passing submission allocates nothing but the
+    empty error dict.
+    """
+
+    def __init__(self, fields: Iterable[Field], max_length: int):
+        self.fields = tuple(fields)
+        self.max_length = max_length
+        self._plan = tuple(self._compile(field) for field in self.fields)
+
+    def _compile(self, field: Field) -> tuple:
+        """Precompute everything a field check needs into a flat tuple."""
+        max_length = field.max_length if field.max_length is not None else self.max_length
+        choices = frozenset(field.choices) if field.choices is not None else None
+        choices_error = None
+        if field.choices is not None:
+            choices_error = f'{field.label} must be one of: {", ".join(field.choices)}'
+        return (
+            field.name,
+            field.required,
+            f"{field.label} is required",
+            field.lower,
+            field.pattern.match if field.pattern is not None else None,
+            field.error or f"{field.label} is invalid",
+            choices,
+            choices_error,
+            field.numeric,
+            field.min_value,
+            field.max_value,
+            f"{field.label} must be a valid number",
+            f"{field.label} must be at least {field.min_value}",
+            f"{field.label} must not exceed {field.max_value}",
+            field.check,
+            max_length,
+            f"{field.label} must not exceed {max_length} characters",
+        )
+
+    def validate(self, body: Dict[str, Any]) -> Tuple[bool, Dict[str, str]]:
+        """Validate a submission and return (is_valid, errors)."""
+        errors = {}
+        get = body.get
+        for (name, required, required_error, lower, match, error, choices, choices_error,
+             numeric, min_value, max_value, number_error, min_error, max_error,
+             check, max_length, length_error) in self._plan:
+            value = get(name)
+            if value is None:
+                value = ''
+            elif not isinstance(value, str):
+                value = str(value)
+            value = value.strip()
+
+            if not value:
+                if required:
+                    errors[name] = required_error
+                continue
+
+            if lower:
+                value = value.lower()
+
+            if match is not None and match(value) is None:
+                errors[name] = error
+            elif choices is not None and value not in choices:
+                errors[name] = choices_error
+            elif numeric:
+                try:
+                    number = int(value)
+                except ValueError:
+                    errors[name] = number_error
+                    continue
+                if min_value is not None and number < min_value:
+                    errors[name] = min_error
+                elif max_value is not None and number > max_value:
+                    errors[name] = max_error
+            elif check is not None:
+                result = check(value)
+                if result is not True:
+                    ok, message = result if isinstance(result, tuple) else (bool(result), error)
+                    if not ok:
+                        errors[name] = message
+                        continue
+                if len(value) > max_length:
+                    errors[name] = length_error
+            elif len(value) > max_length:
+                errors[name] = length_error
+
+        return len(errors) == 0, errors
+
+    __call__ = validate
+
+    def normalize(self, body: Dict[str, Any]) -> Dict[str, str]:
+        """Return the stripped (and, where declared, lower-cased) non-empty values of the schema's fields."""
+        normalized = {}
+        for field in self.fields:
+            value = body.get(field.name)
+            if value is None:
+                continue
+            value = (value if isinstance(value, str) else str(value)).strip()
+            if value:
+                normalized[field.name] = value.lower() if field.lower else value
+        return normalized
+
+
+def compile_schema(fields: Iterable[Field], max_length: int) -> FormSchema:
+    """Compile field declarations into a FormSchema; max_length is the default length limit."""
+    return FormSchema(fields, max_length)
@@ -0,0 +1,404 @@
+import os
+import re
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+from prpm_circuit import CircuitBreaker, CircuitOpenError, get_breaker
+
+# smtplib and ssl are imported on first use: together they cost tens of
+# milliseconds of cold start that requests failing validation never need.
+
+# Seconds a connection may sit idle before it is health-checked with NOOP
+HEALTH_CHECK_INTERVAL = 10.0
+
+# Socket timeouts in seconds (Lambda environment variables): the TCP connect
+# and greeting, each reply during STARTTLS/LOGIN/NOOP, and each socket
+# operation while a message is sent (the reply to DATA can be slow).
+CONNECT_TIMEOUT = float(os.environ.get('PRPM_SMTP_CONNECT_TIMEOUT', '5'))
+READ_TIMEOUT = float(os.environ.get('PRPM_SMTP_READ_TIMEOUT', '10'))
+SEND_TIMEOUT = float(os.environ.get('PRPM_SMTP_SEND_TIMEOUT', '20'))
+
+# Submissions port that speaks TLS from the first byte (RFC 8314)
+IMPLICIT_TLS_PORT = 465
+
+# Lines of a DATA stream that start with a period get a second one (RFC 5321 4.5.2)
+DOT_STUFF_PATTERN = re.compile(rb'^\.', re.MULTILINE)
+
+# Process-wide TLS client context; creating one reloads the CA bundle
+_SSL_CONTEXT = None
+_SSL_CONTEXT_LOCK = threading.Lock()
+TLS_STATS: Dict[str, Any] = {
+    "context_create_ms": 0.0,
+    "context_cache_hits": 0,
+}
+
+
+def get_ssl_context():
+    """
+    Return the cached default SSLContext, creating it on first use.
+
+    Creation is locked: saved TLS sessions can only be resumed on the context
+    that created them, so concurrent sessions must never end up with two.
+    """
+    global _SSL_CONTEXT
+    with _SSL_CONTEXT_LOCK:
+        if _SSL_CONTEXT is None:
+            import ssl
+
+            start = time.perf_counter()
+            _SSL_CONTEXT = ssl.create_default_context()
+            TLS_STATS["context_create_ms"] = (time.perf_counter() - start) * 1000
+        else:
+            TLS_STATS["context_cache_hits"] += 1
+        return _SSL_CONTEXT
+
+
+class _ResumingContext:
+    """Wraps an SSLContext so smtplib's STARTTLS offers a saved TLS session."""
+
+    def __init__(self, context, session):
+        self._context = context
+        self._session = session
+
+    def wrap_socket(self, sock, server_hostname=None, **kwargs):
+        return self._context.wrap_socket(sock, server_hostname=server_hostname,
+                                         session=self._session, **kwargs)
+
+
+class SMTPSessionManager:
+    """
+    Keeps one authenticated SMTP connection open across warm Lambda invocations.
+
+    The connection is created lazily on the first send, reused while it is
+    healthy, and transparently re-established when the server drops it.
+    Every socket operation has a timeout, and when a breaker is given,
+    sends are refused outright while the server's circuit is open.
+    Port 465 (or implicit_tls=True) connects with implicit TLS instead of
+    STARTTLS.
+    """
+
+    def __init__(self, server: str, port: int, username: str, password: str,
+                 health_check_interval: float = HEALTH_CHECK_INTERVAL,
+                 connect_timeout: float = CONNECT_TIMEOUT, read_timeout: float = READ_TIMEOUT,
+                 send_timeout: float = SEND_TIMEOUT, breaker: Optional[CircuitBreaker] = None,
+                 implicit_tls: Optional[bool] = None):
+        self.server = server
+        self.port = port
+        self.implicit_tls = port == IMPLICIT_TLS_PORT if implicit_tls is None else implicit_tls
+        self.username = username
+        self.password = password
+        self.health_check_interval = health_check_interval
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.send_timeout = send_timeout
+        self.breaker = breaker
+        self._connection: Optional['smtplib.SMTP'] = None
+        self._last_used = 0.0
+        self._tls_session = None
+        self.last_timings: Dict[str, Any] = {}
+        self.stats: Dict[str, Any] = {
+            "connects": 0,
+            "reuses": 0,
+            "reconnects": 0,
+            "connect_ms_total": 0.0,
+            "tls_full_handshakes": 0,
+            "tls_full_handshake_ms_total": 0.0,
+            "tls_resumptions": 0,
+            "tls_resumed_handshake_ms_total": 0.0,
+        }
+
+    def _connect(self) -> 'smtplib.SMTP':
+        """
+        Open a new connection, secure it (resuming the last TLS session) and LOGIN.
+
+        With implicit TLS the handshake is part of the connect, so
+        connect_ms covers both and starttls_ms is not reported.
+        """
+        import smtplib
+
+        timings = self.last_timings
+        start = time.perf_counter()
+        if self.implicit_tls:
+            context = self._tls_context()
+            context_ready = time.perf_counter()
+            server = smtplib.SMTP_SSL(self.server, self.port, timeout=self.connect_timeout, context=context)
+            connected = secured = time.perf_counter()
+        else:
+            server = smtplib.SMTP(self.server, self.port, timeout=self.connect_timeout)
+            connected = time.perf_counter()
+        # A failed STARTTLS or LOGIN must not leave the socket open in a warm container
+        try:
+            if not self.implicit_tls:
+                server.sock.settimeout(self.read_timeout)
+                context = self._tls_context()
+                context_ready = time.perf_counter()
+                server.starttls(context=context)
+                secured = time.perf_counter()
+            server.sock.settimeout(self.read_timeout)
+            server.login(self.username, self.password)
+            logged_in = time.perf_counter()
+        except BaseException:
+            server.close()
+            raise
+
+        # TLS 1.3 session tickets arrive after the handshake, so the session is
+        # only worth saving once LOGIN has read from the encrypted socket.
+        self._tls_session = server.sock.session
+        resumed = server.sock.session_reused
+        handshake_ms = (secured - context_ready) * 1000
+        if resumed:
+            self.stats["tls_resumptions"] += 1
+            self.stats["tls_resumed_handshake_ms_total"] += handshake_ms
+        else:
+            self.stats["tls_full_handshakes"] += 1
+            self.stats["tls_full_handshake_ms_total"] += handshake_ms
+
+        if self.implicit_tls:
+            timings["ssl_context_ms"] = (context_ready - start) * 1000
+            timings["connect_ms"] = handshake_ms
+        else:
+            timings["connect_ms"] = (connected - start) * 1000
+            timings["ssl_context_ms"] = (context_ready - connected) * 1000
+            timings["starttls_ms"] = handshake_ms
+        timings["tls_session_reused"] = resumed
+        timings["login_ms"] = (logged_in - secured) * 1000
+        setup_ms = (logged_in - start) * 1000
+        timings["setup_ms"] = setup_ms
+        self.stats["connects"] += 1
+        self.stats["connect_ms_total"] += setup_ms
+        return server
+
+    def _tls_context(self):
+        """Return the shared SSL context, offering the last TLS session when there is one."""
+        context = get_ssl_context()
+        if self._tls_session is not None:
+            return _ResumingContext(context, self._tls_session)
+        return context
+
+    def _is_healthy(self, server: 'smtplib.SMTP') -> bool:
+        """Check a pooled connection with NOOP."""
+        import smtplib
+
+        start = time.perf_counter()
+        try:
+            server.sock.settimeout(self.read_timeout)
+            code, _ = server.noop()
+        except (smtplib.SMTPException, OSError):
+            return False
+        finally:
+            self.last_timings["noop_ms"] = (time.perf_counter() - start) * 1000
+        return code == 250
+
+    def get_connection(self) -> 'smtplib.SMTP':
+        """Return an authenticated connection, reusing the pooled one when healthy."""
+        self.last_timings = {"reused": False}
+        server = self._connection
+        if server is not None:
+            idle = time.monotonic() - self._last_used
+            if idle < self.health_check_interval or self._is_healthy(server):
+                self.last_timings["reused"] = True
+                self.stats["reuses"] += 1
+                return server
+            self.stats["reconnects"] += 1
+            self.close()
+
+        self._connection = self._connect()
+        return self._connection
+
+    def send_message(self, msg) -> None:
+        """
+        Send a message, failing fast with CircuitOpenError while the circuit is open.
+
+        A socket timeout is raised as SMTPServerDisconnected, so callers see
+        it as the SMTP failure it is. Timeouts, dropped connections and
+        4xx/auth replies count against the breaker; any other reply shows
+        the server is up and resets it.
+        """
+        import smtplib
+        import socket
+
+        breaker = self.breaker
+        self.last_timings = {}
+        try:
+            if breaker is not None:
+                breaker.check()
+            try:
+                self._send(msg)
+            except socket.timeout as e:
+                self.close()
+                raise smtplib.SMTPServerDisconnected(
+                    f"Timed out talking to {self.server}:{self.port}: {str(e)}") from e
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            if breaker is not None:
+                if is_outage(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            raise
+        else:
+            if breaker is not None:
+                breaker.record_success()
+        finally:
+            if breaker is not None:
+                self.last_timings["circuit"] = breaker.state
+
+    def _send(self, msg) -> None:
+        """Send a message over the pooled connection, reconnecting once if it was dropped."""
+        import smtplib
+
+        server = self.get_connection()
+        reused = self.last_timings["reused"]
+        start = time.perf_counter()
+        try:
+            server.sock.settimeout(self.send_timeout)
+            transmit(server, msg)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            # The server closed an idle session between the health check and
+            # the send; a fresh connection is the only way forward.
+            self.close()
+            if not reused:
+                raise
+            self.stats["reconnects"] += 1
+            server = self.get_connection()
+            start = time.perf_counter()
+            server.sock.settimeout(self.send_timeout)
+            transmit(server, msg)
+        except smtplib.SMTPException:
+            # Protocol-level failures leave the session in an unknown state
+            self.close()
+            raise
+        self.last_timings["send_ms"] = (time.perf_counter() - start) * 1000
+        self._last_used = time.monotonic()
+
+    def close(self) -> None:
+        """Close the pooled connection, ignoring errors from an already dead socket."""
+        server, self._connection = self._connection, None
+        if server is None:
+            return
+        import smtplib
+
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def summary(self) -> Dict[str, Any]:
+        """Return connection statistics, including the latency saved by warm reuse."""
+        stats = self.stats
+        connects = stats["connects"]
+        avg_setup_ms = stats["connect_ms_total"] / connects if connects else 0.0
+        full = stats["tls_full_handshakes"]
+        resumed = stats["tls_resumptions"]
+        return {
+            **stats,
+            "avg_setup_ms": round(avg_setup_ms, 2),
+            "estimated_saved_ms": round(avg_setup_ms * stats["reuses"], 2),
+            "avg_full_handshake_ms": round(stats["tls_full_handshake_ms_total"] / full, 2) if full else None,
+            "avg_resumed_handshake_ms": round(stats["tls_resumed_handshake_ms_total"] / resumed, 2) if resumed else None,
+            "ssl_context_create_ms": round(TLS_STATS["context_create_ms"], 2),
+            "ssl_context_cache_hits": TLS_STATS["context_cache_hits"],
+        }
+
+
+def transmit(server, msg) -> None:
+    """Send msg over a connected smtplib.SMTP, streaming it when it produces its body in chunks."""
+    if hasattr(msg, 'iter_chunks'):
+        send_streaming(server, msg)
+    else:
+        server.send_message(msg)
+
+
+def send_streaming(server, msg) -> None:
+    """
+    Send a message chunk by chunk (see prpm_attachments.StreamingMessage).
+
+    The same MAIL/RCPT/DATA exchange smtplib.send_message makes, but each
+    chunk of CRLF-terminated lines is dot-stuffed and written to the socket
+    as it is produced, instead of the whole message being flattened,
+    line-ending-fixed and dot-stuffed as separate full copies first. The
+    message size is declared up front so a server that will refuse it does
+    so before the body is sent.
+    """
+    import smtplib
+
+    server.ehlo_or_helo_if_needed()
+    options = [f"SIZE={msg.size}"] if server.has_extn('size') else []
+    code, reply = server.mail(msg.from_addr, options)
+    if code != 250:
+        raise smtplib.SMTPSenderRefused(code, reply, msg.from_addr)
+    refused = {}
+    for address in msg.to_addrs:
+        code, reply = server.rcpt(address)
+        if code not in (250, 251):
+            refused[address] = (code, reply)
+    if len(refused) == len(msg.to_addrs):
+        raise smtplib.SMTPRecipientsRefused(refused)
+
+    server.putcmd('data')
+    code, reply = server.getreply()
+    if code != 354:
+        raise smtplib.SMTPDataError(code, reply)
+    last = b'\r\n'
+    for chunk in msg.iter_chunks():
+        if chunk:
+            server.send(DOT_STUFF_PATTERN.sub(b'..', chunk))
+            last = chunk
+    server.send(b'.\r\n' if last.endswith(b'\r\n') else b'\r\n.\r\n')
+    code, reply = server.getreply()
+    if code != 250:
+        raise smtplib.SMTPDataError(code, reply)
+
+
+def is_outage(error: Exception) -> bool:
+    """Return True for failures that say the server is unreachable or refusing all mail."""
+    import smtplib
+
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError,
+                          smtplib.SMTPAuthenticationError)):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    # SMTPException subclasses OSError; the rest (refused recipients and
+    # the like) are about one message, not the server
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+def smtp_breaker(server: str, port: int) -> CircuitBreaker:
+    """Return the breaker shared by every session to this server."""
+    return get_breaker(f"{server}:{port}")
+
+
+_SESSIONS: Dict[Tuple[str, int, str, str], SMTPSessionManager] = {}
+
+
+def get_session(server: str, port: int, username: str, password: str,
+                channel: str = 'notification', implicit_tls: Optional[bool] = None) -> SMTPSessionManager:
+    """
+    Return the process-wide session manager for the given server and account.
+
+    Each channel gets its own connection, so messages on different channels
+    (e.g. the internal notification and the submitter acknowledgement) can be
+    sent concurrently from different threads.
+    """
+    key = (server, port, username, channel)
+    session = _SESSIONS.get(key)
+    if session is None or session.password != password:
+        session = SMTPSessionManager(server, port, username, password,
+                                     breaker=smtp_breaker(server, port), implicit_tls=implicit_tls)
+        _SESSIONS[key] = session
+    return session
+
+
+def smtp_exception_type() -> type:
+    """
+    Return smtplib.SMTPException, importing smtplib only when called.
+
+    Handlers use this as `except smtp_exception_type() as e:`; the expression
+    is evaluated only when an exception reaches that clause, so requests that
+    fail validation never pay for the import.
+    """
+    import smtplib
+    return smtplib.SMTPException
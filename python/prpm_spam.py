@@ -0,0 +1,217 @@
+import os
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+# Spam screening settings (Lambda environment variables)
+FORM_TOKEN_SECRET = os.environ.get('PRPM_FORM_TOKEN_SECRET', '')
+QUARANTINE_SCORE = float(os.environ.get('PRPM_SPAM_QUARANTINE_SCORE', '5'))
+DROP_SCORE = float(os.environ.get('PRPM_SPAM_DROP_SCORE', '10'))
+MIN_FILL_SECONDS = float(os.environ.get('PRPM_MIN_FILL_SECONDS', '3'))
+FORM_TOKEN_TTL = int(os.environ.get('PRPM_FORM_TOKEN_TTL', '86400'))
+EXTRA_KEYWORDS = os.environ.get('PRPM_SPAM_KEYWORDS', '')
+HONEYPOT_FIELD = 'url'
+TOKEN_FIELD = 'formToken'
+
+# Free-text fields scanned for links and spam phrases
+TEXT_FIELDS = ('message', 'specialRequirements', 'communityAmenities')
+ALLOWED_LINKS = 1
+
+# What each signal adds to the score
+HONEYPOT_WEIGHT = 10.0
+MISSING_TOKEN_WEIGHT = 3.0
+BAD_TOKEN_WEIGHT = 5.0
+TOO_FAST_WEIGHT = 5.0
+LINK_WEIGHT = 1.5
+MARKUP_LINK_WEIGHT = 4.0
+DEFAULT_KEYWORD_WEIGHT = 2.0
+
+# Phrases bots send to contact forms, with their weights; matching is
+# case-insensitive, on whole words, and ignores punctuation
+SPAM_KEYWORDS = {
+    'seo services': 3, 'seo expert': 3, 'backlinks': 3, 'guest post': 3, 'first page of google': 4,
+    'rank your website': 4, 'increase your traffic': 3, 'website traffic': 2, 'web design services': 2,
+    'digital marketing': 1, 'lead generation': 1, 'domain authority': 3, 'link building': 3,
+    'bitcoin': 3, 'crypto': 2, 'cryptocurrency': 3, 'forex': 3, 'binary options': 4, 'investment opportunity': 3,
+    'casino': 4, 'betting': 2, 'viagra': 5, 'cialis': 5, 'porn': 5, 'escort': 4, 'dating site': 4,
+    'loan offer': 4, 'payday loan': 4, 'quick loan': 3, 'credit repair': 2, 'work from home': 2,
+    'make money': 3, 'earn money': 3, 'buy followers': 4, 'instagram followers': 3,
+    'whatsapp': 2, 'telegram': 2, 'click here': 2, 'unsubscribe': 2, 'limited time offer': 2,
+    'dear sir': 2, 'congratulations you': 3, 'you have won': 4, 'wire transfer': 2,
+    'virtual assistant': 1, 'outsourcing': 1, 'chatgpt': 1, 'ai chatbot': 2, 'free trial': 1,
+}
+
+
+class SpamVerdict:
+    """A screened submission's score, the signals behind it and what to do with it."""
+
+    __slots__ = ('score', 'reasons', 'action')
+
+    def __init__(self, score: float, reasons: List[str], action: Optional[str]):
+        self.score = score
+        self.reasons = reasons
+        self.action = action
+
+    def describe(self) -> str:
+        return f"score {self.score:g} ({', '.join(self.reasons) or 'no signals'})"
+
+
+def _sign(message: str) -> str:
+    import base64
+    import hashlib
+    import hmac
+
+    digest = hmac.new(FORM_TOKEN_SECRET.encode('utf-8'), message.encode('utf-8'), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:16]).rstrip(b'=').decode('ascii')
+
+
+def issue_form_token(form_type: str, now: Optional[float] = None) -> str:
+    """Return a token recording when the form was rendered, signed with PRPM_FORM_TOKEN_SECRET."""
+    message = f"{form_type}.{int(time.time() if now is None else now)}"
+    return f"{message}.{_sign(message)}"
+
+
+def token_age(token: Any, form_type: str) -> Optional[float]:
+    """Return seconds since a valid token was issued for this form, or None if it is forged or malformed."""
+    import hmac
+
+    if not isinstance(token, str):
+        return None
+    message, _, signature = token.rpartition('.')
+    token_form, _, issued = message.rpartition('.')
+    if token_form != form_type or not issued.isdigit() or not hmac.compare_digest(signature, _sign(message)):
+        return None
+    return time.time() - int(issued)
+
+
+class KeywordMatcher:
+    """
+    Finds which of a list of phrases occur in a text as whole words.
+
+    Phrases are indexed by their first word. A text is lower-cased, its
+    punctuation turned into spaces and split into words; one set
+    intersection with the index finds the few phrases that could occur, and
+    only those are confirmed with a substring search. Every pass runs in C,
+    which is what makes this faster than an Aho-Corasick automaton stepped
+    a character at a time in Python (see benchmarks/bench_spam.py).
+    """
+
+    def __init__(self, weights: Dict[str, float]):
+        import string
+
+        self._table = str.maketrans({char: ' ' for char in string.punctuation if char != "'"})
+        self.weights = {}
+        self._index = {}
+        for phrase, weight in weights.items():
+            words = self.words(phrase)
+            if words:
+                self.weights[' '.join(words)] = weight
+                self._index.setdefault(words[0], []).append(f" {' '.join(words)} ")
+        self._first_words = frozenset(self._index)
+
+    def words(self, text: str) -> List[str]:
+        """Split text into lower-case words, the way phrases are matched."""
+        return text.lower().translate(self._table).split()
+
+    def matches(self, text: str) -> List[str]:
+        """Return the phrases found in text, sorted."""
+        words = self.words(text)
+        candidates = self._first_words.intersection(words)
+        if not candidates:
+            return []
+        padded = f" {' '.join(words)} "
+        return sorted(phrase[1:-1] for word in candidates for phrase in self._index[word] if phrase in padded)
+
+
+_MATCHER: Optional[KeywordMatcher] = None
+
+
+def keyword_matcher() -> KeywordMatcher:
+    """Return the spam phrase matcher, built on first use to keep it off the import path."""
+    global _MATCHER
+    if _MATCHER is None:
+        weights = dict(SPAM_KEYWORDS)
+        for phrase in EXTRA_KEYWORDS.split(','):
+            if phrase.strip():
+                weights[phrase.strip()] = DEFAULT_KEYWORD_WEIGHT
+        _MATCHER = KeywordMatcher(weights)
+    return _MATCHER
+
+
+def count_links(text: str) -> Tuple[int, int]:
+    """Return the number of links in text and how many of them are HTML or BBCode markup."""
+    text = text.lower()
+    links = text.count('://') + text.count('www.') - text.count('://www.')
+    return links, text.count('[url') + text.count('<a ')
+
+
+def screen(form_type: str, body: Dict[str, Any]) -> SpamVerdict:
+    """
+    Score a validated submission for bot and spam signals.
+
+    A filled honeypot field settles it on its own. Otherwise the render token
+    (when PRPM_FORM_TOKEN_SECRET is set) must be valid and older than
+    MIN_FILL_SECONDS, and the free-text fields are checked for links beyond
+    ALLOWED_LINKS, BBCode/HTML links and spam phrases. The action is 'drop'
+    at DROP_SCORE, 'quarantine' at QUARANTINE_SCORE and None below that.
+    """
+    honeypot = body.get(HONEYPOT_FIELD)
+    if honeypot and str(honeypot).strip():
+        return SpamVerdict(HONEYPOT_WEIGHT, ['honeypot'], _action(HONEYPOT_WEIGHT))
+
+    score = 0.0
+    reasons = []
+    if FORM_TOKEN_SECRET:
+        token = body.get(TOKEN_FIELD)
+        age = token_age(token, form_type) if token else None
+        if not token:
+            score += MISSING_TOKEN_WEIGHT
+            reasons.append('no form token')
+        elif age is None or age > FORM_TOKEN_TTL:
+            score += BAD_TOKEN_WEIGHT
+            reasons.append('invalid form token')
+        elif age < MIN_FILL_SECONDS:
+            score += TOO_FAST_WEIGHT
+            reasons.append(f'filled in {max(age, 0):.1f} s')
+
+    texts = [value for value in (body.get(name) for name in TEXT_FIELDS) if isinstance(value, str) and value]
+    if texts:
+        links = markup = 0
+        for text in texts:
+            found, tagged = count_links(text)
+            links += found
+            markup += tagged
+        if links > ALLOWED_LINKS:
+            score += LINK_WEIGHT * (links - ALLOWED_LINKS)
+            reasons.append(f'{links} links')
+        if markup:
+            score += MARKUP_LINK_WEIGHT
+            reasons.append('markup links')
+        matcher = keyword_matcher()
+        for phrase in sorted({phrase for text in texts for phrase in matcher.matches(text)}):
+            score += matcher.weights[phrase]
+            reasons.append(repr(phrase))
+
+    return SpamVerdict(score, reasons, _action(score))
+
+
+def _action(score: float) -> Optional[str]:
+    if score >= DROP_SCORE:
+        return 'drop'
+    if score >= QUARANTINE_SCORE:
+        return 'quarantine'
+    return None
+
+
+def quarantine(form_type: str, title: str, content: str, verdict: SpamVerdict) -> bool:
+    """
+    Hold a suspected spam submission for the quarantine digest instead of emailing it on its own.
+
+    Returns False when there is no digest buffer to hold it in (SQLite inside
+    Lambda), so the caller delivers it as usual rather than lose it.
+    """
+    from prpm_digest import QUARANTINE_FORM, digest_configured, get_digest_buffer
+
+    if not digest_configured():
+        return False
+    get_digest_buffer().add(QUARANTINE_FORM, f"[{form_type}, {verdict.describe()}] {title}", content)
+    return True
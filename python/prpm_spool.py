@@ -0,0 +1,300 @@
+import json
+import os
+import time
+from typing import Dict, Any, List, Optional
+
+# Spool settings (Lambda environment variables). In AWS the spool must be the
+# SQS queue: the SQLite file in /tmp belongs to one container, so the drain
+# function would never see it. SQLite is a stand-in for local runs only.
+SPOOL_PATH = os.environ.get('PRPM_SPOOL_PATH', '/tmp/prpm-spool.sqlite3')
+SPOOL_QUEUE_URL = os.environ.get('PRPM_SPOOL_QUEUE_URL', '')
+SPOOL_DLQ_URL = os.environ.get('PRPM_SPOOL_DLQ_URL', '')
+MAX_ATTEMPTS = int(os.environ.get('PRPM_SPOOL_MAX_ATTEMPTS', '5'))
+VISIBILITY_TIMEOUT = 60
+RETRY_BASE_DELAY = 30
+
+# SMTP reply codes that will never succeed on retry
+PERMANENT_SMTP_CODES = range(500, 600)
+
+# Largest message body SQS accepts
+SQS_MAX_MESSAGE_BYTES = 256 * 1024
+
+
+class MessageTooLargeError(Exception):
+    """Raised when a message is too large for the spool's queue (attachments can be)."""
+
+
+def running_in_lambda() -> bool:
+    """Return True inside the AWS Lambda runtime, where /tmp is private to one container."""
+    return bool(os.environ.get('AWS_LAMBDA_FUNCTION_NAME'))
+
+
+def spool_configured() -> bool:
+    """Return True when the spool is one the drain function can read: SQS, or SQLite outside Lambda."""
+    if SPOOL_QUEUE_URL or not running_in_lambda():
+        return True
+    print("Configuration error: PRPM_SPOOL_QUEUE_URL must be set to spool in AWS Lambda; "
+          "the SQLite spool is for local runs only")
+    return False
+
+
+def spool_mode_enabled() -> bool:
+    """Return True when handlers should spool submissions instead of sending inline (and the spool is usable)."""
+    return os.environ.get('PRPM_SPOOL_MODE', '').lower() in ('1', 'true', 'yes') and spool_configured()
+
+
+def spool_fallback_enabled() -> bool:
+    """Return True when PRPM_SMTP_FALLBACK=spool (and the spool is usable): spool while the SMTP circuit is open."""
+    return os.environ.get('PRPM_SMTP_FALLBACK', '').lower() == 'spool' and spool_configured()
+
+
+class SpooledMessage:
+    """A message claimed from the spool, invisible to other drainers until released."""
+
+    __slots__ = ('id', 'form_type', 'message', 'attempts')
+
+    def __init__(self, id: Any, form_type: str, message: bytes, attempts: int):
+        self.id = id
+        self.form_type = form_type
+        self.message = message
+        self.attempts = attempts
+
+
+class SubmissionSpool:
+    """
+    Durable SQLite-backed queue with SQS-style semantics.
+
+    Received messages stay hidden for a visibility timeout and reappear unless
+    they are deleted; messages that keep failing are moved to the dead state
+    instead of being retried forever. Serves as the local stand-in for SQS.
+    """
+
+    def __init__(self, path: str = SPOOL_PATH, max_attempts: int = MAX_ATTEMPTS):
+        import sqlite3
+
+        self.path = path
+        self.max_attempts = max_attempts
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS spool ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " form_type TEXT NOT NULL,"
+            " message BLOB NOT NULL,"
+            " enqueued_at REAL NOT NULL,"
+            " visible_at REAL NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " status TEXT NOT NULL DEFAULT 'pending',"
+            " last_error TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS spool_ready ON spool (status, visible_at)")
+
+    def enqueue(self, form_type: str, message: bytes) -> int:
+        """Persist a message and return its spool id."""
+        now = time.time()
+        cursor = self._db.execute(
+            "INSERT INTO spool (form_type, message, enqueued_at, visible_at) VALUES (?, ?, ?, ?)",
+            (form_type, message, now, now),
+        )
+        return cursor.lastrowid
+
+    def receive(self, max_messages: int = 10, visibility_timeout: int = VISIBILITY_TIMEOUT) -> List[SpooledMessage]:
+        """Claim up to max_messages ready messages."""
+        now = time.time()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self._db.execute(
+                "SELECT id, form_type, message, attempts FROM spool"
+                " WHERE status = 'pending' AND visible_at <= ? ORDER BY id LIMIT ?",
+                (now, max_messages),
+            ).fetchall()
+            self._db.executemany(
+                "UPDATE spool SET visible_at = ?, attempts = attempts + 1 WHERE id = ?",
+                [(now + visibility_timeout, row[0]) for row in rows],
+            )
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+        return [SpooledMessage(row[0], row[1], row[2], row[3] + 1) for row in rows]
+
+    def delete(self, message: SpooledMessage) -> None:
+        """Remove a successfully delivered message."""
+        self._db.execute("DELETE FROM spool WHERE id = ?", (message.id,))
+
+    def release(self, message: SpooledMessage, error: str, delay: float = 0, poison: bool = False) -> bool:
+        """Return a failed message to the queue; returns True if it was moved to dead instead."""
+        dead = poison or message.attempts >= self.max_attempts
+        if dead:
+            self._db.execute(
+                "UPDATE spool SET status = 'dead', last_error = ? WHERE id = ?",
+                (error, message.id),
+            )
+        else:
+            self._db.execute(
+                "UPDATE spool SET visible_at = ?, last_error = ? WHERE id = ?",
+                (time.time() + delay, error, message.id),
+            )
+        return dead
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of messages per status."""
+        rows = self._db.execute("SELECT status, COUNT(*) FROM spool GROUP BY status").fetchall()
+        return dict(rows)
+
+
+class SQSSpool:
+    """
+    Spool backed by an SQS queue.
+
+    Messages that keep failing reach the queue's redrive DLQ through
+    maxReceiveCount; permanent rejections are moved to dlq_url right away.
+    """
+
+    def __init__(self, queue_url: str, dlq_url: str = SPOOL_DLQ_URL, client=None):
+        if client is None:
+            import boto3
+            client = boto3.client('sqs')
+        self.queue_url = queue_url
+        self.dlq_url = dlq_url
+        self._sqs = client
+
+    def enqueue(self, form_type: str, message: bytes) -> str:
+        """Send a message to the queue and return its SQS message id; raises MessageTooLargeError past 256 KiB."""
+        import base64
+
+        body = json.dumps({
+            "formType": form_type,
+            "message": base64.b64encode(message).decode('ascii'),
+        })
+        if len(body) > SQS_MAX_MESSAGE_BYTES:
+            raise MessageTooLargeError(f"{len(message)}-byte message exceeds the SQS limit once encoded "
+                                       f"({len(body)} of {SQS_MAX_MESSAGE_BYTES} bytes)")
+        response = self._sqs.send_message(QueueUrl=self.queue_url, MessageBody=body)
+        return response['MessageId']
+
+    def receive(self, max_messages: int = 10, visibility_timeout: int = VISIBILITY_TIMEOUT) -> List[SpooledMessage]:
+        """Receive up to max_messages (SQS caps a single receive at 10)."""
+        import base64
+
+        response = self._sqs.receive_message(
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=min(max_messages, 10),
+            VisibilityTimeout=visibility_timeout,
+            AttributeNames=['ApproximateReceiveCount'],
+        )
+        messages = []
+        for item in response.get('Messages', []):
+            attempts = int(item.get('Attributes', {}).get('ApproximateReceiveCount', '1'))
+            try:
+                payload = json.loads(item['Body'])
+                messages.append(SpooledMessage(
+                    item['ReceiptHandle'], payload['formType'],
+                    base64.b64decode(payload['message']), attempts,
+                ))
+            except (ValueError, KeyError) as e:
+                self._dead_letter(item['ReceiptHandle'], item['Body'], f"Unreadable message: {str(e)}")
+        return messages
+
+    def _dead_letter(self, receipt_handle: str, body: str, error: str) -> None:
+        """Move a message to the DLQ (when configured) and remove it from the queue."""
+        print(f"Moving spool message to dead letter queue: {error}")
+        if self.dlq_url:
+            self._sqs.send_message(QueueUrl=self.dlq_url, MessageBody=body,
+                                   MessageAttributes={'error': {'DataType': 'String', 'StringValue': error[:1000]}})
+        self._sqs.delete_message(QueueUrl=self.queue_url, ReceiptHandle=receipt_handle)
+
+    def delete(self, message: SpooledMessage) -> None:
+        """Remove a successfully delivered message."""
+        self._sqs.delete_message(QueueUrl=self.queue_url, ReceiptHandle=message.id)
+
+    def release(self, message: SpooledMessage, error: str, delay: float = 0, poison: bool = False) -> bool:
+        """Make a failed message visible again after delay; poison messages go to the DLQ."""
+        import base64
+
+        if poison:
+            body = json.dumps({
+                "formType": message.form_type,
+                "message": base64.b64encode(message.message).decode('ascii'),
+            })
+            self._dead_letter(message.id, body, error)
+            return True
+        # SQS caps visibility timeouts at 12 hours
+        self._sqs.change_message_visibility(
+            QueueUrl=self.queue_url, ReceiptHandle=message.id, VisibilityTimeout=min(int(delay), 43200),
+        )
+        return False
+
+
+_SPOOL: Optional[Any] = None
+
+
+def get_spool():
+    """Return the process-wide spool: SQS when a queue URL is configured, SQLite otherwise (outside Lambda)."""
+    global _SPOOL
+    if _SPOOL is None:
+        if not spool_configured():
+            raise RuntimeError("PRPM_SPOOL_QUEUE_URL is not configured")
+        _SPOOL = SQSSpool(SPOOL_QUEUE_URL) if SPOOL_QUEUE_URL else SubmissionSpool(SPOOL_PATH)
+    return _SPOOL
+
+
+def _is_permanent_failure(error: Exception) -> bool:
+    """Return True for SMTP rejections that will fail the same way on every retry."""
+    import smtplib
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    code = getattr(error, 'smtp_code', None)
+    return isinstance(error, smtplib.SMTPResponseException) and code in PERMANENT_SMTP_CODES \
+        and not isinstance(error, smtplib.SMTPAuthenticationError)
+
+
+def drain(spool, session, batch_size: int = 10, max_batches: int = 10,
+          visibility_timeout: int = VISIBILITY_TIMEOUT) -> Dict[str, Any]:
+    """
+    Send spooled messages in batches over one SMTP session.
+
+    Transient failures are released with exponential backoff; permanent
+    rejections and unparseable messages are moved aside as poison. When the
+    SMTP circuit is open the rest of the batch is released until it may
+    close, and draining stops.
+    """
+    import smtplib
+    from email import message_from_bytes, policy
+    from prpm_circuit import CircuitOpenError
+
+    summary = {"sent": 0, "retried": 0, "dead": 0}
+    for _ in range(max_batches):
+        batch = spool.receive(batch_size, visibility_timeout)
+        if not batch:
+            break
+        for position, item in enumerate(batch):
+            try:
+                msg = message_from_bytes(item.message, policy=policy.default)
+            except Exception as e:
+                spool.release(item, f"Unreadable message: {str(e)}", poison=True)
+                summary["dead"] += 1
+                continue
+
+            try:
+                session.send_message(msg)
+            except CircuitOpenError as e:
+                for pending in batch[position:]:
+                    spool.release(pending, str(e), delay=e.retry_after)
+                summary["retried"] += len(batch) - position
+                print(f"Spool drain stopped: {str(e)}")
+                return summary
+            except (smtplib.SMTPException, OSError) as e:
+                poison = _is_permanent_failure(e)
+                delay = RETRY_BASE_DELAY * (2 ** (item.attempts - 1))
+                if spool.release(item, f"{type(e).__name__}: {str(e)}", delay=delay, poison=poison):
+                    summary["dead"] += 1
+                else:
+                    summary["retried"] += 1
+                print(f"Spool delivery failed for {item.form_type} message {item.id}: {str(e)}")
+                continue
+
+            spool.delete(item)
+            summary["sent"] += 1
+    return summary
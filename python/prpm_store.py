@@ -0,0 +1,542 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+
+from prpm_spool import running_in_lambda
+
+# Submission store settings (Lambda environment variables)
+STORE_PATH = os.environ.get('PRPM_STORE_PATH', '/tmp/prpm-submissions.sqlite3')
+STORE_TABLE = os.environ.get('PRPM_STORE_TABLE', '')
+STORE_ENDPOINT = os.environ.get('PRPM_STORE_ENDPOINT', '')
+FLUSH_INTERVAL = float(os.environ.get('PRPM_STORE_FLUSH_INTERVAL', '0.05'))
+BATCH_SIZE = int(os.environ.get('PRPM_STORE_BATCH_SIZE', '500'))
+MAX_PENDING = int(os.environ.get('PRPM_STORE_MAX_PENDING', '10000'))
+WRITE_ATTEMPTS = 3
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+# Indexed columns and the form fields they are taken from, first present wins
+INDEXED_FIELDS = {
+    'state': ('state',),
+    'zip_code': ('zipCode',),
+    'contact_email': ('contactEmail', 'email'),
+    'community': ('communityName',),
+    'deadline': ('deadlineDate',),
+}
+
+# Query filters as (column, comparison); community matches by case-insensitive prefix
+FILTERS = {
+    'form_type': ('form_type', '='),
+    'state': ('state', '='),
+    'zip_code': ('zip_code', '='),
+    'contact_email': ('contact_email', '='),
+    'community': ('community', 'prefix'),
+    'since': ('submitted_at', '>='),
+    'until': ('submitted_at', '<'),
+    'deadline_from': ('deadline', '>='),
+    'deadline_to': ('deadline', '<='),
+}
+
+# Index each query runs on, chosen by the first filter it uses, most selective first; without
+# statistics SQLite's planner favours the form-type index, which can mean reading every proposal
+SQLITE_INDEXES = (
+    ('contact_email', 'submissions_email'),
+    ('zip_code', 'submissions_zip'),
+    ('community', 'submissions_community'),
+    ('deadline_from', 'submissions_deadline'),
+    ('deadline_to', 'submissions_deadline'),
+    ('state', 'submissions_state'),
+    ('form_type', 'submissions_form_time'),
+)
+
+def store_configured() -> bool:
+    """Return True when the store is one the query function can read: DynamoDB, or SQLite outside Lambda."""
+    if STORE_TABLE or not running_in_lambda():
+        return True
+    print("Configuration error: PRPM_STORE_TABLE must be set to store submissions in AWS Lambda; "
+          "the SQLite store is for local runs only")
+    return False
+
+
+def store_enabled() -> bool:
+    """Return True when PRPM_SUBMISSION_STORE is set to 1/true (and the store is usable)."""
+    return os.environ.get('PRPM_SUBMISSION_STORE', '').lower() in ('1', 'true', 'yes') and store_configured()
+
+
+def _iso_date(value: str) -> Optional[str]:
+    """Return a validated deadline (YYYY-MM-DD, MM/DD/YYYY or YYYY/MM/DD) as YYYY-MM-DD so it sorts as text."""
+    parts = value.replace('/', '-').split('-')
+    if len(parts) != 3 or not all(part.isdigit() for part in parts):
+        return None
+    year, month, day = parts if len(parts[0]) == 4 else (parts[2], parts[0], parts[1])
+    return f"{int(year):04d}-{int(month):02d}-{int(day):02d}"
+
+
+def indexed_values(fields: Dict[str, str]) -> Dict[str, Optional[str]]:
+    """Pull the indexed columns out of a submission's normalized fields."""
+    values = {}
+    for column, names in INDEXED_FIELDS.items():
+        values[column] = next((fields[name] for name in names if fields.get(name)), None)
+    if values['zip_code']:
+        # ZIP+4 codes are found by their five-digit zip
+        values['zip_code'] = values['zip_code'][:5]
+    if values['contact_email']:
+        values['contact_email'] = values['contact_email'].lower()
+    if values['deadline']:
+        values['deadline'] = _iso_date(values['deadline'])
+    return values
+
+
+def _cursor(submitted_at: float, position: Any) -> str:
+    return f"{submitted_at!r}:{position}"
+
+
+def new_submission_id() -> str:
+    """Return a random id for one stored submission."""
+    return os.urandom(16).hex()
+
+
+def _submission(id: str, key: Optional[str], form_type: str, submitted_at: float, fields: str) -> Dict[str, Any]:
+    from datetime import datetime, timezone
+
+    return {
+        "id": id,
+        "idempotencyKey": key,
+        "formType": form_type,
+        "submittedAt": datetime.fromtimestamp(submitted_at, timezone.utc).isoformat(timespec='seconds'),
+        "fields": json.loads(fields),
+    }
+
+
+class SubmissionStore:
+    """
+    SQLite-backed searchable record of validated submissions.
+
+    Every submission gets its own random id; its idempotency key is kept
+    alongside, so a submission sent again after the idempotency window
+    is stored again rather than mistaken for the first. Each query runs on the index of its most
+    selective filter, the way the DynamoDB store picks a secondary index.
+    Serves as the local stand-in for DynamoDB.
+    """
+
+    def __init__(self, path: str = STORE_PATH):
+        import sqlite3
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS submissions ("
+            " seq INTEGER PRIMARY KEY,"
+            " id TEXT NOT NULL UNIQUE,"
+            " idempotency_key TEXT,"
+            " form_type TEXT NOT NULL,"
+            " submitted_at REAL NOT NULL,"
+            " state TEXT,"
+            " zip_code TEXT,"
+            " contact_email TEXT,"
+            " community TEXT COLLATE NOCASE,"
+            " deadline TEXT,"
+            " fields TEXT NOT NULL)"
+        )
+        # Stores created before submissions had their own id keep the key in id
+        if 'idempotency_key' not in {row[1] for row in self._db.execute("PRAGMA table_info(submissions)")}:
+            self._db.execute("ALTER TABLE submissions ADD COLUMN idempotency_key TEXT")
+        for name, columns in (('form_time', 'form_type, submitted_at'), ('time', 'submitted_at'),
+                              ('state', 'state, submitted_at'), ('zip', 'zip_code, submitted_at'),
+                              ('email', 'contact_email, submitted_at'), ('community', 'community'),
+                              ('deadline', 'deadline')):
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS submissions_{name} ON submissions ({columns})")
+
+    def write(self, records: List[Tuple[str, str, str, float, Dict[str, str]]]) -> None:
+        """Insert (id, idempotency key, form_type, submitted_at, fields) records in one transaction."""
+        rows = []
+        for id, key, form_type, submitted_at, fields in records:
+            values = indexed_values(fields)
+            rows.append((id, key, form_type, submitted_at, values['state'], values['zip_code'],
+                         values['contact_email'], values['community'], values['deadline'],
+                         json.dumps(fields, separators=(',', ':'), ensure_ascii=False)))
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO submissions (id, idempotency_key, form_type, submitted_at, state,"
+                    " zip_code, contact_email, community, deadline, fields) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def _source(self, filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """Return the FROM clause onwards (table, index and conditions) and its parameters."""
+        filters = {name: value for name, value in filters.items() if value is not None and value != ''}
+        index = next((index for name, index in SQLITE_INDEXES if name in filters), 'submissions_time')
+        clauses, params = [], []
+        for name, value in filters.items():
+            if name not in FILTERS:
+                raise ValueError(f"Unknown filter: {name}")
+            column, operator = FILTERS[name]
+            if name == 'community':
+                # A range rather than LIKE so the NOCASE index is used; U+10FFFF sorts after any continuation
+                clauses.append(f"{column} >= ? AND {column} < ?")
+                params += [value, value + '\U0010ffff']
+            else:
+                clauses.append(f"{column} {operator} ?")
+                params.append(value)
+        where = (' WHERE ' + ' AND '.join(clauses)) if clauses else ''
+        return f" FROM submissions INDEXED BY {index}{where}", params
+
+    def query(self, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None,
+              **filters: Any) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Return the newest submissions matching every filter, and a cursor for the next page."""
+        filters = _normalized_filters(filters)
+        source, params = self._source(filters)
+        if cursor:
+            try:
+                submitted_at, seq = cursor.split(':')
+                params += [float(submitted_at), int(seq)]
+            except ValueError:
+                raise ValueError("Invalid cursor") from None
+            source += (' AND ' if ' WHERE ' in source else ' WHERE ') + '(submitted_at, seq) < (?, ?)'
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT seq, id, idempotency_key, form_type, submitted_at, fields{source}"
+                " ORDER BY submitted_at DESC, seq DESC LIMIT ?",
+                params + [limit + 1],
+            ).fetchall()
+        next_cursor = _cursor(rows[limit - 1][4], rows[limit - 1][0]) if len(rows) > limit else None
+        return [_submission(*row[1:]) for row in rows[:limit]], next_cursor
+
+    def count(self, **filters: Any) -> int:
+        """Return the number of submissions matching every filter."""
+        source, params = self._source(_normalized_filters(filters))
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*){source}", params).fetchone()[0]
+
+    def get(self, id: str) -> Optional[Dict[str, Any]]:
+        """Return one submission by its id."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, idempotency_key, form_type, submitted_at, fields FROM submissions WHERE id = ?", (id,),
+            ).fetchone()
+        return _submission(*row) if row else None
+
+
+def _normalized_filters(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """Match filter values to the way indexed_values stores them."""
+    filters = dict(filters)
+    if filters.get('zip_code'):
+        filters['zip_code'] = str(filters['zip_code'])[:5]
+    if filters.get('contact_email'):
+        filters['contact_email'] = str(filters['contact_email']).strip().lower()
+    for name in ('deadline_from', 'deadline_to'):
+        if filters.get(name):
+            filters[name] = _iso_date(str(filters[name])) or filters[name]
+    return filters
+
+
+# DynamoDB global secondary indexes as (index name, partition key attribute, sort key attribute),
+# in the order a query prefers them; each filter column maps onto one attribute
+DYNAMO_ATTRIBUTES = {
+    'form_type': 'formType', 'submitted_at': 'submittedAt', 'state': 'state', 'zip_code': 'zipCode',
+    'contact_email': 'contactEmail', 'community': 'community', 'deadline': 'deadline',
+}
+DYNAMO_INDEXES = (
+    ('contactEmail-submittedAt', 'contactEmail', 'submittedAt'),
+    ('zipCode-submittedAt', 'zipCode', 'submittedAt'),
+    ('state-submittedAt', 'state', 'submittedAt'),
+    ('formType-submittedAt', 'formType', 'submittedAt'),
+)
+
+
+class DynamoSubmissionStore:
+    """
+    DynamoDB-backed submission store with the same API as SubmissionStore.
+
+    Each filterable column has a global secondary index sorted by submission
+    time; a query runs against the most selective index its filters allow and
+    applies the rest as a filter expression. Point PRPM_STORE_ENDPOINT at
+    DynamoDB Local to run it without AWS.
+    """
+
+    def __init__(self, table: str = STORE_TABLE, endpoint: str = STORE_ENDPOINT, client=None):
+        if client is None:
+            import boto3
+            client = boto3.client('dynamodb', endpoint_url=endpoint or None)
+        self.table = table
+        self._dynamodb = client
+
+    def create_table(self) -> None:
+        """Create the table and its indexes (for DynamoDB Local and first deployments)."""
+        key_attributes = {'id', 'submittedAt'} | {index[1] for index in DYNAMO_INDEXES}
+        self._dynamodb.create_table(
+            TableName=self.table,
+            BillingMode='PAY_PER_REQUEST',
+            KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': name, 'AttributeType': 'N' if name == 'submittedAt' else 'S'}
+                                  for name in sorted(key_attributes)],
+            GlobalSecondaryIndexes=[{
+                'IndexName': name,
+                'KeySchema': [{'AttributeName': partition, 'KeyType': 'HASH'},
+                              {'AttributeName': sort, 'KeyType': 'RANGE'}],
+                'Projection': {'ProjectionType': 'ALL'},
+            } for name, partition, sort in DYNAMO_INDEXES],
+        )
+
+    def write(self, records: List[Tuple[str, str, str, float, Dict[str, str]]]) -> None:
+        """Put (id, idempotency key, form_type, submitted_at, fields) records, 25 to a BatchWriteItem call."""
+        items = {}
+        for id, key, form_type, submitted_at, fields in records:
+            item = {'id': {'S': id}, 'formType': {'S': form_type}, 'submittedAt': {'N': repr(submitted_at)},
+                    'fields': {'S': json.dumps(fields, separators=(',', ':'), ensure_ascii=False)}}
+            if key:
+                item['idempotencyKey'] = {'S': key}
+            for column, value in indexed_values(fields).items():
+                if value:
+                    item[DYNAMO_ATTRIBUTES[column]] = {'S': value}
+            # A batch may not name the same key twice
+            items.setdefault(id, {'PutRequest': {'Item': item}})
+        requests = list(items.values())
+        for start in range(0, len(requests), 25):
+            pending = {self.table: requests[start:start + 25]}
+            for attempt in range(WRITE_ATTEMPTS + 1):
+                pending = self._dynamodb.batch_write_item(RequestItems=pending).get('UnprocessedItems')
+                if not pending:
+                    break
+                time.sleep(0.05 * 2 ** attempt)
+            else:
+                raise RuntimeError(f"DynamoDB left {len(pending[self.table])} submissions unprocessed")
+
+    def _plan(self, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """Build Query parameters: key condition on the best index, the remaining filters as a filter expression."""
+        attributes = {DYNAMO_ATTRIBUTES[FILTERS[name][0]]: name for name in filters}
+        index = next((index for index in DYNAMO_INDEXES if index[1] in attributes), None)
+        if index is None:
+            raise ValueError("DynamoDB queries need a formType, state, zipCode or contactEmail filter")
+        names, values, keys, conditions = {}, {}, [], []
+        for position, (name, value) in enumerate(filters.items()):
+            column, operator = FILTERS[name]
+            attribute = DYNAMO_ATTRIBUTES[column]
+            if attribute == 'submittedAt':
+                continue
+            names[f'#a{position}'] = attribute
+            values[f':v{position}'] = {'S': str(value)}
+            if name == 'community':
+                # Prefix match; unlike SQLite's LIKE this one is case-sensitive
+                conditions.append(f"begins_with(#a{position}, :v{position})")
+            elif attribute == index[1]:
+                keys.append(f"#a{position} {operator} :v{position}")
+            else:
+                conditions.append(f"#a{position} {operator} :v{position}")
+        # Every index sorts on submittedAt, which DynamoDB only accepts in the key condition, and only once
+        since, until = filters.get('since'), filters.get('until')
+        if since is not None or until is not None:
+            names['#t'] = 'submittedAt'
+        if since is not None and until is not None:
+            import math
+
+            if float(since) >= float(until):
+                raise ValueError("since must be earlier than until")
+            # BETWEEN includes both ends; until does not, so the upper end is the float just below it
+            keys.append("#t BETWEEN :since AND :until")
+            values[':since'] = {'N': repr(float(since))}
+            values[':until'] = {'N': repr(math.nextafter(float(until), -math.inf))}
+        elif since is not None:
+            keys.append("#t >= :since")
+            values[':since'] = {'N': repr(float(since))}
+        elif until is not None:
+            keys.append("#t < :until")
+            values[':until'] = {'N': repr(float(until))}
+        params = {
+            'TableName': self.table, 'IndexName': index[0], 'ScanIndexForward': False,
+            'KeyConditionExpression': ' AND '.join(keys),
+            'ExpressionAttributeNames': names, 'ExpressionAttributeValues': values,
+        }
+        if conditions:
+            params['FilterExpression'] = ' AND '.join(conditions)
+        return params
+
+    def query(self, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None,
+              **filters: Any) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Return the newest submissions matching every filter, and a cursor for the next page."""
+        import base64
+
+        filters = {name: value for name, value in _normalized_filters(filters).items() if value not in (None, '')}
+        for name in filters:
+            if name not in FILTERS:
+                raise ValueError(f"Unknown filter: {name}")
+        params = self._plan(filters)
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        if cursor:
+            params['ExclusiveStartKey'] = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        submissions = []
+        # Limit applies before the filter expression, so pages may come back short
+        while True:
+            page = self._dynamodb.query(Limit=limit - len(submissions), **params)
+            for item in page.get('Items', []):
+                submissions.append(_dynamo_submission(item))
+            last_key = page.get('LastEvaluatedKey')
+            if not last_key or len(submissions) >= limit:
+                break
+            params['ExclusiveStartKey'] = last_key
+        next_cursor = base64.urlsafe_b64encode(json.dumps(last_key).encode()).decode('ascii') if last_key else None
+        return submissions, next_cursor
+
+    def count(self, **filters: Any) -> int:
+        """Return the number of submissions matching every filter."""
+        params = self._plan({name: value for name, value in _normalized_filters(filters).items()
+                             if value not in (None, '')})
+        total = 0
+        while True:
+            page = self._dynamodb.query(Select='COUNT', **params)
+            total += page['Count']
+            if not page.get('LastEvaluatedKey'):
+                return total
+            params['ExclusiveStartKey'] = page['LastEvaluatedKey']
+
+    def get(self, id: str) -> Optional[Dict[str, Any]]:
+        """Return one submission by its id."""
+        item = self._dynamodb.get_item(TableName=self.table, Key={'id': {'S': id}}).get('Item')
+        return _dynamo_submission(item) if item is not None else None
+
+
+def _dynamo_submission(item: Dict[str, Any]) -> Dict[str, Any]:
+    return _submission(item['id']['S'], item.get('idempotencyKey', {}).get('S'), item['formType']['S'],
+                       float(item['submittedAt']['N']), item['fields']['S'])
+
+
+class WriteBehind:
+    """
+    Buffer submission records and write them to the store in batches on a background thread.
+
+    record() only appends to an in-memory buffer, so the handler never waits
+    on the store. The writer collects whatever arrives within FLUSH_INTERVAL
+    into one transaction (or BatchWriteItem run). When Lambda freezes the
+    container the writer freezes with it and catches up on the next
+    invocation; a container reclaimed while frozen loses the records still
+    buffered, and the notification email remains the record of those.
+    """
+
+    def __init__(self, store_factory, batch_size: int = BATCH_SIZE, interval: float = FLUSH_INTERVAL,
+                 max_pending: int = MAX_PENDING):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_pending = max_pending
+        self.written = self.dropped = self.failed = self.batches = 0
+        self._store_factory = store_factory
+        self._store = None
+        self._buffer = deque()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._done = threading.Condition(self._lock)
+        self._thread = None
+
+    def record(self, key: str, form_type: str, fields: Dict[str, str]) -> bool:
+        """Queue a submission, under a new id, for writing; returns False if the buffer is full and it was dropped."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.dropped += 1
+                return False
+            self._buffer.append((new_submission_id(), key, form_type, time.time(), fields))
+            self._pending += 1
+            if self._thread is None:
+                import atexit
+
+                self._thread = threading.Thread(target=self._run, name='prpm-store-writer', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+            self._ready.notify()
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued record has been written (or given up on); returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._done.wait(remaining)
+        return True
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._buffer:
+                    self._ready.wait()
+                full = len(self._buffer) >= self.batch_size
+            if not full and self.interval:
+                # Let records that arrive meanwhile share the transaction
+                time.sleep(self.interval)
+            with self._lock:
+                batch = [self._buffer.popleft() for _ in range(min(len(self._buffer), self.batch_size))]
+            written = self._write(batch)
+            with self._lock:
+                self._pending -= len(batch)
+                self.batches += 1
+                if written:
+                    self.written += len(batch)
+                else:
+                    self.failed += len(batch)
+                self._done.notify_all()
+
+    def _write(self, batch) -> bool:
+        for attempt in range(WRITE_ATTEMPTS):
+            try:
+                if self._store is None:
+                    self._store = self._store_factory()
+                self._store.write(batch)
+                return True
+            except Exception as e:
+                print(f"Submission store write failed (attempt {attempt + 1}): {str(e)}")
+                time.sleep(0.1 * 2 ** attempt)
+        print(f"Submission store dropped {len(batch)} records")
+        return False
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            return {"written": self.written, "pending": self._pending, "batches": self.batches,
+                    "failed": self.failed, "dropped": self.dropped}
+
+
+_STORE: Optional[Any] = None
+_WRITER: Optional[WriteBehind] = None
+
+
+def get_submission_store():
+    """Return the process-wide store: DynamoDB when a table is configured, SQLite otherwise (outside Lambda)."""
+    global _STORE
+    if _STORE is None:
+        if not store_configured():
+            raise RuntimeError("PRPM_STORE_TABLE is not configured")
+        _STORE = DynamoSubmissionStore(STORE_TABLE) if STORE_TABLE else SubmissionStore(STORE_PATH)
+    return _STORE
+
+
+def get_writer() -> WriteBehind:
+    """Return the process-wide write-behind buffer in front of get_submission_store()."""
+    global _WRITER
+    if _WRITER is None:
+        _WRITER = WriteBehind(get_submission_store)
+    return _WRITER
+
+
+def record_submission(key: str, form_type: str, fields: Dict[str, str]) -> None:
+    """
+    Queue an accepted submission for the store when PRPM_SUBMISSION_STORE is on.
+
+    fields are the schema-normalized values and must not be changed afterwards;
+    key is the submission's idempotency key, stored next to its own new id.
+    Call it once the submission has passed every check that can reject it.
+    """
+    if store_enabled() and not get_writer().record(key, form_type, fields):
+        print(f"Submission store buffer full; not storing {key}")
@@ -0,0 +1,185 @@
+import time
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple, Union
+
+DIVIDER = '━' * 80
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Inline styles for the HTML part (mail clients ignore <style> blocks)
+HTML_HEAD = ('<!DOCTYPE html><html><body style="margin:0;padding:16px;'
+             'font-family:Arial,Helvetica,sans-serif;font-size:14px;color:#222;">')
+HTML_TAIL = '</body></html>'
+HTML_SECTION = ('<h3 style="margin:24px 0 8px;padding-bottom:4px;font-size:15px;'
+                'border-bottom:2px solid #1f3b5a;color:#1f3b5a;">')
+HTML_TABLE = '<table cellpadding="4" cellspacing="0" style="border-collapse:collapse;">'
+HTML_LABEL = '<th align="left" valign="top" style="padding-right:16px;white-space:nowrap;">'
+HTML_VALUE = '<td style="white-space:pre-wrap;">'
+HTML_BLOCK = '<div style="white-space:pre-wrap;margin:0 0 12px;">'
+
+Getter = Union[str, Callable[[Dict[str, Any]], Any]]
+
+
+def escape_html(value: str) -> str:
+    """Escape text for an HTML element or attribute."""
+    if '&' in value:
+        value = value.replace('&', '&amp;')
+    if '<' in value:
+        value = value.replace('<', '&lt;')
+    if '>' in value:
+        value = value.replace('>', '&gt;')
+    if '"' in value:
+        value = value.replace('"', '&quot;')
+    if "'" in value:
+        value = value.replace("'", '&#x27;')
+    return value
+
+
+def submitted_on(body: Dict[str, Any]) -> str:
+    """Local submission timestamp, as printed at the foot of every notification."""
+    return time.strftime(TIMESTAMP_FORMAT)
+
+
+class Line:
+    """A 'Label: value' row."""
+
+    __slots__ = ('label', 'key', 'default', 'transform')
+
+    def __init__(self, label: str, key: Getter, default: str = 'N/A',
+                 transform: Optional[Callable[[str], str]] = None):
+        self.label = label
+        self.key = key
+        self.default = default
+        self.transform = transform
+
+
+class Block(Line):
+    """A multi-line value printed under its label (or on its own when label is None)."""
+
+    __slots__ = ()
+
+    def __init__(self, label: Optional[str], key: Getter, default: str = 'N/A',
+                 transform: Optional[Callable[[str], str]] = None):
+        super().__init__(label, key, default, transform)
+
+
+class Section:
+    """A titled group of lines, framed by divider rules."""
+
+    __slots__ = ('title', 'items')
+
+    def __init__(self, title: str, items: Iterable[Line]):
+        self.title = title
+        self.items = tuple(items)
+
+
+class _Builder:
+    """Accumulates static text and slots, merging adjacent static text."""
+
+    def __init__(self):
+        self.parts: List[Optional[str]] = []
+
+    def text(self, value: str) -> None:
+        if self.parts and self.parts[-1] is not None:
+            self.parts[-1] += value
+        else:
+            self.parts.append(value)
+
+    def slot(self) -> int:
+        self.parts.append(None)
+        return len(self.parts) - 1
+
+
+class EmailTemplate:
+    """
+    A notification layout compiled into static segments and field slots.
+
+    Both the plain-text and the HTML part are laid out once, at import time.
+    Rendering copies the two segment lists, looks every field up exactly once
+    and drops the value (escaped for HTML) into its slot in both parts.
+    """
+
+    def __init__(self, heading: str, sections: Iterable[Section]):
+        self.heading = heading
+        self.sections = tuple(sections)
+        self._text, self._html, self._slots = self._compile()
+
+    def _compile(self) -> Tuple[List[Optional[str]], List[Optional[str]], tuple]:
+        text = _Builder()
+        html = _Builder()
+        slots = []
+
+        def slot(line: Line) -> None:
+            key = line.key
+            slots.append((text.slot(), html.slot(), key if isinstance(key, str) else None,
+                          None if isinstance(key, str) else key, line.default, line.transform))
+
+        text.text(f"\n{self.heading}:\n\n{DIVIDER}\n\n")
+        html.text(f'{HTML_HEAD}<h2 style="margin:0 0 8px;font-size:18px;">{escape_html(self.heading)}</h2>')
+
+        for section in self.sections:
+            text.text(f"{section.title}:\n{DIVIDER}\n")
+            html.text(f"{HTML_SECTION}{escape_html(section.title.title())}</h3>")
+            in_table = False
+            for index, item in enumerate(section.items):
+                if isinstance(item, Block):
+                    if in_table:
+                        html.text('</table>')
+                        in_table = False
+                    if index:
+                        text.text("\n")
+                    if item.label is not None:
+                        text.text(f"{item.label}:\n")
+                        html.text(f'<p style="margin:8px 0 4px;"><strong>{escape_html(item.label)}</strong></p>')
+                    html.text(HTML_BLOCK)
+                    slot(item)
+                    text.text("\n")
+                    html.text('</div>')
+                else:
+                    if not in_table:
+                        html.text(HTML_TABLE)
+                        in_table = True
+                    text.text(f"{item.label}: ")
+                    html.text(f"<tr>{HTML_LABEL}{escape_html(item.label)}:</th>{HTML_VALUE}")
+                    slot(item)
+                    text.text("\n")
+                    html.text('</td></tr>')
+            if in_table:
+                html.text('</table>')
+            text.text(f"\n{DIVIDER}\n\n")
+
+        text.text("Submitted on: ")
+        html.text('<p style="margin:24px 0 0;color:#666;font-size:12px;">Submitted on: ')
+        slot(Line('Submitted on', submitted_on))
+        text.text("\n")
+        html.text('</p>' + HTML_TAIL)
+        return text.parts, html.parts, tuple(slots)
+
+    def render(self, body: Dict[str, Any]) -> Tuple[str, str]:
+        """Render the (plain_text, html) parts for a submission in one pass."""
+        text = self._text[:]
+        html = self._html[:]
+        get = body.get
+        for text_index, html_index, key, compute, default, transform in self._slots:
+            value = get(key, default) if compute is None else compute(body)
+            if transform is not None:
+                value = transform(value)
+            if value.__class__ is not str:
+                value = str(value)
+            text[text_index] = value
+            html[html_index] = escape_html(value)
+        return ''.join(text), ''.join(html)
+
+    def render_text(self, body: Dict[str, Any]) -> str:
+        """Render only the plain-text part."""
+        text = self._text[:]
+        get = body.get
+        for text_index, _, key, compute, default, transform in self._slots:
+            value = get(key, default) if compute is None else compute(body)
+            if transform is not None:
+                value = transform(value)
+            text[text_index] = value if value.__class__ is str else str(value)
+        return ''.join(text)
+
+
+def compile_template(heading: str, sections: Iterable[Section]) -> EmailTemplate:
+    """Compile a notification layout; heading is the first line of the email."""
+    return EmailTemplate(heading, sections)
@@ -0,0 +1,295 @@
+import json
+import os
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from prpm_attachments import ALLOWED_TYPES, SIGNATURES, clean_filename
+from prpm_intake import IntakeError
+
+# Upload offload settings (Lambda environment variables). Files go straight
+# from the browser to the object store: S3 when a bucket is configured (any
+# S3-compatible endpoint with PRPM_UPLOAD_ENDPOINT), or the local stand-in
+# at PRPM_UPLOAD_LOCAL_URL (benchmarks/object_store_stub.py).
+UPLOAD_BUCKET = os.environ.get('PRPM_UPLOAD_BUCKET', '')
+UPLOAD_ENDPOINT = os.environ.get('PRPM_UPLOAD_ENDPOINT', '')
+UPLOAD_LOCAL_URL = os.environ.get('PRPM_UPLOAD_LOCAL_URL', '')
+UPLOAD_PREFIX = os.environ.get('PRPM_UPLOAD_PREFIX', 'uploads/')
+# Signs upload tokens (and the local stand-in's URLs)
+UPLOAD_SECRET = os.environ.get('PRPM_UPLOAD_SECRET', '')
+# Seconds a token (and its upload URL) stays valid, from upload to submission
+UPLOAD_TTL = int(os.environ.get('PRPM_UPLOAD_TTL', '3600'))
+# Seconds the links in the notification stay valid; SigV4 caps them at 7 days,
+# and links signed with the function's role credentials die with those
+LINK_TTL = int(os.environ.get('PRPM_UPLOAD_LINK_TTL', str(7 * 24 * 3600)))
+MAX_UPLOAD_BYTES = int(os.environ.get('PRPM_MAX_UPLOAD_BYTES', str(25 * 1024 * 1024)))
+MAX_UPLOADS = int(os.environ.get('PRPM_MAX_UPLOADS', '5'))
+
+# Bytes read back from each stored file to check its type signature
+PROBE_BYTES = 16
+
+
+def uploads_enabled() -> bool:
+    """Return True when an object store and a token secret are configured."""
+    return bool((UPLOAD_BUCKET or UPLOAD_LOCAL_URL) and UPLOAD_SECRET)
+
+
+def _b64(data: bytes) -> str:
+    import base64
+
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _unb64(text: str) -> bytes:
+    import base64
+
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def sign(message: str) -> str:
+    """HMAC-SHA256 of message under PRPM_UPLOAD_SECRET, base64url-encoded."""
+    import hashlib
+    import hmac
+
+    return _b64(hmac.new(UPLOAD_SECRET.encode('utf-8'), message.encode('utf-8'), hashlib.sha256).digest())
+
+
+def verify(message: str, signature: str) -> bool:
+    import hmac
+
+    return hmac.compare_digest(sign(message), signature)
+
+
+class StoredUpload:
+    """A file the client put in the object store, checked and linked for the notification."""
+
+    __slots__ = ('key', 'filename', 'content_type', 'size', 'url')
+
+    def __init__(self, key: str, filename: str, content_type: str, size: int, url: str):
+        self.key = key
+        self.filename = filename
+        self.content_type = content_type
+        self.size = size
+        self.url = url
+
+
+class S3Store:
+    """Uploads in an S3 bucket, or any S3-compatible store at PRPM_UPLOAD_ENDPOINT."""
+
+    def __init__(self, bucket: str, endpoint_url: str = UPLOAD_ENDPOINT, client=None):
+        if client is None:
+            import boto3
+            from botocore.config import Config
+            client = boto3.client('s3', endpoint_url=endpoint_url or None,
+                                  config=Config(signature_version='s3v4'))
+        self.bucket = bucket
+        self._s3 = client
+
+    def presign_put(self, key: str, content_type: str, size: int, ttl: int) -> str:
+        return self._s3.generate_presigned_url('put_object', ExpiresIn=ttl, Params={
+            'Bucket': self.bucket, 'Key': key, 'ContentType': content_type, 'ContentLength': size})
+
+    def presign_get(self, key: str, filename: str, ttl: int) -> str:
+        return self._s3.generate_presigned_url('get_object', ExpiresIn=ttl, Params={
+            'Bucket': self.bucket, 'Key': key,
+            'ResponseContentDisposition': f'attachment; filename="{filename}"'})
+
+    def probe(self, key: str, length: int) -> Optional[Tuple[int, str, bytes]]:
+        """Return (size, content_type, first bytes) of a stored object, or None when it does not exist."""
+        from botocore.exceptions import ClientError
+
+        try:
+            response = self._s3.get_object(Bucket=self.bucket, Key=key, Range=f'bytes=0-{length - 1}')
+        except ClientError as e:
+            code = e.response.get('Error', {}).get('Code')
+            if code in ('NoSuchKey', '404'):
+                return None
+            if code == 'InvalidRange':
+                return 0, '', b''
+            raise
+        size = int(response['ContentRange'].rsplit('/', 1)[-1])
+        return size, response.get('ContentType', ''), response['Body'].read()
+
+
+class LocalObjectStore:
+    """
+    The local stand-in for S3: an HTTP object store whose URLs are signed
+    with PRPM_UPLOAD_SECRET instead of AWS credentials.
+    """
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip('/')
+
+    def _url(self, method: str, key: str, ttl: int, content_type: str = '', size: int = 0) -> str:
+        from urllib.parse import quote, urlencode
+
+        expires = int(time.time()) + ttl
+        signature = sign(url_message(method, key, expires, content_type, size))
+        return f"{self.base_url}/{quote(key)}?{urlencode({'expires': expires, 'signature': signature})}"
+
+    def presign_put(self, key: str, content_type: str, size: int, ttl: int) -> str:
+        return self._url('PUT', key, ttl, content_type, size)
+
+    def presign_get(self, key: str, filename: str, ttl: int) -> str:
+        return self._url('GET', key, ttl)
+
+    def probe(self, key: str, length: int) -> Optional[Tuple[int, str, bytes]]:
+        import urllib.error
+        import urllib.request
+
+        request = urllib.request.Request(self._url('GET', key, 60), headers={'Range': f'bytes=0-{length - 1}'})
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                head = response.read(length)
+                content_range = response.headers.get('Content-Range')
+                size = int(content_range.rsplit('/', 1)[-1]) if content_range else len(head)
+                return size, response.headers.get('Content-Type', ''), head
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            if e.code == 416:
+                return 0, '', b''
+            raise
+
+
+def url_message(method: str, key: str, expires: int, content_type: str = '', size: int = 0) -> str:
+    """What a local stand-in URL signs: the method, key and expiry, and for PUT the type and size."""
+    return f"{method}\n{key}\n{expires}\n{content_type}\n{size}"
+
+
+_STORE = None
+
+
+def get_store():
+    """Return the process-wide object store: S3 when a bucket is configured, the local stand-in otherwise."""
+    global _STORE
+    if _STORE is None:
+        if not uploads_enabled():
+            raise IntakeError(400, "File uploads are not available")
+        _STORE = S3Store(UPLOAD_BUCKET) if UPLOAD_BUCKET else LocalObjectStore(UPLOAD_LOCAL_URL)
+    return _STORE
+
+
+def issue_upload(form_type: str, request: Any) -> Dict[str, Any]:
+    """
+    Check one {"filename", "contentType", "size"} request and return where to put the file.
+
+    The answer holds a pre-signed PUT URL (with the headers the client must
+    send) and an upload token to submit with the form in its place.
+    """
+    if not isinstance(request, dict):
+        raise IntakeError(400, "Each upload request must be an object with filename, contentType and size")
+    filename = clean_filename(str(request.get('filename') or 'upload'))
+    content_type = str(request.get('contentType') or '').split(';', 1)[0].strip().lower()
+    size = request.get('size')
+    if content_type not in ALLOWED_TYPES:
+        raise IntakeError(415, f"{filename}: file type {content_type or 'unknown'} is not accepted "
+                               f"(allowed: {', '.join(ALLOWED_TYPES)})")
+    if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+        raise IntakeError(400, f"{filename}: size must be a positive number of bytes")
+    if size > MAX_UPLOAD_BYTES:
+        raise IntakeError(413, f"{filename}: each file must not exceed {MAX_UPLOAD_BYTES} bytes")
+
+    store = get_store()
+    key = f"{UPLOAD_PREFIX}{form_type}/{time.strftime('%Y/%m/%d')}/{os.urandom(12).hex()}/{filename}"
+    expires = int(time.time()) + UPLOAD_TTL
+    payload = _b64(json.dumps({'k': key, 'm': form_type, 'f': filename, 't': content_type,
+                               'n': size, 'e': expires}, separators=(',', ':')).encode('utf-8'))
+    return {
+        "uploadToken": f"{payload}.{sign('token:' + payload)}",
+        "uploadUrl": store.presign_put(key, content_type, size, UPLOAD_TTL),
+        "method": "PUT",
+        "headers": {"Content-Type": content_type},
+        "expiresIn": UPLOAD_TTL,
+    }
+
+
+def issue_uploads(form_type: str, requests: Any) -> Dict[str, Any]:
+    """Answer a {"requestUploads": [...]} body with one upload per requested file."""
+    if not isinstance(requests, list) or not requests:
+        raise IntakeError(400, "requestUploads must be a non-empty list")
+    if len(requests) > MAX_UPLOADS:
+        raise IntakeError(413, f"No more than {MAX_UPLOADS} files may be uploaded")
+    return {"uploads": [issue_upload(form_type, request) for request in requests]}
+
+
+def upload_tokens(body: Dict[str, Any]) -> List[str]:
+    """The tokens a submission refers to: a list, or one comma-separated string from a plain form post."""
+    tokens = body.get('uploads')
+    if not tokens:
+        return []
+    if isinstance(tokens, str):
+        tokens = tokens.split(',')
+    if not isinstance(tokens, list) or not all(isinstance(token, str) for token in tokens):
+        raise IntakeError(400, "uploads must be a list of upload tokens")
+    return [token.strip() for token in tokens if token.strip()]
+
+
+def _read_token(token: str, form_type: str) -> Dict[str, Any]:
+    payload, _, signature = token.partition('.')
+    try:
+        valid = verify('token:' + payload, signature)
+        claims = json.loads(_unb64(payload)) if valid else None
+    except ValueError:
+        claims = None
+    if not isinstance(claims, dict) or claims.get('m') != form_type:
+        raise IntakeError(400, "Upload token is not valid")
+    if claims['e'] < time.time():
+        raise IntakeError(400, f"{claims['f']}: upload has expired, please attach the file again")
+    return claims
+
+
+def resolve_uploads(body: Dict[str, Any], form_type: str) -> List[StoredUpload]:
+    """
+    Replace the submission's upload tokens with the files they stand for.
+
+    Each token's signature, form and expiry are checked, then the first
+    bytes of the stored object are fetched to confirm the upload finished
+    with the declared size and type. The handler touches only those bytes,
+    so its memory and latency do not depend on how large the files are.
+    The resolved list is left in body['uploads'] for the email template.
+    """
+    tokens = upload_tokens(body)
+    if not tokens:
+        body.pop('uploads', None)
+        return []
+    if len(tokens) > MAX_UPLOADS:
+        raise IntakeError(413, f"No more than {MAX_UPLOADS} files may be uploaded")
+
+    store = get_store()
+    uploads = []
+    for token in tokens:
+        claims = _read_token(token, form_type)
+        filename, content_type = claims['f'], claims['t']
+        found = store.probe(claims['k'], PROBE_BYTES)
+        if found is None:
+            raise IntakeError(400, f"{filename}: file has not been uploaded")
+        size, stored_type, head = found
+        if size != claims['n']:
+            raise IntakeError(400, f"{filename}: upload is incomplete ({size} of {claims['n']} bytes)")
+        signatures = SIGNATURES.get(content_type)
+        if stored_type.split(';', 1)[0].strip().lower() != content_type or (
+                signatures is not None and not head.startswith(signatures)):
+            raise IntakeError(415, f"{filename}: file content is not {content_type}")
+        url = store.presign_get(claims['k'], filename, LINK_TTL)
+        uploads.append(StoredUpload(claims['k'], filename, content_type, size, url))
+    body['uploads'] = uploads
+    return uploads
+
+
+def document_links(body: Dict[str, Any]) -> str:
+    """
+    Template value listing the submission's files: attached ones by name,
+    uploaded ones with their download links.
+
+    The handler leaves the files it read in body['attachments'] and
+    resolve_uploads leaves the uploads in body['uploads']; anything else
+    there (tokens, or a blank value that named no file) is not listed.
+    """
+    attached = [f"{a.filename} ({a.content_type}, {a.size / 1024:,.0f} KiB), attached"
+                for a in body.get('attachments') or ()]
+    uploads = [upload for upload in body.get('uploads') or () if isinstance(upload, StoredUpload)]
+    if not uploads:
+        return '\n\n'.join(attached) or 'None uploaded'
+    expires = time.strftime('%Y-%m-%d', time.localtime(time.time() + LINK_TTL))
+    lines = attached + [f"{u.filename} ({u.content_type}, {u.size / 1024:,.0f} KiB)\n{u.url}" for u in uploads]
+    return '\n\n'.join(lines) + f"\n\nLinks expire on {expires}."
@@ -0,0 +1,130 @@
+"""
+Shared test setup.
+
+Puts the Lambda modules and the benchmark helpers (handler loading,
+payloads, SMTP stub) on sys.path, and points every local store at a
+throwaway directory before any prpm module reads its settings.
+"""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for path in (PYTHON_DIR, os.path.join(PYTHON_DIR, 'benchmarks')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+STATE_DIR = tempfile.mkdtemp(prefix='prpm-tests-')
+atexit.register(shutil.rmtree, STATE_DIR, ignore_errors=True)
+os.environ.update({
+    'ZEPTO_USER': 'test', 'ZEPTO_PASS': 'test',
+    'PRPM_METRICS': '0', 'PRPM_RATE_LIMIT': '0', 'PRPM_ACK_EMAILS': '0',
+    'PRPM_SPOOL_PATH': os.path.join(STATE_DIR, 'spool.sqlite3'),
+    'PRPM_DIGEST_PATH': os.path.join(STATE_DIR, 'digest.sqlite3'),
+    'PRPM_STORE_PATH': os.path.join(STATE_DIR, 'store.sqlite3'),
+})
+os.environ.pop('AWS_LAMBDA_FUNCTION_NAME', None)
+
+
+@pytest.fixture
+def load_form(request):
+    """Return a loader that imports a form handler script as a fresh module for this test."""
+    from _handlers import load_handler
+
+    def load(form_type: str):
+        return load_handler(form_type, f"prpm_test_{request.node.name}_{form_type}".replace('-', '_'))
+
+    return load
+
+
+class FakeObjectStore:
+    """In-memory stand-in for the upload object store, answering probes the way S3Store does."""
+
+    def __init__(self):
+        self.objects = {}
+        self._last_key = None
+
+    def presign_put(self, key, content_type, size, ttl):
+        self._last_key = key
+        return f"https://uploads.test/{key}?put"
+
+    def presign_get(self, key, filename, ttl):
+        return f"https://uploads.test/{key}"
+
+    def probe(self, key, length):
+        if key not in self.objects:
+            return None
+        content_type, data = self.objects[key]
+        return len(data), content_type, data[:length]
+
+    def upload(self, form_type, filename, content_type, data, stored=True):
+        """Issue an upload token for a file and, unless stored is False, put the file in the store."""
+        import prpm_uploads
+
+        answer = prpm_uploads.issue_upload(form_type, {'filename': filename, 'contentType': content_type,
+                                                       'size': len(data)})
+        if stored:
+            self.objects[self._last_key] = (content_type, data)
+        return answer['uploadToken']
+
+
+@pytest.fixture
+def object_store(monkeypatch):
+    """Enable contractor uploads against an in-memory object store."""
+    import prpm_uploads
+
+    store = FakeObjectStore()
+    monkeypatch.setattr(prpm_uploads, 'UPLOAD_SECRET', 'test-upload-secret')
+    monkeypatch.setattr(prpm_uploads, 'UPLOAD_LOCAL_URL', 'http://uploads.test')
+    monkeypatch.setattr(prpm_uploads, '_STORE', store)
+    return store
+
+
+class RecordingDelivery:
+    """Stand-in for a DeliveryPool that keeps the messages it is given; fails them all when error is set."""
+
+    def __init__(self):
+        self.sent = []
+        self.error = None
+        self.last_timings = {}
+
+    def is_open(self):
+        return False
+
+    def retry_after(self):
+        return 0.0
+
+    def send_message(self, msg):
+        if self.error is not None:
+            raise self.error
+        self.sent.append(msg)
+
+
+@pytest.fixture
+def delivery(monkeypatch):
+    """
+    A RecordingDelivery; patch it over a handler's get_delivery to capture what would be sent.
+
+    The idempotency cache starts empty, so a payload sent by an earlier test is not replayed.
+    """
+    import prpm_idempotency
+
+    monkeypatch.setattr(prpm_idempotency, '_CACHE', None)
+    return RecordingDelivery()
+
+
+@pytest.fixture
+def smtp_stub(monkeypatch):
+    """A local SMTP stand-in speaking STARTTLS, trusted by a fresh shared SSL context."""
+    import prpm_smtp
+    from smtp_stub import SMTPStub
+
+    with SMTPStub() as stub:
+        monkeypatch.setenv('SSL_CERT_FILE', stub.cert_path)
+        monkeypatch.setattr(prpm_smtp, '_SSL_CONTEXT', None)
+        yield stub
@@ -0,0 +1,96 @@
+import json
+import smtplib
+
+import pytest
+
+import prpm_ack
+from payloads import valid_payload
+
+
+class AckDelivery:
+    """Records each acknowledgement with the notifications already delivered when it was sent."""
+
+    def __init__(self, notifications):
+        self.notifications = notifications
+        self.sent = []
+        self.warmed = False
+
+    def warm(self):
+        self.warmed = True
+
+    def send_message(self, msg):
+        self.sent.append((msg['To'], len(self.notifications.sent)))
+
+
+@pytest.fixture
+def general_inquiry(load_form, delivery, monkeypatch):
+    monkeypatch.setenv('PRPM_ACK_EMAILS', '1')
+    handler = load_form('general-inquiry')
+    ack_delivery = AckDelivery(delivery)
+    monkeypatch.setattr(handler, 'get_delivery', lambda *args, channel='notification': (
+        ack_delivery if channel == prpm_ack.ACK_CHANNEL else delivery))
+    return handler, ack_delivery
+
+
+def settle():
+    """Wait for the acknowledgement worker to finish what it was given."""
+    prpm_ack._worker().submit(lambda: None).result(timeout=5)
+
+
+def test_acknowledgement_follows_the_notification(general_inquiry, delivery):
+    handler, ack_delivery = general_inquiry
+    body = valid_payload('general-inquiry')
+
+    response = handler.lambda_handler({'body': json.dumps(body)}, None)
+
+    assert response['statusCode'] == 200
+    assert json.loads(response['body'])['acknowledgement'] == 'sent'
+    assert ack_delivery.warmed
+    assert ack_delivery.sent == [(body['email'], 1)]
+
+
+def test_failed_notification_sends_no_acknowledgement(general_inquiry, delivery):
+    handler, ack_delivery = general_inquiry
+    delivery.error = smtplib.SMTPDataError(554, b'Message rejected')
+
+    response = handler.lambda_handler({'body': json.dumps(valid_payload('general-inquiry'))}, None)
+    settle()
+
+    assert response['statusCode'] == 500
+    assert ack_delivery.sent == []
+
+
+def test_failed_acknowledgement_is_reported(general_inquiry, delivery, monkeypatch):
+    handler, ack_delivery = general_inquiry
+
+    def refuse(msg):
+        raise smtplib.SMTPRecipientsRefused({msg['To']: (550, b'No such user')})
+
+    monkeypatch.setattr(ack_delivery, 'send_message', refuse)
+
+    response = handler.lambda_handler({'body': json.dumps(valid_payload('general-inquiry'))}, None)
+
+    assert response['statusCode'] == 200
+    assert json.loads(response['body'])['acknowledgement'] == 'failed'
+    assert len(delivery.sent) == 1
+
+
+def test_no_acknowledgement_when_disabled(load_form, delivery, monkeypatch):
+    handler = load_form('general-inquiry')
+    monkeypatch.setattr(handler, 'get_delivery', lambda *args, **kwargs: delivery)
+
+    response = handler.lambda_handler({'body': json.dumps(valid_payload('general-inquiry'))}, None)
+
+    assert response['statusCode'] == 200
+    assert 'acknowledgement' not in json.loads(response['body'])
+    assert [msg['To'] for msg in delivery.sent] == [handler.TO_EMAIL]
+
+
+def test_acknowledgement_replies_to_the_office_and_escapes_the_name():
+    msg = prpm_ack.build_acknowledgement('jordan@example.com', '<Jordan>', 'Thanks', 'We got it.',
+                                         'forms@example.com', 'office@example.com')
+
+    assert (msg['To'], msg['Reply-To']) == ('jordan@example.com', 'office@example.com')
+    text, html = (part.get_content() for part in msg.iter_parts())
+    assert 'Hi <Jordan>,' in text
+    assert 'Hi &lt;Jordan&gt;,' in html
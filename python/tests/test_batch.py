@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+import prpm_batch
+from payloads import invalid_payload
+
+
+def batch_event(items, token=None):
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    return {'body': json.dumps(items), 'headers': headers}
+
+
+@pytest.mark.parametrize('form_type', ['general-inquiry', 'proposal', 'contractor-application'])
+def test_public_endpoints_refuse_arrays(load_form, monkeypatch, form_type):
+    monkeypatch.setattr(prpm_batch, 'BATCH_TOKEN', '')
+    handler = load_form(form_type)
+
+    response = handler.lambda_handler(batch_event([invalid_payload(form_type)]), None)
+
+    assert response['statusCode'] == 400
+
+
+def test_batches_need_the_batch_token(load_form, monkeypatch):
+    monkeypatch.setattr(prpm_batch, 'BATCH_TOKEN', 'integration-secret')
+    handler = load_form('general-inquiry')
+    items = [invalid_payload('general-inquiry')]
+
+    assert handler.lambda_handler(batch_event(items), None)['statusCode'] == 401
+    assert handler.lambda_handler(batch_event(items, 'wrong'), None)['statusCode'] == 401
+    response = handler.lambda_handler(batch_event(items, 'integration-secret'), None)
+    assert response['statusCode'] == 207
+    assert json.loads(response['body'])['summary']['invalid'] == 1
+
+
+def test_batch_size_is_capped():
+    items = [{}] * (prpm_batch.MAX_BATCH_SIZE + 1)
+
+    status_code, body = prpm_batch.process_batch(items, 'general-inquiry', lambda item: (True, {}), None)
+
+    assert status_code == 400
+    assert prpm_batch.MAX_BATCH_SIZE <= 25
@@ -0,0 +1,134 @@
+import json
+import smtplib
+from email.message import EmailMessage
+
+import pytest
+
+import prpm_circuit
+import prpm_smtp
+from payloads import valid_payload
+from prpm_circuit import CircuitBreaker, CircuitOpenError
+
+
+class Clock:
+    """A settable stand-in for time.monotonic."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(prpm_circuit.time, 'monotonic', clock)
+    return clock
+
+
+def opened(failures: int = 3) -> CircuitBreaker:
+    breaker = CircuitBreaker('smtp.test:587', failure_threshold=failures, reset_timeout=30)
+    for _ in range(failures):
+        breaker.check()
+        breaker.record_failure()
+    return breaker
+
+
+def test_circuit_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker('smtp.test:587', failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == prpm_circuit.CLOSED
+    breaker.record_failure()
+
+    assert breaker.state == prpm_circuit.OPEN
+    assert breaker.is_open()
+    clock.now += 10
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.check()
+    assert error.value.retry_after == pytest.approx(20)
+    assert breaker.stats == {"opened": 1, "rejected": 1, "probes": 0}
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker('smtp.test:587', failure_threshold=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == prpm_circuit.CLOSED
+
+
+def test_one_probe_after_the_reset_timeout_closes_the_circuit(clock):
+    breaker = opened()
+    clock.now += 30
+
+    assert not breaker.is_open()
+    breaker.check()
+    assert breaker.state == prpm_circuit.HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_success()
+
+    assert breaker.state == prpm_circuit.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_the_circuit(clock):
+    breaker = opened()
+    clock.now += 30
+    breaker.check()
+    breaker.record_failure()
+
+    assert breaker.state == prpm_circuit.OPEN
+    assert breaker.retry_after() == pytest.approx(30)
+
+
+def test_breakers_are_shared_by_name():
+    assert prpm_circuit.get_breaker('smtp.shared:587') is prpm_circuit.get_breaker('smtp.shared:587')
+
+
+def message() -> EmailMessage:
+    msg = EmailMessage()
+    msg['Subject'], msg['From'], msg['To'] = 'Test', 'forms@example.com', 'office@example.com'
+    msg.set_content('Test')
+    return msg
+
+
+def test_smtp_timeout_counts_against_the_breaker(smtp_stub):
+    breaker = CircuitBreaker('stub', failure_threshold=1)
+    manager = prpm_smtp.SMTPSessionManager('localhost', smtp_stub.port, 'user', 'secret',
+                                           send_timeout=0.2, breaker=breaker)
+    smtp_stub.set_delays(data_ms=1000)
+
+    with pytest.raises(smtplib.SMTPServerDisconnected):
+        manager.send_message(message())
+    assert breaker.state == prpm_circuit.OPEN
+    with pytest.raises(CircuitOpenError):
+        manager.send_message(message())
+    manager.close()
+
+
+def test_rejected_message_does_not_open_the_circuit(smtp_stub):
+    breaker = CircuitBreaker('stub', failure_threshold=1)
+    manager = prpm_smtp.SMTPSessionManager('localhost', smtp_stub.port, 'user', 'secret', breaker=breaker)
+    smtp_stub.set_failure(554)
+
+    with pytest.raises(smtplib.SMTPDataError):
+        manager.send_message(message())
+    assert breaker.state == prpm_circuit.CLOSED
+    manager.close()
+
+
+def test_handler_fails_fast_while_the_circuit_is_open(load_form, delivery, monkeypatch):
+    handler = load_form('general-inquiry')
+    monkeypatch.setattr(handler, 'get_delivery', lambda *args, **kwargs: delivery)
+    monkeypatch.setattr(delivery, 'is_open', lambda: True)
+    monkeypatch.setattr(delivery, 'retry_after', lambda: 12.3)
+
+    response = handler.lambda_handler({'body': json.dumps(valid_payload('general-inquiry'))}, None)
+
+    assert response['statusCode'] == 503
+    assert response['headers']['Retry-After'] == '13'
+    assert delivery.sent == []
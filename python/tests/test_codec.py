@@ -0,0 +1,21 @@
+import subprocess
+import sys
+
+from _handlers import PYTHON_DIR
+
+FIRST_REQUEST = """
+import json, sys
+sys.path.insert(0, 'benchmarks')
+from _handlers import load_handler
+from payloads import invalid_payload
+handler = load_handler('general-inquiry')
+response = handler.lambda_handler({'body': json.dumps(invalid_payload('general-inquiry'))}, None)
+print(response['statusCode'], 'orjson' in sys.modules)
+"""
+
+
+def test_rejected_first_request_does_not_load_orjson():
+    result = subprocess.run([sys.executable, '-c', FIRST_REQUEST], capture_output=True, text=True,
+                            cwd=PYTHON_DIR, check=True)
+
+    assert result.stdout.split() == ['400', 'False']
@@ -0,0 +1,93 @@
+import smtplib
+
+import pytest
+
+import prpm_circuit
+import prpm_delivery
+from prpm_circuit import CircuitOpenError
+from prpm_delivery import DeliveryPool, parse_endpoints
+
+
+class FakeSession:
+    """Fails every send with `error` when it is set."""
+
+    def __init__(self, name):
+        self.name = name
+        self.error = None
+        self.sent = []
+        self.last_timings = {}
+
+    def send_message(self, msg):
+        if self.error is not None:
+            raise self.error
+        self.sent.append(msg)
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    """Fake sessions by endpoint name, each endpoint with a fresh breaker."""
+    sessions = {}
+    monkeypatch.setattr(prpm_circuit, '_BREAKERS', {})
+    monkeypatch.setattr(prpm_delivery, 'get_session', lambda host, port, *args, **kwargs: (
+        sessions.setdefault(f"{host}:{port}", FakeSession(f"{host}:{port}"))))
+    return sessions
+
+
+def pool(**kwargs) -> DeliveryPool:
+    endpoints = parse_endpoints('primary.test:587,backup.test:465')
+    return DeliveryPool(endpoints, 'user', 'secret', base_delay=0, **kwargs)
+
+
+def test_parse_endpoints():
+    assert parse_endpoints(' smtp.test:587 , smtps://smtp.test:2465,smtp://relay.test:465,bare.test,') == [
+        ('smtp.test', 587, False), ('smtp.test', 2465, True), ('relay.test', 465, False), ('bare.test', 587, False),
+    ]
+
+
+def test_outage_fails_over_to_the_next_endpoint(sessions):
+    delivery = pool()
+    delivery.send_message('first')
+    sessions['primary.test:587'].error = smtplib.SMTPServerDisconnected('Connection dropped')
+
+    delivery.send_message('second')
+
+    assert sessions['primary.test:587'].sent == ['first']
+    assert sessions['backup.test:465'].sent == ['second']
+    assert delivery.stats["failovers"] == 1
+    assert [a["outcome"] for a in delivery.last_timings["attempts"]] == ['SMTPServerDisconnected', 'sent']
+    assert delivery.ranked()[0].name == 'backup.test:465'
+
+
+def test_rejected_message_is_not_retried(sessions):
+    delivery = pool()
+    delivery.send_message('first')
+    sessions['primary.test:587'].error = smtplib.SMTPDataError(554, b'Message rejected')
+
+    with pytest.raises(smtplib.SMTPDataError):
+        delivery.send_message('second')
+    assert 'backup.test:465' not in sessions
+    assert delivery.stats["retries"] == 0
+
+
+def test_last_error_is_raised_when_every_endpoint_is_down(sessions):
+    delivery = pool(max_attempts=3)
+    for name in ('primary.test:587', 'backup.test:465'):
+        sessions[name] = FakeSession(name)
+        sessions[name].error = smtplib.SMTPResponseException(421, b'Try again later')
+
+    with pytest.raises(smtplib.SMTPResponseException):
+        delivery.send_message('message')
+    assert len(delivery.last_timings["attempts"]) == 3
+    assert delivery.stats["failed"] == 1
+
+
+def test_open_circuits_fail_fast(sessions):
+    delivery = pool()
+    for endpoint in delivery.endpoints:
+        for _ in range(endpoint.breaker.failure_threshold):
+            endpoint.breaker.record_failure()
+
+    assert delivery.is_open()
+    with pytest.raises(CircuitOpenError):
+        delivery.send_message('message')
+    assert sessions == {}
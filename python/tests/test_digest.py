@@ -0,0 +1,141 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+
+import prpm_digest
+import prpm_spam
+from _handlers import load_script
+from payloads import valid_payload
+
+
+class RecordingBuffer:
+    def __init__(self):
+        self.entries = []
+
+    def add(self, form_type, title, content):
+        self.entries.append((form_type, title))
+
+
+@pytest.fixture
+def proposal(load_form, monkeypatch):
+    monkeypatch.setenv('PRPM_DIGEST_FORMS', 'proposal')
+    handler = load_form('proposal')
+    buffer = RecordingBuffer()
+    monkeypatch.setattr(handler, 'get_digest_buffer', lambda: buffer)
+    return handler, buffer
+
+
+def deadline_in(days: int) -> str:
+    return f"  {(date.today() + timedelta(days=days)).isoformat()} "
+
+
+def test_padded_near_deadline_is_sent_now(proposal):
+    handler, buffer = proposal
+    body = dict(valid_payload('proposal'), deadlineDate=deadline_in(3))
+
+    assert handler.validate_proposal_data(body)[0]
+    assert not handler.add_to_digest(body)
+    assert buffer.entries == []
+
+
+def test_padded_distant_deadline_is_digested(proposal):
+    handler, buffer = proposal
+    body = dict(valid_payload('proposal'), deadlineDate=deadline_in(60))
+
+    assert handler.add_to_digest(body)
+    assert len(buffer.entries) == 1
+
+
+@pytest.fixture
+def lambda_runtime(monkeypatch):
+    monkeypatch.setenv('AWS_LAMBDA_FUNCTION_NAME', 'prpm-proposal')
+    monkeypatch.setattr(prpm_digest, 'DIGEST_QUEUE_URL', '')
+    monkeypatch.setattr(prpm_digest, '_BUFFER', None)
+
+
+def test_sqlite_digest_is_refused_in_lambda(lambda_runtime, monkeypatch):
+    monkeypatch.setenv('PRPM_DIGEST_FORMS', 'proposal')
+
+    assert not prpm_digest.digest_enabled('proposal')
+    with pytest.raises(RuntimeError):
+        prpm_digest.get_digest_buffer()
+
+
+def test_digest_run_reports_missing_queue(lambda_runtime):
+    digest = load_script('PRPM-digest-lambda-function.py', 'prpm_digest_run_test')
+
+    assert digest.lambda_handler({}, None)['statusCode'] == 500
+
+
+def test_suspected_spam_is_sent_without_a_quarantine_buffer(lambda_runtime, load_form, monkeypatch):
+    handler = load_form('general-inquiry')
+    monkeypatch.setattr(prpm_spam, 'screen', lambda form_type, body: prpm_spam.SpamVerdict(6, ['test'], 'quarantine'))
+
+    assert not handler.screen_submission(valid_payload('general-inquiry'))
+
+
+class RecordingSQS:
+    """Per-queue message lists behind the calls SQSDigestBuffer makes."""
+
+    def __init__(self):
+        self.queues = {}
+        self.receives = []
+
+    def send_message(self, QueueUrl, MessageBody):
+        self.queues.setdefault(QueueUrl, []).append(MessageBody)
+
+    def get_queue_attributes(self, QueueUrl, AttributeNames):
+        return {'Attributes': {'ApproximateNumberOfMessages': str(len(self.queues.get(QueueUrl, [])))}}
+
+    def receive_message(self, QueueUrl, MaxNumberOfMessages, **kwargs):
+        self.receives.append(QueueUrl)
+        pending = self.queues.get(QueueUrl, [])
+        taken, self.queues[QueueUrl] = pending[:MaxNumberOfMessages], pending[MaxNumberOfMessages:]
+        return {'Messages': [{'ReceiptHandle': f'{QueueUrl}#{index}', 'Body': body}
+                             for index, body in enumerate(taken)]}
+
+
+def test_each_form_has_its_own_queue():
+    sqs = RecordingSQS()
+    buffer = prpm_digest.SQSDigestBuffer('https://sqs.test/prpm-digest-{form}', client=sqs)
+    for index in range(3):
+        buffer.add('quarantine', f'spam {index}', 'content')
+    buffer.add('general-inquiry', 'Inquiry', 'content')
+
+    assert buffer.due('quarantine', max_items=3)
+    assert not buffer.due('general-inquiry', max_items=3)
+    [entry] = buffer.claim('general-inquiry')
+    assert (entry.form_type, entry.title) == ('general-inquiry', 'Inquiry')
+    assert set(sqs.receives) == {'https://sqs.test/prpm-digest-general-inquiry'}
+
+
+def test_queue_url_must_name_the_form(monkeypatch):
+    monkeypatch.setattr(prpm_digest, 'DIGEST_QUEUE_URL', 'https://sqs.test/prpm-digest')
+
+    assert not prpm_digest.digest_configured()
+
+
+def test_due_only_run_sends_forms_that_are_due(tmp_path, delivery):
+    buffer = prpm_digest.DigestBuffer(str(tmp_path / 'digest.sqlite3'))
+    for index in range(3):
+        buffer.add('general-inquiry', f'Inquiry {index}', 'content')
+    buffer.add('proposal', 'Proposal', 'content')
+
+    summary = prpm_digest.send_due_digests(buffer, delivery, max_items=3)
+
+    assert summary == {"digests": 1, "entries": 3, "failed": 0}
+    assert [msg['Subject'] for msg in delivery.sent] == ['General Inquiry digest: 3 new submissions']
+    assert buffer.form_types() == ['proposal']
+
+
+def test_handler_does_not_send_digests(proposal, delivery, monkeypatch):
+    handler, buffer = proposal
+    monkeypatch.setattr(handler, 'get_delivery', lambda *args, **kwargs: delivery)
+    body = dict(valid_payload('proposal'), deadlineDate=deadline_in(60))
+
+    response = handler.lambda_handler({'body': json.dumps(body)}, None)
+
+    assert response['statusCode'] == 200
+    assert len(buffer.entries) == 1
+    assert delivery.sent == []
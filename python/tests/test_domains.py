@@ -0,0 +1,102 @@
+import json
+import os
+
+import pytest
+
+import prpm_domains
+from payloads import valid_payload
+from prpm_domains import DomainIndex, build_index, read_domain_list
+
+LIST_PATH = os.path.join(os.path.dirname(prpm_domains.INDEX_PATH), 'prpm_blocked_domains.txt')
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = str(tmp_path / 'domains.idx')
+    domains = {f'disposable{number:03d}.test': 'disposable' for number in range(100)}
+    domains.update({'guerrillamail.com': 'disposable', 'example.com': 'invalid', 'localhost': 'invalid'})
+    build_index(domains, path)
+    index = DomainIndex(path)
+    yield index
+    index.close()
+
+
+def test_committed_index_is_rebuilt_byte_identical(tmp_path):
+    with open(LIST_PATH, encoding='utf-8') as f:
+        domains = read_domain_list(f, LIST_PATH)
+    path = str(tmp_path / 'rebuilt.idx')
+    build_index(domains, path)
+
+    with open(path, 'rb') as rebuilt, open(prpm_domains.INDEX_PATH, 'rb') as committed:
+        assert rebuilt.read() == committed.read()
+
+
+def test_every_domain_round_trips(index):
+    assert len(index) == 103
+    assert dict(index)['disposable042.test'] == 'disposable'
+    assert all(index.kind(domain) == kind for domain, kind in index)
+
+
+def test_kind_is_exact(index):
+    assert index.kind('Example.COM') == 'invalid'
+    assert index.kind('mail.example.com') is None
+    assert index.kind('example.co') is None
+    assert index.kind('disposable042.tes') is None
+    assert index.kind('aaa.test') is None
+    assert index.kind('zzz.test') is None
+
+
+def test_lookup_finds_subdomains(index):
+    assert index.lookup('guerrillamail.com') == 'disposable'
+    assert index.lookup('mx.Sharklasers.guerrillamail.com.') == 'disposable'
+    assert index.lookup('box.localhost') == 'invalid'
+    assert index.lookup('notguerrillamail.com') is None
+    assert index.lookup('gmail.com') is None
+    assert index.lookup('bücher.de') is None
+
+
+def test_domain_list_parsing():
+    lines = ['# comment', '', '*.Mailinator.com', '.trashmail.de  # trailing comment',
+             'example.com invalid', 'bücher.example']
+
+    assert read_domain_list(lines) == {
+        'mailinator.com': 'disposable', 'trashmail.de': 'disposable',
+        'example.com': 'invalid', 'xn--bcher-kva.example': 'disposable',
+    }
+
+
+@pytest.mark.parametrize('line', ['example.com unknown', 'example.com invalid extra'])
+def test_domain_list_errors_name_the_line(line):
+    with pytest.raises(ValueError, match=r'^blocked\.txt:2: '):
+        read_domain_list(['ok.com', line], 'blocked.txt')
+
+
+def test_not_an_index(tmp_path):
+    path = tmp_path / 'domains.idx'
+    path.write_bytes(b'\0' * 32)
+
+    with pytest.raises(ValueError):
+        DomainIndex(str(path))
+
+
+def test_check_email_domain(index, monkeypatch):
+    monkeypatch.setattr(prpm_domains, '_INDEX', index)
+    monkeypatch.setattr(prpm_domains, '_INDEX_LOADED', True)
+
+    assert prpm_domains.check_email_domain('jordan@gmail.com') is True
+    assert prpm_domains.check_email_domain('jordan@mail.guerrillamail.com') == (
+        False, prpm_domains.DOMAIN_ERRORS['disposable'])
+    monkeypatch.setenv('PRPM_DOMAIN_CHECK', '0')
+    assert prpm_domains.check_email_domain('jordan@guerrillamail.com') is True
+
+
+def test_handler_rejects_a_disposable_address(load_form, delivery, monkeypatch):
+    handler = load_form('general-inquiry')
+    monkeypatch.setattr(handler, 'get_delivery', lambda *args, **kwargs: delivery)
+    body = dict(valid_payload('general-inquiry'), email='jordan@guerrillamail.com')
+
+    response = handler.lambda_handler({'body': json.dumps(body)}, None)
+
+    assert response['statusCode'] == 400
+    assert json.loads(response['body'])['errors']['email'] == prpm_domains.DOMAIN_ERRORS['disposable']
+    assert delivery.sent == []
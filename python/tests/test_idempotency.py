@@ -0,0 +1,76 @@
+import json
+
+import prpm_idempotency
+from payloads import valid_payload
+
+
+class Clock:
+    """A settable stand-in for time.monotonic."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entry_expires_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(prpm_idempotency.time, 'monotonic', clock)
+    cache = prpm_idempotency.IdempotencyCache(ttl=60)
+    cache.put('key', {'statusCode': 200})
+
+    clock.now += 59
+    assert cache.get('key') == {'statusCode': 200}
+    clock.now += 2
+    assert cache.get('key') is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_oldest_entry_is_evicted():
+    cache = prpm_idempotency.IdempotencyCache(max_entries=2)
+    for key in ('a', 'b'):
+        cache.put(key, {'key': key})
+    cache.get('a')
+    cache.put('c', {'key': 'c'})
+
+    assert cache.get('b') is None
+    assert cache.get('a') == {'key': 'a'}
+
+
+def test_shared_store_answers_another_container(tmp_path):
+    path = str(tmp_path / 'idempotency.sqlite3')
+    first = prpm_idempotency.IdempotencyCache(store=prpm_idempotency.SharedIdempotencyStore(path))
+    second = prpm_idempotency.IdempotencyCache(store=prpm_idempotency.SharedIdempotencyStore(path))
+    first.put('key', {'statusCode': 200})
+
+    assert second.get('key') == {'statusCode': 200}
+
+
+def test_duplicate_replays_the_stored_response(load_form, delivery, monkeypatch):
+    handler = load_form('general-inquiry')
+    monkeypatch.setattr(handler, 'get_delivery', lambda *args, **kwargs: delivery)
+    event = {'body': json.dumps(valid_payload('general-inquiry'))}
+
+    first = handler.lambda_handler(event, None)
+    second = handler.lambda_handler(event, None)
+
+    assert first['statusCode'] == second['statusCode'] == 200
+    assert second['body'] == first['body']
+    assert second['headers']['Idempotent-Replayed'] == 'true'
+    assert 'Idempotent-Replayed' not in first['headers']
+    assert len(delivery.sent) == 1
+
+
+def test_client_key_takes_precedence_over_body(load_form, delivery, monkeypatch):
+    handler = load_form('general-inquiry')
+    monkeypatch.setattr(handler, 'get_delivery', lambda *args, **kwargs: delivery)
+    headers = {'Idempotency-Key': 'retry-1'}
+    first = dict(valid_payload('general-inquiry'), message='First attempt at this message.')
+    retry = dict(first, message='Edited before the retry.')
+
+    handler.lambda_handler({'body': json.dumps(first), 'headers': headers}, None)
+    response = handler.lambda_handler({'body': json.dumps(retry), 'headers': headers}, None)
+
+    assert response['headers']['Idempotent-Replayed'] == 'true'
+    assert len(delivery.sent) == 1
@@ -0,0 +1,82 @@
+import base64
+import gzip
+import json
+
+import pytest
+
+import prpm_intake
+from prpm_intake import IntakeError, read_body
+
+
+def rejected(event, **kwargs) -> int:
+    with pytest.raises(IntakeError) as error:
+        read_body(event, **kwargs)
+    return error.value.status_code
+
+
+def test_json_body_is_parsed():
+    assert read_body({'body': '{"name": "Jordan"}'}) == {'name': 'Jordan'}
+
+
+def test_oversized_body_is_refused_before_parsing():
+    assert rejected({'body': '{' * 101}, max_bytes=100) == 413
+
+
+def test_base64_body_is_decoded():
+    event = {'body': base64.b64encode(b'{"name": "Jordan"}').decode(), 'isBase64Encoded': True}
+
+    assert read_body(event) == {'name': 'Jordan'}
+
+
+def test_oversized_base64_body_is_refused():
+    event = {'body': base64.b64encode(b'x' * 200).decode(), 'isBase64Encoded': True}
+
+    assert rejected(event, max_bytes=100) == 413
+    assert rejected({'body': 'abc', 'isBase64Encoded': True}) == 400
+
+
+def gzipped(data: bytes) -> dict:
+    return {'body': base64.b64encode(gzip.compress(data)).decode(), 'isBase64Encoded': True,
+            'headers': {'Content-Encoding': 'gzip'}}
+
+
+def test_gzip_body_is_inflated():
+    assert read_body(gzipped(json.dumps({'name': 'Jordan'}).encode())) == {'name': 'Jordan'}
+
+
+def test_compression_bomb_is_refused():
+    event = gzipped(b' ' * 10_000_000)
+
+    assert len(event['body']) < 100_000
+    assert rejected(event, max_bytes=1024) == 413
+
+
+def test_unsupported_encoding_is_refused():
+    assert rejected({'body': '{}', 'headers': {'content-encoding': 'br'}}) == 415
+
+
+def test_urlencoded_body_becomes_a_flat_dict():
+    event = {'body': 'firstName=Jordan&message=Hi+there&blank=',
+             'headers': {'Content-Type': 'application/x-www-form-urlencoded; charset=utf-8'}}
+
+    assert read_body(event) == {'firstName': 'Jordan', 'message': 'Hi there', 'blank': ''}
+
+
+def test_urlencoded_field_count_is_capped(monkeypatch):
+    monkeypatch.setattr(prpm_intake, 'MAX_FORM_FIELDS', 3)
+    event = {'body': 'a=1&b=2&c=3&d=4', 'headers': {'Content-Type': 'application/x-www-form-urlencoded'}}
+
+    assert rejected(event) == 413
+
+
+def test_multipart_is_refused_by_forms_without_attachments():
+    event = {'body': '--x--', 'headers': {'Content-Type': 'multipart/form-data; boundary=x'}}
+
+    assert rejected(event) == 415
+
+
+def test_handler_answers_413(load_form):
+    handler = load_form('general-inquiry')
+    event = {'body': json.dumps({'message': 'x' * (prpm_intake.MAX_BODY_BYTES + 1)})}
+
+    assert handler.lambda_handler(event, None)['statusCode'] == 413
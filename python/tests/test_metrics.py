@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+import prpm_metrics
+
+
+@pytest.fixture
+def metrics_on(monkeypatch):
+    monkeypatch.setenv('PRPM_METRICS', '1')
+    monkeypatch.setattr(prpm_metrics, '_cold_start', True)
+
+
+def handler_with_phases(event, context):
+    with prpm_metrics.phase('Validate'):
+        pass
+    with prpm_metrics.phase('Validate'):
+        pass
+    prpm_metrics.record_smtp({'connect_ms': 12.5, 'send_ms': 3.0, 'reused': False})
+    prpm_metrics.set_property('Spam', 'drop')
+    return {'statusCode': 200}
+
+
+def records(capsys):
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+def test_each_invocation_emits_one_record(metrics_on, capsys):
+    handler = prpm_metrics.instrumented('general-inquiry')(handler_with_phases)
+
+    handler({}, None)
+    handler({}, None)
+    first, second = records(capsys)
+
+    assert (first['StartType'], second['StartType']) == ('cold', 'warm')
+    assert first['FormType'] == 'general-inquiry' and first['StatusCode'] == 200
+    assert first['Spam'] == 'drop' and first['SmtpSessionReused'] is False
+    assert (first['ConnectMs'], first['SendMs']) == (12.5, 3.0)
+    names = {metric['Name'] for metric in first['_aws']['CloudWatchMetrics'][0]['Metrics']}
+    assert {'ValidateMs', 'ConnectMs', 'SendMs', 'TotalMs'} <= names
+    assert first['_aws']['CloudWatchMetrics'][0]['Dimensions'] == [prpm_metrics.DIMENSIONS]
+
+
+def test_failed_invocation_still_emits(metrics_on, capsys):
+    def failing(event, context):
+        raise RuntimeError('boom')
+
+    with pytest.raises(RuntimeError):
+        prpm_metrics.instrumented('proposal')(failing)({}, None)
+    [record] = records(capsys)
+
+    assert record['StatusCode'] is None
+
+
+def test_metrics_can_be_switched_off(monkeypatch, capsys):
+    monkeypatch.setenv('PRPM_METRICS', '0')
+
+    assert prpm_metrics.instrumented('proposal')(handler_with_phases)({}, None) == {'statusCode': 200}
+    assert capsys.readouterr().out == ''
+    with prpm_metrics.phase('Validate'):
+        pass
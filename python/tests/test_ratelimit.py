@@ -0,0 +1,41 @@
+import json
+
+import prpm_batch
+import prpm_ratelimit
+from payloads import invalid_payload
+
+
+def test_charge_larger_than_burst_leaves_the_bucket_in_debt():
+    limiter = prpm_ratelimit.TokenBucketLimiter(rate=1.0, burst=5, max_keys=10)
+
+    assert limiter.acquire('203.0.113.1', cost=20)[0]
+    allowed, retry_after = limiter.acquire('203.0.113.1')
+
+    assert not allowed
+    assert retry_after > 15
+
+
+def test_shared_store_charges_batches_the_same_way(tmp_path):
+    store = prpm_ratelimit.SharedRateLimitStore(str(tmp_path / 'limits.sqlite3'))
+    limiter = prpm_ratelimit.TokenBucketLimiter(rate=1.0, burst=5, store=store)
+
+    assert limiter.acquire('203.0.113.1', cost=20)[0]
+    assert not limiter.acquire('203.0.113.1')[0]
+
+
+def test_batch_is_charged_per_submission(load_form, monkeypatch):
+    monkeypatch.setenv('PRPM_RATE_LIMIT', '1')
+    monkeypatch.setattr(prpm_ratelimit, '_LIMITER', prpm_ratelimit.TokenBucketLimiter(rate=0.1, burst=5))
+    monkeypatch.setattr(prpm_batch, 'BATCH_TOKEN', 'integration-secret')
+    handler = load_form('general-inquiry')
+    event = {
+        'body': json.dumps([invalid_payload('general-inquiry')] * 4),
+        'headers': {'Authorization': 'Bearer integration-secret'},
+        'requestContext': {'identity': {'sourceIp': '203.0.113.7'}},
+    }
+
+    assert handler.lambda_handler(event, None)['statusCode'] == 207
+    response = handler.lambda_handler(event, None)
+
+    assert response['statusCode'] == 429
+    assert 'Retry-After' in response['headers']
@@ -0,0 +1,29 @@
+import json
+
+import prpm_intake
+from _handlers import load_router
+
+
+def test_unknown_form_is_not_found():
+    router = load_router('prpm_forms_router_test')
+
+    response = router.lambda_handler({'rawPath': '/forms', 'body': json.dumps({'formType': 'survey'})}, None)
+
+    assert response['statusCode'] == 404
+
+
+def test_invalid_json_is_a_bad_request():
+    router = load_router('prpm_forms_router_test')
+
+    response = router.lambda_handler({'rawPath': '/forms', 'body': '{"formType": "proposal",'}, None)
+
+    assert response['statusCode'] == 400
+    assert json.loads(response['body'])['message'] == "Invalid JSON format in request body."
+
+
+def test_rejected_body_keeps_its_status():
+    router = load_router('prpm_forms_router_test')
+
+    response = router.lambda_handler({'rawPath': '/forms', 'body': 'x' * (prpm_intake.MAX_BODY_BYTES + 1)}, None)
+
+    assert response['statusCode'] == 413
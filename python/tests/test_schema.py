@@ -0,0 +1,37 @@
+import random
+
+import pytest
+
+import legacy
+from payload_generator import DEFAULT_MIX, PayloadGenerator
+from payloads import invalid_payload, valid_payload
+
+VALIDATOR_NAMES = {
+    'contractor-application': 'validate_contractor_data',
+    'proposal': 'validate_proposal_data',
+    'general-inquiry': 'validate_general_inquiry_data',
+}
+
+
+@pytest.mark.parametrize('form_type', VALIDATOR_NAMES)
+def test_schema_matches_the_legacy_validator(load_form, form_type):
+    validate = getattr(load_form(form_type), VALIDATOR_NAMES[form_type])
+    generator = PayloadGenerator(form_type, random.Random(7))
+    payloads = [valid_payload(form_type), invalid_payload(form_type)]
+    for case in DEFAULT_MIX:
+        if generator.supports(case):
+            payloads += [generator.generate(case)[0] for _ in range(20)]
+
+    for payload in payloads:
+        assert validate(payload) == legacy.VALIDATORS[form_type](payload), payload
+
+
+def test_normalize_keeps_stripped_schema_values(load_form):
+    schema = load_form('general-inquiry').GENERAL_INQUIRY_SCHEMA
+    body = dict(valid_payload('general-inquiry'), firstName='  Jordan ', mobilePhone='   ', notAField='x')
+
+    normalized = schema.normalize(body)
+
+    assert normalized['firstName'] == 'Jordan'
+    assert 'mobilePhone' not in normalized
+    assert 'notAField' not in normalized
@@ -0,0 +1,86 @@
+import smtplib
+
+import pytest
+
+import prpm_smtp
+
+
+class FakeSocket:
+    session = None
+    session_reused = False
+
+    def settimeout(self, timeout):
+        pass
+
+
+class FailingSMTP:
+    """Connects, then fails at STARTTLS or LOGIN."""
+
+    instances = []
+
+    def __init__(self, host, port, timeout=None, fail_at='login'):
+        self.sock = FakeSocket()
+        self.closed = False
+        self.fail_at = fail_at
+        FailingSMTP.instances.append(self)
+
+    def starttls(self, context=None):
+        if self.fail_at == 'starttls':
+            raise TimeoutError('STARTTLS timed out')
+
+    def login(self, username, password):
+        raise smtplib.SMTPAuthenticationError(535, b'Authentication failed')
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.parametrize('fail_at', ['starttls', 'login'])
+def test_failed_setup_closes_the_connection(monkeypatch, fail_at):
+    FailingSMTP.instances.clear()
+    monkeypatch.setattr(smtplib, 'SMTP', lambda *args, **kwargs: FailingSMTP(*args, fail_at=fail_at, **kwargs))
+    manager = prpm_smtp.SMTPSessionManager('smtp.invalid', 587, 'user', 'secret')
+    monkeypatch.setattr(manager, '_tls_context', lambda: None)
+
+    with pytest.raises((TimeoutError, smtplib.SMTPAuthenticationError)):
+        manager._connect()
+
+    assert [server.closed for server in FailingSMTP.instances] == [True]
+
+
+def notification():
+    from email.message import EmailMessage
+
+    msg = EmailMessage()
+    msg['From'] = 'noreply@paxriverpm.com'
+    msg['To'] = 'info@paxriverpm.com'
+    msg['Subject'] = 'Test'
+    msg.set_content('Hello')
+    return msg
+
+
+def test_ssl_context_is_created_once(smtp_stub):
+    assert prpm_smtp.get_ssl_context() is prpm_smtp.get_ssl_context()
+
+
+def test_reconnect_resumes_the_tls_session(smtp_stub):
+    manager = prpm_smtp.SMTPSessionManager('localhost', smtp_stub.port, 'user', 'secret')
+
+    manager.send_message(notification())
+    assert manager.last_timings['tls_session_reused'] is False
+    manager.close()
+    manager.send_message(notification())
+
+    assert manager.last_timings['tls_session_reused'] is True
+    assert (manager.stats['tls_full_handshakes'], manager.stats['tls_resumptions']) == (1, 1)
+    assert smtp_stub.delivered == 2
+
+
+def test_warm_connection_is_reused(smtp_stub):
+    manager = prpm_smtp.SMTPSessionManager('localhost', smtp_stub.port, 'user', 'secret')
+
+    manager.send_message(notification())
+    manager.send_message(notification())
+
+    assert (manager.stats['connects'], manager.stats['reuses']) == (1, 1)
+    assert smtp_stub.connections == 1
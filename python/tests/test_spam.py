@@ -0,0 +1,65 @@
+import base64
+import json
+
+import prpm_digest
+import prpm_spam
+from payloads import valid_payload
+
+
+class RecordingBuffer:
+    def __init__(self):
+        self.entries = []
+
+    def add(self, form_type, title, content):
+        self.entries.append((form_type, title, content))
+
+
+def suspected_spam(monkeypatch):
+    buffer = RecordingBuffer()
+    monkeypatch.setattr(prpm_digest, '_BUFFER', buffer)
+    monkeypatch.setattr(prpm_spam, 'screen', lambda form_type, body: prpm_spam.SpamVerdict(6, ['test'], 'quarantine'))
+    return buffer
+
+
+def test_suspected_spam_is_quarantined(load_form, delivery, monkeypatch):
+    handler = load_form('contractor-application')
+    monkeypatch.setattr(handler, 'get_delivery', lambda *args, **kwargs: delivery)
+    buffer = suspected_spam(monkeypatch)
+
+    response = handler.lambda_handler({'body': json.dumps(valid_payload('contractor-application'))}, None)
+
+    assert response['statusCode'] == 200
+    [(form_type, title, content)] = buffer.entries
+    assert form_type == prpm_digest.QUARANTINE_FORM
+    assert delivery.sent == []
+
+
+def test_suspected_spam_with_uploads_is_delivered(load_form, object_store, delivery, monkeypatch):
+    handler = load_form('contractor-application')
+    monkeypatch.setattr(handler, 'get_delivery', lambda *args, **kwargs: delivery)
+    buffer = suspected_spam(monkeypatch)
+    token = object_store.upload('contractor-application', 'license.pdf', 'application/pdf', b'%PDF-1.7\n' * 10)
+    body = dict(valid_payload('contractor-application'), uploads=[token])
+
+    response = handler.lambda_handler({'body': json.dumps(body)}, None)
+
+    assert response['statusCode'] == 200
+    assert buffer.entries == []
+    [msg] = delivery.sent
+    assert 'https://uploads.test/' in msg.get_body(('plain',)).get_content()
+
+
+def test_suspected_spam_with_attachments_is_delivered(load_form, delivery, monkeypatch):
+    handler = load_form('contractor-application')
+    monkeypatch.setattr(handler, 'get_delivery', lambda *args, **kwargs: delivery)
+    buffer = suspected_spam(monkeypatch)
+    attachment = {'filename': 'insurance.pdf', 'contentType': 'application/pdf',
+                  'data': base64.b64encode(b'%PDF-1.7\n' * 10).decode('ascii')}
+    body = dict(valid_payload('contractor-application'), attachments=[attachment])
+
+    response = handler.lambda_handler({'body': json.dumps(body)}, None)
+
+    assert response['statusCode'] == 200
+    assert buffer.entries == []
+    [msg] = delivery.sent
+    assert b'filename="insurance.pdf"' in msg.as_bytes()
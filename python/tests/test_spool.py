@@ -0,0 +1,56 @@
+import pytest
+
+import prpm_spool
+from _handlers import load_script
+
+
+@pytest.fixture
+def lambda_runtime(monkeypatch):
+    monkeypatch.setenv('AWS_LAMBDA_FUNCTION_NAME', 'prpm-general-inquiry')
+    monkeypatch.setattr(prpm_spool, 'SPOOL_QUEUE_URL', '')
+    monkeypatch.setattr(prpm_spool, '_SPOOL', None)
+
+
+def test_sqlite_spool_is_refused_in_lambda(lambda_runtime, monkeypatch):
+    monkeypatch.setenv('PRPM_SPOOL_MODE', '1')
+    monkeypatch.setenv('PRPM_SMTP_FALLBACK', 'spool')
+
+    assert not prpm_spool.spool_mode_enabled()
+    assert not prpm_spool.spool_fallback_enabled()
+    with pytest.raises(RuntimeError):
+        prpm_spool.get_spool()
+
+
+def test_drain_reports_missing_queue(lambda_runtime, monkeypatch):
+    monkeypatch.setenv('ZEPTO_USER', 'user')
+    monkeypatch.setenv('ZEPTO_PASS', 'secret')
+    drain = load_script('PRPM-spool-drain-lambda-function.py', 'prpm_spool_drain_test')
+
+    assert drain.lambda_handler({}, None)['statusCode'] == 500
+
+
+def test_sqlite_spool_outside_lambda(monkeypatch):
+    monkeypatch.delenv('AWS_LAMBDA_FUNCTION_NAME', raising=False)
+    monkeypatch.setenv('PRPM_SPOOL_MODE', '1')
+    monkeypatch.setattr(prpm_spool, 'SPOOL_QUEUE_URL', '')
+
+    assert prpm_spool.spool_mode_enabled()
+
+
+class RecordingSQS:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, **kwargs):
+        self.sent.append(kwargs)
+        return {'MessageId': str(len(self.sent))}
+
+
+def test_sqs_spool_refuses_oversize_messages():
+    sqs = RecordingSQS()
+    spool = prpm_spool.SQSSpool('https://sqs.example/queue', client=sqs)
+
+    assert spool.enqueue('general-inquiry', b'x' * 1024) == '1'
+    with pytest.raises(prpm_spool.MessageTooLargeError):
+        spool.enqueue('contractor-application', b'x' * (200 * 1024))
+    assert len(sqs.sent) == 1
@@ -0,0 +1,97 @@
+import json
+import time
+
+import pytest
+
+import prpm_store
+from _handlers import load_script
+from payloads import valid_payload
+
+
+def test_resubmission_is_stored_again(tmp_path):
+    store = prpm_store.SubmissionStore(str(tmp_path / 'submissions.sqlite3'))
+    fields = {'firstName': 'Jordan', 'email': 'jordan.alvarez@mail.test'}
+
+    for submitted_at in (time.time() - 3600, time.time()):
+        store.write([(prpm_store.new_submission_id(), 'same-key', 'general-inquiry', submitted_at, fields)])
+    submissions, _ = store.query(form_type='general-inquiry')
+
+    assert store.count(form_type='general-inquiry') == 2
+    assert len({submission['id'] for submission in submissions}) == 2
+    assert [submission['idempotencyKey'] for submission in submissions] == ['same-key', 'same-key']
+    assert store.get(submissions[0]['id'])['idempotencyKey'] == 'same-key'
+
+
+def test_rejected_upload_is_not_recorded(load_form, object_store, monkeypatch):
+    handler = load_form('contractor-application')
+    recorded = []
+    monkeypatch.setattr(prpm_store, 'record_submission', lambda *args: recorded.append(args))
+    token = object_store.upload('contractor-application', 'license.pdf', 'application/pdf', b'%PDF-1.7\n',
+                                stored=False)
+    body = dict(valid_payload('contractor-application'), uploads=[token])
+
+    response = handler.lambda_handler({'body': json.dumps(body)}, None)
+
+    assert response['statusCode'] == 400
+    assert 'has not been uploaded' in json.loads(response['body'])['message']
+    assert recorded == []
+
+
+class RecordingDynamoDB:
+    def __init__(self):
+        self.queries = []
+
+    def query(self, **params):
+        self.queries.append(params)
+        return {'Items': []}
+
+
+def test_dynamo_time_range_is_one_key_condition():
+    client = RecordingDynamoDB()
+    store = prpm_store.DynamoSubmissionStore('submissions', client=client)
+
+    store.query(form_type='proposal', state='Maryland', since=1000.0, until=2000.0)
+    params = client.queries[0]
+
+    assert params['IndexName'] == 'state-submittedAt'
+    assert params['KeyConditionExpression'].endswith('#t BETWEEN :since AND :until')
+    assert params['ExpressionAttributeNames']['#t'] == 'submittedAt'
+    assert params['ExpressionAttributeValues'][':since'] == {'N': '1000.0'}
+    assert 1999.999 < float(params['ExpressionAttributeValues'][':until']['N']) < 2000.0
+    assert params['FilterExpression'] == '#a0 = :v0'
+    assert list(params['ExpressionAttributeNames'].values()).count('submittedAt') == 1
+
+
+def test_dynamo_until_alone_is_a_key_condition():
+    client = RecordingDynamoDB()
+    store = prpm_store.DynamoSubmissionStore('submissions', client=client)
+
+    store.query(form_type='proposal', until=2000.0)
+
+    assert client.queries[0]['KeyConditionExpression'] == '#a0 = :v0 AND #t < :until'
+    assert 'FilterExpression' not in client.queries[0]
+
+
+@pytest.fixture
+def lambda_runtime(monkeypatch):
+    monkeypatch.setenv('AWS_LAMBDA_FUNCTION_NAME', 'prpm-general-inquiry')
+    monkeypatch.setattr(prpm_store, 'STORE_TABLE', '')
+    monkeypatch.setattr(prpm_store, '_STORE', None)
+
+
+def test_sqlite_store_is_refused_in_lambda(lambda_runtime, monkeypatch):
+    monkeypatch.setenv('PRPM_SUBMISSION_STORE', '1')
+
+    assert not prpm_store.store_enabled()
+    with pytest.raises(RuntimeError):
+        prpm_store.get_submission_store()
+
+
+def test_query_reports_missing_table(lambda_runtime, monkeypatch):
+    monkeypatch.setenv('PRPM_QUERY_TOKEN', 'staff-token')
+    query = load_script('PRPM-submissions-query-lambda-function.py', 'prpm_submissions_query_test')
+
+    response = query.lambda_handler({'headers': {'Authorization': 'Bearer staff-token'}}, None)
+
+    assert response['statusCode'] == 500
+    assert json.loads(response['body'])['error'] == 'Submission table missing'
@@ -0,0 +1,57 @@
+import pytest
+
+import legacy
+from bench_templates import TEMPLATE_NAMES, same_text
+from payloads import valid_payload
+from prpm_templates import Block, Line, Section, compile_template, escape_html
+
+
+@pytest.mark.parametrize('form_type', sorted(TEMPLATE_NAMES))
+def test_text_matches_the_legacy_formatter(load_form, form_type):
+    template = getattr(load_form(form_type), TEMPLATE_NAMES[form_type])
+    payload = valid_payload(form_type)
+
+    assert same_text(legacy.FORMATTERS[form_type](payload), template.render_text(payload))
+    assert template.render(payload)[0] == template.render_text(payload)
+
+
+def test_html_part_escapes_values():
+    template = compile_template("New <Test> Submission", [
+        Section("DETAILS", [Line("Name", 'name'), Block("Notes", 'notes')]),
+    ])
+    body = {'name': 'Tom & "Jerry"', 'notes': "<script>alert('x')</script>"}
+
+    text, html = template.render(body)
+
+    assert 'Name: Tom & "Jerry"\n' in text
+    assert "<script>alert('x')</script>\n" in text
+    assert 'New &lt;Test&gt; Submission' in html
+    assert 'Tom &amp; &quot;Jerry&quot;' in html
+    assert '&lt;script&gt;alert(&#x27;x&#x27;)&lt;/script&gt;' in html
+    assert '<script>' not in html
+
+
+def test_missing_fields_use_defaults_and_transforms():
+    template = compile_template("Heading", [
+        Section("DETAILS", [Line("Phone", 'phone', default='Not provided'),
+                            Line("Count", lambda body: len(body)),
+                            Line("State", 'state', transform=str.upper)]),
+    ])
+
+    text = template.render_text({'state': 'md'})
+
+    assert 'Phone: Not provided\n' in text
+    assert 'Count: 1\n' in text
+    assert 'State: MD\n' in text
+
+
+def test_notification_is_multipart(load_form):
+    handler = load_form('general-inquiry')
+    msg = handler.build_message(valid_payload('general-inquiry'))
+
+    assert msg.get_content_type() == 'multipart/alternative'
+    assert [part.get_content_type() for part in msg.iter_parts()] == ['text/plain', 'text/html']
+
+
+def test_escape_html_leaves_plain_text_alone():
+    assert escape_html('Plain text') == 'Plain text'
@@ -0,0 +1,18 @@
+import json
+
+import pytest
+
+from payloads import valid_payload
+
+
+@pytest.mark.parametrize('uploads', [' ', ',', ['']])
+def test_blank_uploads_are_ignored(load_form, delivery, monkeypatch, uploads):
+    handler = load_form('contractor-application')
+    monkeypatch.setattr(handler, 'get_delivery', lambda *args, **kwargs: delivery)
+    body = dict(valid_payload('contractor-application'), uploads=uploads)
+
+    response = handler.lambda_handler({'body': json.dumps(body)}, None)
+
+    assert response['statusCode'] == 200
+    [msg] = delivery.sent
+    assert 'None uploaded' in msg.get_body(('plain',)).get_content()